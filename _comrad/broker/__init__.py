@@ -0,0 +1,12 @@
+# flake8: noqa: F401
+"""
+Local subscription broker, that owns control system subscriptions on behalf of all ComRAD applications running on
+the same console, so that each device is subscribed only once, and JAPC runs in a single JVM.
+
+This package must not import Qt, PyDM or :mod:`comrad` (except for :class:`~_comrad.broker.backends.JapcBackend`),
+as it is used by the launcher and by the broker daemon.
+"""
+
+from .protocol import default_socket_path, BrokerError
+from .backends import BrokerBackend, SyntheticBackend, JapcBackend, SubscriptionKey
+from .server import BrokerServer, probe_broker, spawn_broker
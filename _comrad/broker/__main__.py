@@ -0,0 +1,7 @@
+"""Entrypoint of the broker daemon, equivalent to ``comrad broker``, that is used to start the broker automatically."""
+import sys
+from _comrad.launcher import run
+
+
+sys.argv.insert(1, 'broker')
+run()
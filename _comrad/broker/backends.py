@@ -0,0 +1,339 @@
+"""
+Control system access of the subscription broker.
+
+Backends are called from the broker thread, and may deliver values from any thread.
+"""
+import logging
+import threading
+import numpy as np
+from abc import ABCMeta, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, NamedTuple, Tuple
+from ..jvm_prewarm import set_jvm_flags
+
+
+logger = logging.getLogger(__name__)
+
+
+ValueCallback = Callable[[Any, Dict[str, Any]], None]
+"""Receives the value and its header."""
+
+ErrorCallback = Callable[[str], None]
+"""Receives the error message."""
+
+
+class SubscriptionKey(NamedTuple):
+    """Identifies the control system subscription that is shared among the clients."""
+
+    parameter_name: str
+    """Device/property(#field) address, without the selector and data filters."""
+
+    selector: Optional[str]
+    """Cycle selector."""
+
+    data_filters: Tuple[Tuple[str, Any], ...]
+    """Data filters (sorted by name)."""
+
+    @classmethod
+    def create(cls, parameter_name: str, selector: Optional[str], data_filters: Optional[Dict[str, Any]]) -> 'SubscriptionKey':
+        """
+        Create a key from the request of the client.
+
+        Args:
+            parameter_name: Device/property(#field) address.
+            selector: Cycle selector.
+            data_filters: Data filters.
+
+        Returns:
+            New key.
+        """
+        return cls(parameter_name=parameter_name,
+                   selector=selector or None,
+                   data_filters=tuple(sorted((data_filters or {}).items())))
+
+    def __str__(self):
+        res = self.parameter_name
+        if self.selector:
+            res += f'@{self.selector}'
+        if self.data_filters:
+            res += '?' + '&'.join(f'{k}={v}' for k, v in self.data_filters)
+        return res
+
+
+class BrokerBackend(metaclass=ABCMeta):
+    """Base class for the control system access, that the broker shares among the clients."""
+
+    @abstractmethod
+    def subscribe(self, key: SubscriptionKey, on_value: ValueCallback, on_error: ErrorCallback):
+        """
+        Start the subscription. Called only once for each key, until it is unsubscribed.
+
+        Args:
+            key: Subscription.
+            on_value: Callback for each new value.
+            on_error: Callback for subscription errors.
+        """
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, key: SubscriptionKey):
+        """
+        Stop the subscription, when the last client has left.
+
+        Args:
+            key: Subscription.
+        """
+        pass
+
+    @abstractmethod
+    def get(self, key: SubscriptionKey, on_value: ValueCallback, on_error: ErrorCallback):
+        """
+        Asynchronous GET request.
+
+        Args:
+            key: Parameter to read.
+            on_value: Callback for the value.
+            on_error: Callback for the failure.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: SubscriptionKey, value: Any, rbac_token: Optional[bytes]):
+        """
+        SET request. It is executed in a worker thread, and may block.
+
+        Args:
+            key: Parameter to write.
+            value: New value.
+            rbac_token: Encoded RBAC token of the requesting application.
+
+        Raises:
+            Exception: If the request has failed.
+        """
+        pass
+
+    def config(self) -> Dict[str, Any]:
+        """
+        Description of the environment, that clients compare with their own, to decide if they can use the broker.
+        """
+        return {}
+
+    def close(self):
+        """Release the resources, when the broker shuts down."""
+        pass
+
+
+class SyntheticBackend(BrokerBackend):
+
+    def __init__(self, period: float = 1.0):
+        """
+        Backend that produces values without any control system, to try and benchmark the broker locally.
+
+        Every subscription receives a counter every ``period`` seconds. When ``size`` data filter is given, an array
+        of this length is produced instead. Values written with SET are delivered to the subscribers instead of
+        the counter.
+
+        Args:
+            period: Interval between values (in seconds).
+        """
+        self.period = period
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[SubscriptionKey, Tuple[ValueCallback, int]] = {}
+        self._written: Dict[str, Any] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='comrad-broker-synthetic', daemon=True)
+        self._thread.start()
+
+    def subscribe(self, key: SubscriptionKey, on_value: ValueCallback, on_error: ErrorCallback):
+        with self._lock:
+            self._subscriptions[key] = on_value, 0
+
+    def unsubscribe(self, key: SubscriptionKey):
+        with self._lock:
+            self._subscriptions.pop(key, None)
+
+    def get(self, key: SubscriptionKey, on_value: ValueCallback, on_error: ErrorCallback):
+        on_value(self._produce(key, 0), self._header(key))
+
+    def set(self, key: SubscriptionKey, value: Any, rbac_token: Optional[bytes]):
+        with self._lock:
+            self._written[key.parameter_name] = value
+
+    def config(self) -> Dict[str, Any]:
+        return {'backend': 'synthetic'}
+
+    def close(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.period):
+            with self._lock:
+                subscriptions = list(self._subscriptions.items())
+                for key, (callback, counter) in subscriptions:
+                    self._subscriptions[key] = callback, counter + 1
+            for key, (callback, counter) in subscriptions:
+                callback(self._produce(key, counter + 1), self._header(key))
+
+    def _produce(self, key: SubscriptionKey, counter: int) -> Any:
+        try:
+            return self._written[key.parameter_name]
+        except KeyError:
+            pass
+        size = dict(key.data_filters).get('size')
+        if size is None:
+            return counter
+        return np.sin(np.linspace(0, 2 * np.pi, int(size)) + counter * 0.1)
+
+    def _header(self, key: SubscriptionKey) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        return {
+            'acqStamp': now,
+            'cycleStamp': now,
+            'setStamp': now,
+            'selector': key.selector or '',
+            'isFirstUpdate': False,
+        }
+
+
+class JapcBackend(BrokerBackend):
+
+    def __init__(self, cmw_env: str, jvm_flags: Optional[Dict[str, str]] = None, use_inca: bool = True):
+        """
+        Backend that accesses the control system via PyJapc (or PAPC, when it replaces PyJapc).
+
+        RBAC token of a client is used only for its own SET requests, and the token of the broker is restored
+        afterwards. Subscriptions and GET requests are always executed with the broker's own identity (the broker
+        does not log in), therefore parameters that require authorization to be read are not available via the broker.
+
+        Args:
+            cmw_env: CMW environment, reported to the clients.
+            jvm_flags: JVM flags to be set as system properties.
+            use_inca: Whether to route JAPC connections through known InCA servers.
+        """
+        from comrad.data.pyjapc_patch import PyJapcWrapper, in_papc_mode
+
+        class _BrokerJapc(PyJapcWrapper):
+
+            def _setup_jvm(self, log_level):
+                super()._setup_jvm(log_level=log_level)
+                set_jvm_flags(jvm_flags or {})
+
+        self._cmw_env = cmw_env
+        self._jvm_flags = jvm_flags or {}
+        self._use_inca = use_inca
+        self._in_papc_mode = in_papc_mode
+        self._japc = _BrokerJapc(selector='', incaAcceleratorName='' if use_inca else None)
+        # Token holder is global for the JVM, therefore tokens of SET requests must not leak into other requests
+        self._token_lock = threading.Lock()
+        # PyJapc groups subscriptions only by parameter name and selector, while keys also differ by data filters
+        self._handles: Dict[SubscriptionKey, Any] = {}
+
+    def subscribe(self, key: SubscriptionKey, on_value: ValueCallback, on_error: ErrorCallback):
+
+        def on_exception(param_name: str, _: str, exception: Any):
+            on_error(_java_message(exception))
+
+        with self._token_lock:
+            handle = self._japc.subscribeParam(parameterName=key.parameter_name,
+                                               onValueReceived=_value_listener(on_value),
+                                               onException=on_exception,
+                                               getHeader=True,
+                                               noPyConversion=False,
+                                               **self._japc_args(key))
+            self._handles[key] = handle
+            try:
+                handle.startMonitoring()
+            except Exception as e:  # noqa: B902
+                on_error(_java_message(e))
+
+    def unsubscribe(self, key: SubscriptionKey):
+        handle = self._handles.pop(key, None)
+        if handle is None:
+            return
+        if any(other.parameter_name == key.parameter_name and other.selector == key.selector for other in self._handles):
+            # Subscriptions with other data filters must keep running
+            handle.stopMonitoring()
+        else:
+            # Also lets PyJapc forget the handle
+            self._japc.clearSubscriptions(parameterName=key.parameter_name, selector=key.selector)
+
+    def get(self, key: SubscriptionKey, on_value: ValueCallback, on_error: ErrorCallback):
+        try:
+            with self._token_lock:
+                self._japc.getParam(parameterName=key.parameter_name,
+                                    onValueReceived=_value_listener(on_value),
+                                    getHeader=True,
+                                    noPyConversion=False,
+                                    **self._japc_args(key))
+        except Exception as e:  # noqa: B902
+            on_error(_java_message(e))
+
+    def set(self, key: SubscriptionKey, value: Any, rbac_token: Optional[bytes]):
+        kwargs = self._japc_args(key)
+        if not self._use_inca:
+            # Same as in CPyJapc, dimensions cannot be checked without InCA
+            kwargs['checkDims'] = False
+        with self._token_lock:
+            restore_token: Optional[Callable[[], None]] = None
+            if rbac_token is not None and not self._in_papc_mode:
+                restore_token = self._inject_token(rbac_token)
+            try:
+                self._japc.setParam(parameterName=key.parameter_name, parameterValue=value, **kwargs)
+            except Exception as e:  # noqa: B902
+                raise RuntimeError(_java_message(e)) from None
+            finally:
+                if restore_token is not None:
+                    restore_token()
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            'backend': 'japc',
+            'cmw_env': self._cmw_env,
+            'jvm_flags': self._jvm_flags,
+            'use_inca': self._use_inca,
+        }
+
+    def close(self):
+        self._handles.clear()
+        self._japc.clearSubscriptions()
+
+    def _japc_args(self, key: SubscriptionKey) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {}
+        if key.selector:
+            kwargs['timingSelectorOverride'] = key.selector
+        if key.data_filters:
+            kwargs['dataFilterOverride'] = dict(key.data_filters)
+        return kwargs
+
+    def _inject_token(self, rbac_token: bytes) -> Callable[[], None]:
+        import jpype
+        cern = jpype.JPackage('cern')
+        java: Any = jpype.java  # type: ignore
+        holder = cern.rbac.util.holder.ClientTierTokenHolder
+        token = cern.rbac.common.RbaToken.parseAndValidate(java.nio.ByteBuffer.wrap(rbac_token))
+        previous_token = holder.getRbaToken()
+        holder.setRbaToken(token)
+
+        def restore():
+            if previous_token is None:
+                holder.clear()
+            else:
+                holder.setRbaToken(previous_token)
+
+        return restore
+
+
+def _value_listener(on_value: ValueCallback) -> Callable:
+
+    def listener(parameterName: str, value: Any, headerInfo: Optional[Dict[str, Any]] = None):
+        # Signature expected by PyJapc
+        on_value(value, headerInfo or {})
+
+    return listener
+
+
+def _java_message(exception: Any) -> str:
+    get_message = getattr(exception, 'getMessage', None)
+    if callable(get_message):
+        return str(get_message())
+    return str(exception)
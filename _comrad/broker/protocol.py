@@ -0,0 +1,446 @@
+"""
+Wire protocol between the subscription broker and ComRAD applications.
+
+Messages are tuples, serialized with :mod:`pickle` and prefixed with their length. The socket is private to the user
+(it is created with ``0600`` permissions in a directory accessible only to the user, and clients verify its owner
+before connecting), therefore messages are trusted the same way as files in the user's home directory. Large arrays
+are not serialized, but written into memory-mapped files (see :class:`SharedArrayWriter`), readable only by the user,
+and only their location is transmitted.
+
+This module must not import Qt, PyDM or :mod:`comrad`, as it is used by the broker daemon.
+"""
+import os
+import mmap
+import stat
+import struct
+import pickle
+import tempfile
+import itertools
+import numpy as np
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Iterator
+
+
+HELLO = 'hello'
+"""Client → broker: ``(HELLO,)``. Broker answers with ``(WELCOME, config)``."""
+
+WELCOME = 'welcome'
+"""Broker → client: ``(WELCOME, config)``, where config describes the control system environment of the broker."""
+
+SUBSCRIBE = 'subscribe'
+"""Client → broker: ``(SUBSCRIBE, sub_id, parameter_name, selector, data_filters)``."""
+
+UNSUBSCRIBE = 'unsubscribe'
+"""Client → broker: ``(UNSUBSCRIBE, sub_id)``."""
+
+GET = 'get'
+"""Client → broker: ``(GET, req_id, parameter_name, selector, data_filters)``."""
+
+SET = 'set'
+"""Client → broker: ``(SET, req_id, parameter_name, selector, data_filters, value, rbac_token)``."""
+
+VALUE = 'value'
+"""
+Broker → client: ``(VALUE, sub_ids, parameter_name, payload)`` for subscriptions, where payload is produced by
+:func:`encode_payload`, and sub_ids are all subscriptions of the client that the value belongs to.
+"""
+
+SUBSCRIPTION_ERROR = 'sub_error'
+"""Broker → client: ``(SUBSCRIPTION_ERROR, sub_id, message)``."""
+
+REPLY = 'reply'
+"""Broker → client: ``(REPLY, req_id, parameter_name, value, header)`` for GET requests, and for completed SET requests."""
+
+ERROR = 'error'
+"""Broker → client: ``(ERROR, req_id, message)`` for failed GET and SET requests."""
+
+
+_LENGTH = struct.Struct('!I')
+
+SHARED_ARRAY_THRESHOLD = 64 * 1024
+"""Arrays of this size (in bytes) and bigger are passed via shared memory."""
+
+
+class BrokerError(Exception):
+    """Error reported by the broker, e.g. a failed subscription."""
+
+    def getMessage(self) -> str:
+        """Mimics Java exceptions, that subscription error handlers of PyJapc receive."""
+        return str(self)
+
+
+def default_socket_path(cmw_env: str = 'PRO') -> str:
+    """
+    Location of the broker socket, taken from ``COMRAD_BROKER_SOCKET`` environment variable, or placed into
+    the directory returned by :func:`private_runtime_dir`. Separate brokers are used for each CMW environment.
+
+    Args:
+        cmw_env: CMW environment that the broker works with.
+
+    Raises:
+        BrokerError: The private directory cannot be used.
+    """
+    custom_path = os.environ.get('COMRAD_BROKER_SOCKET')
+    if custom_path:
+        return custom_path
+    return str(Path(private_runtime_dir()) / f'comrad-broker-{cmw_env}.sock')
+
+
+def private_runtime_dir() -> str:
+    """
+    Directory accessible only to the current user: ``$XDG_RUNTIME_DIR``, or ``comrad-<uid>`` in the temporary
+    directory, which is created with ``0700`` permissions, if it does not exist yet.
+
+    Returns:
+        Path to the directory.
+
+    Raises:
+        BrokerError: The directory in the temporary directory is not owned by the user, or is accessible to others.
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return runtime_dir
+    path = os.path.join(tempfile.gettempdir(), f'comrad-{os.getuid()}')
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        raise BrokerError(f'Cannot create {path}: {e!s}') from None
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise BrokerError(f'{path} must be a directory that is accessible only to the current user')
+    return path
+
+
+def verify_socket_owner(socket_path: str):
+    """
+    Make sure that the socket has been created by the current user, before connecting to it, as received
+    messages are unpickled, and SET requests carry the RBAC token.
+
+    Args:
+        socket_path: Location of the socket.
+
+    Raises:
+        FileNotFoundError: The socket does not exist.
+        BrokerError: The file is not a socket, or it belongs to another user.
+    """
+    info = os.lstat(socket_path)
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise BrokerError(f'{socket_path} is not a socket owned by the current user')
+
+
+def encode_frame(message: Tuple) -> bytes:
+    """
+    Serialize the message to be written into the socket.
+
+    Args:
+        message: Tuple, starting with the message type.
+
+    Returns:
+        Length-prefixed frame.
+    """
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def encode_payload(value: Any, header: Dict[str, Any]) -> bytes:
+    """
+    Serialize the value separately from the message, so that it is done only once for all the clients.
+
+    Args:
+        value: Value, processed by :func:`share_arrays`.
+        header: Meta-information of the value.
+
+    Returns:
+        Serialized payload.
+    """
+    return pickle.dumps((value, header), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode_payload(payload: bytes) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Deserialize the payload produced by :func:`encode_payload`.
+
+    Args:
+        payload: Serialized payload.
+
+    Returns:
+        Tuple of value and header.
+    """
+    return pickle.loads(payload)
+
+
+class FrameDecoder:
+
+    def __init__(self):
+        """Accumulates bytes read from the socket, and splits them into messages."""
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> Iterator[Tuple]:
+        """
+        Add received bytes.
+
+        Args:
+            data: Bytes read from the socket.
+
+        Returns:
+            Messages that have been completed by the received bytes.
+        """
+        self._buffer += data
+        while len(self._buffer) >= _LENGTH.size:
+            length, = _LENGTH.unpack_from(self._buffer)
+            end = _LENGTH.size + length
+            if len(self._buffer) < end:
+                break
+            payload = bytes(self._buffer[_LENGTH.size:end])
+            del self._buffer[:end]
+            yield pickle.loads(payload)
+
+
+@dataclass(frozen=True)
+class SharedArrayRef:
+    """Location of an array, written into shared memory by the broker."""
+
+    path: str
+    """Memory-mapped file."""
+
+    offset: int
+    """Position of the slot inside the file."""
+
+    seq: int
+    """Version of the contents, that the receiver is expected to find."""
+
+    dtype: str
+    """Array data type."""
+
+    shape: Tuple[int, ...]
+    """Array shape."""
+
+
+_SEQ = struct.Struct('=Q')
+
+
+class SharedArrayWriter:
+
+    SLOT_COUNT = 3
+    """Amount of values kept in the file, before the oldest one gets overwritten."""
+
+    _counter = itertools.count()
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Memory-mapped file of a single subscription field, that rotates new values through :attr:`SLOT_COUNT`
+        slots. Thus, a referenced value stays readable until newer values have been written into all the other slots,
+        and receivers that are a message or two behind the broker still get every value.
+
+        Writes into each slot are guarded by a sequence number (seqlock): it does not match any reference while
+        the data is being written, and the receiver discards the value, if the sequence number has changed while
+        it was copying the data, because it means that several newer values are already on their way.
+
+        Args:
+            directory: Location of the files (default: ``/dev/shm``, if available).
+        """
+        self._directory = directory or shared_memory_dir()
+        self._file: Optional[Any] = None
+        self._map: Optional[mmap.mmap] = None
+        self._path = ''
+        self._seq = 0
+        self._slot_size = 0
+        self._slot = 0
+
+    def write(self, array: np.ndarray) -> SharedArrayRef:
+        """
+        Write the array into the next slot.
+
+        Args:
+            array: Array to share.
+
+        Returns:
+            Reference to the array to be sent to the receivers.
+        """
+        array = np.ascontiguousarray(array)
+        size = _SEQ.size + array.nbytes
+        if self._map is None or self._slot_size < size:
+            self._allocate(size)
+        else:
+            self._slot = (self._slot + 1) % SharedArrayWriter.SLOT_COUNT
+        assert self._map is not None
+        offset = self._slot * self._slot_size
+        self._seq += 1
+        _SEQ.pack_into(self._map, offset, self._seq)
+        self._map[offset + _SEQ.size:offset + size] = array.tobytes()
+        self._seq += 1
+        _SEQ.pack_into(self._map, offset, self._seq)
+        return SharedArrayRef(path=self._path, offset=offset, seq=self._seq, dtype=array.dtype.str, shape=array.shape)
+
+    def close(self):
+        """Release and remove the file. Receivers that have mapped it, will detect that values are outdated."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._path:
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass
+
+    def _allocate(self, size: int):
+        self.close()
+        # Grow in advance, so that arrays of changing length do not reallocate on every value
+        self._slot_size = max(size * 2, mmap.PAGESIZE)
+        self._slot = 0
+        file_size = self._slot_size * SharedArrayWriter.SLOT_COUNT
+        while True:
+            self._path = os.path.join(self._directory, f'comrad-broker-{os.getpid()}-{next(SharedArrayWriter._counter)}')
+            try:
+                # Exclusive creation, so that a file (or a symlink) planted by another user is never written into
+                fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                continue
+            break
+        self._file = os.fdopen(fd, 'w+b')
+        self._file.truncate(file_size)
+        self._map = mmap.mmap(self._file.fileno(), file_size)
+        # Sequence continues across files, so that stale references never match
+        for slot in range(SharedArrayWriter.SLOT_COUNT):
+            _SEQ.pack_into(self._map, slot * self._slot_size, self._seq)
+
+
+class StaleValueError(Exception):
+    """The shared array has been overwritten, before it could be read."""
+    pass
+
+
+class SharedArrayReader:
+
+    def __init__(self):
+        """Receiving side of :class:`SharedArrayWriter`, keeping the files mapped between values."""
+        self._maps: Dict[str, mmap.mmap] = {}
+
+    def read(self, ref: SharedArrayRef) -> np.ndarray:
+        """
+        Copy the array out of the shared memory.
+
+        Args:
+            ref: Reference received from the broker.
+
+        Returns:
+            Array owned by the receiver.
+
+        Raises:
+            StaleValueError: Newer values have already replaced the referenced one.
+        """
+        try:
+            shared_map = self._maps[ref.path]
+        except KeyError:
+            try:
+                with open(ref.path, 'rb') as f:
+                    shared_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # File has been removed in favor of a bigger one
+                raise StaleValueError
+            self._maps[ref.path] = shared_map
+        if _SEQ.unpack_from(shared_map, ref.offset)[0] != ref.seq:
+            raise StaleValueError
+        dtype = np.dtype(ref.dtype)
+        count = int(np.prod(ref.shape)) if ref.shape else 1
+        array = np.frombuffer(shared_map, dtype=dtype, count=count, offset=ref.offset + _SEQ.size).reshape(ref.shape).copy()
+        if _SEQ.unpack_from(shared_map, ref.offset)[0] != ref.seq:
+            raise StaleValueError
+        return array
+
+    def forget(self, paths: List[str]):
+        """
+        Unmap files that are no longer used.
+
+        Args:
+            paths: Files to unmap.
+        """
+        for path in paths:
+            shared_map = self._maps.pop(path, None)
+            if shared_map is not None:
+                shared_map.close()
+
+    def close(self):
+        """Unmap all files."""
+        self.forget(list(self._maps.keys()))
+
+
+def share_arrays(value: Any, writers: Dict[str, SharedArrayWriter], threshold: int = SHARED_ARRAY_THRESHOLD) -> Any:
+    """
+    Replace big arrays in the value (or in the fields of the property) with references to shared memory.
+
+    Args:
+        value: Value of the field or the property.
+        writers: Writers of the subscription, by field name (empty string for the field-level value).
+                 New writers are added, when needed.
+        threshold: Minimum size of the array (in bytes) to be shared.
+
+    Returns:
+        Value to be sent to the clients.
+    """
+    if isinstance(value, np.ndarray):
+        return _share_array('', value, writers, threshold)
+    if isinstance(value, dict):
+        return {name: _share_array(name, field, writers, threshold) if isinstance(field, np.ndarray) else field
+                for name, field in value.items()}
+    return value
+
+
+def unshare_arrays(value: Any, reader: SharedArrayReader) -> Any:
+    """
+    Resolve references produced by :func:`share_arrays`.
+
+    Args:
+        value: Value received from the broker.
+        reader: Reader of the shared memory.
+
+    Returns:
+        Value with actual arrays.
+
+    Raises:
+        StaleValueError: One of the arrays has already been overwritten by a newer value.
+    """
+    if isinstance(value, SharedArrayRef):
+        return reader.read(value)
+    if isinstance(value, dict):
+        return {name: reader.read(field) if isinstance(field, SharedArrayRef) else field
+                for name, field in value.items()}
+    return value
+
+
+def shared_paths(value: Any) -> List[str]:
+    """
+    Files referenced by the value produced by :func:`share_arrays`.
+
+    Args:
+        value: Value received from the broker.
+
+    Returns:
+        List of memory-mapped files.
+    """
+    if isinstance(value, SharedArrayRef):
+        return [value.path]
+    if isinstance(value, dict):
+        return [field.path for field in value.values() if isinstance(field, SharedArrayRef)]
+    return []
+
+
+def shared_memory_dir() -> str:
+    """Directory for memory-mapped files, that is backed by RAM, if possible."""
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+def _share_array(name: str, array: np.ndarray, writers: Dict[str, SharedArrayWriter], threshold: int) -> Any:
+    if array.nbytes < threshold or array.dtype.hasobject:
+        return array
+    try:
+        writer = writers[name]
+    except KeyError:
+        writer = writers[name] = SharedArrayWriter()
+    return writer.write(array)
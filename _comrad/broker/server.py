@@ -0,0 +1,462 @@
+"""
+Broker daemon, owning control system subscriptions on behalf of all ComRAD applications of the console.
+"""
+import os
+import time
+import queue
+import socket
+import logging
+import selectors
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple, Callable
+from . import protocol
+from .backends import BrokerBackend, SubscriptionKey
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Client:
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.decoder = protocol.FrameDecoder()
+        self.outgoing = bytearray()
+        self.subscriptions: Dict[int, SubscriptionKey] = {}
+
+    def __repr__(self) -> str:
+        return f'<client {self.sock.fileno()}>'
+
+
+class _Subscription:
+
+    def __init__(self, key: SubscriptionKey):
+        self.key = key
+        self.subscribers: Set[Tuple[_Client, int]] = set()
+        self.last_value: Optional[bytes] = None
+        self.last_error: Optional[str] = None
+        self.writers: Dict[str, protocol.SharedArrayWriter] = {}
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+
+
+class BrokerServer:
+
+    MAX_CLIENT_BACKLOG = 256 * 1024 * 1024
+    """Amount of undelivered bytes (in bytes), after which a client that does not read from the socket is dropped."""
+
+    def __init__(self,
+                 socket_path: str,
+                 backend: BrokerBackend,
+                 idle_timeout: Optional[float] = None,
+                 shared_array_threshold: int = protocol.SHARED_ARRAY_THRESHOLD):
+        """
+        Broker that owns control system subscriptions and shares them among ComRAD applications, connected over
+        a Unix socket.
+
+        Each subscription is established only once, regardless of how many applications request it, and the last
+        received value (or error) is kept, so that applications joining later receive it immediately, without
+        a GET request.
+        Large arrays are passed to the applications via shared memory.
+
+        Args:
+            socket_path: Location of the socket.
+            backend: Control system access.
+            idle_timeout: Stop the broker, when there have been no clients for this amount of seconds.
+                          If ``None``, the broker runs until :meth:`shutdown` is called.
+            shared_array_threshold: Minimum size of the arrays (in bytes) that are passed via shared memory.
+        """
+        self.socket_path = socket_path
+        self.backend = backend
+        self.idle_timeout = idle_timeout
+        self.shared_array_threshold = shared_array_threshold
+        self._selector = selectors.DefaultSelector()
+        self._listener: Optional[socket.socket] = None
+        self._clients: Dict[socket.socket, _Client] = {}
+        self._subscriptions: Dict[SubscriptionKey, _Subscription] = {}
+        # Backend delivers values from its own threads, they are handed over to the broker thread via the queue
+        self._events: 'queue.SimpleQueue[Callable[[], None]]' = queue.SimpleQueue()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='comrad-broker-set')
+        self._running = threading.Event()
+        self._stopped = False
+        self._idle_since = time.monotonic()
+
+    @property
+    def subscription_count(self) -> int:
+        """Amount of distinct control system subscriptions."""
+        return len(self._subscriptions)
+
+    @property
+    def client_count(self) -> int:
+        """Amount of connected applications."""
+        return len(self._clients)
+
+    def bind(self):
+        """
+        Create the socket.
+
+        Raises:
+            OSError: Another broker is already listening on the socket, or the socket cannot be created.
+        """
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                # Left over by a broker that has crashed
+                os.unlink(self.socket_path)
+            else:
+                probe.close()
+                raise OSError(f'Another broker is already running at {self.socket_path}')
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            listener.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        listener.listen(64)
+        listener.setblocking(False)
+        self._listener = listener
+        self._selector.register(listener, selectors.EVENT_READ, self._accept)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, self._drain_wakeup)
+
+    def serve_forever(self):
+        """Process requests until :meth:`shutdown` is called, or the broker stays idle for too long."""
+        if self._listener is None:
+            self.bind()
+        logger.info(f'Subscription broker is listening on {self.socket_path}')
+        self._running.set()
+        try:
+            while not self._stopped:
+                for key, mask in self._selector.select(timeout=1.0):
+                    key.data(key.fileobj, mask)
+                self._process_events()
+                if (self.idle_timeout is not None and not self._clients
+                        and time.monotonic() - self._idle_since > self.idle_timeout):
+                    logger.info('No clients left, stopping the broker')
+                    break
+        finally:
+            self._close()
+
+    def wait_until_running(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the broker is accepting clients, e.g. when it is run in a separate thread.
+
+        Args:
+            timeout: Maximum time to wait (in seconds).
+        """
+        return self._running.wait(timeout)
+
+    def shutdown(self):
+        """Stop the broker. Can be called from any thread."""
+        self._stopped = True
+        self._wakeup()
+
+    def _call_soon(self, fn: Callable[[], None]):
+        self._events.put(fn)
+        self._wakeup()
+
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send(b'\0')
+        except OSError:
+            pass
+
+    def _drain_wakeup(self, sock: socket.socket, _):
+        try:
+            while sock.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def _process_events(self):
+        while True:
+            try:
+                fn = self._events.get_nowait()
+            except queue.Empty:
+                return
+            fn()
+
+    def _accept(self, listener: socket.socket, _):
+        try:
+            sock, _ = listener.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        client = _Client(sock)
+        self._clients[sock] = client
+        self._selector.register(sock, selectors.EVENT_READ, self._on_client_event)
+        logger.debug(f'{client} connected')
+
+    def _on_client_event(self, sock: socket.socket, mask: int):
+        client = self._clients.get(sock)
+        if client is None:
+            return
+        if mask & selectors.EVENT_WRITE:
+            self._flush(client)
+        if mask & selectors.EVENT_READ:
+            try:
+                data = sock.recv(1024 * 1024)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                data = b''
+            if not data:
+                self._drop_client(client)
+                return
+            for message in client.decoder.feed(data):
+                try:
+                    self._handle(client, message)
+                except Exception as e:  # noqa: B902
+                    logger.exception(f'Failed to handle {message[0]!r} from {client}: {e!s}')
+
+    def _handle(self, client: _Client, message: Tuple):
+        kind = message[0]
+        if kind == protocol.SUBSCRIBE:
+            _, sub_id, parameter_name, selector, data_filters = message
+            self._subscribe(client, sub_id, SubscriptionKey.create(parameter_name, selector, data_filters))
+        elif kind == protocol.UNSUBSCRIBE:
+            _, sub_id = message
+            self._unsubscribe(client, sub_id)
+        elif kind == protocol.GET:
+            _, req_id, parameter_name, selector, data_filters = message
+            self._get(client, req_id, SubscriptionKey.create(parameter_name, selector, data_filters))
+        elif kind == protocol.SET:
+            _, req_id, parameter_name, selector, data_filters, value, rbac_token = message
+            self._set(client, req_id, SubscriptionKey.create(parameter_name, selector, data_filters), value, rbac_token)
+        elif kind == protocol.HELLO:
+            self._send(client, (protocol.WELCOME, self.backend.config()))
+        else:
+            logger.warning(f'Unknown message {kind!r} from {client}')
+
+    def _subscribe(self, client: _Client, sub_id: int, key: SubscriptionKey):
+        if sub_id in client.subscriptions:
+            self._unsubscribe(client, sub_id)
+        client.subscriptions[sub_id] = key
+        try:
+            subscription = self._subscriptions[key]
+        except KeyError:
+            subscription = self._subscriptions[key] = _Subscription(key)
+            subscription.subscribers.add((client, sub_id))
+            logger.debug(f'Subscribing to {key}')
+            try:
+                self.backend.subscribe(key,
+                                       on_value=lambda value, header: self._call_soon(lambda: self._on_value(key, value, header)),
+                                       on_error=lambda message: self._call_soon(lambda: self._on_error(key, message)))
+            except Exception as e:  # noqa: B902
+                # Not kept, so that the next client retries the subscription, instead of waiting for values forever
+                logger.warning(f'Subscription to {key} has failed: {e!s}')
+                del self._subscriptions[key]
+                client.subscriptions.pop(sub_id, None)
+                subscription.close()
+                self._send(client, (protocol.SUBSCRIPTION_ERROR, sub_id, str(e)))
+            return
+        subscription.subscribers.add((client, sub_id))
+        logger.debug(f'Reusing subscription to {key} ({len(subscription.subscribers)} subscribers)')
+        if subscription.last_value is not None:
+            self._send(client, (protocol.VALUE, (sub_id,), key.parameter_name, subscription.last_value))
+        if subscription.last_error is not None:
+            self._send(client, (protocol.SUBSCRIPTION_ERROR, sub_id, subscription.last_error))
+
+    def _unsubscribe(self, client: _Client, sub_id: int):
+        key = client.subscriptions.pop(sub_id, None)
+        if key is None:
+            return
+        subscription = self._subscriptions.get(key)
+        if subscription is None:
+            return
+        subscription.subscribers.discard((client, sub_id))
+        if not subscription.subscribers:
+            logger.debug(f'Unsubscribing from {key}, as there are no subscribers left')
+            del self._subscriptions[key]
+            subscription.close()
+            self.backend.unsubscribe(key)
+
+    def _get(self, client: _Client, req_id: int, key: SubscriptionKey):
+
+        def on_value(value: Any, header: Dict[str, Any]):
+            self._call_soon(lambda: self._send(client, (protocol.REPLY, req_id, key.parameter_name, value, header)))
+
+        def on_error(message: str):
+            self._call_soon(lambda: self._send(client, (protocol.ERROR, req_id, message)))
+
+        self.backend.get(key, on_value=on_value, on_error=on_error)
+
+    def _set(self, client: _Client, req_id: int, key: SubscriptionKey, value: Any, rbac_token: Optional[bytes]):
+
+        def work():
+            try:
+                self.backend.set(key, value=value, rbac_token=rbac_token)
+            except Exception as e:  # noqa: B902
+                message = str(e)
+                self._call_soon(lambda: self._send(client, (protocol.ERROR, req_id, message)))
+            else:
+                self._call_soon(lambda: self._send(client, (protocol.REPLY, req_id, key.parameter_name, None, {})))
+
+        self._executor.submit(work)
+
+    def _on_value(self, key: SubscriptionKey, value: Any, header: Dict[str, Any]):
+        subscription = self._subscriptions.get(key)
+        if subscription is None:
+            # Late value of a stopped subscription
+            return
+        value = protocol.share_arrays(value, writers=subscription.writers, threshold=self.shared_array_threshold)
+        # Serialized once, regardless of the amount of subscribers
+        subscription.last_value = protocol.encode_payload(value, header)
+        subscription.last_error = None
+        sub_ids: Dict[_Client, List[int]] = {}
+        for client, sub_id in list(subscription.subscribers):
+            sub_ids.setdefault(client, []).append(sub_id)
+        for client, ids in sub_ids.items():
+            self._send(client, (protocol.VALUE, tuple(ids), key.parameter_name, subscription.last_value))
+
+    def _on_error(self, key: SubscriptionKey, message: str):
+        subscription = self._subscriptions.get(key)
+        if subscription is None:
+            return
+        logger.warning(f'Subscription to {key} has failed: {message}')
+        # Replayed to the clients joining later, same as the last value
+        subscription.last_error = message
+        for client, sub_id in list(subscription.subscribers):
+            self._send(client, (protocol.SUBSCRIPTION_ERROR, sub_id, message))
+
+    def _send(self, client: _Client, message: Tuple):
+        self._send_frame(client, protocol.encode_frame(message))
+
+    def _send_frame(self, client: _Client, frame: bytes):
+        if client.sock not in self._clients:
+            return
+        was_empty = not client.outgoing
+        client.outgoing += frame
+        if len(client.outgoing) > self.MAX_CLIENT_BACKLOG:
+            logger.warning(f'{client} does not keep up with the updates and will be disconnected')
+            self._drop_client(client)
+            return
+        if was_empty:
+            self._flush(client)
+
+    def _flush(self, client: _Client):
+        try:
+            sent = client.sock.send(client.outgoing)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self._drop_client(client)
+            return
+        del client.outgoing[:sent]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outgoing else 0)
+        self._selector.modify(client.sock, events, self._on_client_event)
+
+    def _drop_client(self, client: _Client):
+        if self._clients.pop(client.sock, None) is None:
+            return
+        logger.debug(f'{client} disconnected')
+        for sub_id in list(client.subscriptions.keys()):
+            self._unsubscribe(client, sub_id)
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+        if not self._clients:
+            self._idle_since = time.monotonic()
+
+    def _close(self):
+        for client in list(self._clients.values()):
+            self._drop_client(client)
+        for key, subscription in list(self._subscriptions.items()):
+            subscription.close()
+            self.backend.unsubscribe(key)
+        self._subscriptions.clear()
+        self._executor.shutdown(wait=False)
+        self.backend.close()
+        if self._listener is not None:
+            self._selector.unregister(self._listener)
+            self._listener.close()
+            self._listener = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        self._selector.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+        self._running.clear()
+
+
+def probe_broker(socket_path: str, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+    """
+    Check if the broker is running at the given location.
+
+    Args:
+        socket_path: Location of the socket.
+        timeout: Maximum time to wait for the answer (in seconds).
+
+    Returns:
+        Configuration of the broker's control system environment, or ``None`` if the broker is not running.
+
+    Raises:
+        BrokerError: The socket belongs to another user.
+    """
+    try:
+        protocol.verify_socket_owner(socket_path)
+    except OSError:
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+        sock.sendall(protocol.encode_frame((protocol.HELLO,)))
+        decoder = protocol.FrameDecoder()
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return None
+            for message in decoder.feed(data):
+                if message[0] == protocol.WELCOME:
+                    return message[1]
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+def spawn_broker(socket_path: str, args: List[str], timeout: float = 30.0) -> Optional[Dict[str, Any]]:
+    """
+    Start the broker daemon in the background, detached from the current process, and wait until it accepts clients.
+
+    Args:
+        socket_path: Location of the socket.
+        args: Arguments of ``comrad broker`` command, configuring the control system environment.
+        timeout: Maximum time to wait for the broker to start (in seconds).
+
+    Returns:
+        Configuration of the broker's control system environment, or ``None`` if it has failed to start.
+
+    Raises:
+        BrokerError: The socket belongs to another user.
+    """
+    import sys
+    import subprocess
+    cmd = [sys.executable, '-m', '_comrad.broker', '--socket', socket_path, *args]
+    logger.debug(f'Starting subscription broker: {" ".join(cmd)}')
+    subprocess.Popen(cmd,
+                     stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL,
+                     start_new_session=True,
+                     close_fds=True)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        config = probe_broker(socket_path)
+        if config is not None:
+            return config
+        time.sleep(0.1)
+    return None
@@ -0,0 +1,136 @@
+"""
+Background startup of the JVM used by JAPC, so that it overlaps with the import of Qt and PyDM, and
+with the loading of the main display, instead of blocking the GUI thread when the first JAPC channel connects.
+
+This module must not import Qt, PyDM or :mod:`comrad`, as it is used by the launcher before those are imported.
+"""
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Optional, Dict, List
+from .startup_profile import startup_phase
+
+
+logger = logging.getLogger(__name__)
+
+
+_JAPC_CLASSES = [
+    'cern.japc.core.ParameterException',
+    'cern.japc.value.ValueConversionException',
+    'cern.japc.value.FailSafeParameterValue',
+    'cern.japc.value.SimpleValueStandardMeaning',
+    'cern.japc.value.spi.AcquiredParameterValueImpl',
+    'cern.rbac.common.RbaToken',
+    'cern.rbac.util.holder.ClientTierTokenHolder',
+    'cern.rbac.util.holder.ClientTierRbaTokenChangeListener',
+]
+"""Java classes used by ComRAD, to be loaded ahead of time together with their dependencies."""
+
+
+_future: Optional['Future[bool]'] = None
+
+
+def start_jvm_prewarm(jvm_flags: Optional[Dict[str, str]] = None, use_inca: bool = True) -> 'Future[bool]':
+    """
+    Start the JVM, load JAPC classes and initialize InCA in a background thread.
+
+    Subsequent calls return the same future.
+
+    Args:
+        jvm_flags: JVM flags to be set as system properties before InCA is initialized.
+        use_inca: Initialize InCA, the same way as :class:`~comrad.data.pyjapc_patch.CPyJapc` would do.
+
+    Returns:
+        Future resolving to ``True`` when the JVM is ready, or ``False`` when JVM is not used (e.g. when PyJapc
+        is replaced by PAPC).
+    """
+    global _future
+    if _future is None:
+        _future = Future()
+        thread = threading.Thread(target=_prewarm,
+                                  args=(_future, jvm_flags or {}, use_inca),
+                                  name='comrad-jvm-prewarm',
+                                  daemon=True)
+        thread.start()
+    return _future
+
+
+def wait_for_jvm(timeout: Optional[float] = None) -> bool:
+    """
+    Block until the JVM started by :func:`start_jvm_prewarm` is ready. Must be called before
+    PyJapc is instantiated, so that the JVM is never started twice concurrently.
+
+    Args:
+        timeout: Maximum time to wait (in seconds), or ``None`` to wait indefinitely.
+
+    Returns:
+        ``True`` if the JVM has been prewarmed, ``False`` if prewarming was not requested or has failed,
+        in which case the JVM will be started by PyJapc as usual.
+    """
+    if _future is None:
+        return False
+    if not _future.done():
+        logger.debug('Waiting for the JVM to finish starting in the background')
+    with startup_phase('Wait for JVM'):
+        try:
+            return _future.result(timeout=timeout)
+        except Exception as e:  # noqa: B902
+            logger.warning(f'Failed to start the JVM in the background: {e!s}')
+            return False
+
+
+def set_jvm_flags(jvm_flags: Dict[str, str]):
+    """
+    Set JVM flags as Java system properties. Must be called right after the JVM has started, so that the flags
+    are present before the InCA configuration is read.
+
+    Args:
+        jvm_flags: Flags to set.
+    """
+    import jpype
+    for name, val in jvm_flags.items():
+        logger.debug('Setting extra JVM flag: %s=%s', name, val)
+        jpype.java.lang.System.setProperty(name, str(val))  # type: ignore
+
+
+def _prewarm(future: 'Future[bool]', jvm_flags: Dict[str, str], use_inca: bool):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        with startup_phase('Import PyJapc'):
+            from pyjapc import PyJapc
+        if PyJapc.__module__.startswith('papc.'):
+            # Simulated control system does not need JVM
+            future.set_result(False)
+            return
+
+        class _PrewarmJapc(PyJapc):
+
+            def _setup_jvm(self, log_level):
+                with startup_phase('Start JVM'):
+                    super()._setup_jvm(log_level=log_level)
+                # Same flags as applied by CPyJapc
+                set_jvm_flags(jvm_flags)
+
+        with startup_phase('Initialize InCA' if use_inca else 'Initialize JAPC'):
+            # Configuration of InCA is global for the JVM, CPyJapc will reuse it
+            _PrewarmJapc(selector='', incaAcceleratorName='' if use_inca else None)
+        with startup_phase('Load JAPC classes'):
+            _load_classes(_JAPC_CLASSES)
+    except Exception as e:  # noqa: B902
+        future.set_exception(e)
+    except BaseException as e:  # noqa: B902
+        # Do not keep the launcher waiting, but let e.g. SystemExit terminate the thread
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(True)
+
+
+def _load_classes(names: List[str]):
+    import jpype
+    for name in names:
+        try:
+            jpype.JClass(name)
+        except Exception as e:  # noqa: B902
+            logger.debug(f'Cannot preload Java class {name}: {e!s}')
@@ -16,6 +16,8 @@ from accwidgets.qt import exec_app_interruptable
 from .comrad_info import COMRAD_DESCRIPTION, COMRAD_VERSION, get_versions_info
 from .log_config import install_logger_level
 from .common import get_japc_support_envs, comrad_asset
+from .jvm_prewarm import start_jvm_prewarm
+from .startup_profile import start_recording, stop_recording, startup_phase, startup_timeline
 
 
 def create_args_parser(deployed_pkg_name: Optional[str] = None) -> Tuple[ArgumentParser, bool]:
@@ -105,6 +107,28 @@ def create_args_parser(deployed_pkg_name: Optional[str] = None) -> Tuple[Argumen
                                            **common_parser_args)
     _package_subcommand(package_parser)
 
+    warm_cache_parser = subparsers.add_parser('warm-cache',
+                                              help='Precompile Qt Designer files of the application to speed up its launch.',
+                                              description='  This command compiles *.ui files into the display cache,\n'
+                                                          '  that is used by "comrad run" to avoid parsing the files\n'
+                                                          '  every time a display is opened. Run it as part of the\n'
+                                                          '  deployment of the application. Cache entries are invalidated\n'
+                                                          '  automatically, when files or ComRAD version change.',
+                                              **common_parser_args)
+    _warm_cache_subcommand(warm_cache_parser)
+
+    broker_parser = subparsers.add_parser('broker',
+                                          help='Run subscription broker shared by ComRAD applications of this console.',
+                                          description='  This command runs the broker in the foreground. Applications\n'
+                                                      '  started with "comrad run --broker" subscribe to devices\n'
+                                                      '  through it, so that each device is subscribed only once\n'
+                                                      '  per console, and JAPC runs in a single JVM. The broker is\n'
+                                                      '  started automatically by "comrad run --broker" when it is\n'
+                                                      '  not running, therefore this command is mostly useful for\n'
+                                                      '  debugging and benchmarking.',
+                                          **common_parser_args)
+    _broker_subcommand(broker_parser)
+
     return parser, use_lazy_version
 
 
@@ -186,6 +210,10 @@ def process_args(args: Namespace, parser: ArgumentParser, use_lazy_version: bool
             return
         elif args.cmd == 'package' and _package_app(args):
             return
+        elif args.cmd == 'warm-cache' and _warm_cache(args):
+            return
+        elif args.cmd == 'broker' and _run_broker(args):
+            return
         parser.print_help()
 
 
@@ -319,6 +347,30 @@ def _run_subcommand(parser: _EmptyLoadSaveActionProfileParser, deployed_pkg_name
     display_group.add_argument('--read-only',
                                action='store_true',
                                help='Launch ComRAD in a read-only mode.')
+    display_group.add_argument('--no-display-cache',
+                               action='store_true',
+                               help='Do not use the cache of compiled Qt Designer files, always parsing *.ui files '
+                                    'when opening displays (see "comrad warm-cache").')
+    display_group.add_argument('--keep-displays',
+                               help='Keep displays that user navigated away from alive, with paused channels, so that '
+                                    'navigating back to them is instant. Optional value defines how many displays '
+                                    'to keep (default: 5).',
+                               metavar='COUNT',
+                               type=int,
+                               nargs='?',
+                               const=5,
+                               default=None)
+    display_group.add_argument('--keep-displays-memory',
+                               help='Limit memory (in megabytes) occupied by displays kept alive with --keep-displays. '
+                                    'Least recently used displays are closed first (requires "psutil").',
+                               metavar='MB',
+                               type=int,
+                               default=None)
+    display_group.add_argument('--single-process',
+                               action='store_true',
+                               help='Open related displays that would normally start a new ComRAD process in a new '
+                                    'window of the running application instead, sharing its control system '
+                                    'connections. Each window keeps its own selector.')
 
     appearance_group = parser.add_argument_group('Appearance configuration')
 
@@ -360,6 +412,40 @@ def _run_subcommand(parser: _EmptyLoadSaveActionProfileParser, deployed_pkg_name
 
     controls_group = cast(ArgumentParser, parser.add_argument_group('Control system configuration'))
     _install_controls_arguments(controls_group)
+    controls_group.add_argument('--cycle-sync',
+                                help='Deliver values belonging to the same accelerator cycle (same "cycleStamp") '
+                                     'together, repainting the display once per cycle. Optional value defines how long '
+                                     'to wait (in milliseconds) for the remaining values of the cycle (default: 100).',
+                                metavar='TIMEOUT',
+                                type=int,
+                                nargs='?',
+                                const=100,
+                                default=None)
+    controls_group.add_argument('--pause-hidden',
+                                help='Pause channels of the widgets that stay hidden (e.g. inside inactive tabs), and '
+                                     'resume them when the widgets are shown again. Optional value defines how long '
+                                     'the widget has to stay hidden (in milliseconds) before pausing (default: 3000). '
+                                     'Containers can override this setting for their child widgets.',
+                                metavar='GRACE_PERIOD',
+                                type=int,
+                                nargs='?',
+                                const=3000,
+                                default=None)
+    controls_group.add_argument('--no-jvm-prewarm',
+                                action='store_true',
+                                help='Do not start the JVM (and InCA) in the background while the display is being '
+                                     'loaded. The JVM will be started when the first JAPC channel connects instead.')
+    controls_group.add_argument('--broker',
+                                help='Subscribe to JAPC devices through the subscription broker shared by ComRAD '
+                                     'applications of this console, starting the broker when it is not running yet. '
+                                     'Each device is then subscribed only once per console, and late subscribers '
+                                     'receive the last value immediately. Optional value defines the location of the '
+                                     'broker socket (default: COMRAD_BROKER_SOCKET environment variable or a '
+                                     'per-user socket for each CMW environment).',
+                                metavar='SOCKET',
+                                nargs='?',
+                                const='',
+                                default=None)
 
     plugin_group = parser.add_argument_group('Extensions')
     plugin_group.add_argument('--enable-plugins',
@@ -370,6 +456,7 @@ def _run_subcommand(parser: _EmptyLoadSaveActionProfileParser, deployed_pkg_name
                                    'COMRAD_TOOLBAR_PLUGIN_PATH for any custom plugins). For built-in items '
                                    'use following identifiers:'
                                    ' - RBAC dialog button: comrad.rbac'
+                                   ' - Performance counters in the status bar: comrad.perf'
                                    ' '
                                    'Example usage: --enable-plugins comrad.rbac org.example.my-plugin',
                               nargs=argparse.ONE_OR_MORE)
@@ -422,13 +509,48 @@ def _run_subcommand(parser: _EmptyLoadSaveActionProfileParser, deployed_pkg_name
                                    'comrad.pls.supercycle, comrad.pls.show_domain, comrad.pls.show_time, '
                                    'comrad.pls.show_start, comrad.pls.show_user, comrad.pls.show_lsa, '
                                    'comrad.pls.show_tz, comrad.pls.heartbeat, comrad.pls.microseconds, comrad.pls.utc, '
-                                   'comrad.screenshot.activities, comrad.screenshot.server, comrad.screenshot.decor.',
+                                   'comrad.screenshot.activities, comrad.screenshot.server, comrad.screenshot.decor, '
+                                   'comrad.perf.top, comrad.perf.interval.',
                               nargs=argparse.ONE_OR_MORE)
     debug_group = cast(ArgumentParser, parser.add_argument_group('Debugging'))
     _install_debug_arguments(debug_group)
     debug_group.add_argument('--perf-mon',
                              action='store_true',
                              help='Enable performance monitoring, and print CPU usage to the terminal.')
+    debug_group.add_argument('--profile-startup',
+                             help='Record the startup of the application: phases (imports, JVM, plugins discovery, '
+                                  'display loading), construction time of each widget class, rules registration and '
+                                  'the time until each channel receives its first value. When the application exits, '
+                                  'a summary is printed to the terminal, and a timeline is written into FILE, that '
+                                  'can be opened in chrome://tracing or https://ui.perfetto.dev '
+                                  '(default: comrad-startup-profile.json).',
+                             metavar='FILE',
+                             nargs='?',
+                             const='comrad-startup-profile.json',
+                             default=None)
+    debug_group.add_argument('--stall-watchdog',
+                             help='Watch for stalls of the GUI event loop longer than the given amount of seconds '
+                                  '(default: 1). During each stall, the stack of the GUI thread is sampled, and a '
+                                  'report naming the widgets, connections or valueTransformation snippets that took '
+                                  'the time is logged.',
+                             metavar='SECONDS',
+                             type=float,
+                             nargs='?',
+                             const=1.0,
+                             default=None)
+    debug_group.add_argument('--headless-bench',
+                             help='Run the display offscreen (without showing any windows) for the given amount of '
+                                  'seconds, then write a JSON report and exit. The report contains the amount of '
+                                  'updates per widget and per channel, event loop lag percentiles, CPU usage and '
+                                  'memory, amount of connections, rule evaluations and time spent in '
+                                  'valueTransformation snippets. Useful to track the runtime cost of a display in CI.',
+                             metavar='SECONDS',
+                             type=float,
+                             default=None)
+    debug_group.add_argument('--bench-report',
+                             help='File to write the report of --headless-bench into (default: comrad-bench.json).',
+                             metavar='FILE',
+                             default='comrad-bench.json')
 
     info_group = cast(ArgumentParser, parser.add_argument_group('User information'))
     _install_help(info_group)
@@ -472,6 +594,7 @@ def __designer_subcommand(parser: ArgumentParser):
 
 def _run_comrad(args: Namespace) -> bool:
     logger = logging.getLogger('')
+    start_recording(profile=args.profile_startup is not None)
 
     # This has to sit here, because other os.environ settings MUST be before comrad or pydm import
     environment = {
@@ -479,9 +602,12 @@ def _run_comrad(args: Namespace) -> bool:
         'PYDM_CONFIRM_QUIT': os.environ.get('COMRAD_CONFIRM_QUIT', 'n'),
         **get_japc_support_envs(args.extra_data_plugin_path),
     }
+    if args.headless_bench is not None:
+        environment['QT_QPA_PLATFORM'] = 'offscreen'
 
     try:
-        ccda_endpoint, java_env, os_env = _parse_control_env(args)
+        with startup_phase('Parse control system environment'):
+            ccda_endpoint, java_env, os_env = _parse_control_env(args)
     except EnvironmentError as e:
         logger.exception(str(e))
         return False
@@ -495,9 +621,20 @@ def _run_comrad(args: Namespace) -> bool:
     for k, v in environment.items():
         os.environ[k] = v
 
+    broker_socket: Optional[str] = None
+    if args.broker is not None:
+        with startup_phase('Connect to subscription broker'):
+            broker_socket = _connect_broker(args, java_env)
+
+    if not args.no_jvm_prewarm and broker_socket is None:
+        # Started as early as possible to overlap with imports and loading of the display, rather than
+        # blocking the GUI thread when the first JAPC channel connects
+        start_jvm_prewarm(jvm_flags=java_env, use_inca=not args.no_inca)
+
     # Importing stuff here and not in the beginning of the file to setup the root logger first.
-    from comrad.app.application import CApplication, CRbaStartupLoginPolicy
-    from pydm.utilities.macro import parse_macro_string
+    with startup_phase('Import ComRAD'):
+        from comrad.app.application import CApplication, CRbaStartupLoginPolicy
+        from pydm.utilities.macro import parse_macro_string
     macros = parse_macro_string(args.macro) if args.macro is not None else None
 
     stylesheet: Optional[str] = (comrad_asset('dark.qss') if args.dark_mode or os.environ.get('COMRAD_DARK_MODE_ENABLED', False)
@@ -515,35 +652,66 @@ def _run_comrad(args: Namespace) -> bool:
         startup_policy = CRbaStartupLoginPolicy[os.environ.get('COMRAD_STARTUP_LOGIN_POLICY', '')]
     except KeyError:
         startup_policy = None
-
-    app = CApplication(ui_file=args.display_file,
-                       command_line_args=args.display_args,
-                       use_inca=not args.no_inca,
-                       ccda_endpoint=ccda_endpoint,
-                       cmw_env=args.cmw_env,
-                       default_selector=args.selector or None,
-                       rbac_token=args.rbac_token,
-                       startup_login_policy=startup_policy,
-                       java_env=java_env,
-                       perf_mon=args.perf_mon,
-                       hide_nav_bar=args.hide_nav_bar,
-                       hide_menu_bar=args.hide_menu_bar,
-                       hide_log_console=args.hide_log_console,
-                       hide_status_bar=args.hide_status_bar,
-                       fullscreen=args.fullscreen,
-                       read_only=args.read_only,
-                       macros=macros,
-                       data_plugin_paths=args.extra_data_plugin_path,
-                       nav_bar_plugin_path=args.nav_plugin_path,
-                       status_bar_plugin_path=args.status_plugin_path,
-                       menu_bar_plugin_path=args.menu_plugin_path,
-                       toolbar_order=args.nav_bar_order,
-                       toolbar_style=args.nav_bar_style,
-                       toolbar_position=args.nav_bar_position,
-                       window_plugin_config=args.window_plugin_config,
-                       plugin_blacklist=args.disable_plugins,
-                       plugin_whitelist=args.enable_plugins,
-                       stylesheet_path=stylesheet)
+    if startup_policy is None and args.headless_bench is not None:
+        # There is nobody to interact with login dialogs, and location is not meaningful on CI machines
+        startup_policy = CRbaStartupLoginPolicy.NO_LOGIN
+
+    bench_metrics = None
+    if args.headless_bench is not None:
+        from comrad.app.headless_bench import install_benchmark_instrumentation
+        bench_metrics = install_benchmark_instrumentation()
+
+    with startup_phase('Load main display'):
+        app = CApplication(ui_file=args.display_file,
+                           command_line_args=args.display_args,
+                           use_inca=not args.no_inca,
+                           ccda_endpoint=ccda_endpoint,
+                           cmw_env=args.cmw_env,
+                           default_selector=args.selector or None,
+                           rbac_token=args.rbac_token,
+                           startup_login_policy=startup_policy,
+                           cycle_sync_timeout=args.cycle_sync,
+                           hidden_channels_grace_period=args.pause_hidden,
+                           use_display_cache=not args.no_display_cache,
+                           kept_displays=args.keep_displays,
+                           kept_displays_memory=args.keep_displays_memory,
+                           single_process=args.single_process,
+                           prewarm_jvm=not args.no_jvm_prewarm,
+                           broker_socket=broker_socket,
+                           stall_threshold=args.stall_watchdog,
+                           java_env=java_env,
+                           perf_mon=args.perf_mon,
+                           hide_nav_bar=args.hide_nav_bar,
+                           hide_menu_bar=args.hide_menu_bar,
+                           hide_log_console=args.hide_log_console,
+                           hide_status_bar=args.hide_status_bar,
+                           fullscreen=args.fullscreen,
+                           read_only=args.read_only,
+                           macros=macros,
+                           data_plugin_paths=args.extra_data_plugin_path,
+                           nav_bar_plugin_path=args.nav_plugin_path,
+                           status_bar_plugin_path=args.status_plugin_path,
+                           menu_bar_plugin_path=args.menu_plugin_path,
+                           toolbar_order=args.nav_bar_order,
+                           toolbar_style=args.nav_bar_style,
+                           toolbar_position=args.nav_bar_position,
+                           window_plugin_config=args.window_plugin_config,
+                           plugin_blacklist=args.disable_plugins,
+                           plugin_whitelist=args.enable_plugins,
+                           stylesheet_path=stylesheet)
+    logger.debug(startup_timeline())
+    if args.profile_startup is None:
+        stop_recording()
+    else:
+        from comrad.app.startup_profile import install_startup_report
+        install_startup_report(app, path=args.profile_startup)
+    if bench_metrics is not None:
+        from comrad.app.headless_bench import install_benchmark_report
+        install_benchmark_report(app,
+                                 metrics=bench_metrics,
+                                 duration=args.headless_bench,
+                                 path=args.bench_report,
+                                 display=args.display_file)
     # install_asyncio_event_loop(app)
     sys.exit(exec_app_interruptable(app))
     return True
@@ -645,6 +813,106 @@ def _parse_control_env(args: Namespace) -> Tuple[str, Dict[str, str], Dict[str,
     return ccda_endpoint, jvm_flags, os_env
 
 
+def _connect_broker(args: Namespace, java_env: Dict[str, str]) -> Optional[str]:
+    from .broker import probe_broker, spawn_broker, default_socket_path, BrokerError
+    logger = logging.getLogger('')
+    try:
+        socket_path = args.broker or default_socket_path(args.cmw_env)
+        config = probe_broker(socket_path)
+        if config is None:
+            broker_args = ['--cmw-env', args.cmw_env, '--idle-timeout', str(_BROKER_IDLE_TIMEOUT)]
+            if args.no_inca:
+                broker_args.append('--no-inca')
+            if args.java_env:
+                broker_args.extend(['--java-env', *args.java_env])
+            logger.debug(f'Starting subscription broker at {socket_path}')
+            config = spawn_broker(socket_path, args=broker_args)
+    except BrokerError as e:
+        logger.error(f'Subscription broker cannot be used: {e!s}. JAPC will be accessed directly.')
+        return None
+    if config is None:
+        logger.error(f'Subscription broker at {socket_path} could not be started. JAPC will be accessed directly.')
+        return None
+    expected_config = {
+        'backend': 'japc',
+        'cmw_env': args.cmw_env,
+        'jvm_flags': java_env,
+        'use_inca': not args.no_inca,
+    }
+    # Synthetic broker, started manually for testing, is accepted regardless of the environment
+    if config.get('backend') == 'japc' and config != expected_config:
+        logger.warning(f'Subscription broker at {socket_path} uses different control system settings ({config}). '
+                       'JAPC will be accessed directly.')
+        return None
+    return socket_path
+
+
+_BROKER_IDLE_TIMEOUT = 60
+"""Automatically started broker exits, when no application has been connected for this amount of seconds."""
+
+
+def _broker_subcommand(parser: ArgumentParser):
+    _install_help(parser)
+    _install_debug_arguments(parser)
+    _install_controls_arguments(parser)
+    parser.add_argument('--socket',
+                        help='Location of the broker socket (default: COMRAD_BROKER_SOCKET environment variable or '
+                             'a per-user socket for each CMW environment).',
+                        metavar='PATH')
+    parser.add_argument('--idle-timeout',
+                        help='Exit, when no application has been connected for this amount of seconds. '
+                             'By default, the broker runs until interrupted.',
+                        metavar='SECONDS',
+                        type=float,
+                        default=None)
+    parser.add_argument('--synthetic',
+                        help='Produce synthetic values instead of accessing the control system, to try and benchmark '
+                             'the broker without devices. Optional value defines the interval between values '
+                             '(in seconds, default: 1). Subscriptions with "size" data filter receive arrays of '
+                             'this length.',
+                        metavar='PERIOD',
+                        type=float,
+                        nargs='?',
+                        const=1.0,
+                        default=None)
+
+
+def _run_broker(args: Namespace) -> bool:
+    import signal
+    from .broker import BrokerServer, BrokerBackend, SyntheticBackend, BrokerError, default_socket_path
+    logger = logging.getLogger('')
+    try:
+        socket_path = args.socket or default_socket_path(args.cmw_env)
+    except BrokerError as e:
+        logger.error(f'Cannot start subscription broker: {e!s}')
+        return False
+
+    backend: BrokerBackend
+    if args.synthetic is not None:
+        backend = SyntheticBackend(period=args.synthetic)
+    else:
+        try:
+            ccda_endpoint, java_env, os_env = _parse_control_env(args)
+        except EnvironmentError as e:
+            logger.exception(str(e))
+            return False
+        os.environ.update(os_env)
+        os.environ['PYCCDA_HOST'] = ccda_endpoint
+        from .broker import JapcBackend
+        backend = JapcBackend(cmw_env=args.cmw_env, jvm_flags=java_env, use_inca=not args.no_inca)
+
+    server = BrokerServer(socket_path=socket_path, backend=backend, idle_timeout=args.idle_timeout)
+    try:
+        server.bind()
+    except OSError as e:
+        logger.error(f'Cannot start subscription broker at {socket_path}: {e!s}')
+        backend.close()
+        return False
+    signal.signal(signal.SIGTERM, lambda *_: server.shutdown())
+    server.serve_forever()
+    return True
+
+
 def _package_subcommand(parser: ArgumentParser):
     _install_help(parser)
 
@@ -721,3 +989,52 @@ def _package_app(args: Namespace) -> bool:
                                  interactive=args.interactive)
 
     return True
+
+
+def _warm_cache_subcommand(parser: ArgumentParser):
+    _install_help(parser)
+    _install_debug_arguments(parser)
+    parser.add_argument('targets',
+                        metavar='PATH_OR_PACKAGE',
+                        help='Qt Designer (*.ui) file, directory to be searched for *.ui files recursively, '
+                             'or name of the installed Python package containing them.',
+                        nargs=argparse.ONE_OR_MORE)
+    parser.add_argument('--cache-dir',
+                        help='Location of the cache (default: COMRAD_DISPLAY_CACHE_DIR environment variable '
+                             'or ~/.cache/comrad/displays).')
+
+
+def _warm_cache(args: Namespace) -> bool:
+    import importlib.util
+    if args.cache_dir:
+        os.environ['COMRAD_DISPLAY_CACHE_DIR'] = args.cache_dir
+    from comrad.app.display_cache import CDisplayCache
+    logger = logging.getLogger('')
+
+    paths: List[Path] = []
+    for target in args.targets:
+        path = Path(target)
+        if path.exists():
+            paths.append(path)
+            continue
+        try:
+            spec = importlib.util.find_spec(target)
+        except (ImportError, ValueError):
+            spec = None
+        if spec is None or not spec.submodule_search_locations:
+            logger.error(f'"{target}" is neither an existing path, nor an installed package')
+            return False
+        paths.extend(Path(location) for location in spec.submodule_search_locations)
+
+    cache = CDisplayCache.instance()
+    results = cache.warm(paths)
+    for ui_file, cold, warm in results:
+        print(f'{ui_file}: {cold * 1000:.1f} ms -> {warm * 1000:.1f} ms')
+    if results:
+        total_cold = sum(cold for _, cold, _ in results)
+        total_warm = sum(warm for _, _, warm in results)
+        print(f'Cached {len(results)} display(s) in {cache.directory}: '
+              f'{total_cold * 1000:.1f} ms -> {total_warm * 1000:.1f} ms')
+    else:
+        print('No Qt Designer files found')
+    return True
@@ -0,0 +1,228 @@
+"""
+Recording of the application startup, producing a timeline of phases across threads, and, when profiling
+is enabled, costs of individual widgets and channels.
+
+This module must not import Qt, PyDM or :mod:`comrad`, as it is used by the launcher before those are imported.
+Qt-dependent instrumentation resides in :mod:`comrad.app.startup_profile`.
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Iterator, Any, Tuple
+
+
+_ORIGIN = time.perf_counter()
+
+
+@dataclass
+class StartupEvent:
+    name: str
+    """Human-readable name of the event."""
+    category: str
+    """Category of the event, e.g. "phase", "widget" or "channel"."""
+    thread: str
+    """Name of the thread where the event happened."""
+    start: float
+    """Start time, as returned by :func:`time.perf_counter`."""
+    end: Optional[float] = None
+    """End time, or ``None`` if the event is still in progress, or is instant."""
+
+
+_events: List[StartupEvent] = []
+_recording = False
+_profiling = False
+
+
+def start_recording(profile: bool = False):
+    """
+    Start recording the startup phases.
+
+    Args:
+        profile: Also record costs of individual widgets, rules and channels, which is more expensive
+                 (see :func:`is_profiling`).
+    """
+    global _recording, _profiling
+    _recording = True
+    _profiling = profile
+
+
+def stop_recording():
+    """Stop recording, e.g. when the startup is finished. Events recorded so far are kept."""
+    global _recording, _profiling
+    _recording = False
+    _profiling = False
+
+
+def is_recording() -> bool:
+    """Startup phases are being recorded."""
+    return _recording
+
+
+def is_profiling() -> bool:
+    """Detailed profiling of the startup has been requested, e.g. with ``--profile-startup`` flag."""
+    return _profiling
+
+
+@contextmanager
+def startup_phase(name: str, category: str = 'phase') -> Iterator[None]:
+    """
+    Record a phase of the application startup, if recording has been started.
+
+    Args:
+        name: Human-readable name of the phase.
+        category: Category of the phase.
+    """
+    if not _recording:
+        yield
+        return
+    event = StartupEvent(name=name, category=category, thread=threading.current_thread().name, start=time.perf_counter())
+    _events.append(event)
+    try:
+        yield
+    finally:
+        event.end = time.perf_counter()
+
+
+def record_event(name: str, category: str, start: float, end: Optional[float] = None):
+    """
+    Record an event that has been measured by the caller, if recording has been started.
+
+    Args:
+        name: Human-readable name of the event.
+        category: Category of the event.
+        start: Start time, as returned by :func:`time.perf_counter`.
+        end: End time, or ``None`` for instant events.
+    """
+    if _recording:
+        _events.append(StartupEvent(name=name, category=category, thread=threading.current_thread().name,
+                                    start=start, end=end))
+
+
+def startup_events(category: Optional[str] = None) -> List[StartupEvent]:
+    """
+    Recorded events, sorted by start time.
+
+    Args:
+        category: Return only events of the given category.
+    """
+    return sorted((e for e in _events if category is None or e.category == category), key=lambda e: e.start)
+
+
+def startup_timeline() -> str:
+    """
+    Produce a human-readable timeline of the recorded startup phases, showing phases running in
+    parallel in different threads.
+
+    Returns:
+        Multiline string with a phase on each line.
+    """
+    phases = startup_events(category='phase')
+    lines = ['Startup timeline (ms since launch):']
+    thread_width = max((len(p.thread) for p in phases), default=0)
+    for phase in phases:
+        end = f'{_ms(phase.end):8.1f}' if phase.end is not None else ' running'
+        lines.append(f'  {phase.thread:<{thread_width}}  {_ms(phase.start):8.1f} -> {end}  {phase.name}')
+    return '\n'.join(lines)
+
+
+def startup_summary(top: int = 20) -> str:
+    """
+    Produce a human-readable summary of the recorded startup, with the timeline of phases, the most expensive
+    widget classes and the time it took channels to receive their first value.
+
+    Args:
+        top: Amount of widget classes to list.
+
+    Returns:
+        Multiline string.
+    """
+    lines = [startup_timeline()]
+
+    widget_costs: Dict[str, Tuple[int, float]] = {}
+    for event in startup_events(category='widget'):
+        count, total = widget_costs.get(event.name, (0, 0.0))
+        widget_costs[event.name] = count + 1, total + _duration(event)
+    if widget_costs:
+        lines.append('')
+        lines.append('Widget construction, including children (ms):')
+        name_width = max(len(name) for name in widget_costs)
+        lines.append(f'  {"Class":<{name_width}}  {"Count":>6}  {"Total":>9}  {"Mean":>8}')
+        ranked = sorted(widget_costs.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (count, total) in ranked[:top]:
+            lines.append(f'  {name:<{name_width}}  {count:>6}  {total * 1000:9.1f}  {total * 1000 / count:8.2f}')
+        if len(ranked) > top:
+            lines.append(f'  ... {len(ranked) - top} more')
+
+    for category, title in (('rules', 'Rules registration'), ('display', 'Display loading')):
+        events = startup_events(category=category)
+        if events:
+            lines.append('')
+            total = sum(_duration(e) for e in events)
+            lines.append(f'{title}: {len(events)} times, {total * 1000:.1f} ms in total')
+
+    channels = [_duration(e) for e in startup_events(category='channel')]
+    if channels:
+        channels.sort()
+        lines.append('')
+        lines.append(f'Time from connection to the first value: {len(channels)} channels, '
+                     f'median {channels[len(channels) // 2] * 1000:.1f} ms, max {channels[-1] * 1000:.1f} ms')
+    return '\n'.join(lines)
+
+
+def chrome_trace() -> Dict[str, Any]:
+    """
+    Produce the recorded events in the Trace Event Format, that can be opened in ``chrome://tracing``
+    or `Perfetto <https://ui.perfetto.dev>`__.
+
+    Returns:
+        JSON-serializable dictionary.
+    """
+    pid = os.getpid()
+    thread_ids: Dict[str, int] = {}
+    trace_events: List[Dict[str, Any]] = []
+    for event in startup_events():
+        tid = thread_ids.setdefault(event.thread, len(thread_ids) + 1)
+        entry: Dict[str, Any] = {
+            'name': event.name,
+            'cat': event.category,
+            'pid': pid,
+            'tid': tid,
+            'ts': _us(event.start),
+        }
+        if event.end is None:
+            entry.update(ph='i', s='t')
+        else:
+            entry.update(ph='X', dur=_us(event.end) - _us(event.start))
+        trace_events.append(entry)
+    for thread, tid in thread_ids.items():
+        trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread}})
+    return {
+        'traceEvents': trace_events,
+        'displayTimeUnit': 'ms',
+    }
+
+
+def write_chrome_trace(path: str):
+    """
+    Write the recorded events into a JSON file (see :func:`chrome_trace`).
+
+    Args:
+        path: Destination file.
+    """
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(), f)
+
+
+def _duration(event: StartupEvent) -> float:
+    return 0.0 if event.end is None else event.end - event.start
+
+
+def _ms(timestamp: float) -> float:
+    return (timestamp - _ORIGIN) * 1000
+
+
+def _us(timestamp: float) -> int:
+    return int((timestamp - _ORIGIN) * 1e6)
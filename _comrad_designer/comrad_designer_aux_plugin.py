@@ -49,6 +49,7 @@ from pydm.widgets import (PyDMLabel, PyDMCheckbox, PyDMPushButton,
                           PyDMSlider, PyDMSpinbox, PyDMByteIndicator,
                           PyDMScaleIndicator)
 from pydm.widgets.enum_button import PyDMEnumButton
+from pydm.widgets.image import PyDMImageView
 from accwidgets.graph import ScrollingPlotWidget, CyclicPlotWidget, StaticPlotWidget
 from accwidgets.property_edit import PropertyEdit
 from accwidgets.log_console import LogConsole
@@ -77,7 +78,7 @@ _PyDMLineEdit = qtplugin_factory(PyDMLineEdit, group=CWidgetBoxGroup.HIDDEN)
 _PyDMSlider = qtplugin_factory(PyDMSlider, group=CWidgetBoxGroup.HIDDEN)
 _PyDMSpinbox = qtplugin_factory(PyDMSpinbox, group=CWidgetBoxGroup.HIDDEN)
 _PyDMByteIndicator = qtplugin_factory(PyDMByteIndicator, group=CWidgetBoxGroup.HIDDEN)
-# _PyDMImageView = qtplugin_factory(PyDMImageView, group=CWidgetBoxGroup.HIDDEN)
+_PyDMImageView = qtplugin_factory(PyDMImageView, group=CWidgetBoxGroup.HIDDEN)
 _PyDMScaleIndicator = qtplugin_factory(PyDMScaleIndicator, group=CWidgetBoxGroup.HIDDEN)
 # _PyDMTabWidget = qtplugin_factory(PyDMTabWidget, group=CWidgetBoxGroup.HIDDEN)
 
@@ -28,7 +28,7 @@ from accwidgets._designer_base import WidgetsTaskMenuExtension
 from comrad import (CScrollingPlot, CCyclicPlot, CStaticPlot, CValueAggregator, CCommandButton, CScaleIndicator,
                     CEnumComboBox, CSlider, CSpinBox, CLabel, CByteIndicator, CLineEdit, CTemplateRepeater,
                     CEmbeddedDisplay, CShellCommand, CRelatedDisplayButton, CPushButton, CEnumButton, CCheckBox,
-                    CPropertyEdit, CLed, CContextFrame, CLogConsole)
+                    CPropertyEdit, CLed, CContextFrame, CLogConsole, CImageView, CWaveFormTable, CWaterfallPlot)
 from comrad.icons import icon
 from _comrad_designer.utils import qtplugin_factory, CWidgetBoxGroup
 from _comrad_designer.rules_editor import RulesEditor
@@ -73,10 +73,6 @@ _CRelatedDisplayButton = qtplugin_factory(CRelatedDisplayButton, group=CWidgetBo
 _CShellCommand = qtplugin_factory(CShellCommand, group=CWidgetBoxGroup.BUTTONS)
 # _CToggleButton = qtplugin_factory(CToggleButton, group=CWidgetBoxGroup.BUTTONS, extensions=_BASE_EXTENSIONS)
 
-# Item Widgets
-# TODO: Uncomment when useful
-# _CWaveformTable = qtplugin_factory(CWaveFormTable, group=CWidgetBoxGroup.ITEM_WIDGETS, extensions=_BASE_EXTENSIONS)
-
 # Containers
 # TODO: What is CFrame useful for?
 # _CFrame = qtplugin_factory(CFrame, group=CWidgetBoxGroup.CONTAINERS, is_container=True, extensions=_BASE_EXTENSIONS)
@@ -97,13 +93,13 @@ _CPropertyEdit = qtplugin_factory(CPropertyEdit,
 # Display Widgets
 _CLabel = qtplugin_factory(CLabel, group=CWidgetBoxGroup.INDICATORS, extensions=_BASE_EXTENSIONS)
 _CByteIndicator = qtplugin_factory(CByteIndicator, group=CWidgetBoxGroup.INDICATORS, extensions=_BASE_EXTENSIONS)
-# TODO: Uncomment when useful
-# _CImageView = qtplugin_factory(CImageView, group=CWidgetBoxGroup.INDICATORS, extensions=_BASE_EXTENSIONS)
+_CImageView = qtplugin_factory(CImageView, group=CWidgetBoxGroup.INDICATORS, extensions=_BASE_EXTENSIONS)
 _CLogConsole = qtplugin_factory(CLogConsole,
                                 group=CWidgetBoxGroup.INDICATORS,
                                 icon=icon('LogConsole', file_path=Path(accwidgets.log_console.designer.__file__)),
                                 extensions=[CLogConsoleLoggersEditorExtension])
 _CScaleIndicator = qtplugin_factory(CScaleIndicator, group=CWidgetBoxGroup.INDICATORS, extensions=_BASE_EXTENSIONS)
+_CWaveFormTable = qtplugin_factory(CWaveFormTable, group=CWidgetBoxGroup.INDICATORS, extensions=_BASE_EXTENSIONS)
 _CEnumLed = qtplugin_factory(CLed,
                              group=CWidgetBoxGroup.INDICATORS,
                              icon=icon('Led', file_path=Path(accwidgets.led.designer.__file__)),
@@ -122,6 +118,10 @@ _CStaticPlot = qtplugin_factory(CStaticPlot,
                                 group=CWidgetBoxGroup.CHARTS,
                                 icon=icon('StaticPlotWidget', file_path=Path(accwidgets.graph.designer.__file__)),
                                 extensions=_PLOT_EXTENSIONS)
+_CWaterfallPlot = qtplugin_factory(CWaterfallPlot,
+                                   group=CWidgetBoxGroup.CHARTS,
+                                   icon=icon('StaticPlotWidget', file_path=Path(accwidgets.graph.designer.__file__)),
+                                   extensions=_PLOT_EXTENSIONS)
 
 # Invisible
 _CValueAggregator = qtplugin_factory(CValueAggregator, group=CWidgetBoxGroup.VIRTUAL)
@@ -11,7 +11,7 @@ from accwidgets.parameter_selector import ParameterLineEditColumnDelegate
 from accwidgets import designer_check
 from accwidgets._designer_base import WidgetsTaskMenuExtension
 from accwidgets.graph.designer.designer_extensions import PlotLayerExtension as _PlotLayerExtension
-from comrad.widgets.graphs import CPlotWidgetBase, ColumnNames, CItemPropertiesBase, PlottingItemTypes
+from comrad.widgets.graphs import CPlotWidgetBase, ColumnNames, CItemPropertiesBase, PlottingItemTypes, DecimationMode
 from comrad._designer_utils import get_designer_cursor
 
 
@@ -34,18 +34,26 @@ class PlottingItemRow:
     symbol: Optional[str] = None
     channel: Optional[str] = None
     label: Optional[str] = None
+    decimation: str = DecimationMode.NONE.value
 
 
 _FORBIDDEN_COLUMNS = {
     PlottingItemTypes.BAR_GRAPH.value: [3, 5, 6],
     PlottingItemTypes.INJECTION_BAR_GRAPH.value: [3, 5, 6],
     PlottingItemTypes.TIMESTAMP_MARKERS.value: [2, 4, 5, 6],
+    PlottingItemTypes.WATERFALL.value: [2, 3, 4, 5, 6],
 }
 
+_DECIMATION_COLUMN = 9
+
 
 class CPlottingItemModel(AbstractTableModel[PlottingItemRow]):
 
-    def __init__(self, item_styles: List[str], data: List[PlottingItemRow], parent: Optional[QObject] = None):
+    def __init__(self,
+                 item_styles: List[str],
+                 data: List[PlottingItemRow],
+                 decimated_styles: Optional[List[str]] = None,
+                 parent: Optional[QObject] = None):
         """
         Data model for the table used in the CPlottingItemEditorDialog.
         The model is based on a plot widget. Each item in the plot will
@@ -54,18 +62,32 @@ class CPlottingItemModel(AbstractTableModel[PlottingItemRow]):
         Args:
             item_styles: Items styles that are available for a given plot widget.
             data: Initial data.
+            decimated_styles: Item styles that support decimation of large waveforms for a given plot widget.
             parent: Owning object.
         """
         super().__init__(data=data, parent=parent)
         self.item_styles = item_styles
+        self.decimated_styles = decimated_styles or []
+
+    def restricted_columns(self, item_style: str) -> List[int]:
+        """
+        Columns that are not supported by the given item style.
+
+        Args:
+            item_style: Style of the plotting item.
+
+        Returns:
+            List of column indexes.
+        """
+        res = list(_FORBIDDEN_COLUMNS.get(item_style, []))
+        if item_style not in self.decimated_styles:
+            res.append(_DECIMATION_COLUMN)
+        return res
 
     def get_cell_data(self, index: QModelIndex, row: PlottingItemRow) -> Any:
         section = index.column()
-        try:
-            if section in _FORBIDDEN_COLUMNS[row.item_style]:
-                return None
-        except KeyError:
-            pass
+        if section in self.restricted_columns(row.item_style):
+            return None
 
         if section == 0:
             return row.channel
@@ -83,16 +105,15 @@ class CPlottingItemModel(AbstractTableModel[PlottingItemRow]):
             return row.symbol_size
         elif section == 7:
             return row.layer
-        else:
+        elif section == 8:
             return row.item_style
+        else:
+            return row.decimation
 
     def set_cell_data(self, index: QModelIndex, row: PlottingItemRow, value: Any) -> bool:
         section = index.column()
-        try:
-            if section in _FORBIDDEN_COLUMNS[row.item_style]:
-                return False
-        except KeyError:
-            pass
+        if section in self.restricted_columns(row.item_style):
+            return False
 
         if section == 0:
             row.channel = value
@@ -114,12 +135,14 @@ class CPlottingItemModel(AbstractTableModel[PlottingItemRow]):
             row.symbol_size = value
         elif section == 7:
             row.layer = value
-        else:
+        elif section == 8:
             row.item_style = value
+        else:
+            row.decimation = value
         return True
 
     def columnCount(self, *args, **kwargs):
-        return 9
+        return 10
 
     def column_name(self, section: int) -> str:
         all_names = [e.value for e in ColumnNames]
@@ -131,7 +154,7 @@ class CPlottingItemModel(AbstractTableModel[PlottingItemRow]):
                                line_style=Qt.SolidLine,
                                line_width=1.0,
                                symbol_size=10,
-                               item_style=PlottingItemTypes.LINE_GRAPH.value)
+                               item_style=next(iter(self.item_styles), PlottingItemTypes.LINE_GRAPH.value))
 
     def flags(self, index: QModelIndex) -> Qt.ItemFlags:
         """
@@ -146,11 +169,7 @@ class CPlottingItemModel(AbstractTableModel[PlottingItemRow]):
             Flag, if cell should be editable or greyed out.
         """
         item_type = index.siblingAtColumn(8).data()
-        try:
-            restricted_cols = _FORBIDDEN_COLUMNS[item_type]
-        except KeyError:
-            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
-        if index.column() in restricted_cols:
+        if index.column() in self.restricted_columns(item_type):
             return Qt.ItemIsSelectable
         return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
 
@@ -180,12 +199,13 @@ class CPlottingItemModel(AbstractTableModel[PlottingItemRow]):
                 ('symbol_size', item.symbol_size),
                 ('layer', item.layer),
                 ('style', item.item_style),
+                ('decimation', item.decimation),
             ]
-            try:
-                restricted_cols = _FORBIDDEN_COLUMNS[item.item_style]
-            except KeyError:
-                restricted_cols = []
-            for col in sorted(restricted_cols, reverse=True):
+            restricted_cols = self.restricted_columns(item.item_style)
+            if item.decimation == DecimationMode.NONE.value:
+                # Keep default omitted, same as CPlotWidgetBase does
+                restricted_cols.append(_DECIMATION_COLUMN)
+            for col in sorted(set(restricted_cols), reverse=True):
                 d.pop(col)
             res.append(dict(d))
         return res
@@ -202,6 +222,16 @@ class PlottingItemStyleColumnDelegate(AbstractComboBoxColumnDelegate):
             editor.addItem(style, style)
 
 
+class DecimationColumnDelegate(AbstractComboBoxColumnDelegate):
+    """
+    Delegate that draws a QComboBox in the Decimation column, so that users
+    can pick the decimation method from a list.
+    """
+    def configure_editor(self, editor: QComboBox, _):
+        for mode in DecimationMode:
+            editor.addItem(mode.value, mode.value)
+
+
 class LineStyleColumnDelegate(AbstractComboBoxColumnDelegate):
 
     def configure_editor(self, editor: QComboBox, _):
@@ -251,7 +281,8 @@ class CPlottingItemEditorDialog(AbstractTableDialog[PlottingItemRow, CPlottingIt
         self.table.setItemDelegateForColumn(3, LineStyleColumnDelegate(self.table))
         self.table.setItemDelegateForColumn(5, SymbolStyleColumnDelegate(self.table))
         self.table.setItemDelegateForColumn(8, PlottingItemStyleColumnDelegate(self.table))
-        for i in [0, 1, 2, 3, 5, 7, 8]:  # Skipping spinbox columns here, as they annoyingly highlight contents by default
+        self.table.setItemDelegateForColumn(9, DecimationColumnDelegate(self.table))
+        for i in [0, 1, 2, 3, 5, 7, 8, 9]:  # Skipping spinbox columns here, as they annoyingly highlight contents by default
             self.table.set_persistent_editor_for_column(i)
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeToContents)
@@ -290,10 +321,14 @@ class CPlottingItemEditorExtension(WidgetsTaskMenuExtension):
                                    symbol=item.symbol,
                                    symbol_size=item.symbol_size,
                                    layer=item.layer,
-                                   item_style=item.style_string)
+                                   item_style=item.style_string,
+                                   decimation=item.decimation)
 
         data = list(map(map_to_view_model, self.widget._items_checked))
-        model = CPlottingItemModel(item_styles=cast(Type[CPlotWidgetBase], type(self.widget)).ITEM_TYPES.keys(),
+        item_types = cast(Type[CPlotWidgetBase], type(self.widget)).ITEM_TYPES
+        model = CPlottingItemModel(item_styles=item_types.keys(),
+                                   decimated_styles=[style for style, item_type in item_types.items()
+                                                     if getattr(item_type, 'supports_decimation', False)],
                                    data=data,
                                    parent=self.widget)
         CPlottingItemEditorDialog(table_model=model, on_save=self._on_items_updated, parent=self.widget).exec_()
@@ -7,14 +7,74 @@ Operational GUI applications without much hassle.
 """
 # flake8: noqa: E401,E403
 from _comrad.comrad_info import COMRAD_AUTHOR as __author__, COMRAD_VERSION as __version__
-from .widgets.modifiers import *
-from .widgets.buttons import *
-from .widgets.graphs import *
-from .widgets.containers import *
-from .widgets.indicators import *
-from .widgets.tables import *
-from .widgets.inputs import *
-from .app.application import *
-from .app.plugins import *
-from .data.channel import CChannelData
-from .data.japc_enum import CEnumValue
+from ._lazy import lazy_attributes
+
+
+# Public classes are imported on first access, so that e.g. a data plugin that only needs CChannelData
+# does not pay for importing all the widgets, graphs and the application.
+_ATTRIBUTES = {
+    '.widgets.modifiers': ('CValueAggregator',),
+    '.widgets.buttons': ('CPushButton', 'CRelatedDisplayButton', 'CShellCommand', 'CEnumButton', 'CCommandButton'),
+    '.widgets.graphs': ('ColumnNames', 'PlottingItemTypes', 'DecimationMode', 'PyDMChannelDataSource', 'CPlotWidgetBase',
+                        'CItemPropertiesBase', 'CCurvePropertiesBase', 'CBarGraphPropertiesBase',
+                        'CInjectionBarGraphPropertiesBase', 'CTimestampMarkerPropertiesBase', 'CScrollingCurve',
+                        'CScrollingBarGraph', 'CScrollingInjectionBarGraph', 'CScrollingTimestampMarker',
+                        'CScrollingCurveDataModel', 'CScrollingBarGraphDataModel', 'CScrollingInjectionBarDataModel',
+                        'CScrollingPlot', 'CCyclicCurve', 'CCyclicPlot', 'CStaticCurve', 'CStaticBarGraph',
+                        'CStaticInjectionBarGraph', 'CStaticTimestampMarker', 'CStaticPlot', 'CWaterfallDataModel',
+                        'CWaterfallPropertiesBase', 'CWaterfallItem', 'CWaterfallPlot', 'CImageView',
+                        # Data structures of accwidgets graphs, used to implement custom update sources
+                        'UpdateSource', 'PointData', 'CurveData', 'BarData', 'BarCollectionData', 'InjectionBarData',
+                        'InjectionBarCollectionData', 'TimestampMarkerData', 'TimestampMarkerCollectionData',
+                        'PlottingItemData',
+                        # Base classes from accwidgets graphs
+                        'ExPlotWidget', 'ScrollingPlotWidget', 'CyclicPlotWidget', 'StaticPlotWidget', 'ScrollingPlotCurve',
+                        'CyclicPlotCurve', 'StaticPlotCurve'),
+    '.widgets.containers': ('CEmbeddedDisplay', 'CTemplateRepeater', 'CDisplay', 'CContextFrame'),
+    '.widgets.indicators': ('CLabel', 'CByteIndicator', 'CScaleIndicator', 'CLed'),
+    '.widgets.tables': ('CWaveformTableModel', 'CWaveFormTable', 'CLogConsole',
+                        # Models of accwidgets log console, used to customize CLogConsole
+                        'AbstractLogConsoleModel', 'LogConsoleModel', 'LogLevel'),
+    '.widgets.inputs': ('CCheckBox', 'CEnumComboBox', 'CLineEdit', 'CSlider', 'CSpinBox', 'CPropertyEditField',
+                        'CAbstractPropertyEditLayoutDelegate', 'CAbstractPropertyEditWidgetDelegate', 'CPropertyEdit',
+                        'CPropertyEditWidgetDelegate'),
+    '.widgets.mixins': ('CChannelDataProcessingMixin', 'CHideUnusedFeaturesMixin', 'CInitializedMixin',
+                        'CCustomizedTooltipMixin', 'CValueTransformerMixin', 'CWidgetRulesMixin',
+                        'CNoPVTextFormatterMixin', 'CColorRulesMixin', 'CRequestingMixin'),
+    '.widgets.value_transform': ('CValueTransformationBase',),
+    '.widgets.widget': ('CContextEnabledObject',),
+    '.app.application': ('CApplication', 'toolbar_area_from_str', 'toolbar_style_from_str'),
+    '.app.main_window': ('CMainWindow',),
+    '.app.plugins': ('CPlugin', 'CPositionalPlugin', 'CStatusBarPlugin', 'CMenuBarPlugin', 'CToolbarWidgetPlugin',
+                     'CToolbarActionPlugin', 'CActionPlugin', 'CToolbarID', 'CToolbarPlugin', 'CWidgetPlugin'),
+    '.rbac': ('CRbaState', 'CRbaStartupLoginPolicy'),
+    '.data.channel': ('CChannelData', 'CChannel'),
+    '.data.context': ('CContext', 'CContextProvider', 'CContextTrackingDelegate'),
+    '.data.activation': ('CHiddenChannels',),
+    '.data.deadband': ('CDeadband',),
+    '.data.japc_enum': ('CEnumValue',),
+}
+
+
+__all__ = sorted(name for names in _ATTRIBUTES.values() for name in names)
+
+
+__getattr__, __dir__ = lazy_attributes(__name__, globals(), _ATTRIBUTES, fallback_modules=(
+    # Other names that used to be exposed by star-imports, in the original order of imports
+    '.widgets.modifiers',
+    '.widgets.buttons',
+    '.widgets.graphs',
+    '.widgets.containers',
+    '.widgets.indicators',
+    '.widgets.tables',
+    '.widgets.inputs',
+    '.app.application',
+    '.app.plugins',
+))
+
+
+# These modules patch PyDM classes in place, therefore they are imported eagerly, so that channels, widgets
+# and rules behave the ComRAD way, regardless of which ComRAD classes have been accessed.
+from .data import channel as _channel
+from .widgets import widget as _widget
+from . import rules as _rules
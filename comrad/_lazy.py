@@ -0,0 +1,57 @@
+"""
+Helpers for packages that expose attributes of their submodules without importing them upfront (:pep:`562`).
+"""
+import importlib
+from typing import Dict, Tuple, Any, Callable, List, Iterable, Sequence
+
+
+def lazy_attributes(package: str,
+                    namespace: Dict[str, Any],
+                    attributes: Dict[str, Iterable[str]],
+                    fallback_modules: Sequence[str] = ()) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Produce module-level ``__getattr__`` and ``__dir__`` functions that import submodules only when
+    their attributes are accessed for the first time.
+
+    Args:
+        package: Name of the package, i.e. ``__name__``.
+        namespace: Namespace of the package, i.e. ``globals()``. Resolved attributes are stored there,
+                   so that subsequent access does not go through ``__getattr__``.
+        attributes: Mapping of submodules (relative to the package) to the attributes that they provide.
+                    Attribute named after the submodule itself (without leading dots) resolves to the submodule.
+        fallback_modules: Submodules to be searched (in reverse order) for attributes that are not listed
+                          in ``attributes``. This keeps working the names that used to be exposed by star-imports.
+
+    Returns:
+        Tuple of ``__getattr__`` and ``__dir__`` functions.
+    """
+    lookup: Dict[str, str] = {}
+    for module_name, names in attributes.items():
+        for name in names:
+            lookup[name] = module_name
+
+    def __getattr__(name: str) -> Any:
+        try:
+            module_name = lookup[name]
+        except KeyError:
+            pass
+        else:
+            module = importlib.import_module(module_name, package)
+            value = module if module_name.lstrip('.') == name else getattr(module, name)
+            namespace[name] = value
+            return value
+        if not name.startswith('_'):
+            for module_name in reversed(fallback_modules):
+                module = importlib.import_module(module_name, package)
+                try:
+                    value = getattr(module, name)
+                except AttributeError:
+                    continue
+                namespace[name] = value
+                return value
+        raise AttributeError(f'module {package!r} has no attribute {name!r}')
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace.keys()) | set(lookup.keys()))
+
+    return __getattr__, __dir__
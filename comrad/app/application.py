@@ -10,6 +10,7 @@ from .main_window import CMainWindow  # This has to be above PyDMApplication to
 from pydm.application import PyDMApplication
 from pydm.utilities import path_info, which
 from pydm.data_plugins import is_read_only
+from _comrad.startup_profile import is_profiling
 from comrad.icons import icon
 from comrad.rbac import CRbaState, CRbaStartupLoginPolicy
 from comrad.app.plugins import CToolbarID
@@ -54,6 +55,15 @@ class CApplication(PyDMApplication):
                  plugin_blacklist: Optional[Iterable[str]] = None,
                  data_plugin_paths: Optional[List[str]] = None,
                  startup_login_policy: Optional[CRbaStartupLoginPolicy] = None,
+                 cycle_sync_timeout: Optional[int] = None,
+                 hidden_channels_grace_period: Optional[int] = None,
+                 use_display_cache: bool = True,
+                 kept_displays: Optional[int] = None,
+                 kept_displays_memory: Optional[int] = None,
+                 single_process: bool = False,
+                 prewarm_jvm: bool = True,
+                 broker_socket: Optional[str] = None,
+                 stall_threshold: Optional[float] = None,
                  fullscreen: bool = False):
         """
         This class handles loading ComRAD display files, opening
@@ -106,6 +116,26 @@ class CApplication(PyDMApplication):
             plugin_blacklist: List of plugin IDs that have to be disabled even if they are enabled by default.
             data_plugin_paths: Extra paths to be searched for data plugins.
             startup_login_policy: Default login policy for RBAC at launch.
+            cycle_sync_timeout: When set, enables cycle-synchronous delivery of the subscription packets,
+                waiting up to the given amount of milliseconds for the remaining packets of the same cycle
+                (see :class:`~comrad.data_plugins.CCycleSynchronizer`).
+            hidden_channels_grace_period: When set, enables pausing channels of the widgets that stay hidden for longer
+                than the given amount of milliseconds (see :class:`~comrad.data.activation.CChannelActivationPolicy`).
+            use_display_cache: Whether to load Qt Designer files through the on-disk cache of compiled
+                displays (see :class:`~comrad.app.display_cache.CDisplayCache`).
+            kept_displays: When set, the given amount of displays that user navigated away from are kept alive with paused
+                channels, to be shown instantly when navigating back to them
+                (see :class:`~comrad.app.display_instances.CDisplayInstanceCache`).
+            kept_displays_memory: Limit of memory (in megabytes) that displays kept alive may occupy.
+            single_process: Open displays that would normally start a new ComRAD process (e.g. from
+                :class:`~comrad.CRelatedDisplayButton`) in a new window of this process instead (see :meth:`new_window`).
+            prewarm_jvm: Whether child ComRAD processes should start the JVM in the background while the display
+                is being loaded. The JVM of this process is prewarmed by the launcher.
+            broker_socket: When set, JAPC channels are served by the subscription broker listening on this socket
+                (see :class:`~comrad.data.broker_client.CBrokerClient`), instead of the JVM of this process.
+            stall_threshold: When set, a watchdog thread logs where the GUI thread spends its time, whenever the
+                event loop stalls for longer than the given amount of seconds
+                (see :func:`~comrad.app.stall_watchdog.install_stall_watchdog`).
             fullscreen: Whether or not to launch PyDM in a full screen mode.
         """
         args = [_APP_NAME]
@@ -120,6 +150,46 @@ class CApplication(PyDMApplication):
         self._extra_data_plugin_paths = data_plugin_paths
         self._window_plugin_config = window_plugin_config
         self._hide_log_console = hide_log_console
+        self._cycle_sync_timeout = cycle_sync_timeout
+        if cycle_sync_timeout is not None:
+            # Must be configured before any connection is created, and created in the GUI thread,
+            # because connections only look it up from the control system threads
+            from comrad.data_plugins import CCycleSynchronizer
+            synchronizer = CCycleSynchronizer.instance()
+            synchronizer.enabled = True
+            synchronizer.timeout = cycle_sync_timeout
+        self._hidden_channels_grace_period = hidden_channels_grace_period
+        if hidden_channels_grace_period is not None:
+            from comrad.data.activation import CChannelActivationPolicy
+            policy = CChannelActivationPolicy.instance()
+            policy.enabled = True
+            policy.grace_period = hidden_channels_grace_period
+        self._kept_displays = kept_displays
+        self._kept_displays_memory = kept_displays_memory
+        if kept_displays is not None:
+            from comrad.app.display_instances import CDisplayInstanceCache, current_memory_usage
+            display_instances = CDisplayInstanceCache.instance()
+            display_instances.capacity = kept_displays
+            if kept_displays_memory is not None:
+                if current_memory_usage() is None:
+                    logger.warning('Memory limit of the kept displays is ignored, because "psutil" is not installed')
+                else:
+                    display_instances.memory_budget = kept_displays_memory * 1024 * 1024
+        self._prewarm_jvm = prewarm_jvm
+        self._broker_socket = broker_socket
+        if broker_socket is not None:
+            # Must be configured before any connection is created
+            from comrad.data.broker_client import CBrokerClient
+            CBrokerClient.instance().socket_path = broker_socket
+        self._use_display_cache = use_display_cache
+        if use_display_cache:
+            # Must be installed before the main display is loaded in super()
+            from comrad.app.display_cache import install_display_cache
+            install_display_cache()
+        if is_profiling():
+            # Wraps the display loader, therefore installed after the display cache
+            from comrad.app.startup_profile import install_startup_instrumentation
+            install_startup_instrumentation()
         super().__init__(ui_file=ui_file,
                          command_line_args=args,
                          display_args=display_args or [],
@@ -135,8 +205,6 @@ class CApplication(PyDMApplication):
         self.main_window: CMainWindow = self.main_window  # Just to make code completion work
         self._plugins_menu: Optional[QMenu] = None
         self.setWindowIcon(icon('app'))
-        self.main_window.addToolBar(toolbar_area_from_str(toolbar_position), self.main_window.ui.navbar)
-        self.main_window.ui.navbar.setToolButtonStyle(toolbar_style_from_str(toolbar_style))
 
         # Useful for sub-processes
         self._stylesheet_path = stylesheet_path
@@ -149,34 +217,77 @@ class CApplication(PyDMApplication):
         self._perf_mon = perf_mon
         self._toolbar_style = toolbar_style
         self._toolbar_position = toolbar_position
+        self._single_process = single_process
+        self._secondary_windows: List[CMainWindow] = []  # Keep additional windows alive until they are closed
+
+        if self.main_window is not None:
+            self._setup_main_window(self.main_window, selector=default_selector)
+
+        if broker_socket is not None:
+            # Connected even when the display has no JAPC channels, so that the broker does not exit as idle
+            from comrad.data.broker_client import CBrokerClient
+            CBrokerClient.instance().ensure_connected()
+
+        self._stall_threshold = stall_threshold
+        if stall_threshold is not None:
+            # Installed after the main display is loaded, so that the loading itself is not reported as a stall
+            from comrad.app.stall_watchdog import install_stall_watchdog
+            install_stall_watchdog(self, threshold=stall_threshold)
+
+    def new_window(self,
+                   ui_file: str,
+                   macros: Optional[Dict[str, str]] = None,
+                   command_line_args: Optional[List[str]] = None) -> CMainWindow:
+        """
+        Open the display in a new main window of this process.
 
-        order: Optional[List[Union[str, CToolbarID]]] = None
-        if toolbar_order is not None:
+        Unlike :meth:`new_pydm_process`, the new window shares control system connections, RBAC session and
+        rules engine with the rest of the application, which makes it open much faster and avoids duplicate
+        subscriptions to the same devices. Each window still keeps its own window context, initialized with the
+        selector of the currently active window.
 
-            def _convert(identifier: Union[str, CToolbarID]) -> Union[str, CToolbarID]:
-                try:
-                    return CToolbarID(identifier)
-                except ValueError:
-                    # Not a valid CToolbarID identifier
-                    return identifier
+        Args:
+            ui_file: The path to a .ui or .py file to open in the new window.
+            macros: A dictionary of macro variables to supply to the display file to be opened.
+            command_line_args: A list of command line arguments to pass to the display.
 
-            order = list(map(_convert, toolbar_order))
-        self.main_window.load_window_plugins(config=self._parse_window_plugin_config(window_plugin_config),
-                                             nav_bar_plugin_path=nav_bar_plugin_path,
-                                             status_bar_plugin_path=status_bar_plugin_path,
-                                             menu_bar_plugin_path=menu_bar_plugin_path,
-                                             toolbar_order=order,
-                                             plugin_whitelist=plugin_whitelist,
-                                             plugin_blacklist=plugin_blacklist)
-        if default_selector:
-            self.main_window.window_context.selector = default_selector
+        Returns:
+            New window.
+        """
+        ui_file_path = Path(ui_file).expanduser().resolve()
+        base_dir, file_name, filepath_args = path_info(str(ui_file_path))
+        source_window = self.active_main_window
+        primary_window = self.main_window
+        try:
+            # Window plugins are created for the window that is assigned to main_window at the time
+            self.make_main_window(stylesheet_path=self.stylesheet_path)
+            window = self.main_window
+            self._setup_main_window(window, selector=source_window.window_context.selector if source_window else None)
+        finally:
+            if primary_window is not None:
+                self.main_window = primary_window
+        window.setAttribute(Qt.WA_DeleteOnClose)
+        self._secondary_windows.append(window)
+        window.destroyed.connect(lambda *_: self._secondary_windows.remove(window))
+        logger.debug(f'Opening {ui_file_path} in a new window')
+        window.open(str(Path(base_dir) / file_name), macros, [*filepath_args, *(command_line_args or [])])
+        return window
+
+    @property
+    def active_main_window(self) -> Optional[CMainWindow]:
+        """Main window that is currently active, or the first main window of the application."""
+        active_window = self.activeWindow()
+        if isinstance(active_window, CMainWindow):
+            return active_window
+        return self.main_window
 
     def new_pydm_process(self,
                          ui_file: str,
                          macros: Optional[Dict[str, str]] = None,
                          command_line_args: Optional[List[str]] = None):
         """
-        Overrides the subclass method to spawn ComRAD process instead of bare PyDM.
+        Overrides the subclass method to spawn ComRAD process instead of bare PyDM. When the application runs
+        in the single-process mode, the display is opened with :meth:`new_window` instead.
 
         Args:
             ui_file: The path to a .ui or .py file to open in the new process.
@@ -186,6 +297,10 @@ class CApplication(PyDMApplication):
                 to pass in extra arguments.  It is probably rare that code you
                 write needs to use this argument.
         """
+        if self.single_process:
+            self.new_window(ui_file, macros=macros, command_line_args=command_line_args)
+            return
+
         # Expand user (~ or ~user) and environment variables.
         ui_file_path = Path(ui_file).expanduser().resolve()
         base_dir, file_name, args = path_info(str(ui_file_path))
@@ -222,14 +337,31 @@ class CApplication(PyDMApplication):
             args.append('--read-only')
         if self._perf_mon:
             args.append('--perf-mon')
+        if self._cycle_sync_timeout is not None:
+            args.extend(['--cycle-sync', str(self._cycle_sync_timeout)])
+        if self._hidden_channels_grace_period is not None:
+            args.extend(['--pause-hidden', str(self._hidden_channels_grace_period)])
+        if not self._use_display_cache:
+            args.append('--no-display-cache')
+        if not self._prewarm_jvm:
+            args.append('--no-jvm-prewarm')
+        if self._broker_socket is not None:
+            args.extend(['--broker', self._broker_socket])
+        if self._stall_threshold is not None:
+            args.extend(['--stall-watchdog', str(self._stall_threshold)])
+        if self._kept_displays is not None:
+            args.extend(['--keep-displays', str(self._kept_displays)])
+        if self._kept_displays_memory is not None:
+            args.extend(['--keep-displays-memory', str(self._kept_displays_memory)])
         if self._stylesheet_path:
             args.extend(['--stylesheet', self._stylesheet_path])
         if macros is not None:
             args.extend(['-m', json.dumps(macros)])
         if not self.use_inca:
             args.append('--no-inca')
-        if self.main_window.window_context.selector:
-            args.extend(['--selector', self.main_window.window_context.selector])
+        source_window = self.active_main_window
+        if source_window is not None and source_window.window_context.selector:
+            args.extend(['--selector', source_window.window_context.selector])
         if self.jvm_flags:
             args.append('--java-env')
             args.extend([f'{key}={flag_val}' for key, flag_val in self.jvm_flags.items()])
@@ -284,10 +416,39 @@ class CApplication(PyDMApplication):
             main_window.setStyleSheet(stylesheet)
             logger.debug('Augmented application stylesheet with color rule overrides')
 
+    def _setup_main_window(self, main_window: CMainWindow, selector: Optional[str]):
+        main_window.addToolBar(toolbar_area_from_str(self._toolbar_position), main_window.ui.navbar)
+        main_window.ui.navbar.setToolButtonStyle(toolbar_style_from_str(self._toolbar_style))
+
+        order: Optional[List[Union[str, CToolbarID]]] = None
+        if self._toolbar_order is not None:
+
+            def _convert(identifier: Union[str, CToolbarID]) -> Union[str, CToolbarID]:
+                try:
+                    return CToolbarID(identifier)
+                except ValueError:
+                    # Not a valid CToolbarID identifier
+                    return identifier
+
+            order = list(map(_convert, self._toolbar_order))
+        main_window.load_window_plugins(config=self._parse_window_plugin_config(self._window_plugin_config),
+                                        nav_bar_plugin_path=self._nav_bar_plugin_path,
+                                        status_bar_plugin_path=self._status_bar_plugin_path,
+                                        menu_bar_plugin_path=self._menu_bar_plugin_path,
+                                        toolbar_order=order,
+                                        plugin_whitelist=self._plugin_whitelist,
+                                        plugin_blacklist=self._plugin_blacklist)
+        if selector:
+            main_window.window_context.selector = selector
+
     @property
     def use_inca(self) -> bool:
         return self._use_inca
 
+    @property
+    def single_process(self) -> bool:
+        return self._single_process
+
     @property
     def ccda_endpoint(self) -> str:
         return self._ccda_endpoint
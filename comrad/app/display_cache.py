@@ -0,0 +1,284 @@
+import io
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import functools
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, Dict, Union, Iterable, List, Tuple, Any, IO, Type
+from qtpy import uic, API_NAME, PYQT_VERSION
+from qtpy.QtWidgets import QWidget
+from _comrad.comrad_info import COMRAD_VERSION
+
+
+logger = logging.getLogger(__name__)
+
+
+_CACHE_FORMAT = '1'
+"""Version of the cache entry layout. Bump it, when the way entries are produced changes."""
+
+
+UiSource = Union[str, Path, IO[str]]
+
+
+class CDisplayCache:
+
+    MAX_LOADED_CLASSES = 128
+    """Amount of compiled classes kept in memory. Least recently used ones are dropped first."""
+
+    MAX_ENTRIES = 500
+    """Amount of files kept in the cache directory. Least recently used ones are removed first."""
+
+    _instance: Optional['CDisplayCache'] = None
+
+    @classmethod
+    def instance(cls) -> 'CDisplayCache':
+        """
+        Method to retrieve a singleton of the cache, placed in the :meth:`default_directory`.
+        """
+        if cls._instance is None:
+            cls._instance = cls(directory=cls.default_directory())
+        return cls._instance
+
+    @staticmethod
+    def default_directory() -> Path:
+        """
+        Location of the cache, taken from ``COMRAD_DISPLAY_CACHE_DIR`` environment variable, or
+        ``$XDG_CACHE_HOME/comrad/displays`` (``~/.cache/comrad/displays``).
+        """
+        custom_dir = os.environ.get('COMRAD_DISPLAY_CACHE_DIR')
+        if custom_dir:
+            return Path(custom_dir).expanduser()
+        cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+        return Path(cache_home) / 'comrad' / 'displays'
+
+    def __init__(self, directory: Optional[Path]):
+        """
+        On-disk cache of Qt Designer files compiled into Python modules.
+
+        Loading a display from a \\*.ui file normally involves parsing the XML and generating Python code with
+        :mod:`~PyQt5.uic` every time the display is opened, e.g. for every instance of :class:`~comrad.CTemplateRepeater`
+        or for every click on :class:`~comrad.CRelatedDisplayButton`. The cache keeps the generated code, so that
+        subsequent loads only have to execute it. Compiled classes are also kept in memory for the lifetime of
+        the process.
+
+        Entries are keyed by the hash of the file contents (with macros already substituted), ComRAD version and
+        Qt bindings version, therefore modified files or upgraded environments never use stale entries. As every
+        macro set produces its own entry, both caches are limited (see :attr:`MAX_LOADED_CLASSES` and
+        :attr:`MAX_ENTRIES`), and files produced by other ComRAD or Qt bindings versions are removed, when new
+        entries are written.
+
+        Args:
+            directory: Location of the cache files. If ``None``, only in-memory cache is used.
+        """
+        self.directory = directory
+        self._classes: 'OrderedDict[str, Type]' = OrderedDict()
+        # Distinguishes files of this environment from the ones left by other versions
+        self._env_tag = hashlib.sha256('\0'.join(_environment()).encode('utf-8')).hexdigest()[:12]
+
+    def key(self, contents: str) -> str:
+        """
+        Produce the cache key for the given display.
+
+        Args:
+            contents: Contents of the \\*.ui file.
+
+        Returns:
+            Hex digest identifying the cache entry.
+        """
+        digest = hashlib.sha256()
+        for part in (*_environment(), contents):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def load_ui_type(self, ui_file: UiSource) -> Type:
+        """
+        Similar to :func:`PyQt5.uic.loadUiType`, produce a form class from the \\*.ui file, using cached code,
+        when available.
+
+        Args:
+            ui_file: Path to the \\*.ui file, or a file-like object with its contents (e.g. after macro substitution).
+
+        Returns:
+            Form class with ``setupUi`` and ``retranslateUi`` methods.
+        """
+        contents = _read_contents(ui_file)
+        key = self.key(contents)
+        try:
+            form_class = self._classes[key]
+        except KeyError:
+            pass
+        else:
+            self._classes.move_to_end(key)
+            return form_class
+        source = self._read_entry(key)
+        if source is None:
+            source = compile_ui(contents)
+            self._write_entry(key, source)
+        form_class = _exec_form_class(source, filename=str(self._entry_path(key) or f'<display {key}>'))
+        self._classes[key] = form_class
+        while len(self._classes) > self.MAX_LOADED_CLASSES:
+            self._classes.popitem(last=False)
+        return form_class
+
+    def warm(self, paths: Iterable[Path]) -> List[Tuple[Path, float, float]]:
+        """
+        Compile \\*.ui files ahead of time, so that the first launch of the application benefits from the cache.
+
+        Only files without macros substitution can be prepared this way. Displays loaded with macros are cached
+        on their first use.
+
+        Args:
+            paths: Files or directories to search for \\*.ui files recursively.
+
+        Returns:
+            List of tuples with the file, time (in seconds) to load it without the cache, and time to load it
+            from the warm cache.
+        """
+        results: List[Tuple[Path, float, float]] = []
+        for ui_file in _find_ui_files(paths):
+            try:
+                contents = ui_file.read_text()
+                start = time.perf_counter()
+                source = compile_ui(contents)
+                _exec_form_class(source, filename=str(ui_file))
+                cold = time.perf_counter() - start
+                key = self.key(contents)
+                self._classes.pop(key, None)
+                self._write_entry(key, source)
+                start = time.perf_counter()
+                self.load_ui_type(io.StringIO(contents))
+                warm = time.perf_counter() - start
+            except Exception as e:  # noqa: B902
+                logger.warning(f'Cannot compile {ui_file}: {e}')
+                continue
+            results.append((ui_file, cold, warm))
+        return results
+
+    def _entry_path(self, key: str) -> Optional[Path]:
+        return None if self.directory is None else self.directory / f'ui_{self._env_tag}_{key}.py'
+
+    def _read_entry(self, key: str) -> Optional[str]:
+        path = self._entry_path(key)
+        if path is None:
+            return None
+        try:
+            source = path.read_text()
+        except OSError:
+            return None
+        try:
+            # Modification time marks recently used entries, to be kept when the cache is trimmed
+            os.utime(path)
+        except OSError:
+            pass
+        return source
+
+    def _write_entry(self, key: str, source: str):
+        path = self._entry_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically, as several ComRAD processes may populate the same cache
+            fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix='.ui_', suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                f.write(source)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            logger.debug(f'Cannot store compiled display in {path}: {e}')
+            return
+        self._trim()
+
+    def _trim(self):
+        if self.directory is None:
+            return
+        own_prefix = f'ui_{self._env_tag}_'
+        entries: List[Tuple[float, Path]] = []
+        try:
+            paths = list(self.directory.glob('ui_*.py'))
+        except OSError:
+            return
+        for path in paths:
+            try:
+                if not path.name.startswith(own_prefix):
+                    # Produced by another ComRAD or Qt bindings version
+                    path.unlink()
+                    continue
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                # Removed by another ComRAD process in the meantime
+                continue
+        excess = len(entries) - self.MAX_ENTRIES
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, path in entries[:excess]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def compile_ui(contents: str) -> str:
+    """
+    Generate Python code for the \\*.ui file.
+
+    Args:
+        contents: Contents of the \\*.ui file.
+
+    Returns:
+        Python source, defining the form class.
+    """
+    out = io.StringIO()
+    uic.compileUi(io.StringIO(contents), out)
+    return out.getvalue()
+
+
+def load_ui_into_display(ui_file: UiSource, display: QWidget):
+    """
+    Replacement of PyDM's loader of \\*.ui files into :class:`~pydm.Display`, that uses :class:`CDisplayCache`.
+
+    Args:
+        ui_file: Path to the \\*.ui file, or a file-like object with its contents.
+        display: Display to set up.
+    """
+    form_class = CDisplayCache.instance().load_ui_type(ui_file)
+    display.retranslateUi = functools.partial(form_class.retranslateUi, display)
+    form_class.setupUi(display, display)
+    display.ui = display
+
+
+def install_display_cache():
+    """
+    Make all displays (including embedded and related ones) load through :class:`CDisplayCache`.
+    """
+    import pydm.display
+    pydm.display._load_ui_into_display = load_ui_into_display
+
+
+def _environment() -> Tuple[str, ...]:
+    return _CACHE_FORMAT, COMRAD_VERSION, API_NAME, PYQT_VERSION or ''
+
+
+def _read_contents(ui_file: UiSource) -> str:
+    if isinstance(ui_file, (str, Path)):
+        return Path(ui_file).read_text()
+    return ui_file.read()
+
+
+def _exec_form_class(source: str, filename: str) -> Type:
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, filename, 'exec'), namespace)  # noqa: S102 Code generated by uic
+    # Generated class is named after the top-level widget, e.g. Ui_Form
+    return next(val for name, val in namespace.items() if name.startswith('Ui_') and isinstance(val, type))
+
+
+def _find_ui_files(paths: Iterable[Path]) -> Iterable[Path]:
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.rglob('*.ui'))
+        elif path.suffix == '.ui':
+            yield path
@@ -0,0 +1,285 @@
+import os
+import json
+import weakref
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple, Dict, Any, Callable
+from qtpy.QtCore import QObject
+from qtpy.QtWidgets import QWidget
+from pydm.widgets.rules import register_widget_rules, unregister_widget_rules
+from comrad.data.activation import CChannelActivationPolicy, PausedChannels
+from comrad.data.context import CContextTrackingDelegate
+
+
+logger = logging.getLogger(__name__)
+
+
+DisplayKey = Tuple[str, str, Tuple[str, ...]]
+
+
+@dataclass
+class _ParkedDisplay:
+    display: QWidget
+    size: int
+    owner: Optional['weakref.ReferenceType[QObject]'] = None
+    trackers: List[CContextTrackingDelegate] = field(default_factory=list)
+    paused: List[Tuple['weakref.ReferenceType[QWidget]', PausedChannels]] = field(default_factory=list)
+
+
+class CDisplayInstanceCache:
+
+    DEFAULT_CAPACITY = 5
+    """Default amount of displays kept alive after navigating away from them."""
+
+    _instance: Optional['CDisplayInstanceCache'] = None
+
+    @classmethod
+    def instance(cls) -> 'CDisplayInstanceCache':
+        """
+        Method to retrieve a singleton of the cache.
+
+        A single instance is shared by all main windows, so that the limits are respected across the application.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, capacity: int = 0, memory_budget: Optional[int] = None):
+        """
+        Cache of display instances that the user has recently navigated away from (with the navigation bar,
+        or by opening another display in the same window, e.g. from :class:`~comrad.CRelatedDisplayButton`).
+
+        Instead of closing all connections of the display, its channels are paused, so that no updates are
+        received while it is not shown, but all the widgets stay alive. When the user navigates back to the display,
+        it is shown immediately, and channels are resumed, delivering the last known values right away, while
+        the fresh ones are on their way. Once the limits are exceeded, the least recently used display is evicted,
+        destroying its widgets. Navigating to an evicted display loads it from scratch.
+
+        Args:
+            capacity: Maximum amount of displays kept alive. ``0`` disables the cache.
+            memory_budget: Maximum amount of memory (in bytes) that displays kept alive are allowed to occupy.
+                           Memory usage of each display is estimated when it is loaded.
+        """
+        self.capacity = capacity
+        """Maximum amount of displays kept alive. ``0`` disables the cache."""
+        self.memory_budget = memory_budget
+        """Maximum amount of memory (in bytes) that displays kept alive are allowed to occupy, or ``None`` for no limit."""
+        self._parked: 'OrderedDict[QWidget, _ParkedDisplay]' = OrderedDict()
+        self._sizes: 'weakref.WeakKeyDictionary[QWidget, int]' = weakref.WeakKeyDictionary()
+        self._evicted: 'weakref.WeakSet[QWidget]' = weakref.WeakSet()
+
+    @property
+    def enabled(self) -> bool:
+        """Displays are kept alive after navigating away from them."""
+        return self.capacity > 0
+
+    @property
+    def parked_count(self) -> int:
+        """Amount of displays that are currently kept alive while not being shown."""
+        return len(self._parked)
+
+    @property
+    def memory_usage(self) -> int:
+        """Estimated amount of memory (in bytes) occupied by the displays that are kept alive."""
+        return sum(entry.size for entry in self._parked.values())
+
+    @staticmethod
+    def key(filename: Optional[str], macros: Optional[Dict[str, Any]], args: Optional[List[str]]) -> Optional[DisplayKey]:
+        """
+        Produce the key identifying the display instance.
+
+        Args:
+            filename: Path to the display file.
+            macros: Macros used to load the display.
+            args: Arguments used to load the display.
+
+        Returns:
+            Hashable key, or ``None`` if display cannot be identified.
+        """
+        if not filename:
+            return None
+        return os.path.abspath(filename), json.dumps(macros or {}, sort_keys=True), tuple(args or [])
+
+    def record_size(self, display: QWidget, size: int):
+        """
+        Remember the estimated memory usage of the display, to be respected by :attr:`memory_budget`.
+
+        Args:
+            display: Loaded display.
+            size: Estimated amount of memory (in bytes).
+        """
+        self._sizes[display] = max(size, 0)
+
+    def is_parked(self, display: QWidget) -> bool:
+        """
+        Check whether the display is kept alive with paused channels.
+
+        Args:
+            display: Display instance.
+        """
+        return display in self._parked
+
+    def is_evicted(self, display: QWidget) -> bool:
+        """
+        Check whether the display has been evicted from the cache and destroyed, and has to be loaded again.
+
+        Args:
+            display: Display instance (possibly still referenced in the navigation history).
+        """
+        return display in self._evicted
+
+    def find(self, filename: str, macros: Optional[Dict[str, Any]], args: Optional[List[str]],
+             exclude: Callable[[QWidget], bool] = lambda _: False,
+             owner: Optional[QObject] = None) -> Optional[QWidget]:
+        """
+        Find the display that has been loaded from the same file with the same macros and arguments.
+
+        Args:
+            filename: Path to the display file.
+            macros: Macros used to load the display.
+            args: Arguments used to load the display.
+            exclude: Predicate to skip displays that cannot be reused.
+            owner: Only consider displays parked by this window. Displays of other windows are still referenced
+                   by their navigation history, and must not be moved into another window.
+
+        Returns:
+            Display kept alive, or ``None``.
+        """
+        key = self.key(filename, macros, args)
+        if key is None:
+            return None
+        for display in reversed(self._parked):
+            entry_owner = self._parked[display].owner
+            if owner is not None and (entry_owner is None or entry_owner() is not owner):
+                continue
+            if _display_key(display) == key and not exclude(display):
+                return display
+        return None
+
+    def park(self, display: QWidget, owner: Optional[QObject] = None):
+        """
+        Pause channels and rules of the display that is no longer shown, and keep it alive, possibly evicting
+        least recently used displays.
+
+        Args:
+            display: Display that has been removed from the window.
+            owner: Window that the display has been removed from.
+        """
+        if display in self._parked:
+            self._parked.move_to_end(display)
+            return
+        unregister_widget_rules(display)
+        entry = _ParkedDisplay(display=display,
+                               size=self._sizes.get(display, 0),
+                               owner=None if owner is None else weakref.ref(owner))
+        policy = CChannelActivationPolicy.instance()
+        for widget in [display, *display.findChildren(QWidget)]:
+            tracker = getattr(widget, '_context_tracker', None)
+            if isinstance(tracker, CContextTrackingDelegate) and tracker.paused:
+                # Already paused while hidden (e.g. in an inactive tab), it will resume on its own when shown
+                continue
+            if isinstance(tracker, CContextTrackingDelegate) and tracker.pause():
+                entry.trackers.append(tracker)
+                continue
+            channels = _widget_channels(widget)
+            if channels:
+                entry.paused.append((weakref.ref(widget), policy.pause(channels)))
+        self._parked[display] = entry
+        logger.debug(f'Keeping display {_display_name(display)} alive with paused channels')
+        self._evict_overflow()
+
+    def restore(self, display: QWidget) -> bool:
+        """
+        Resume channels and rules of the display that has been kept alive, before showing it again.
+
+        Args:
+            display: Display to be shown.
+
+        Returns:
+            ``False`` if the display has not been kept alive.
+        """
+        entry = self._parked.pop(display, None)
+        if entry is None:
+            return False
+        logger.debug(f'Restoring display {_display_name(display)}')
+        for tracker in entry.trackers:
+            tracker.resume()
+        policy = CChannelActivationPolicy.instance()
+        for widget_ref, paused in entry.paused:
+            widget = widget_ref()
+            if widget is None:
+                policy.release(len(paused))
+            else:
+                policy.resume(paused, channels=_widget_channels(widget))
+        register_widget_rules(display)
+        return True
+
+    def discard(self, display: QWidget):
+        """
+        Evict the display right away, e.g. when it has been replaced by the reloaded instance.
+
+        Args:
+            display: Display instance.
+        """
+        entry = self._parked.pop(display, None)
+        if entry is not None:
+            self._evict(entry)
+
+    def clear(self):
+        """Evict all displays that are kept alive."""
+        while self._parked:
+            self._evict(self._parked.popitem(last=False)[1])
+
+    def _evict_overflow(self):
+        while self._parked and (len(self._parked) > self.capacity
+                                or (self.memory_budget is not None and self.memory_usage > self.memory_budget)):
+            self._evict(self._parked.popitem(last=False)[1])
+
+    def _evict(self, entry: _ParkedDisplay):
+        logger.debug(f'Evicting display {_display_name(entry.display)}')
+        policy = CChannelActivationPolicy.instance()
+        for _, paused in entry.paused:
+            policy.release(len(paused))
+        # Trackers release their paused channels when destroyed
+        self._evicted.add(entry.display)
+        entry.display.deleteLater()
+
+
+def current_memory_usage() -> Optional[int]:
+    """
+    Resident memory size of the current process, used to estimate memory usage of the loaded displays.
+
+    Returns:
+        Memory in bytes, or ``None`` if ``psutil`` is not installed.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def _widget_channels(widget: QWidget) -> List[Any]:
+    # Checking with hasattr would fail on pyqtgraph-derived widgets, same as in find_context_provider
+    channels_getter = getattr(type(widget), 'channels', None)
+    if not callable(channels_getter):
+        return []
+    try:
+        return [ch for ch in (channels_getter(widget) or []) if ch is not None]
+    except (NameError, TypeError):
+        return []
+
+
+def _display_key(display: QWidget) -> Optional[DisplayKey]:
+    try:
+        return CDisplayInstanceCache.key(display.loaded_file(), display.macros(), display.args())
+    except (AttributeError, TypeError):
+        return None
+
+
+def _display_name(display: QWidget) -> str:
+    try:
+        return display.loaded_file() or type(display).__name__
+    except AttributeError:
+        return type(display).__name__
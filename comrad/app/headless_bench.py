@@ -0,0 +1,214 @@
+"""
+Measurement of the headless benchmark, active only when requested with ``comrad run --headless-bench``.
+
+Counters are collected by :class:`~comrad.instrumentation.InstrumentationRegistry`, which stays disabled
+otherwise, so that there is no overhead.
+"""
+import os
+import json
+import time
+import logging
+from typing import Optional, Dict, List, Any
+from qtpy.QtCore import QTimer
+from qtpy.QtWidgets import QApplication
+from comrad.instrumentation import InstrumentationRegistry, CEventLoopProbe, connection_counts
+
+
+logger = logging.getLogger(__name__)
+
+
+class BenchmarkMetrics:
+
+    def __init__(self, registry: Optional[InstrumentationRegistry] = None):
+        """
+        Measurement of the running display, based on the counters of
+        :class:`~comrad.instrumentation.InstrumentationRegistry`, amended with the process-wide CPU usage.
+
+        Args:
+            registry: Registry to read the counters from (default: the application-wide one).
+        """
+        self.registry = registry or InstrumentationRegistry.instance()
+        self._started_wall = time.perf_counter()
+        self._started_cpu = _cpu_time()
+        self._registry_enabled = False
+
+    def start(self):
+        """
+        Enable the registry, discard everything recorded so far (e.g. during the display loading), and start
+        the measurement.
+        """
+        if not self._registry_enabled:
+            self._registry_enabled = True
+            self.registry.enable()
+        self.registry.reset()
+        self._started_wall = time.perf_counter()
+        self._started_cpu = _cpu_time()
+
+    def stop(self):
+        """Release the registry, so that it is disabled, unless it is used by others."""
+        if self._registry_enabled:
+            self._registry_enabled = False
+            self.registry.disable()
+
+    def report(self,
+               display: Optional[str] = None,
+               connections: Optional[Dict[str, int]] = None,
+               listeners: Optional[int] = None,
+               rss: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Summarize the measurement.
+
+        Args:
+            display: Benchmarked display file.
+            connections: Amount of open connections, by protocol.
+            listeners: Amount of channels listening to the connections.
+            rss: Resident memory size (in bytes) at the end of the measurement, if known.
+
+        Returns:
+            JSON-serializable report.
+        """
+        duration = time.perf_counter() - self._started_wall
+        cpu = _cpu_time() - self._started_cpu
+        snapshot = self.registry.snapshot()
+        lag = sorted(self.registry.take_event_loop_lag())
+        widgets = sorted((stats for stats in snapshot.widgets if stats.updates.count),
+                         key=lambda stats: stats.updates.count,
+                         reverse=True)
+        channels = sorted(snapshot.channels, key=lambda stats: stats.packets.count, reverse=True)
+        transformations = sorted((stats for stats in snapshot.widgets if stats.transformations.count),
+                                 key=lambda stats: stats.transformations.seconds,
+                                 reverse=True)
+        return {
+            'display': display,
+            'duration_s': round(duration, 3),
+            'event_loop': {
+                'samples': len(lag),
+                'lag_ms': {
+                    'p50': _percentile(lag, 50),
+                    'p90': _percentile(lag, 90),
+                    'p99': _percentile(lag, 99),
+                    'max': round(lag[-1], 3) if lag else None,
+                },
+            },
+            'process': {
+                'cpu_s': round(cpu, 3),
+                'cpu_percent': round(cpu / duration * 100, 1) if duration > 0 else None,
+                'rss_bytes': rss,
+                'peak_rss_bytes': _peak_rss(),
+            },
+            'connections': {
+                'total': sum((connections or {}).values()),
+                'by_protocol': connections or {},
+                'listeners': listeners,
+            },
+            'channels': [{
+                'address': stats.address,
+                'updates': stats.packets.count,
+                'dropped': stats.dropped,
+            } for stats in channels],
+            'widgets': [{
+                'name': stats.name,
+                'class': stats.class_name,
+                'updates': stats.updates.count,
+                'coalesced': stats.coalesced,
+            } for stats in widgets],
+            'rules': {
+                'evaluations': snapshot.rules.count,
+                'time_s': round(snapshot.rules.seconds, 6),
+            },
+            'value_transformations': {
+                'evaluations': snapshot.transformations.count,
+                'time_s': round(snapshot.transformations.seconds, 6),
+                'widgets': [{
+                    'name': stats.name,
+                    'class': stats.class_name,
+                    'evaluations': stats.transformations.count,
+                    'time_s': round(stats.transformations.seconds, 6),
+                } for stats in transformations],
+            },
+        }
+
+
+def write_report(report: Dict[str, Any], path: str):
+    """
+    Write the report as a JSON file.
+
+    Args:
+        report: Report produced by :meth:`BenchmarkMetrics.report`.
+        path: Destination file.
+    """
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def install_benchmark_instrumentation() -> BenchmarkMetrics:
+    """
+    Enable counting of values delivered from connections to widgets, evaluation of rules and of
+    ``valueTransformation`` snippets.
+
+    Must be called before the main display is loaded.
+
+    Returns:
+        Metrics that are going to be collected.
+    """
+    metrics = BenchmarkMetrics()
+    metrics.start()
+    return metrics
+
+
+def install_benchmark_report(app: QApplication, metrics: BenchmarkMetrics, duration: float, path: str, display: Optional[str] = None):
+    """
+    Start the measurement together with the event loop, and after the given time, write the report and
+    quit the application.
+
+    Args:
+        app: Application instance.
+        metrics: Metrics produced by :func:`install_benchmark_instrumentation`.
+        duration: Length of the measurement (in seconds).
+        path: File to write the report into.
+        display: Benchmarked display file, mentioned in the report.
+    """
+    probe = CEventLoopProbe(parent=app)
+
+    def start():
+        metrics.start()
+        probe.start()
+        QTimer.singleShot(int(duration * 1000), finish)
+        logger.info(f'Benchmarking the display for {duration:g} seconds')
+
+    def finish():
+        probe.stop()
+        from comrad.app.display_instances import current_memory_usage
+        report = metrics.report(display=display, rss=current_memory_usage(), **connection_counts())
+        metrics.stop()
+        try:
+            write_report(report, path)
+        except OSError as e:
+            logger.error(f'Cannot write benchmark report to {path}: {e!s}')
+        else:
+            logger.info(f'Benchmark report has been written to {path}')
+        app.quit()
+
+    QTimer.singleShot(0, start)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    # Nearest-rank method, so that reported values are actually observed ones
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return round(sorted_values[int(rank) - 1], 3)
+
+
+def _cpu_time() -> float:
+    times = os.times()
+    return times.user + times.system
+
+
+def _peak_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux reports kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -12,14 +12,19 @@ from qtpy.QtGui import QKeySequence
 from pydm.pydm_ui import Ui_MainWindow
 from pydm.main_window import PyDMMainWindow
 from pydm.data_plugins import is_read_only
+from pydm.display import load_file
+from pydm.utilities import find_file, establish_widget_connections
+from pydm.widgets.rules import register_widget_rules
 from accwidgets.log_console import LogConsoleDock
 from comrad.monkey import modify_in_place, MonkeyPatchedClass
 from comrad.data.context import CContext, CContextProvider
 from comrad.widgets.tables import CLogConsole
 from .about import AboutDialog
+from .display_instances import CDisplayInstanceCache, current_memory_usage
 from .plugins.common import (load_plugins_from_path, CToolbarActionPlugin, CActionPlugin, CToolbarWidgetPlugin,
                              CPositionalPlugin, CToolbarID, CPlugin, CMenuBarPlugin, CStatusBarPlugin,
                              CToolbarPlugin, filter_enabled_plugins)
+from .plugins._index import PluginIndex
 from .plugins._config import WindowPluginConfigTrie
 
 
@@ -84,6 +89,7 @@ class CMainWindow(PyDMMainWindow, CContextProvider, MonkeyPatchedClass):
                                              **kwargs)
         CContextProvider.__init__(self)
         self._stored_plugins: List[CPlugin] = []  # Reference plugins to keep the objects alive
+        self._bypass_instance_cache = False
         self._signal_helper = CMainWindowSignalHelper(self)
         self._icon_factor: float = 1.0
         self._default_icon_size = self.ui.navbar.iconSize()
@@ -244,6 +250,112 @@ class CMainWindow(PyDMMainWindow, CContextProvider, MonkeyPatchedClass):
             except (OSError, ValueError, ImportError) as e:  #
                 self.handle_open_file_error(filename, e)
 
+    def open(self, filename: str, macros: Optional[Dict[str, str]] = None, args: Optional[List[str]] = None, target: Optional[int] = None):
+        """Overridden method to reuse displays kept alive by :class:`~comrad.app.display_instances.CDisplayInstanceCache`."""
+        cache = CDisplayInstanceCache.instance()
+        if not cache.enabled or target is not None or self._bypass_instance_cache:
+            return self._overridden_members['open'](self, filename, macros=macros, args=args, target=target)
+        curr_display = self.display_widget()
+        if not os.path.isabs(filename):
+            base_path = os.path.dirname(curr_display.loaded_file()) if curr_display else None
+            filename = find_file(filename, base_path=base_path)
+        # Reusing a display from the back history would make the history circular. Displays of other windows
+        # are never reused, as they are still referenced by the history of those windows.
+        back_history = set(_walk_history(curr_display, 'previous_display'))
+        display = cache.find(filename, macros=macros, args=args, exclude=lambda d: d in back_history, owner=self)
+        if display is not None:
+            cache.restore(display)
+            display.previous_display = curr_display
+            display.next_display = None
+            self.set_display_widget(display)
+            return display
+        memory_before = current_memory_usage()
+        new_widget = self._overridden_members['open'](self, filename, macros=macros, args=args, target=target)
+        if new_widget is not None and memory_before is not None:
+            cache.record_size(new_widget, cast(int, current_memory_usage()) - memory_before)
+        return new_widget
+
+    def clear_display_widget(self):
+        """Overridden method to keep the display alive with paused channels, instead of closing its connections."""
+        display = self.display_widget()
+        cache = CDisplayInstanceCache.instance()
+        if display is None or not cache.enabled:
+            self._overridden_members['clear_display_widget'](self)
+            return
+        display.setVisible(False)
+        display.setParent(None)
+        self.ui.actionEdit_in_Designer.setEnabled(False)
+        cache.park(display, owner=self)
+
+    def back(self, open_in_new_process: bool = False):
+        """Overridden method to restore displays kept alive by :class:`~comrad.app.display_instances.CDisplayInstanceCache`."""
+        curr_display = self.display_widget()
+        prev_display = curr_display.previous_display if curr_display else None
+        if open_in_new_process or not prev_display or not CDisplayInstanceCache.instance().enabled:
+            self._overridden_members['back'](self, open_in_new_process)
+            return
+        prev_display = self._revive_display(prev_display)
+        if prev_display is not None:
+            prev_display.next_display = curr_display
+            self.set_display_widget(prev_display)
+
+    def forward(self, open_in_new_process: bool = False):
+        """Overridden method to restore displays kept alive by :class:`~comrad.app.display_instances.CDisplayInstanceCache`."""
+        curr_display = self.display_widget()
+        next_display = curr_display.next_display if curr_display else None
+        if open_in_new_process or not next_display or not CDisplayInstanceCache.instance().enabled:
+            self._overridden_members['forward'](self, open_in_new_process)
+            return
+        next_display = self._revive_display(next_display)
+        if next_display is not None:
+            next_display.previous_display = curr_display
+            self.set_display_widget(next_display)
+
+    def home(self, open_in_new_process: bool = False):
+        """Overridden method to restore displays kept alive by :class:`~comrad.app.display_instances.CDisplayInstanceCache`."""
+        if open_in_new_process or self.home_widget is None or not CDisplayInstanceCache.instance().enabled:
+            self._overridden_members['home'](self, open_in_new_process)
+            return
+        if self.home_widget is not self.display_widget():
+            home_widget = self._revive_display(self.home_widget)
+            if home_widget is not None:
+                self.set_display_widget(home_widget)
+
+    def reload_display(self, checked: bool):
+        """Overridden method to always load the display from scratch, discarding the current instance."""
+        curr_display = self.display_widget()
+        self._bypass_instance_cache = True
+        try:
+            self._overridden_members['reload_display'](self, checked)
+        finally:
+            self._bypass_instance_cache = False
+        if curr_display is not None and curr_display is not self.display_widget():
+            CDisplayInstanceCache.instance().discard(curr_display)
+
+    def _revive_display(self, display: QWidget) -> Optional[QWidget]:
+        cache = CDisplayInstanceCache.instance()
+        if cache.restore(display):
+            return display
+        if not cache.is_evicted(display):
+            # Closed before the cache got enabled
+            establish_widget_connections(display)
+            register_widget_rules(display)
+            return display
+        filename = display.loaded_file()
+        try:
+            memory_before = current_memory_usage()
+            new_display = load_file(filename, macros=display.macros(), args=display.args(), target=None)
+        except (OSError, ValueError, ImportError) as e:
+            self.handle_open_file_error(filename, e)
+            return None
+        if memory_before is not None:
+            cache.record_size(new_display, cast(int, current_memory_usage()) - memory_before)
+        new_display.previous_display = display.previous_display
+        new_display.next_display = display.next_display
+        if self.home_widget is display:
+            self.home_widget = new_display
+        return new_display
+
     def load_window_plugins(self,
                             config: WindowPluginConfigTrie,
                             nav_bar_plugin_path: Optional[List[str]] = None,
@@ -387,7 +499,9 @@ class CMainWindow(PyDMMainWindow, CContextProvider, MonkeyPatchedClass):
         toolbar_plugins = CMainWindow._load_plugins(env_var_path_key='COMRAD_TOOLBAR_PLUGIN_PATH',
                                                     cmd_line_paths=cmd_line_paths,
                                                     shipped_plugin_path='toolbar',
-                                                    base_type=CToolbarPlugin)
+                                                    base_type=CToolbarPlugin,
+                                                    whitelist=whitelist,
+                                                    blacklist=blacklist)
         if not toolbar_plugins:
             return None
 
@@ -506,7 +620,9 @@ class CMainWindow(PyDMMainWindow, CContextProvider, MonkeyPatchedClass):
         menubar_plugins = CMainWindow._load_plugins(env_var_path_key='COMRAD_MENUBAR_PLUGIN_PATH',
                                                     cmd_line_paths=cmd_line_paths,
                                                     shipped_plugin_path='menu',
-                                                    base_type=CMenuBarPlugin)
+                                                    base_type=CMenuBarPlugin,
+                                                    whitelist=whitelist,
+                                                    blacklist=blacklist)
         if not menubar_plugins:
             return None
 
@@ -554,7 +670,9 @@ class CMainWindow(PyDMMainWindow, CContextProvider, MonkeyPatchedClass):
         status_bar_plugins = CMainWindow._load_plugins(env_var_path_key='COMRAD_STATUSBAR_PLUGIN_PATH',
                                                        cmd_line_paths=cmd_line_paths,
                                                        shipped_plugin_path='statusbar',
-                                                       base_type=CStatusBarPlugin)
+                                                       base_type=CStatusBarPlugin,
+                                                       whitelist=whitelist,
+                                                       blacklist=blacklist)
         if not status_bar_plugins:
             return None
 
@@ -597,7 +715,9 @@ class CMainWindow(PyDMMainWindow, CContextProvider, MonkeyPatchedClass):
     def _load_plugins(env_var_path_key: str,
                       cmd_line_paths: Optional[List[str]],
                       shipped_plugin_path: str,
-                      base_type: Type = CPlugin) -> Dict[str, Type]:
+                      base_type: Type = CPlugin,
+                      whitelist: Optional[Iterable[str]] = None,
+                      blacklist: Optional[Iterable[str]] = None) -> Dict[str, Type]:
 
         all_plugin_paths = [str(Path(__file__).parent / 'plugins' / shipped_plugin_path)]
 
@@ -614,7 +734,10 @@ class CMainWindow(PyDMMainWindow, CContextProvider, MonkeyPatchedClass):
 
         return load_plugins_from_path(locations=map(Path, all_plugin_paths),
                                       token='_plugin.py',
-                                      base_type=base_type)
+                                      base_type=base_type,
+                                      index=PluginIndex.instance(),
+                                      whitelist=whitelist,
+                                      blacklist=blacklist)
 
     @staticmethod
     def _read_widget_plugin_config(config: WindowPluginConfigTrie, plugin_id: str) -> Optional[Dict[str, str]]:
@@ -628,8 +751,11 @@ class CMainWindow(PyDMMainWindow, CContextProvider, MonkeyPatchedClass):
     def __rbac_startup_login(self):
         # Done here and not in CApplication. See the reason at the caller location of this method
         from comrad import CApplication  # Import here to avoid circular dependency
-        rbac = cast(CApplication, CApplication.instance()).rbac
-        rbac.startup_login()
+        app = cast(CApplication, CApplication.instance())
+        if getattr(app, 'main_window', None) is not None:
+            # Additional windows of the same process share the RBAC session of the first one
+            return
+        app.rbac.startup_login()
 
 
 @modify_in_place
@@ -666,3 +792,11 @@ class ToolbarSpacer(QWidget):
     Special widget type that can be recognized from within QSS, to allow better dark-mode compatibility.
     """
     pass
+
+
+def _walk_history(display: Optional[QWidget], link: str) -> Iterable[QWidget]:
+    visited = set()
+    while display is not None and display not in visited:
+        visited.add(display)
+        yield display
+        display = getattr(display, link, None)
@@ -0,0 +1,297 @@
+import os
+import ast
+import json
+import logging
+import tempfile
+from pathlib import Path
+from types import ModuleType
+from typing import Optional, Dict, List, Any, Iterable, Callable, cast
+
+
+logger = logging.getLogger(__name__)
+
+
+_INDEX_FORMAT = 1
+"""Version of the index layout. Bump it, when the way entries are produced changes."""
+
+
+ClassInfo = Dict[str, Any]
+
+
+class PluginIndex:
+
+    _instance: Optional['PluginIndex'] = None
+
+    @classmethod
+    def instance(cls) -> 'PluginIndex':
+        """
+        Method to retrieve a singleton of the index, stored in the :meth:`default_path`.
+        """
+        if cls._instance is None:
+            cls._instance = cls(path=cls.default_path())
+        return cls._instance
+
+    @staticmethod
+    def default_path() -> Path:
+        """
+        Location of the index, taken from ``COMRAD_PLUGIN_INDEX`` environment variable, or
+        ``$XDG_CACHE_HOME/comrad/plugin-index.json`` (``~/.cache/comrad/plugin-index.json``).
+        """
+        custom_path = os.environ.get('COMRAD_PLUGIN_INDEX')
+        if custom_path:
+            return Path(custom_path).expanduser()
+        cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+        return Path(cache_home) / 'comrad' / 'plugin-index.json'
+
+    def __init__(self, path: Optional[Path]):
+        """
+        Index of window plugin files, used to avoid importing plugins that would not be used.
+
+        For every plugin file, the index records (without importing the file) which classes it defines, their
+        base classes, ``plugin_id`` and ``enabled`` attributes. Entries are keyed by the file path, and are
+        refreshed when the modification time or the size of the file changes. Plugin locations are walked once
+        per process, and imported modules are reused, even when the same location provides plugins of several
+        kinds (navigation bar, menu bar, status bar).
+
+        When the attributes cannot be determined statically (e.g. ``plugin_id`` is computed, or ``enabled`` is
+        inherited from a class defined in another module), the file is always imported, same as without the index.
+        Classes that derive from unknown classes are considered plugins only if they define ``plugin_id``
+        in the same file.
+
+        Args:
+            path: Location of the index file. If ``None``, the index is kept only in memory.
+        """
+        self.path = path
+        self._files: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._walks: Dict[str, List[Path]] = {}
+        self._modules: Dict[str, ModuleType] = {}
+
+    def find_files(self, location: Path, token: str) -> List[Path]:
+        """
+        Find plugin files inside the location, walking it only once per process.
+
+        Args:
+            location: Directory to search recursively.
+            token: a phrase that must match the end of the filename for it to be checked for.
+
+        Returns:
+            List of files.
+        """
+        key = str(location)
+        try:
+            files = self._walks[key]
+        except KeyError:
+            files = []
+            for root, _, names in os.walk(location):
+                root_path = Path(root)
+                if root_path.name.startswith('__'):
+                    continue
+                files.extend(root_path / name for name in sorted(names) if name.endswith('.py'))
+            self._walks[key] = files
+        return [f for f in files if f.name.endswith(token)]
+
+    def classes(self, file: Path) -> Optional[List[ClassInfo]]:
+        """
+        Statically collected information about classes defined in the file.
+
+        Args:
+            file: Plugin file.
+
+        Returns:
+            List of class descriptions, or ``None`` if the file cannot be analyzed.
+        """
+        files = self._load()
+        try:
+            stat = file.stat()
+        except OSError:
+            return None
+        key = str(file)
+        entry = files.get(key)
+        if entry is None or entry.get('mtime') != stat.st_mtime_ns or entry.get('size') != stat.st_size:
+            entry = {
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'classes': _analyze(file),
+            }
+            files[key] = entry
+            self._dirty = True
+        return entry['classes']
+
+    def module(self, file: Path, loader: Callable[[Path], Optional[ModuleType]]) -> Optional[ModuleType]:
+        """
+        Import the plugin file once per process.
+
+        Args:
+            file: Plugin file.
+            loader: Function that imports the file.
+
+        Returns:
+            Imported module, or ``None`` if it could not be imported.
+        """
+        key = str(file)
+        try:
+            return self._modules[key]
+        except KeyError:
+            pass
+        mod = loader(file)
+        if mod is not None:
+            self._modules[key] = mod
+        return mod
+
+    def save(self):
+        """Store the updated index on disk."""
+        if not self._dirty or self.path is None or self._files is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write atomically, as several ComRAD processes may update the same index
+            fd, tmp_name = tempfile.mkstemp(dir=str(self.path.parent), prefix='.plugin-index', suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'format': _INDEX_FORMAT, 'files': self._files}, f)
+            os.replace(tmp_name, self.path)
+        except OSError as e:
+            logger.debug(f'Cannot store plugin index in {self.path}: {e}')
+        else:
+            self._dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._files is None:
+            self._files = {}
+            if self.path is not None:
+                try:
+                    with self.path.open() as f:
+                        contents = json.load(f)
+                except (OSError, ValueError):
+                    pass
+                else:
+                    if isinstance(contents, dict) and contents.get('format') == _INDEX_FORMAT:
+                        self._files = contents.get('files') or {}
+        return self._files
+
+
+def may_provide_plugins(classes: Optional[List[ClassInfo]],
+                        base_type: type,
+                        known_bases: Dict[str, type],
+                        is_enabled: Callable[[str, bool], bool]) -> bool:
+    """
+    Decide whether the file has to be imported to look for the plugins.
+
+    Args:
+        classes: Information produced by :meth:`PluginIndex.classes`.
+        base_type: Base class of the plugins to look for.
+        known_bases: Classes that plugins derive from, by name.
+        is_enabled: Predicate accepting ``plugin_id`` and ``enabled`` attributes, that tells if the plugin is going
+                    to be used.
+
+    Returns:
+        ``False`` if the file definitely does not contain plugins that are going to be used.
+    """
+    if classes is None:
+        return True
+    by_name = {info['name']: info for info in classes}
+
+    def resolve(info: ClassInfo, attr: str, seen: List[str]) -> Any:
+        if attr in info:
+            return info[attr]
+        for base in info['bases']:
+            if base in by_name and base not in seen:
+                val = resolve(by_name[base], attr, seen + [base])
+                if val is not _MISSING:
+                    return val
+            elif base in known_bases:
+                val = getattr(known_bases[base], attr, _MISSING)
+                if val is not _MISSING:
+                    return val
+            elif base not in by_name and not _is_unrelated(base):
+                return _UNKNOWN
+        return _MISSING
+
+    def kind(info: ClassInfo, seen: List[str]) -> Optional[bool]:
+        # True if derives from base_type, False if not, None if it cannot be told
+        res: Optional[bool] = False
+        for base in info['bases']:
+            if base in by_name and base not in seen:
+                base_kind = kind(by_name[base], seen + [base])
+            elif base in known_bases:
+                base_kind = issubclass(known_bases[base], base_type)
+            elif _is_unrelated(base):
+                base_kind = False
+            else:
+                base_kind = None
+            if base_kind:
+                return True
+            if base_kind is None:
+                res = None
+        return res
+
+    for info in classes:
+        plugin_kind = kind(info, [info['name']])
+        if plugin_kind is False:
+            continue
+        plugin_id = resolve(info, 'plugin_id', [info['name']])
+        if plugin_kind is None and (plugin_id is _MISSING or plugin_id is _UNKNOWN):
+            # Not a plugin (e.g. a helper widget), as plugins define plugin_id in the same file
+            continue
+        enabled = resolve(info, 'enabled', [info['name']])
+        if not isinstance(plugin_id, str) or not plugin_id or not isinstance(enabled, bool):
+            # Cannot tell statically, or it's an erroneous plugin that must be reported on import
+            return True
+        if plugin_kind is None or is_enabled(plugin_id, enabled):
+            return True
+    return False
+
+
+class _Marker:
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+_MISSING = _Marker('MISSING')
+_UNKNOWN = _Marker('UNKNOWN')
+
+
+def _is_unrelated(base: str) -> bool:
+    # Qt classes and builtins cannot be plugins
+    return base == 'object' or (len(base) > 1 and base[0] == 'Q' and base[1].isupper())
+
+
+def _analyze(file: Path) -> Optional[List[ClassInfo]]:
+    try:
+        tree = ast.parse(file.read_bytes(), filename=str(file))
+    except (OSError, SyntaxError, ValueError):
+        return None
+    res: List[ClassInfo] = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        info: ClassInfo = {
+            'name': node.name,
+            'bases': [_base_name(base) for base in node.bases],
+        }
+        for stmt in node.body:
+            targets: Iterable[ast.expr]
+            if isinstance(stmt, ast.Assign):
+                targets, value = stmt.targets, stmt.value
+            elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+                targets, value = [stmt.target], stmt.value
+            else:
+                continue
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id in ('plugin_id', 'enabled'):
+                    # None marks values that cannot be evaluated statically
+                    info[target.id] = value.value if isinstance(value, ast.Constant) else None
+        res.append(info)
+    return res
+
+
+def _base_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return cast(str, ast.dump(node))
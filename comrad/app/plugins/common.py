@@ -11,6 +11,7 @@ from qtpy.QtWidgets import QWidget, QAction, QMenu
 from qtpy.QtGui import QIcon
 from qtpy.QtCore import Qt
 from pydm.utilities import IconFont
+from ._index import PluginIndex, may_provide_plugins
 
 
 logger = logging.getLogger(__name__)
@@ -184,7 +185,12 @@ class CStatusBarPlugin(CWidgetPlugin, metaclass=ABCMeta):
 _T = TypeVar('_T', bound=CPlugin)
 
 
-def load_plugins_from_path(locations: Iterable[Path], token: str, base_type: Type[CPlugin] = CPlugin):
+def load_plugins_from_path(locations: Iterable[Path],
+                           token: str,
+                           base_type: Type[CPlugin] = CPlugin,
+                           index: Optional[PluginIndex] = None,
+                           whitelist: Optional[Iterable[str]] = None,
+                           blacklist: Optional[Iterable[str]] = None):
     """
     Load plugins from file locations that match a specific token.
 
@@ -192,12 +198,21 @@ def load_plugins_from_path(locations: Iterable[Path], token: str, base_type: Typ
         locations: list of file locations.
         token: a phrase that must match the end of the filename for it to be checked for.
         base_type: Base class of the plugins to look for. It should be a subclass of / or :class:`CPlugin`.
+        index: Discovery index that allows skipping files, that do not contain plugins that would be enabled.
+               When omitted, every matching file is imported.
+        whitelist: IDs of plugins that are going to be enabled, even if disabled by default. Only used with ``index``.
+        blacklist: IDs of plugins that are going to be disabled. Only used with ``index``.
 
     Returns:
         dictionary of plugins add from this folder.
     """
-    import importlib.util
-    import importlib.machinery
+    if index is not None:
+        return _load_indexed_plugins(locations=locations,
+                                     token=token,
+                                     base_type=base_type,
+                                     index=index,
+                                     whitelist=whitelist,
+                                     blacklist=blacklist)
     plugin_classes: Dict[str, ModuleType] = {}
     for loc in locations:
         for root, _, files in os.walk(loc):
@@ -209,23 +224,9 @@ def load_plugins_from_path(locations: Iterable[Path], token: str, base_type: Typ
             for name in files:
                 if not name.endswith(token):
                     continue
-                temp_name = str(uuid.uuid4())
-                logger.debug(f'Trying to load {name} (as {temp_name})...')
-                spec = importlib.util.spec_from_file_location(name=temp_name, location=root_path / name)
-                if spec is None:
-                    continue
-                mod = importlib.util.module_from_spec(spec)
-                loader = cast(importlib.machinery.SourceFileLoader, spec.loader)
-                try:
-                    loader.exec_module(mod)
-                except ImportError as ex:
-                    logger.exception(f'Cannot import plugin from {name}: {str(ex)}')
-                    continue
-                classes = {f'{temp_name}:{obj_name}': obj for obj_name, obj in inspect.getmembers(mod)
-                           if (inspect.isclass(obj) and issubclass(obj, base_type) and obj is not base_type
-                               and not inspect.isabstract(obj))}
-                logger.debug(f'Found new plugin classes:\n{classes}')
-                plugin_classes.update(classes)
+                mod = _import_plugin_file(root_path / name)
+                if mod is not None:
+                    plugin_classes.update(_find_plugin_classes(mod, base_type))
     return plugin_classes
 
 
@@ -245,17 +246,87 @@ def filter_enabled_plugins(plugins: Iterable[Type[_T]],
     for plugin_type in plugins:
         try:
             plugin_id: str = extract_type_attr(plugin_type, 'plugin_id')
-            is_enabled: bool = extract_type_attr(plugin_type, 'enabled')
+            default_enabled: bool = extract_type_attr(plugin_type, 'enabled')
         except AttributeError:
             continue
 
-        if not is_enabled and whitelist and plugin_id in whitelist:
-            is_enabled = True
+        is_enabled = _is_plugin_enabled(plugin_id=plugin_id,
+                                        enabled=default_enabled,
+                                        whitelist=whitelist,
+                                        blacklist=blacklist)
+        if is_enabled and not default_enabled:
             logger.debug(f'Enabling whitelisted plugin "{plugin_type.__name__}"')
-        elif is_enabled and blacklist and plugin_id in blacklist:
-            is_enabled = False
+        elif not is_enabled and default_enabled:
             logger.debug(f'Disabling blacklisted plugin "{plugin_type.__name__}"')
 
         if not is_enabled:
             continue
         yield plugin_id, plugin_type
+
+
+def _is_plugin_enabled(plugin_id: str,
+                       enabled: bool,
+                       whitelist: Optional[Iterable[str]],
+                       blacklist: Optional[Iterable[str]]) -> bool:
+    if not enabled and whitelist and plugin_id in whitelist:
+        return True
+    elif enabled and blacklist and plugin_id in blacklist:
+        return False
+    return enabled
+
+
+def _load_indexed_plugins(locations: Iterable[Path],
+                          token: str,
+                          base_type: Type[CPlugin],
+                          index: PluginIndex,
+                          whitelist: Optional[Iterable[str]],
+                          blacklist: Optional[Iterable[str]]):
+    whitelist = list(whitelist or [])
+    blacklist = list(blacklist or [])
+    known_bases = {name: obj for name, obj in globals().items()
+                   if inspect.isclass(obj) and obj.__module__ == __name__}
+
+    def is_enabled(plugin_id: str, enabled: bool) -> bool:
+        return _is_plugin_enabled(plugin_id=plugin_id, enabled=enabled, whitelist=whitelist, blacklist=blacklist)
+
+    plugin_classes: Dict[str, ModuleType] = {}
+    for loc in locations:
+        logger.debug(f'Looking for plugins at: {loc}')
+        for file in index.find_files(loc, token):
+            if not may_provide_plugins(classes=index.classes(file),
+                                       base_type=base_type,
+                                       known_bases=known_bases,
+                                       is_enabled=is_enabled):
+                logger.debug(f'Skipping {file.name}, as it has no enabled plugins of type {base_type.__name__}')
+                continue
+            mod = index.module(file, _import_plugin_file)
+            if mod is not None:
+                plugin_classes.update(_find_plugin_classes(mod, base_type))
+    index.save()
+    return plugin_classes
+
+
+def _import_plugin_file(file: Path) -> Optional[ModuleType]:
+    import importlib.util
+    import importlib.machinery
+    temp_name = str(uuid.uuid4())
+    logger.debug(f'Trying to load {file.name} (as {temp_name})...')
+    spec = importlib.util.spec_from_file_location(name=temp_name, location=file)
+    if spec is None:
+        return None
+    mod = importlib.util.module_from_spec(spec)
+    loader = cast(importlib.machinery.SourceFileLoader, spec.loader)
+    try:
+        loader.exec_module(mod)
+    except ImportError as ex:
+        logger.exception(f'Cannot import plugin from {file.name}: {str(ex)}')
+        return None
+    return mod
+
+
+def _find_plugin_classes(mod: ModuleType, base_type: Type[CPlugin]) -> Dict[str, ModuleType]:
+    classes = {f'{mod.__name__}:{obj_name}': obj for obj_name, obj in inspect.getmembers(mod)
+               if (inspect.isclass(obj) and issubclass(obj, base_type) and obj is not base_type
+                   and not inspect.isabstract(obj))}
+    logger.debug(f'Found new plugin classes:\n{classes}')
+    return classes
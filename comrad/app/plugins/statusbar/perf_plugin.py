@@ -0,0 +1,198 @@
+import logging
+from typing import Optional, Dict, List, Union
+from qtpy.QtCore import QTimer, Qt
+from qtpy.QtWidgets import (QToolButton, QDialog, QTableWidget, QTableWidgetItem, QTabWidget, QVBoxLayout, QWidget,
+                            QHeaderView, QLabel, QDialogButtonBox, QAbstractItemView)
+from comrad.instrumentation import InstrumentationRegistry, InstrumentationSnapshot, CEventLoopProbe, connection_counts
+from comrad.app.plugins.common import CStatusBarPlugin
+
+
+logger = logging.getLogger('comrad.app.plugins.statusbar.perf_plugin')
+
+
+class PerformanceStatusBarPlugin(CStatusBarPlugin):
+    """Plugin to display live performance counters of the application in the status bar."""
+
+    position = CStatusBarPlugin.Position.RIGHT
+    plugin_id = 'comrad.perf'
+    is_permanent = True
+    enabled = False
+
+    def create_widget(self, config: Optional[Dict[str, str]]):
+        config = config or {}
+        return PerformanceMonitorButton(top=_read_int(config, 'top', 5),
+                                        interval=_read_int(config, 'interval', 1000))
+
+
+class PerformanceMonitorButton(QToolButton):
+
+    def __init__(self, top: int = 5, interval: int = 1000, parent: Optional[QWidget] = None):
+        """
+        Summary of the performance counters, that opens the detailed table when clicked.
+
+        Counters are collected only while this widget exists, as it enables
+        :class:`~comrad.instrumentation.InstrumentationRegistry` and disables it again, when destroyed.
+
+        Args:
+            top: Amount of the most expensive widgets and channels to mention in the tooltip.
+            interval: Refresh interval (in milliseconds).
+            parent: Owning object.
+        """
+        super().__init__(parent)
+        self.setAutoRaise(True)
+        self._top = top
+        self._registry = registry = InstrumentationRegistry.instance()
+        registry.enable()
+        # Must not reference self, as the Python object may be gone by the time the signal is emitted
+        self.destroyed.connect(lambda *_: registry.disable())
+        self._last_snapshot: Optional[InstrumentationSnapshot] = None
+        self._dialog: Optional[PerformanceDetailsDialog] = None
+        self._probe = CEventLoopProbe(parent=self)
+        self._probe.start()
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._refresh)
+        self._timer.start()
+        self.clicked.connect(self._show_details)
+        self._refresh()
+
+    def _refresh(self):
+        snapshot = self._registry.snapshot()
+        lag = self._registry.take_event_loop_lag()
+        last = self._last_snapshot
+        if last is None or snapshot.duration <= last.duration:
+            # First refresh, or counters have been reset in the meantime
+            rate = snapshot.packets / snapshot.duration if snapshot.duration > 0 else 0.0
+        else:
+            rate = (snapshot.packets - last.packets) / (snapshot.duration - last.duration)
+        self._last_snapshot = snapshot
+        connections = sum(connection_counts()['connections'].values())
+        self.setText(f'Lag {max(lag, default=0.0):.0f} ms | {rate:.0f} values/s | {snapshot.dropped} dropped | '
+                     f'{snapshot.coalesced} coalesced | {connections} connections')
+        self.setToolTip(self._tooltip(snapshot))
+        if self._dialog is not None and self._dialog.isVisible():
+            self._dialog.update_snapshot(snapshot)
+
+    def _tooltip(self, snapshot: InstrumentationSnapshot) -> str:
+        widgets = sorted(snapshot.widgets, key=lambda stats: stats.seconds, reverse=True)[:self._top]
+        channels = sorted(snapshot.channels, key=lambda stats: stats.packets.seconds, reverse=True)[:self._top]
+        lines = ['<b>Most expensive widgets</b>']
+        lines.extend(f'{stats.name or stats.class_name}: {stats.seconds * 1000.0:.1f} ms' for stats in widgets)
+        lines.append('<b>Most expensive channels</b>')
+        lines.extend(f'{stats.address}: {stats.packets.seconds * 1000.0:.1f} ms' for stats in channels)
+        lines.append('<i>Click for details</i>')
+        return '<br>'.join(lines)
+
+    def _show_details(self):
+        if self._dialog is None:
+            self._dialog = PerformanceDetailsDialog(registry=self._registry, parent=self.window())
+        self._dialog.update_snapshot(self._registry.snapshot())
+        self._dialog.show()
+        self._dialog.raise_()
+
+
+class PerformanceDetailsDialog(QDialog):
+
+    def __init__(self, registry: InstrumentationRegistry, parent: Optional[QWidget] = None):
+        """
+        Sortable tables with the counters of individual widgets and channels.
+
+        Args:
+            registry: Registry to read the counters from.
+            parent: Owning object.
+        """
+        super().__init__(parent)
+        self.setWindowTitle('Performance')
+        self._registry = registry
+        self._summary = QLabel()
+        self._widgets = _StatsTable(['Name', 'Class', 'Updates', 'Update time (ms)', 'Transformations',
+                                     'Transformation time (ms)', 'Rules', 'Rule time (ms)', 'Total time (ms)',
+                                     'Coalesced'])
+        self._channels = _StatsTable(['Address', 'Values', 'Values/s', 'Emission time (ms)', 'Dropped'])
+        tabs = QTabWidget()
+        tabs.addTab(self._widgets, 'Widgets')
+        tabs.addTab(self._channels, 'Channels')
+        buttons = QDialogButtonBox(QDialogButtonBox.Reset | QDialogButtonBox.Close)
+        buttons.rejected.connect(self.close)
+        buttons.button(QDialogButtonBox.Reset).clicked.connect(self._reset)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self._summary)
+        layout.addWidget(tabs)
+        layout.addWidget(buttons)
+        self.resize(900, 500)
+
+    def update_snapshot(self, snapshot: InstrumentationSnapshot):
+        """
+        Display the new state of the counters.
+
+        Args:
+            snapshot: Counters to display.
+        """
+        self._summary.setText(f'Collected during {snapshot.duration:.0f} s: {snapshot.packets} values, '
+                              f'{snapshot.dropped} dropped, {snapshot.coalesced} coalesced updates, '
+                              f'{snapshot.rules.count} rule evaluations ({snapshot.rules.seconds * 1000.0:.1f} ms), '
+                              f'{snapshot.transformations.count} transformations '
+                              f'({snapshot.transformations.seconds * 1000.0:.1f} ms)')
+        self._widgets.set_rows([[
+            stats.name,
+            stats.class_name,
+            stats.updates.count,
+            _ms(stats.updates.seconds),
+            stats.transformations.count,
+            _ms(stats.transformations.seconds),
+            stats.rules.count,
+            _ms(stats.rules.seconds),
+            _ms(stats.seconds),
+            stats.coalesced,
+        ] for stats in snapshot.widgets])
+        duration = snapshot.duration or 1.0
+        self._channels.set_rows([[
+            stats.address,
+            stats.packets.count,
+            round(stats.packets.count / duration, 1),
+            _ms(stats.packets.seconds),
+            stats.dropped,
+        ] for stats in snapshot.channels])
+
+    def _reset(self):
+        self._registry.reset()
+        self.update_snapshot(self._registry.snapshot())
+
+
+class _StatsTable(QTableWidget):
+
+    def __init__(self, headers: List[str], parent: Optional[QWidget] = None):
+        super().__init__(0, len(headers), parent)
+        self.setHorizontalHeaderLabels(headers)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.verticalHeader().setVisible(False)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.setSortingEnabled(True)
+
+    def set_rows(self, rows: List[List[Union[str, int, float]]]):
+        # Sorting is suspended while filling the table, otherwise rows are moving while being populated.
+        # Items keep numbers (not strings), so that numeric columns are sorted by value.
+        self.setSortingEnabled(False)
+        self.setRowCount(len(rows))
+        for row_idx, row in enumerate(rows):
+            for col_idx, value in enumerate(row):
+                item = QTableWidgetItem()
+                item.setData(Qt.DisplayRole, value)
+                self.setItem(row_idx, col_idx, item)
+        self.setSortingEnabled(True)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
+
+
+def _read_int(config: Dict[str, str], key: str, default: int) -> int:
+    try:
+        return int(config[key])
+    except KeyError:
+        return default
+    except ValueError:
+        logger.warning(f'Invalid value of "comrad.perf.{key}" configuration: {config[key]}. Using {default} instead.')
+        return default
@@ -11,6 +11,7 @@ from qtpy.uic import loadUi
 from pydm.utilities.iconfont import IconFont
 from accwidgets.timing_bar import TimingBar, TimingBarDomain, TimingBarModel
 from comrad import CApplication
+from comrad.data.context import CContext
 from comrad.data.pyjapc_patch import CPyJapc
 from comrad.app.plugins.common import CToolbarWidgetPlugin
 from comrad.app._toolbtn import ToolButton
@@ -28,9 +29,10 @@ class TelegramInfo:
     found_in_context: bool = False
 
 
-def get_telegram_info() -> TelegramInfo:
-    app = cast(CApplication, CApplication.instance())
-    app_selector = app.main_window.window_context.selector
+def get_telegram_info(context: Optional[CContext] = None) -> TelegramInfo:
+    if context is None:
+        context = cast(CApplication, CApplication.instance()).main_window.window_context
+    app_selector = context.selector
 
     if app_selector:
         try:
@@ -194,7 +196,7 @@ class PLSPluginButton(ToolButton):
         menu.addAction(act_bar)
 
     def _open_user_selector(self):
-        tgm_info = get_telegram_info()
+        tgm_info = get_telegram_info(cast(PLSToolbarWidget, self.parent()).window_context)
         config = PLSSelectorConfig(machine=tgm_info.machine,
                                    group=tgm_info.group,
                                    line=tgm_info.line,
@@ -214,7 +216,7 @@ class PLSPluginButton(ToolButton):
         parent.config = update
 
     def _on_timing_selector_updated(self, new_selector: str):
-        cast(CApplication, CApplication.instance()).main_window.window_context.selector = new_selector
+        cast(PLSToolbarWidget, self.parent()).window_context.selector = new_selector
 
     def set_toggle_action_enable(self, is_already_enabled: bool):
         self.act_toggle.setIcon(IconFont().icon('eye-slash' if is_already_enabled else 'eye'))
@@ -232,6 +234,8 @@ class PLSToolbarWidget(QWidget):
         """
         super().__init__(parent)
         self._config = PLSToolbarConfig.parse(config)
+        # Plugins are created together with the window, so the window they belong to is the current main window
+        self._window_context = cast(CApplication, CApplication.instance()).main_window.window_context
         layout = QHBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
         self._bar: Optional[TimingBar] = None
@@ -242,9 +246,14 @@ class PLSToolbarWidget(QWidget):
         self.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Preferred)
         self.setLayout(layout)
         self._update_view_for_config(self._config)
-        cast(CApplication, CApplication.instance()).main_window.window_context.selectorChanged.connect(self._on_selector_changed)
+        self._window_context.selectorChanged.connect(self._on_selector_changed)
         self._btn.act_toggle.triggered.connect(self._on_selector_toggled)
 
+    @property
+    def window_context(self) -> CContext:
+        """Context of the window that this widget belongs to."""
+        return self._window_context
+
     @property
     def config(self) -> PLSToolbarConfig:
         return self._config
@@ -259,7 +268,7 @@ class PLSToolbarWidget(QWidget):
     def _update_view_for_config(self, config: PLSToolbarConfig):
         self._reset_bar_width()
         if config.show_bar and not self._bar:
-            bar_config = get_bar_config_for_current_selector()
+            bar_config = get_bar_config_for_current_selector(self._window_context)
             user: Optional[str] = None
             # Here we are using singleton PyJapc instance to ensure that configuration of separate instances does not
             # get conflicting. (E.g. JAPC has only global configuration for InCA usage, therefore disabling InCA here
@@ -303,18 +312,16 @@ class PLSToolbarWidget(QWidget):
             bar.showTimeZone = config.show_tz
             bar.indicateHeartbeat = config.heartbeat
             bar.displayedTimeZone = TimingBar.TimeZone.UTC if config.utc else TimingBar.TimeZone.LOCAL
-        app = cast(CApplication, CApplication.instance())
         self._update_btn_menu(config)
         if config.show_sel:
             self._update_btn_text()
-            app.main_window.window_context.selectorChanged.connect(self._update_btn_text)
+            self._window_context.selectorChanged.connect(self._update_btn_text)
         else:
-            app.main_window.window_context.selectorChanged.disconnect(self._update_btn_text)
+            self._window_context.selectorChanged.disconnect(self._update_btn_text)
             self._btn.setText('PLS')
 
     def _update_btn_text(self):
-        app = cast(CApplication, CApplication.instance())
-        app_selector = app.main_window.window_context.selector or 'None'
+        app_selector = self._window_context.selector or 'None'
         self._btn.setText(f'PLS: {app_selector}')
 
     def _update_btn_menu(self, config: Optional[PLSToolbarConfig] = None):
@@ -365,7 +372,7 @@ class PLSToolbarWidget(QWidget):
         # If domain has changed, update it in timing bar
         if self._bar:
             bar = cast(TimingBar, self._bar)
-            config = get_bar_config_for_current_selector()
+            config = get_bar_config_for_current_selector(self._window_context)
             if config is not None:
                 domain, user = config
                 bar.highlightedUser = user
@@ -380,8 +387,8 @@ class PLSToolbarWidget(QWidget):
         self._update_view_for_config(config)
 
 
-def get_bar_config_for_current_selector() -> Optional[Tuple[TimingBarDomain, Optional[str]]]:
-    tgm_info = get_telegram_info()
+def get_bar_config_for_current_selector(context: Optional[CContext] = None) -> Optional[Tuple[TimingBarDomain, Optional[str]]]:
+    tgm_info = get_telegram_info(context)
     try:
         domain = TimingBarDomain(tgm_info.machine)
     except ValueError:
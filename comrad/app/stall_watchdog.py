@@ -0,0 +1,232 @@
+"""
+Watchdog detecting stalls of the GUI event loop, active only when requested with ``comrad run --stall-watchdog``.
+
+While the event loop is stalled, the stack of the GUI thread is sampled from the watchdog thread, to find out
+where the time goes.
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from types import FrameType
+from typing import Optional, Callable, List, Tuple, Any
+from qtpy.QtCore import QTimer
+from qtpy.QtWidgets import QApplication, QWidget
+from comrad.data_plugins import CDataConnection
+
+
+logger = logging.getLogger(__name__)
+
+
+FrameClassifier = Callable[[FrameType], Optional[str]]
+"""
+Callable that recognizes frames belonging to a known object, e.g. a widget or a connection, and returns its
+human-readable description, or ``None`` for other frames.
+"""
+
+
+@dataclass
+class StallReport:
+    duration: float
+    """How long the event loop has been stalled (in seconds)."""
+    samples: int
+    """Amount of stack samples taken during the stall."""
+    culprits: List[Tuple[str, int]]
+    """Objects recognized in the samples (innermost recognized frame of each sample) and amount of samples,
+    most frequent first."""
+    hotspots: List[Tuple[str, int]]
+    """Innermost frames of the samples and amount of samples, most frequent first."""
+    stack: List[str]
+    """Most frequent stack, outermost frame first."""
+
+    def format(self, top: int = 3, max_depth: int = 12) -> str:
+        """
+        Compact human-readable summary.
+
+        Args:
+            top: Amount of culprits and hotspots to mention.
+            max_depth: Amount of innermost frames of the most frequent stack to include.
+
+        Returns:
+            Multi-line summary.
+        """
+        lines = [f'Event loop stalled for {self.duration:.2f} s ({self.samples} samples)']
+        if self.culprits:
+            lines.append('Spent in: ' + ', '.join(f'{name} ({self._percent(count)}%)' for name, count in self.culprits[:top]))
+        if self.hotspots:
+            lines.append('Hottest frames: ' + ', '.join(f'{frame} ({self._percent(count)}%)' for frame, count in self.hotspots[:top]))
+        if self.stack:
+            lines.append('Most frequent stack (innermost last):')
+            lines.extend(f'  {frame}' for frame in self.stack[-max_depth:])
+        return '\n'.join(lines)
+
+    def _percent(self, count: int) -> int:
+        return round(count * 100 / self.samples) if self.samples else 0
+
+
+class StallWatchdog:
+
+    def __init__(self,
+                 threshold: float,
+                 on_stall: Callable[[StallReport], None],
+                 heartbeat_interval: float = 0.0,
+                 classify: Optional[FrameClassifier] = None,
+                 sample_interval: float = 0.005,
+                 thread_id: Optional[int] = None):
+        """
+        Thread that expects regular :meth:`heartbeat` calls from the monitored thread. When a heartbeat is late by
+        more than the threshold, stack of the monitored thread is sampled until the next heartbeat, and the result
+        is passed to ``on_stall``.
+
+        Nothing is sampled until the first heartbeat, so that the stall is not reported while the application is
+        still starting.
+
+        Args:
+            threshold: Delay of the heartbeat (in seconds), that is considered a stall.
+            on_stall: Callback receiving the report. It is called in the watchdog thread.
+            heartbeat_interval: Expected interval between heartbeats (in seconds).
+            classify: Callable that recognizes frames of known objects, to attribute the stall to them.
+            sample_interval: Interval between stack samples during the stall (in seconds).
+            thread_id: Identifier of the monitored thread (default: the calling thread).
+        """
+        self.threshold = threshold
+        self.heartbeat_interval = heartbeat_interval
+        self.sample_interval = sample_interval
+        self._on_stall = on_stall
+        self._classify = classify
+        self._thread_id = threading.get_ident() if thread_id is None else thread_id
+        self._last_heartbeat: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='comrad-stall-watchdog', daemon=True)
+
+    def start(self):
+        """Start the watchdog thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watchdog thread."""
+        self._stopped.set()
+        if self._thread.is_alive() and self._thread.ident != threading.get_ident():
+            self._thread.join()
+
+    def heartbeat(self):
+        """Notify that the monitored thread is responsive. Must be called from the monitored thread."""
+        self._last_heartbeat = time.perf_counter()
+
+    def _run(self):
+        check_interval = min(self.threshold / 2, 0.1)
+        while not self._stopped.wait(check_interval):
+            last_heartbeat = self._last_heartbeat
+            if last_heartbeat is None:
+                continue
+            if time.perf_counter() - last_heartbeat - self.heartbeat_interval < self.threshold:
+                continue
+            report = self._sample_stall(last_heartbeat)
+            if report is not None:
+                self._on_stall(report)
+
+    def _sample_stall(self, last_heartbeat: float) -> Optional[StallReport]:
+        culprits: Counter = Counter()
+        hotspots: Counter = Counter()
+        stacks: Counter = Counter()
+        samples = 0
+        while self._last_heartbeat == last_heartbeat:
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                # Monitored thread has finished
+                return None
+            culprit, stack = self._sample(frame)
+            del frame
+            samples += 1
+            if culprit is not None:
+                culprits[culprit] += 1
+            if stack:
+                hotspots[stack[-1]] += 1
+            stacks[stack] += 1
+            if self._stopped.wait(self.sample_interval):
+                return None
+        end = self._last_heartbeat or time.perf_counter()
+        return StallReport(duration=max(0.0, end - last_heartbeat - self.heartbeat_interval),
+                           samples=samples,
+                           culprits=culprits.most_common(),
+                           hotspots=hotspots.most_common(),
+                           stack=list(stacks.most_common(1)[0][0]) if stacks else [])
+
+    def _sample(self, frame: Optional[FrameType]) -> Tuple[Optional[str], Tuple[str, ...]]:
+        culprit: Optional[str] = None
+        stack: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f'{os.path.basename(code.co_filename)}:{frame.f_lineno} in {code.co_name}')
+            if culprit is None and self._classify is not None:
+                try:
+                    culprit = self._classify(frame)
+                except Exception:  # noqa: B902
+                    # Objects may be in an inconsistent state, as the monitored thread is running
+                    pass
+            frame = frame.f_back
+        stack.reverse()
+        return culprit, tuple(stack)
+
+
+_HEARTBEAT_INTERVAL = 100
+"""Interval of the heartbeat timer in the event loop (in milliseconds)."""
+
+
+def install_stall_watchdog(app: QApplication, threshold: float) -> StallWatchdog:
+    """
+    Start the watchdog that logs a report, every time the event loop of the GUI thread stalls
+    for longer than the threshold.
+
+    Must be called from the GUI thread. The watchdog gets armed, once the event loop is started.
+
+    Args:
+        app: Application instance.
+        threshold: Stall duration (in seconds) that gets reported.
+
+    Returns:
+        Running watchdog.
+    """
+    watchdog = StallWatchdog(threshold=threshold,
+                             on_stall=_log_stall,
+                             heartbeat_interval=_HEARTBEAT_INTERVAL / 1000.0,
+                             classify=_classify_frame)
+    heartbeat = QTimer(app)
+    heartbeat.setInterval(_HEARTBEAT_INTERVAL)
+    heartbeat.timeout.connect(watchdog.heartbeat)
+    heartbeat.start()
+    app.aboutToQuit.connect(watchdog.stop)
+    watchdog.start()
+    logger.debug(f'Watching for event loop stalls longer than {threshold:g} s')
+    return watchdog
+
+
+def _log_stall(report: StallReport):
+    # Called in the watchdog thread
+    logger.warning(report.format())
+
+
+def _classify_frame(frame: FrameType) -> Optional[str]:
+    # Called in the watchdog thread, while the GUI thread is executing the frame
+    if frame.f_code.co_name == '__comrad_dcode_wrapper__':
+        # Wrapper of the valueTransformation snippet (see comrad.widgets.value_transform)
+        widget = frame.f_locals.get('inputs', {}).get('widget')
+        return f'valueTransformation of {_describe_widget(widget)}' if widget is not None else 'valueTransformation'
+    obj = frame.f_locals.get('self')
+    if isinstance(obj, CDataConnection):
+        return f'connection {obj.address}'
+    if isinstance(obj, QWidget):
+        return _describe_widget(obj)
+    return None
+
+
+def _describe_widget(widget: Any) -> str:
+    try:
+        name = widget.objectName()
+    except (AttributeError, RuntimeError):
+        # RuntimeError when the underlying C++ object has been deleted
+        name = ''
+    return f'{type(widget).__name__} "{name}"' if name else type(widget).__name__
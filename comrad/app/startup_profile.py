@@ -0,0 +1,178 @@
+"""
+Instrumentation of the application startup, active only when profiling has been requested with ``--profile-startup``.
+
+Instead of placing checks into the regular code paths, relevant functions are wrapped when profiling is
+enabled, so that there is no overhead otherwise.
+"""
+import time
+import logging
+import functools
+from types import ModuleType
+from typing import Type, Dict, Any, Callable, Optional
+from qtpy import uic
+from qtpy.QtCore import QTimer
+from qtpy.QtWidgets import QWidget, QApplication
+from _comrad.startup_profile import (startup_phase, record_event, stop_recording, startup_summary,
+                                     write_chrome_trace)
+
+
+logger = logging.getLogger(__name__)
+
+
+_PROFILED_MARKER = '__comrad_startup_profiled__'
+
+
+def install_startup_instrumentation():
+    """
+    Wrap discovery of window plugins, loading of displays, construction of widgets, registration of rules and
+    delivery of the first value of each channel, to be recorded in the startup profile.
+
+    Must be called after :func:`~comrad.app.display_cache.install_display_cache`, but before the main display is loaded.
+    """
+    import pydm.display
+    from comrad.app.display_cache import CDisplayCache
+    from comrad.app.main_window import CMainWindow
+    from comrad.rules import CRulesEngine
+    from comrad.data_plugins import CDataConnection, CCommonDataConnection
+
+    for loader_name in ('load_ui_file', 'load_py_file'):
+        setattr(pydm.display, loader_name, _display_loader(getattr(pydm.display, loader_name)))
+
+    # Generated code is instrumented regardless of whether it is loaded from the display cache
+    uic.loadUiType = _instrumented_loader(uic.loadUiType, returns_tuple=True)
+    CDisplayCache.load_ui_type = _instrumented_loader(CDisplayCache.load_ui_type, returns_tuple=False)
+
+    orig_load_plugins = CMainWindow._load_plugins
+
+    def load_plugins(env_var_path_key: str, *args, **kwargs):
+        with startup_phase(f'Discover window plugins ({env_var_path_key})'):
+            return orig_load_plugins(env_var_path_key, *args, **kwargs)
+
+    CMainWindow._load_plugins = staticmethod(load_plugins)
+
+    orig_register = CRulesEngine.register
+
+    def register(self, widget: QWidget, *args, **kwargs):
+        with startup_phase(f'Register rules of {widget.objectName() or type(widget).__name__}', category='rules'):
+            return orig_register(self, widget, *args, **kwargs)
+
+    CRulesEngine.register = register
+
+    connection_times: Dict[str, float] = {}
+    orig_conn_init = CDataConnection.__init__
+
+    def conn_init(self, channel: Any, address: str, *args, **kwargs):
+        connection_times.setdefault(address, time.perf_counter())
+        orig_conn_init(self, channel, address, *args, **kwargs)
+
+    CDataConnection.__init__ = conn_init
+
+    orig_emit_packet = CCommonDataConnection._emit_packet
+
+    def emit_packet(self, *args, **kwargs):
+        start = connection_times.pop(self.address, None)
+        if start is not None:
+            record_event(self.address, category='channel', start=start, end=time.perf_counter())
+        orig_emit_packet(self, *args, **kwargs)
+
+    CCommonDataConnection._emit_packet = emit_packet
+
+
+def install_startup_report(app: QApplication, path: str):
+    """
+    Mark the start of the event loop in the profile, and write the report when the application exits.
+
+    Args:
+        app: Application instance.
+        path: File to write the trace into.
+    """
+    def mark_event_loop():
+        record_event('Event loop started', category='phase', start=time.perf_counter())
+
+    def write_report():
+        stop_recording()
+        try:
+            write_chrome_trace(path)
+        except OSError as e:
+            logger.error(f'Cannot write startup profile to {path}: {e!s}')
+        else:
+            logger.info(f'Startup profile has been written to {path}')
+        print(startup_summary())
+
+    QTimer.singleShot(0, mark_event_loop)
+    app.aboutToQuit.connect(write_report)
+
+
+class _TimedClass:
+
+    def __init__(self, cls: Type):
+        # Proxy is used instead of the widget class in generated code, which may also access class attributes (e.g. enums)
+        self._cls = cls
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        obj = self._cls(*args, **kwargs)
+        record_event(self._cls.__name__, category='widget', start=start, end=time.perf_counter())
+        return obj
+
+    def __getattr__(self, item: str):
+        return getattr(self._cls, item)
+
+
+class _TimedModule:
+
+    def __init__(self, module: Any):
+        # Replaces e.g. QtWidgets module in generated code, which uses it to create standard widgets
+        self._module = module
+        self._proxies: Dict[str, Any] = {}
+
+    def __getattr__(self, item: str):
+        try:
+            return self._proxies[item]
+        except KeyError:
+            pass
+        val = getattr(self._module, item)
+        if _is_widget_class(val):
+            val = _TimedClass(val)
+        self._proxies[item] = val
+        return val
+
+
+def _display_loader(loader: Callable) -> Callable:
+
+    @functools.wraps(loader)
+    def wrapper(file: str, *args, **kwargs):
+        with startup_phase(f'Load display {file}', category='display'):
+            return loader(file, *args, **kwargs)
+
+    return wrapper
+
+
+def _instrumented_loader(loader: Callable, returns_tuple: bool) -> Callable:
+
+    @functools.wraps(loader)
+    def wrapper(*args, **kwargs):
+        res = loader(*args, **kwargs)
+        _instrument_form_class(res[0] if returns_tuple else res)
+        return res
+
+    return wrapper
+
+
+def _instrument_form_class(form_class: Optional[Type]):
+    try:
+        namespace = form_class.setupUi.__globals__  # type: ignore
+    except AttributeError:
+        return
+    if namespace.get(_PROFILED_MARKER):
+        return
+    for name, val in list(namespace.items()):
+        if _is_widget_class(val):
+            namespace[name] = _TimedClass(val)
+        elif isinstance(val, ModuleType) and val.__name__.endswith('.QtWidgets'):
+            namespace[name] = _TimedModule(val)
+    namespace[_PROFILED_MARKER] = True
+
+
+def _is_widget_class(val: Any) -> bool:
+    return isinstance(val, type) and issubclass(val, QWidget)
@@ -0,0 +1,159 @@
+import logging
+from enum import IntEnum
+from typing import Optional, List, Tuple, Any
+from qtpy.QtCore import QObject, Signal
+from qtpy.QtWidgets import QWidget
+from pydm import data_plugins
+from pydm.widgets.channel import PyDMChannel
+
+
+logger = logging.getLogger(__name__)
+
+
+PausedChannels = List[Tuple[PyDMChannel, Any]]
+
+
+class CHiddenChannels(IntEnum):
+    """Enum defining what happens to the channels of the widgets that are hidden."""
+
+    INHERIT = 0
+    """Use the setting of the enclosing container, or the global setting of :class:`CChannelActivationPolicy`."""
+
+    KEEP_ACTIVE = 1
+    """Channels stay connected and keep receiving updates."""
+
+    PAUSE = 2
+    """Channels get disconnected after the grace period, and connected again when the widget is shown."""
+
+
+class CChannelActivationPolicy(QObject):
+
+    DEFAULT_GRACE_PERIOD = 3000
+    """Default time (in milliseconds) that the widget has to stay hidden before its channels get paused."""
+
+    _instance: Optional['CChannelActivationPolicy'] = None
+
+    countersChanged = Signal()
+    """Notification when channels have been paused or resumed."""
+
+    @classmethod
+    def instance(cls) -> 'CChannelActivationPolicy':
+        """
+        Method to retrieve a singleton of the policy.
+
+        A single instance is shared by all widgets, so that the global setting and the counters are consistent
+        across the application.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """
+        Visibility-aware subscription policy. Channels of widgets that stay hidden (e.g. inside inactive tabs or
+        collapsed frames) for longer than :attr:`grace_period` get disconnected, releasing their subscriptions
+        in the control system. When the widget is shown again, channels are connected back, and the last value
+        received before pausing is delivered right away, while the fresh one is on its way.
+
+        Visibility is tracked by :class:`~comrad.data.context.CContextTrackingDelegate`. The global setting can be
+        overridden by containers (e.g. :attr:`~comrad.CContextFrame.hiddenChannels`) for their child widgets.
+
+        Args:
+            parent: Optional parent owner.
+        """
+        super().__init__(parent)
+        self.enabled: bool = False
+        """Whether channels of hidden widgets should be paused, unless overridden by the enclosing container."""
+        self.grace_period: int = CChannelActivationPolicy.DEFAULT_GRACE_PERIOD
+        """Time (in milliseconds) that the widget has to stay hidden before its channels get paused."""
+        self._paused_count = 0
+
+    @property
+    def paused_count(self) -> int:
+        """Amount of channels that are currently paused."""
+        return self._paused_count
+
+    @property
+    def active_count(self) -> int:
+        """Amount of channels that are currently connected via data plugins."""
+        return sum(len(plugin.channels) for plugin in data_plugins.plugin_modules.values())
+
+    def settings_for(self, widget: QWidget) -> Tuple[bool, int]:
+        """
+        Resolve the setting applicable to the given widget, by looking for the closest container that overrides
+        the global setting.
+
+        Args:
+            widget: Widget owning the channels.
+
+        Returns:
+            Tuple of whether the channels should be paused and the grace period in milliseconds.
+        """
+        parent = widget.parentWidget()
+        while parent is not None:
+            # Checking with hasattr would fail on pyqtgraph-derived widgets, same as in find_context_provider
+            policy_getter = getattr(type(parent), 'hidden_channels_policy', None)
+            if callable(policy_getter):
+                mode, grace_period = policy_getter(parent)
+                if mode != CHiddenChannels.INHERIT:
+                    return mode == CHiddenChannels.PAUSE, (self.grace_period if grace_period < 0 else grace_period)
+            parent = parent.parentWidget()
+        return self.enabled, self.grace_period
+
+    def pause(self, channels: List[PyDMChannel]) -> PausedChannels:
+        """
+        Disconnect the channels, remembering the last values that they have received.
+
+        Args:
+            channels: Channels to disconnect.
+
+        Returns:
+            Disconnected channels with their last values, to be passed into :meth:`resume`.
+        """
+        paused: PausedChannels = []
+        for channel in channels:
+            paused.append((channel, _last_packet(channel)))
+            channel.disconnect()
+        if paused:
+            logger.debug(f'Paused {len(paused)} channel(s) of the hidden widget')
+            self._paused_count += len(paused)
+            self.countersChanged.emit()
+        return paused
+
+    def resume(self, paused: PausedChannels, channels: List[PyDMChannel]):
+        """
+        Connect the channels back, delivering their last values immediately.
+
+        Args:
+            paused: Channels returned by :meth:`pause`.
+            channels: Channels currently owned by the widget. Paused channels that have been removed in the
+                      meantime (e.g. because of the context change) are not connected back.
+        """
+        for channel, packet in paused:
+            if not any(channel is owned for owned in channels):
+                continue
+            channel.connect()
+            if packet is not None and channel.value_slot is not None:
+                # Value slot may be given as a signal as well
+                getattr(channel.value_slot, 'emit', channel.value_slot)(packet)
+        if paused:
+            logger.debug(f'Resumed {len(paused)} channel(s) of the shown widget')
+            self.release(len(paused))
+
+    def release(self, count: int):
+        """
+        Forget paused channels that will never be resumed, e.g. because their widget has been destroyed.
+
+        Args:
+            count: Amount of paused channels.
+        """
+        self._paused_count = max(self._paused_count - count, 0)
+        self.countersChanged.emit()
+
+
+def _last_packet(channel: PyDMChannel) -> Any:
+    plugin = data_plugins.plugin_for_address(channel.address)
+    if plugin is None:
+        return None
+    connection = plugin.connections.get(plugin.get_address(channel))
+    return getattr(connection, 'last_packet', None)
@@ -0,0 +1,341 @@
+"""
+Client of the local subscription broker (see :mod:`_comrad.broker`), that replaces :class:`~comrad.data.pyjapc_patch.CPyJapc`
+for JAPC channels, when the application is started with ``--broker``.
+"""
+import logging
+import itertools
+from dataclasses import dataclass, field
+from typing import Optional, Callable, Any, Dict, List, Set, Tuple, cast
+from qtpy.QtCore import QObject, Signal, QTimer
+from qtpy.QtNetwork import QLocalSocket
+from _comrad.broker.protocol import (FrameDecoder, SharedArrayReader, StaleValueError, BrokerError, encode_frame,
+                                     decode_payload, unshare_arrays, shared_paths, verify_socket_owner, SUBSCRIBE,
+                                     UNSUBSCRIBE, GET, SET, VALUE, SUBSCRIPTION_ERROR, REPLY, ERROR)
+from comrad.app.application import CApplication
+
+
+logger = logging.getLogger('comrad.japc')
+
+
+_CONNECT_TIMEOUT = 2000
+"""How long to wait for the broker socket to connect (in milliseconds)."""
+
+_RECONNECT_INTERVAL = 1000
+"""Interval between attempts to reconnect to the broker (in milliseconds)."""
+
+
+@dataclass
+class _BrokerSubscription:
+    parameter_name: str
+    selector: Optional[str]
+    data_filters: Optional[Dict[str, Any]]
+    on_value: Callable[[str, Any, Dict[str, Any]], None]
+    on_exception: Optional[Callable[[str, str, Any], None]]
+    active: bool = False
+    shared_paths: List[str] = field(default_factory=list)
+
+
+class CBrokerClient(QObject):
+
+    japc_status_changed = Signal(bool)
+    japc_param_error = Signal(str, bool)
+
+    _instance: Optional['CBrokerClient'] = None
+
+    @classmethod
+    def instance(cls) -> 'CBrokerClient':
+        """Method to retrieve a singleton of the broker client."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def active(cls) -> Optional['CBrokerClient']:
+        """Singleton instance, if the application has been configured to use the broker, or ``None`` otherwise."""
+        inst = cls._instance
+        return inst if inst is not None and inst.socket_path else None
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """
+        Connection to the subscription broker, that mimics the API of PyJapc used by
+        :class:`~comrad.data.japc_plugin.CJapcConnection`.
+
+        Subscriptions are sent to the broker, that subscribes to the device only once for all ComRAD applications of
+        the console, and returns the last received value immediately to the late subscribers. When the connection to
+        the broker is lost, it is re-established periodically, and active subscriptions are sent again.
+
+        Args:
+            parent: Owning object.
+        """
+        super().__init__(parent)
+        self.socket_path: Optional[str] = None
+        self._socket: Optional[QLocalSocket] = None
+        self._decoder = FrameDecoder()
+        self._reader = SharedArrayReader()
+        self._ids = itertools.count(1)
+        self._subscriptions: Dict[int, _BrokerSubscription] = {}
+        self._requests: Dict[int, Optional[Callable[[str, Any, Dict[str, Any]], None]]] = {}
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.setInterval(_RECONNECT_INTERVAL)
+        self._reconnect_timer.timeout.connect(self._connect)
+        self._app: Optional[CApplication] = None
+        self._reported_unavailable = False
+
+    def subscribeParam(self,
+                       parameterName: str,
+                       onValueReceived: Callable[[str, Any, Dict[str, Any]], None],
+                       onException: Optional[Callable[[str, str, Any], None]] = None,
+                       getHeader: bool = True,
+                       noPyConversion: bool = False,
+                       timingSelectorOverride: Optional[str] = None,
+                       dataFilterOverride: Optional[Dict[str, Any]] = None,
+                       **_) -> int:
+        """
+        Register the subscription, that is sent to the broker by :meth:`startSubscriptions`.
+
+        Values are always delivered together with the header, converted to Python types.
+
+        Args:
+            parameterName: Device/property(#field) address.
+            onValueReceived: Callback receiving the parameter name, value and header.
+            onException: Callback receiving the parameter name, description and the exception.
+            getHeader: Ignored (header is always delivered).
+            noPyConversion: Ignored (values are always converted).
+            timingSelectorOverride: Cycle selector.
+            dataFilterOverride: Data filters.
+
+        Returns:
+            Subscription identifier.
+        """
+        self.ensure_connected()
+        sub_id = next(self._ids)
+        self._subscriptions[sub_id] = _BrokerSubscription(parameter_name=parameterName,
+                                                          selector=timingSelectorOverride,
+                                                          data_filters=dataFilterOverride,
+                                                          on_value=onValueReceived,
+                                                          on_exception=onException)
+        return sub_id
+
+    def startSubscriptions(self, parameterName: Optional[str] = None, selector: Optional[str] = None):
+        """
+        Start registered subscriptions.
+
+        Args:
+            parameterName: Start only subscriptions of this parameter (all, if ``None``).
+            selector: Selector of the parameter subscriptions.
+        """
+        for sub_id, sub in self._find_subscriptions(parameterName, selector):
+            if not sub.active:
+                sub.active = True
+                self._send_subscribe(sub_id, sub)
+
+    def stopSubscriptions(self, parameterName: Optional[str] = None, selector: Optional[str] = None):
+        """
+        Stop subscriptions, keeping them registered.
+
+        Args:
+            parameterName: Stop only subscriptions of this parameter (all, if ``None``).
+            selector: Selector of the parameter subscriptions.
+        """
+        for sub_id, sub in self._find_subscriptions(parameterName, selector):
+            self._stop(sub_id, sub)
+
+    def clearSubscriptions(self, parameterName: Optional[str] = None, selector: Optional[str] = None):
+        """
+        Stop and remove subscriptions.
+
+        Args:
+            parameterName: Remove only subscriptions of this parameter (all, if ``None``).
+            selector: Selector of the parameter subscriptions.
+        """
+        for sub_id, sub in self._find_subscriptions(parameterName, selector):
+            self._stop(sub_id, sub)
+            del self._subscriptions[sub_id]
+
+    def getParam(self,
+                 parameterName: str,
+                 onValueReceived: Callable[[str, Any, Dict[str, Any]], None],
+                 getHeader: bool = True,
+                 noPyConversion: bool = False,
+                 timingSelectorOverride: Optional[str] = None,
+                 dataFilterOverride: Optional[Dict[str, Any]] = None,
+                 **_):
+        """
+        Asynchronous GET request. Failures are reported via :attr:`japc_param_error`.
+
+        Args:
+            parameterName: Device/property(#field) address.
+            onValueReceived: Callback receiving the parameter name, value and header.
+            getHeader: Ignored (header is always delivered).
+            noPyConversion: Ignored (values are always converted).
+            timingSelectorOverride: Cycle selector.
+            dataFilterOverride: Data filters.
+        """
+        req_id = next(self._ids)
+        if self._send((GET, req_id, parameterName, timingSelectorOverride, dataFilterOverride)):
+            self._requests[req_id] = onValueReceived
+        else:
+            self.japc_param_error.emit(f'Cannot read {parameterName}: subscription broker is not available', False)
+
+    def setParam(self,
+                 parameterName: str,
+                 parameterValue: Any,
+                 timingSelectorOverride: Optional[str] = None,
+                 dataFilterOverride: Optional[Dict[str, Any]] = None,
+                 **_):
+        """
+        SET request, executed by the broker with the RBAC token of this application. Failures are reported
+        via :attr:`japc_param_error`.
+
+        Args:
+            parameterName: Device/property(#field) address.
+            parameterValue: New value.
+            timingSelectorOverride: Cycle selector.
+            dataFilterOverride: Data filters.
+        """
+        app = self._application()
+        token = app.rbac.token.get_encoded() if app is not None and app.rbac.token is not None else None
+        req_id = next(self._ids)
+        if self._send((SET, req_id, parameterName, timingSelectorOverride, dataFilterOverride, parameterValue, token)):
+            self._requests[req_id] = None
+        else:
+            self.japc_param_error.emit(f'Cannot write {parameterName}: subscription broker is not available', True)
+
+    def ensure_connected(self):
+        """Connect to the broker, unless already connected (or reconnecting)."""
+        if self._socket is None:
+            self._application()
+            self._socket = QLocalSocket(self)
+            self._socket.readyRead.connect(self._on_ready_read)
+            self._socket.disconnected.connect(self._on_disconnected)
+            self._connect()
+
+    def _application(self) -> Optional[CApplication]:
+        if self._app is None:
+            app = CApplication.instance()
+            if not isinstance(app, CApplication):
+                return None
+            self._app = cast(CApplication, app)
+            # Subscriptions that failed because of missing authorization are restarted, same as with CPyJapc
+            self._app.rbac.login_succeeded.connect(lambda _: self.japc_status_changed.emit(True))
+            self._app.rbac.logout_finished.connect(lambda: self.japc_status_changed.emit(False))
+            self.japc_param_error.connect(self._app.on_control_error)
+        return self._app
+
+    def _connect(self):
+        assert self._socket is not None
+        assert self.socket_path is not None
+        try:
+            # Received messages are unpickled, therefore the socket must not be provided by another user
+            verify_socket_owner(self.socket_path)
+        except (OSError, BrokerError) as e:
+            error: Optional[str] = str(e)
+        else:
+            self._socket.connectToServer(self.socket_path)
+            error = None if self._socket.waitForConnected(_CONNECT_TIMEOUT) else self._socket.errorString()
+        if error is not None:
+            if not self._reported_unavailable:
+                # Reported once, rather than on every attempt to reconnect
+                self._reported_unavailable = True
+                logger.warning('Cannot connect to the subscription broker at %s: %s', self.socket_path, error)
+            self._socket.abort()
+            self._reconnect_timer.start()
+            return
+        self._reported_unavailable = False
+        logger.debug('Connected to the subscription broker at %s', self.socket_path)
+        self._decoder = FrameDecoder()
+        for sub_id, sub in self._subscriptions.items():
+            if sub.active:
+                self._send_subscribe(sub_id, sub)
+
+    def _on_disconnected(self):
+        logger.warning('Connection to the subscription broker has been lost. Reconnecting...')
+        for callback in self._requests.values():
+            self.japc_param_error.emit('Subscription broker has disconnected before replying', callback is None)
+        self._requests.clear()
+        self._reconnect_timer.start()
+
+    def _send(self, message: Tuple) -> bool:
+        self.ensure_connected()
+        assert self._socket is not None
+        if self._socket.state() != QLocalSocket.ConnectedState:
+            return False
+        self._socket.write(encode_frame(message))
+        return True
+
+    def _send_subscribe(self, sub_id: int, sub: _BrokerSubscription):
+        self._send((SUBSCRIBE, sub_id, sub.parameter_name, sub.selector, sub.data_filters))
+
+    def _stop(self, sub_id: int, sub: _BrokerSubscription):
+        if not sub.active:
+            return
+        sub.active = False
+        self._send((UNSUBSCRIBE, sub_id))
+        self._release_shared_paths(sub_id, sub.shared_paths)
+        sub.shared_paths = []
+
+    def _find_subscriptions(self, parameter_name: Optional[str], selector: Optional[str]) -> List[Tuple[int, _BrokerSubscription]]:
+        if parameter_name is None:
+            return list(self._subscriptions.items())
+        return [(sub_id, sub) for sub_id, sub in self._subscriptions.items()
+                if sub.parameter_name == parameter_name and (sub.selector or None) == (selector or None)]
+
+    def _on_ready_read(self):
+        assert self._socket is not None
+        data = bytes(self._socket.readAll())
+        for message in self._decoder.feed(data):
+            try:
+                self._handle(message)
+            except Exception:  # noqa: B902
+                logger.exception('Failed to process message "%s" of the subscription broker', message[0])
+
+    def _handle(self, message: Tuple):
+        kind = message[0]
+        if kind == VALUE:
+            _, sub_ids, parameter_name, payload = message
+            for sub_id in sub_ids:
+                sub = self._subscriptions.get(sub_id)
+                if sub is None or not sub.active:
+                    continue
+                # Decoded separately for every subscription, because connections modify received values in place
+                value, header = decode_payload(payload)
+                self._track_shared_paths(sub_id, sub, shared_paths(value))
+                try:
+                    value = unshare_arrays(value, self._reader)
+                except StaleValueError:
+                    # Newer value has already been written, and will arrive shortly
+                    continue
+                sub.on_value(parameter_name, value, header)
+        elif kind == SUBSCRIPTION_ERROR:
+            _, sub_id, error_message = message
+            sub = self._subscriptions.get(sub_id)
+            if sub is not None and sub.on_exception is not None:
+                sub.on_exception(sub.parameter_name, error_message, BrokerError(error_message))
+        elif kind == REPLY:
+            _, req_id, parameter_name, value, header = message
+            callback = self._requests.pop(req_id, None)
+            if callback is not None:
+                callback(parameter_name, value, header)
+        elif kind == ERROR:
+            _, req_id, error_message = message
+            try:
+                callback = self._requests.pop(req_id)
+            except KeyError:
+                return
+            # Only SET failures are shown in a popup, same as with CPyJapc
+            self.japc_param_error.emit(error_message, callback is None)
+
+    def _track_shared_paths(self, sub_id: int, sub: _BrokerSubscription, paths: List[str]):
+        if paths == sub.shared_paths:
+            return
+        self._release_shared_paths(sub_id, [p for p in sub.shared_paths if p not in paths])
+        sub.shared_paths = paths
+
+    def _release_shared_paths(self, sub_id: int, paths: List[str]):
+        # Files can be shared by several subscriptions of this application
+        used: Set[str] = set()
+        for other_id, other in self._subscriptions.items():
+            if other_id != sub_id:
+                used.update(other.shared_paths)
+        self._reader.forget([p for p in paths if p not in used])
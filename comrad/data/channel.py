@@ -1,5 +1,6 @@
 import logging
 from enum import Enum
+from string import Template
 from typing import Callable, Optional, cast, Any, Generic, TypeVar, Dict
 from dataclasses import dataclass
 from qtpy.QtCore import Signal
@@ -7,6 +8,7 @@ from pydm.widgets.channel import PyDMChannel, clear_channel_address
 from comrad.monkey import modify_in_place, MonkeyPatchedClass
 from comrad.generics import GenericMeta
 from .context import CContext
+from .deadband import CDeadband
 
 
 logger = logging.getLogger(__name__)
@@ -73,8 +75,8 @@ class CChannel(PyDMChannel, MonkeyPatchedClass):
 
     @property
     def address_no_ctx(self) -> str:
-        """Address of the channel excluding context information."""
-        return self._address
+        """Address of the channel excluding context information and deadband configuration."""
+        return CDeadband.strip_suffix(self._address)
 
 
 def format_address(channel_address: str, context: Optional[CContext]) -> str:
@@ -84,17 +86,35 @@ def format_address(channel_address: str, context: Optional[CContext]) -> str:
     because PyDM groups connections by their address string, and we cannot work with multiple selectors/data filters
     through the same connection object.
 
+    Deadband configuration (see :class:`~comrad.data.deadband.CDeadband`), if present in the channel address,
+    is always moved to the very end, after the context information.
+
+    Macro variables (``${NAME}``) remaining in the address are substituted with the wildcards of the context,
+    allowing to re-point the channel at runtime without reloading the widget.
+
     Args:
-        channel_address: Device/property(#field) address.
+        channel_address: Device/property(#field) address, optionally followed by deadband configuration.
         context: Additional context containing timing user / cycle selector / data filters.
 
     Returns:
         Formatter string with all information embedded.
     """
     clean_address = clear_channel_address(channel_address)
+    if context and context.wildcards and '$' in clean_address:
+        clean_address = Template(clean_address).safe_substitute(context.wildcards)
+    deadband_suffix = ''
+    if CDeadband.SUFFIX_DELIMITER in clean_address:
+        try:
+            clean_address, deadband = CDeadband.split_address(clean_address)
+        except ValueError as e:
+            logger.warning(str(e))
+            clean_address = CDeadband.strip_suffix(clean_address)
+        else:
+            if deadband is not None:
+                deadband_suffix = deadband.to_string_suffix()
     if context:
-        return clean_address + CContext.to_string_suffix(data_filters=context.data_filters, selector=context.selector)
-    return clean_address
+        clean_address += CContext.to_string_suffix(data_filters=context.data_filters, selector=context.selector)
+    return clean_address + deadband_suffix
 
 
 T = TypeVar('T')
@@ -1,14 +1,16 @@
 import logging
 import weakref
+import functools
 import os
 from abc import abstractmethod
-from typing import Optional, Dict, Any, TypeVar, cast, Union
+from typing import Optional, Dict, Any, TypeVar, cast, Union, List, Callable
 from qtpy.QtCore import QObject, Signal, QEvent, QTimer, Qt
 from qtpy.QtWidgets import QWidget
 from qtpy.QtDesigner import QDesignerFormWindowInterface
 from pydm.utilities import is_qt_designer
 from pydm import config
 from comrad.generics import GenericQObjectMeta
+from comrad.data.activation import CChannelActivationPolicy, PausedChannels
 
 
 logger = logging.getLogger(__name__)
@@ -275,12 +277,19 @@ class CContextTrackingDelegate(QObject):
         Delegate that helps to start and stop watching context changes whenever widget is added or removed from the
         view hierarchy.
 
+        It also tracks visibility of the widget, pausing channels of the parent owner when the widget stays hidden
+        according to :class:`~comrad.data.activation.CChannelActivationPolicy`.
+
         Args:
             parent: Parent owner of this object.
         """
         super().__init__(parent)
         self._prev_context_provider: Optional[weakref.ReferenceType] = None
         self._deferred_resolution_target: Optional[weakref.ReferenceType] = None
+        self._visibility_target: Optional[weakref.ReferenceType] = None
+        self._pause_timer: Optional[QTimer] = None
+        self._paused_channels: Optional[PausedChannels] = None
+        self._release_on_destroy: Optional[Callable[[], None]] = None
 
     @property
     def context_ready(self) -> bool:
@@ -292,6 +301,11 @@ class CContextTrackingDelegate(QObject):
             return False
         return context_provider.context_ready
 
+    @property
+    def paused(self) -> bool:
+        """Channels of the parent owner are paused because the widget is hidden."""
+        return self._paused_channels is not None
+
     def eventFilter(self, obj: QWidget, event: QEvent) -> bool:
         # This method always returns False, because we don't want to stop any event from propagating, just eavesdrop on them.
         # Note! ParentChange does not fire when widgets are instantiated from the UI file
@@ -301,9 +315,88 @@ class CContextTrackingDelegate(QObject):
                 QEvent.PolishRequest,  # The only sensible type for CValueAggregator, as it's hidden in runtime
         ):
             self._detect_context_provider(obj)
+            if not obj.isVisible():
+                # Widgets inside inactive tabs are never shown, hence never hidden, but they get connected anyway
+                self._schedule_pause(obj)
+        elif event.type() == QEvent.Hide:
+            self._schedule_pause(obj)
+        elif event.type() == QEvent.Show:
+            self.resume()
 
         return False
 
+    def _schedule_pause(self, obj: QWidget):
+        if self.paused or (self._pause_timer is not None and self._pause_timer.isActive()):
+            return
+        owner = self.parent()
+        if not getattr(owner, '_channel_ids', None):
+            return
+        should_pause, grace_period = CChannelActivationPolicy.instance().settings_for(owner)
+        if not should_pause:
+            return
+        if self._pause_timer is None:
+            self._pause_timer = QTimer(self)
+            self._pause_timer.setSingleShot(True)
+            self._pause_timer.setTimerType(Qt.CoarseTimer)
+            self._pause_timer.timeout.connect(self._pause_if_hidden)
+        self._visibility_target = weakref.ref(obj)
+        self._pause_timer.start(grace_period)
+
+    def _pause_if_hidden(self):
+        obj = self._visibility_target() if self._visibility_target is not None else None
+        if not obj or obj.isVisible() or self.paused:
+            return
+        if obj.testAttribute(Qt.WA_WState_ExplicitShowHide) and obj.testAttribute(Qt.WA_WState_Hidden):
+            # Widgets hidden on purpose (e.g. CValueAggregator that is invisible at runtime, or by visibility rules)
+            # still need their data, unlike the ones inside hidden containers
+            return
+        if self.pause():
+            logger.debug(f'{obj}: paused channels of the hidden widget')
+        else:
+            # Channels are not connected until the context is ready, so try again later
+            self._pause_timer.start()
+
+    def pause(self) -> bool:
+        """
+        Pause channels of the parent owner right away, regardless of its visibility, e.g. when the whole display
+        is put aside.
+
+        Returns:
+            ``True`` if channels are paused after the call.
+        """
+        if self._pause_timer is not None:
+            self._pause_timer.stop()
+        if self.paused:
+            return True
+        channels: List[Any] = list(getattr(self.parent(), '_channels', None) or [])
+        if not channels:
+            return False
+        policy = CChannelActivationPolicy.instance()
+        self._paused_channels = policy.pause(channels)
+        # Keep counters correct, if the widget gets closed while paused
+        self._release_on_destroy = functools.partial(policy.release, len(self._paused_channels))
+        self.destroyed.connect(self._release_on_destroy)
+        return True
+
+    def resume(self):
+        """
+        Connect paused channels of the parent owner back. If the owner is still hidden, channels will be paused
+        again after the grace period, according to :class:`~comrad.data.activation.CChannelActivationPolicy`.
+        """
+        if self._pause_timer is not None:
+            self._pause_timer.stop()
+        if self._paused_channels is None:
+            return
+        paused, self._paused_channels = self._paused_channels, None
+        if self._release_on_destroy is not None:
+            self.destroyed.disconnect(self._release_on_destroy)
+            self._release_on_destroy = None
+        owner = self.parent()
+        logger.debug(f'{owner}: resuming channels of the shown widget')
+        CChannelActivationPolicy.instance().resume(paused, channels=getattr(owner, '_channels', None) or [])
+        if isinstance(owner, QWidget) and not owner.isVisible():
+            self._schedule_pause(owner)
+
     def _disconnect_previous_context_provider(self, obj: QWidget):
         if not self._prev_context_provider:
             return
@@ -0,0 +1,177 @@
+import numpy as np
+from typing import Optional, Tuple, Any, cast
+
+
+class CDeadband:
+
+    SUFFIX_DELIMITER = '|'
+    """Character separating deadband configuration from the rest of the channel address."""
+
+    def __init__(self, absolute: float = 0.0, relative: float = 0.0, hysteresis: float = 0.0):
+        """
+        Parameters of the deadband filter that suppresses insignificant value changes inside the data connection,
+        before they are propagated to the widgets.
+
+        Changes are always measured against the last value that has been let through, so that slow drifts are
+        eventually propagated, even if every single step stays within the deadband. For arrays, the thresholds are
+        applied per element, and the array is propagated when any of its elements violates the deadband.
+
+        Args:
+            absolute: Minimum absolute change of the value that is propagated to the listeners.
+            relative: Minimum change relative to the magnitude of the last propagated value (e.g. ``0.01`` for 1%).
+            hysteresis: Minimum absolute change in the direction opposite to the previously propagated change.
+                        This prevents flickering of values oscillating around a certain level.
+        """
+        if absolute < 0.0 or relative < 0.0 or hysteresis < 0.0:
+            raise ValueError('Deadband parameters must not be negative')
+        self.absolute = absolute
+        self.relative = relative
+        self.hysteresis = hysteresis
+
+    @property
+    def active(self) -> bool:
+        """Deadband has at least one non-zero parameter, and therefore will filter values."""
+        return bool(self.absolute or self.relative or self.hysteresis)
+
+    def to_string_suffix(self) -> str:
+        """
+        Common way of adding deadband information into string addresses, similar to
+        :meth:`CContext.to_string_suffix <comrad.data.context.CContext.to_string_suffix>`.
+
+        Returns:
+            A formatted suffix suitable for appending to the address string, e.g. ``|abs=0.5,rel=0.01``.
+        """
+        if not self.active:
+            return ''
+        params = [(key, val) for key, val in (('abs', self.absolute),
+                                              ('rel', self.relative),
+                                              ('hyst', self.hysteresis)) if val]
+        return self.SUFFIX_DELIMITER + ','.join((f'{key}={val}' for key, val in params))
+
+    @classmethod
+    def strip_suffix(cls, address: str) -> str:
+        """
+        Remove deadband configuration from the channel address without parsing it.
+
+        Args:
+            address: Address string, possibly containing deadband suffix.
+
+        Returns:
+            Address string without the deadband suffix.
+        """
+        idx = address.find(cls.SUFFIX_DELIMITER)
+        return address if idx == -1 else address[:idx]
+
+    @classmethod
+    def split_address(cls, address: str) -> Tuple[str, Optional['CDeadband']]:
+        """
+        Separate the deadband configuration from the channel address.
+
+        Args:
+            address: Address string, possibly containing deadband suffix, e.g. ``DEV/PROP#field|abs=0.5``.
+
+        Returns:
+            Tuple of the address without the deadband suffix and the parsed deadband (or ``None``, if
+            the address does not define it).
+
+        Raises:
+            ValueError: Deadband suffix cannot be parsed.
+        """
+        idx = address.find(cls.SUFFIX_DELIMITER)
+        if idx == -1:
+            return address, None
+        clean_address = address[:idx]
+        suffix = address[idx + 1:].strip()
+        kwargs = {}
+        key_map = {
+            'abs': 'absolute',
+            'rel': 'relative',
+            'hyst': 'hysteresis',
+        }
+        for pair in filter(None, suffix.split(',')):
+            try:
+                key, value = tuple(pair.split('='))
+                kwargs[key_map[key.strip()]] = float(value)
+            except (ValueError, KeyError):
+                raise ValueError(f'Invalid deadband parameter "{pair}" in address "{address}"')
+        return clean_address, cls(**kwargs)
+
+    def __eq__(self, other: object) -> bool:
+        if other is None or type(other) is not type(self):
+            return False
+        other_db = cast(CDeadband, other)
+        return (self.absolute == other_db.absolute
+                and self.relative == other_db.relative
+                and self.hysteresis == other_db.hysteresis)
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} abs={self.absolute}; rel={self.relative}; hyst={self.hysteresis}>'
+
+
+class CDeadbandFilter:
+
+    def __init__(self, deadband: CDeadband):
+        """
+        Stateful filter that decides whether a new value is significant enough to be propagated,
+        based on the given deadband parameters.
+
+        Only numeric scalars and numeric arrays are subject to filtering. Any other types (strings, booleans,
+        enums, property-level dictionaries) are always let through.
+
+        Args:
+            deadband: Filter parameters.
+        """
+        self.deadband = deadband
+        self._last_value: Optional[np.ndarray] = None
+        self._last_direction: Optional[np.ndarray] = None
+
+    def reset(self):
+        """Forget the last propagated value, so that the next incoming value is always let through."""
+        self._last_value = None
+        self._last_direction = None
+
+    def accept(self, value: Any) -> bool:
+        """
+        Check whether the value should be propagated, and remember it as the new reference, if so.
+
+        Args:
+            value: Newly arrived value.
+
+        Returns:
+            ``True`` if the value violates the deadband and should be propagated.
+        """
+        if not _is_numeric(value):
+            return True
+
+        new_val = np.asarray(value, dtype=float)
+        last_val = self._last_value
+        if last_val is None or last_val.shape != new_val.shape:
+            self._last_value = new_val
+            self._last_direction = None
+            return True
+
+        diff = new_val - last_val
+        threshold = np.maximum(self.deadband.absolute, self.deadband.relative * np.abs(last_val))
+        if self.deadband.hysteresis and self._last_direction is not None:
+            reversed_dir = np.sign(diff) * self._last_direction < 0
+            threshold = np.where(reversed_dir, np.maximum(threshold, self.deadband.hysteresis), threshold)
+
+        if not np.any(np.abs(diff) > threshold):
+            return False
+
+        direction = np.sign(diff)
+        if self._last_direction is not None:
+            direction = np.where(direction == 0, self._last_direction, direction)
+        self._last_value = new_val
+        self._last_direction = direction
+        return True
+
+
+def _is_numeric(value: Any) -> bool:
+    if isinstance(value, (bool, np.bool_)):
+        return False
+    if isinstance(value, (int, float, np.number)):
+        return True
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in 'iuf'
+    return False
@@ -3,7 +3,9 @@ import re
 from qtpy.QtCore import QObject
 from typing import Any, Optional, Callable, Dict, Union, Tuple
 from comrad.data.addr import ControlEndpointAddress
+from comrad.data.deadband import CDeadband
 from comrad.data.pyjapc_patch import CPyJapc
+from comrad.data.broker_client import CBrokerClient
 from comrad.data_plugins import CCommonDataConnection, CDataPlugin, CChannelData, CChannel
 
 
@@ -79,13 +81,14 @@ class CJapcConnection(CCommonDataConnection):
 
         if not ControlEndpointAddress.validate_parameter_name(channel.address_no_ctx):
             # Extra protection so that selector comes from the context and not directly from the address string
-            logger.error(f'Cannot create connection with invalid parameter name format "{channel.address_no_ctx}"!')
+            logger.error('Cannot create connection with invalid parameter name format "%s"!', channel.address_no_ctx)
             return
 
-        japc_address = ControlEndpointAddress.from_string(channel.address)
+        # Deadband is applied by the connection itself and is not known to JAPC
+        japc_address = ControlEndpointAddress.from_string(CDeadband.strip_suffix(channel.address))
 
         if japc_address is None:
-            logger.error(f'Cannot create connection for address "{channel.address}"!')
+            logger.error('Cannot create connection for address "%s"!', channel.address)
             return
 
         self._meta_field = (japc_address.field
@@ -110,7 +113,7 @@ class CJapcConnection(CCommonDataConnection):
         japc_address.data_filters = None
         self._pyjapc_param_name = str(japc_address)
 
-        CPyJapc.instance().japc_status_changed.connect(self._on_japc_status_changed)
+        _japc_service().japc_status_changed.connect(self._on_japc_status_changed)
         self.add_listener(channel)
 
     def add_listener(self, channel: CChannel):
@@ -130,44 +133,44 @@ class CJapcConnection(CCommonDataConnection):
         self.set(value={})
 
     def get(self, callback: Callable[[str, Any, Dict[str, Any]], None]):
-        CPyJapc.instance().getParam(parameterName=self._pyjapc_param_name,
-                                    onValueReceived=callback,
-                                    getHeader=True,  # Needed for meta-fields
-                                    noPyConversion=False,
-                                    **self._japc_additional_args)
+        _japc_service().getParam(parameterName=self._pyjapc_param_name,
+                                 onValueReceived=callback,
+                                 getHeader=True,  # Needed for meta-fields
+                                 noPyConversion=False,
+                                 **self._japc_additional_args)
 
     def set(self, value: Any):
         if not self._is_property_level:
             if parse_field_trait(self._pyjapc_param_name) is not None:
-                logger.error(f'Cannot write into meta-field "{self._pyjapc_param_name}". SET operation will be ignored.')
+                logger.error('Cannot write into meta-field "%s". SET operation will be ignored.', self._pyjapc_param_name)
                 return
         elif isinstance(value, dict):
             excluded_fields = [name for name in value.keys() if parse_field_trait(name) is not None]
             if excluded_fields:
-                logger.warning('Cannot write meta-fields of property "{prop}": {fields}. They will be excluded from '
-                               'the SET payload.'.format(fields=', '.join(excluded_fields), prop=self._pyjapc_param_name))
+                logger.warning('Cannot write meta-fields of property "%s": %s. They will be excluded from the SET payload.',
+                               self._pyjapc_param_name, ', '.join(excluded_fields))
                 new_val = {**value}
                 for field_name in excluded_fields:
                     del new_val[field_name]
                 value = new_val
 
-        CPyJapc.instance().setParam(parameterName=self._pyjapc_param_name,
-                                    parameterValue=value,
-                                    **self._japc_additional_args)
+        _japc_service().setParam(parameterName=self._pyjapc_param_name,
+                                 parameterValue=value,
+                                 **self._japc_additional_args)
 
     def subscribe(self, callback: Callable[[str, Any, Dict[str, Any]], None]):
-        logger.debug(f'{self}: Subscribing to JAPC')
-        CPyJapc.instance().subscribeParam(parameterName=self._pyjapc_param_name,
-                                          onValueReceived=callback,
-                                          onException=self._on_subscription_exception,
-                                          getHeader=True,  # Needed for meta-fields
-                                          noPyConversion=False,
-                                          **self._japc_additional_args)
+        logger.debug('%s: Subscribing to JAPC', self)
+        _japc_service().subscribeParam(parameterName=self._pyjapc_param_name,
+                                       onValueReceived=callback,
+                                       onException=self._on_subscription_exception,
+                                       getHeader=True,  # Needed for meta-fields
+                                       noPyConversion=False,
+                                       **self._japc_additional_args)
         self._start_subscriptions()
 
     def unsubscribe(self):
-        CPyJapc.instance().clearSubscriptions(parameterName=self._pyjapc_param_name,
-                                              selector=self._selector)
+        _japc_service().clearSubscriptions(parameterName=self._pyjapc_param_name,
+                                           selector=self._selector)
 
     def process_incoming_value(self, parameterName: str, value: Any, headerInfo: Dict[str, Any]) -> CChannelData[Any]:  # type: ignore  # arguments are different from super
         # These parameters are defined to the signature, expected by PyJapc
@@ -204,27 +207,31 @@ class CJapcConnection(CCommonDataConnection):
         return CChannelData[Any](value=value, meta_info=headerInfo)
 
     def _start_subscriptions(self):
-        logger.debug(f'{self}: Starting subscriptions')
+        logger.debug('%s: Starting subscriptions', self)
         try:
-            CPyJapc.instance().startSubscriptions(parameterName=self._pyjapc_param_name, selector=self._selector)
+            _japc_service().startSubscriptions(parameterName=self._pyjapc_param_name, selector=self._selector)
         except Exception as e:  # noqa: B902
             # TODO: Catch more specific Jpype errors here
-            logger.exception(f'Unexpected error while subscribing to {self.address}: {e!s}')
+            logger.exception('Unexpected error while subscribing to %s: %s', self.address, e)
 
     def _on_subscription_exception(self, param_name: str, _: str, exception: Any):
-        logger.exception(f'Exception {type(exception).__name__} triggered '  # type: ignore
-                         f'on {param_name}: {exception.getMessage()}')
+        logger.exception('Exception %s triggered on %s: %s', type(exception).__name__, param_name, exception.getMessage())
         self._some_subscriptions_failed = True
 
     def _on_japc_status_changed(self, logged_in: bool):
         if logged_in and (not self.connected or self._some_subscriptions_failed):
-            logger.debug(f'{self}: Reviving blocked subscriptions after login')
+            logger.debug('%s: Reviving blocked subscriptions after login', self)
             self._some_subscriptions_failed = False
             # Need to stop subscriptions before restarting, otherwise they will not start
-            CPyJapc.instance().stopSubscriptions(parameterName=self._pyjapc_param_name, selector=self._selector)
+            _japc_service().stopSubscriptions(parameterName=self._pyjapc_param_name, selector=self._selector)
             self._start_subscriptions()
 
 
+def _japc_service() -> Union[CPyJapc, CBrokerClient]:
+    # Broker transparently replaces local JAPC, when the application has been configured to use it
+    return CBrokerClient.active() or CPyJapc.instance()
+
+
 class JapcPlugin(CDataPlugin):
     """
     PyDM data plugin that handles communications with the channels on "japc://" scheme.
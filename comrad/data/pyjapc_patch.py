@@ -9,6 +9,7 @@ from typing import cast, Optional, Callable, Any, Dict, List, Union
 from qtpy.QtCore import QObject, Signal
 from pyjapc import PyJapc
 from pyrbac import Token
+from _comrad.jvm_prewarm import wait_for_jvm, set_jvm_flags
 from comrad.app.application import CApplication
 from comrad.data.jpype_utils import get_cmw_user_message, get_java_user_message, meaning_from_jpype
 from comrad.data.japc_enum import CEnumValue
@@ -258,6 +259,23 @@ class PyJapcWrapper(PyJapc):
     # similar to PyJapc's overridden _convertSimpleValToPy.
     subscribeParam = _fixed_papc_subscribe_param if in_papc_mode else PyJapc.subscribeParam
 
+    def _convertSimpleValToPy(self, val) -> Any:
+        """Overrides internal PyJapc method to emit different data struct for enums."""
+        typename = val.getValueType().toString().lower()
+
+        def enum_item_to_obj(enum_item: Any) -> CEnumValue:
+            return CEnumValue(code=enum_item.getCode(),
+                              label=enum_item.getSymbol(),
+                              meaning=meaning_from_jpype(enum_item.getStandardMeaning()),
+                              settable=enum_item.isSettable())
+
+        if typename == 'enum':
+            return enum_item_to_obj(val.getEnumItem())
+        elif typename == 'enumset':
+            return [enum_item_to_obj(v) for v in val.getEnumItemSet()]
+        else:
+            return super()._convertSimpleValToPy(val)
+
 
 class CPyJapc(PyJapcWrapper, QObject):
 
@@ -299,6 +317,8 @@ class CPyJapc(PyJapcWrapper, QObject):
             # INFO output from Java libs is too chatty. Either leave that for DEBUG, or when warning or more critical
             # is specified (even though by default PyJapc will place WARN logging level internally anyway)
             effective_level = None
+        # When JVM is being started in the background by the launcher, it must not be started here concurrently
+        wait_for_jvm()
         PyJapcWrapper.__init__(self,
                                selector='',
                                incaAcceleratorName='' if app.use_inca else None,
@@ -339,7 +359,7 @@ class CPyJapc(PyJapcWrapper, QObject):
             # Can fail, e.g. with error
             # cern.rbac.common.TokenFormatException:
             # Token's signature is invalid - only tokens issued by the RBAC <RBAC_ENV> Server are accepted.
-            logger.error(f'Java refused generated token: {e!s}')
+            logger.error('Java refused generated token: %s', e)
         else:
             cern.rbac.util.holder.ClientTierTokenHolder.setRbaToken(new_token)
             self._set_online(logged_in=self.rbacGetToken() is not None)
@@ -382,9 +402,7 @@ class CPyJapc(PyJapcWrapper, QObject):
                 log_level = 'OFF'
 
         super()._setup_jvm(log_level=log_level)
-        for name, val in self._app.jvm_flags.items():
-            logger.debug(f'Setting extra JVM flag: {name}={val}')
-            jpype.java.lang.System.setProperty(name, str(val))  # type: ignore
+        set_jvm_flags(self._app.jvm_flags)
 
         def print_token(token):
             token_info: str = 'None'
@@ -395,7 +413,7 @@ class CPyJapc(PyJapcWrapper, QObject):
                 else:
                     # Happens, e.g. in tests, when passing empty pyrbac token into Java
                     token_info = 'Unknown user'
-            logger.debug(f'Java received new RBAC token: {token_info}')
+            logger.debug('Java received new RBAC token: %s', token_info)
 
         JProxy: Any = jpype.JProxy  # type: ignore  # mypy fails all imports from jpype package in Python 3.9
         listener = JProxy('cern.rbac.util.holder.ClientTierRbaTokenChangeListener', {
@@ -403,21 +421,4 @@ class CPyJapc(PyJapcWrapper, QObject):
         })
         cern.rbac.util.holder.ClientTierTokenHolder.addRbaTokenChangeListener(listener)
 
-    def _convertSimpleValToPy(self, val) -> Any:
-        """Overrides internal PyJapc method to emit different data struct for enums."""
-        typename = val.getValueType().toString().lower()
-
-        def enum_item_to_obj(enum_item: Any) -> CEnumValue:
-            return CEnumValue(code=enum_item.getCode(),
-                              label=enum_item.getSymbol(),
-                              meaning=meaning_from_jpype(enum_item.getStandardMeaning()),
-                              settable=enum_item.isSettable())
-
-        if typename == 'enum':
-            return enum_item_to_obj(val.getEnumItem())
-        elif typename == 'enumset':
-            return [enum_item_to_obj(v) for v in val.getEnumItemSet()]
-        else:
-            return super()._convertSimpleValToPy(val)
-
     _instance = None
@@ -7,6 +7,12 @@ slots.
 
 # flake8: noqa: E401,E403
 from pydm.data_plugins.plugin import PyDMPlugin as CDataPlugin
-from ._conn import CDataConnection
-from ._common_conn import CCommonDataConnection
-from comrad import CChannel, CChannelData
+from comrad._lazy import lazy_attributes
+
+
+__getattr__, __dir__ = lazy_attributes(__name__, globals(), {
+    '._conn': ('CDataConnection',),
+    '._common_conn': ('CCommonDataConnection',),
+    '._cycle_sync': ('CCycleSynchronizer',),
+    '..data.channel': ('CChannel', 'CChannelData'),
+})
@@ -1,11 +1,15 @@
+import time
 import logging
 import functools
 import numpy as np
 from typing import Optional, Any, Callable, List
 from abc import abstractmethod
 from qtpy.QtCore import Signal, Slot, Qt, QVariant, QObject
+from comrad.instrumentation import InstrumentationRegistry
 from comrad.generics import GenericQObjectMeta
+from comrad.data.deadband import CDeadband, CDeadbandFilter
 from ._conn import CDataConnection, CChannelData, CChannel
+from ._cycle_sync import CCycleSynchronizer
 
 
 logger = logging.getLogger('comrad.data_plugins')
@@ -27,6 +31,14 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
         This is a generalized class, and independent of implementation. Thus it can be used for
         JAPC, RDA or similar APIs.
 
+        If the channel address contains deadband configuration (see :class:`~comrad.data.deadband.CDeadband`),
+        insignificant changes arriving via subscriptions are discarded here, before they reach any of the
+        listeners. Explicitly requested values are never filtered.
+
+        When cycle-synchronous delivery is enabled (see :class:`CCycleSynchronizer`), packets arriving via
+        subscriptions are grouped by their ``cycleStamp`` and delivered together with packets from other
+        connections belonging to the same cycle.
+
         Args:
             channel: Initial channel to connect to the data source.
             address: Address string of the device to be connected to.
@@ -34,7 +46,19 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
             parent: Optional parent owner.
         """
         super().__init__(channel=channel, address=address, protocol=protocol, parent=parent)
-        self._subscribe_callback = functools.partial(self._notify_listeners, callback_signals=[self.new_value_signal])
+        self._deadband_filter: Optional[CDeadbandFilter] = None
+        try:
+            _, deadband = CDeadband.split_address(channel.address)
+        except ValueError as e:
+            logger.warning('%s: %s. Deadband will not be applied.', self, e)
+        else:
+            if deadband is not None and deadband.active:
+                self._deadband_filter = CDeadbandFilter(deadband)
+        self.last_packet: Optional[CChannelData[Any]] = None
+        """Last value delivered to the listeners, used to refresh widgets when their paused channels are resumed."""
+        self._subscribe_callback = functools.partial(self._notify_listeners,
+                                                     callback_signals=[self.new_value_signal],
+                                                     from_subscription=True)
 
     @abstractmethod
     def get(self, callback: Callable):
@@ -119,11 +143,11 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
         # Start receiving values
         if channel.value_slot is not None:
             if not self.connected:
-                logger.debug(f'{self}: First connection and value_slot available. Will initiate subscriptions.')
+                logger.debug('%s: First connection and value_slot available. Will initiate subscriptions.', self)
                 self.subscribe(callback=self._subscribe_callback)
             else:
-                logger.debug(f'{self}: This was an additional listener. Initiating a single GET '
-                             'to update the displayed value')
+                logger.debug('%s: This was an additional listener. Initiating a single GET '
+                             'to update the displayed value', self)
                 # Artificially emit a single value to allow the UI update once because subscription
                 # is not initiated here, thus we are not getting initial values
                 self.get(callback=self._on_async_get)
@@ -132,11 +156,11 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
                 # If no previous listeners were added, but we are not expecting to subscribe, still subscribe, because
                 # future listeners which will connect to the object will fail to receive updates
                 # FIXME: This is not very straightforward. How can we fix it?
-                logger.debug(f'{self}: First connection and request_slot available. Will initiate subscriptions.')
+                logger.debug('%s: First connection and request_slot available. Will initiate subscriptions.', self)
                 self.subscribe(callback=self._subscribe_callback)
             else:
-                logger.debug(f'{self}: This was an additional listener. Initiating a single GET '
-                             f'to update the displayed value via request_slot')
+                logger.debug('%s: This was an additional listener. Initiating a single GET '
+                             'to update the displayed value via request_slot', self)
                 # Artificially emit a single value to allow the UI update once because subscription
                 # is not initiated here, thus we are not getting initial values
                 self.get(callback=self._on_requested_get)
@@ -150,14 +174,14 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
             if channel.request_signal is not None:
                 try:
                     channel.request_signal.disconnect(self.request_value)
-                    logger.debug(f'Disconnected request_signal ({channel.request_signal}) from {self}')
+                    logger.debug('Disconnected request_signal (%s) from %s', channel.request_signal, self)
                 except TypeError:
                     pass
 
             if channel.request_slot is not None:
                 try:
                     self.requested_value_signal.disconnect(channel.request_slot)
-                    logger.debug(f'{self}: Disconnected requested_value_signal from {channel.request_slot}')
+                    logger.debug('%s: Disconnected requested_value_signal from %s', self, channel.request_slot)
                 except (KeyError, TypeError):
                     pass
         super().remove_listener(channel=channel, destroying=destroying)
@@ -172,27 +196,27 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
         self.set(new_val)
 
     def close(self):
-        logger.debug(f'{self}: Stopping and removing subscriptions')
+        logger.debug('%s: Stopping and removing subscriptions', self)
         self.unsubscribe()
         super().close()
 
     def _connect_request_signals(self, channel: CChannel):
         if channel.request_signal is not None:
             channel.request_signal.connect(slot=self.request_value, type=Qt.QueuedConnection)
-            logger.debug(f'{self}: Connected request_signal to proactively GET')
+            logger.debug('%s: Connected request_signal to proactively GET', self)
         if channel.request_slot is not None:
             try:
                 self.requested_value_signal.connect(slot=channel.request_slot, type=Qt.QueuedConnection)
             except (KeyError, TypeError):
                 pass
-            logger.debug(f'{self}: Connected requested_value_signal to {channel.request_slot}')
+            logger.debug('%s: Connected requested_value_signal to %s', self, channel.request_slot)
 
     def _on_async_get(self, *args, **kwargs):
-        logger.debug(f'{self}: Received async GET callback')
+        logger.debug('%s: Received async GET callback', self)
         self._notify_listeners(*args, callback_signals=[self.new_value_signal], **kwargs)
 
     def _on_requested_get(self, *args, initiator_uid: Optional[str] = None, **kwargs):
-        logger.debug(f'{self}: Received GET callback on request')
+        logger.debug('%s: Received GET callback on request', self)
 
         def emit_signals(sig: Signal, value: CChannelData[Any]):
             sig.emit(value, initiator_uid)
@@ -202,6 +226,7 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
     def _notify_listeners(self, *args,
                           callback_signals: List[Signal],
                           emitter: Optional[Callable[[Signal, CChannelData[Any]], None]] = None,
+                          from_subscription: bool = False,
                           **kwargs):
         # In case the very first value arrives on subscription, and this is the earliest indicator that our
         # connection has succeeded
@@ -210,9 +235,41 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
         try:
             packet = self.process_incoming_value(*args, **kwargs)
         except ValueError as e:
-            logger.warning(f'{self}: {str(e)}')
+            logger.warning('%s: %s', self, e)
+            registry = InstrumentationRegistry.instance()
+            if registry.enabled:
+                registry.record_dropped(self.address)
             return
 
+        if from_subscription:
+            if self._deadband_filter is not None and not self._deadband_filter.accept(packet.value):
+                registry = InstrumentationRegistry.instance()
+                if registry.enabled:
+                    registry.record_dropped(self.address)
+                return
+
+            # May be called from the control system thread, hence never create the singleton here
+            synchronizer = CCycleSynchronizer.active()
+            if synchronizer is not None:
+                cycle_stamp = (packet.meta_info or {}).get('cycleStamp')
+                if cycle_stamp is not None:
+                    synchronizer.submit(cycle_stamp=cycle_stamp,
+                                        connection=self,
+                                        deliver=functools.partial(self._emit_packet,
+                                                                  packet=packet,
+                                                                  callback_signals=callback_signals,
+                                                                  emitter=emitter))
+                    return
+
+        self._emit_packet(packet=packet, callback_signals=callback_signals, emitter=emitter)
+
+    def _emit_packet(self,
+                     packet: CChannelData[Any],
+                     callback_signals: List[Signal],
+                     emitter: Optional[Callable[[Signal, CChannelData[Any]], None]] = None):
+        self.last_packet = packet
+        registry = InstrumentationRegistry.instance()
+        start = time.perf_counter() if registry.enabled else None
         for signal in callback_signals or []:
             try:
                 if emitter is None:
@@ -220,4 +277,6 @@ class CCommonDataConnection(CDataConnection, metaclass=GenericQObjectMeta):
                 else:
                     emitter(signal, packet)
             except (KeyError, TypeError):
-                logger.warning(f'{self}: Cannot propagate received value ({type(packet.value)}) to the widget.')
+                logger.warning('%s: Cannot propagate received value (%s) to the widget.', self, type(packet.value))
+        if start is not None:
+            registry.record_packet(self.address, time.perf_counter() - start)
@@ -84,18 +84,18 @@ class CDataConnection(PyDMConnection, metaclass=GenericQObjectMeta):
         Args:
             channel: A new listener.
         """
-        logger.debug(f'Adding a listener for {self}')
+        logger.debug('Adding a listener for %s', self)
         super().add_listener(channel)
 
         # Connect write slots even if we are in the read-only mode, since the mode can change dynamically,
         # and it will be hard to connect slots at that point. Rather forbid sending data over signals
         # in the read-only mode.
         if channel.value_signal is not None:
-            logger.debug(f'{self}: Connecting value_signal to write into CS')
+            logger.debug('%s: Connecting value_signal to write into CS', self)
             self._connect_write_slots(channel.value_signal)
 
         enable_write_access = not self.read_only
-        logger.debug(f'{self}: Emitting write access: {enable_write_access}')
+        logger.debug('%s: Emitting write access: %s', self, enable_write_access)
         self.write_access_signal.emit(enable_write_access)
 
         # Issue a connection signal (e.g. if it's an additional listener for already connected channel, we need to let
@@ -117,20 +117,20 @@ class CDataConnection(PyDMConnection, metaclass=GenericQObjectMeta):
             if channel.value_signal is not None:
                 try:
                     channel.value_signal.disconnect(self.write_value)
-                    logger.debug(f'Disconnected value_signal ({channel.value_signal}) from {self}')
+                    logger.debug('Disconnected value_signal (%s) from %s', channel.value_signal, self)
                 except (TypeError):
                     pass
                 for data_type in [str, bool, int, float, QVariant, np.ndarray]:
                     try:
                         channel.value_signal[data_type].disconnect(self.write_value)
-                        logger.debug(f'Disconnected value_signal[{data_type.__name__}] ({channel.value_signal}) from {self}')
+                        logger.debug('Disconnected value_signal[%s] (%s) from %s', data_type.__name__, channel.value_signal, self)
                     except (KeyError, TypeError):
                         continue
-            logger.debug(f'{self}: Removed one of the listeners')
+            logger.debug('%s: Removed one of the listeners', self)
         else:
-            logger.debug(f'{self}: Destroying the connection. All listeners should be disconnected automatically.')
+            logger.debug('%s: Destroying the connection. All listeners should be disconnected automatically.', self)
         super().remove_listener(channel=channel, destroying=destroying)
-        logger.debug(f'{self}: Listener count now is {self.listener_count}')
+        logger.debug('%s: Listener count now is %s', self, self.listener_count)
 
     @property
     def read_only(self) -> bool:
@@ -149,7 +149,7 @@ class CDataConnection(PyDMConnection, metaclass=GenericQObjectMeta):
 
         Subclasses must clear their subscriptions by overriding this method.
         """
-        logger.debug(f'{self}: Closing connection')
+        logger.debug('%s: Closing connection', self)
         self.connected = False
         super().close()
 
@@ -159,7 +159,7 @@ class CDataConnection(PyDMConnection, metaclass=GenericQObjectMeta):
     def _set_connected(self, connected: bool):
         if self._connected != connected:
             self._connected = connected
-            logger.debug(f'{self} is {"online" if connected else "offline"}')
+            logger.debug('%s is %s', self, 'online' if connected else 'offline')
             self.connection_state_signal.emit(connected)
 
     connected = property(fget=_get_connected, fset=_set_connected)
@@ -175,12 +175,12 @@ class CDataConnection(PyDMConnection, metaclass=GenericQObjectMeta):
                 signal[data_type].connect(slot=self.write_value, type=Qt.QueuedConnection)
             except (KeyError, TypeError):
                 continue
-            logger.debug(f'Connected write_signal[{data_type.__name__}] to {self}')
+            logger.debug('Connected write_signal[%s] to %s', data_type.__name__, self)
             set_slot_connected = True
 
         if not set_slot_connected:
             try:
                 signal.connect(slot=self.send_command, type=Qt.QueuedConnection)
-                logger.debug(f'Connected write_signal to {self}')
+                logger.debug('Connected write_signal to %s', self)
             except (KeyError, TypeError):
                 pass
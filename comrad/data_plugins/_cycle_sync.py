@@ -0,0 +1,151 @@
+import logging
+import weakref
+from collections import OrderedDict
+from typing import Optional, Any, Callable, List, Tuple
+from qtpy.QtCore import QObject, Signal, QTimer, Qt
+
+
+logger = logging.getLogger('comrad.data_plugins')
+
+
+_PendingPackets = List[Tuple['weakref.ReferenceType[QObject]', Callable[[], None]]]
+
+
+class CCycleSynchronizer(QObject):
+
+    DEFAULT_TIMEOUT = 100
+    """Default time (in milliseconds) to wait for the remaining packets of the same cycle."""
+
+    _instance: Optional['CCycleSynchronizer'] = None
+
+    _packet_submitted = Signal(object, object, object)
+
+    @classmethod
+    def instance(cls) -> 'CCycleSynchronizer':
+        """
+        Method to retrieve a singleton of the synchronizer.
+
+        A single instance is shared by all connections, so that packets of the same cycle coming from different
+        devices can be delivered together.
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def active(cls) -> Optional['CCycleSynchronizer']:
+        """
+        Retrieve the singleton only if it has been created and enabled.
+
+        Unlike :meth:`instance`, this method never creates the synchronizer, so it is safe to call from
+        the control system threads. The synchronizer must be created in the GUI thread (this is done by
+        :class:`~comrad.CApplication`), otherwise its timer would live in the wrong thread.
+        """
+        inst = cls._instance
+        if inst is None or not inst.enabled:
+            return None
+        return inst
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """
+        Synchronizer that groups packets arriving from subscriptions by their ``cycleStamp`` and delivers all
+        packets belonging to the same accelerator cycle in a single batch. The whole batch is applied within
+        a single turn of the event loop, so that Qt coalesces the repaint requests of the affected widgets and
+        the display never shows a mixture of the old and the new cycle.
+
+        A cycle is considered complete, when all connections that have contributed to the previously delivered cycle
+        have contributed to the pending one, when packets of a newer cycle start arriving, or when :attr:`timeout`
+        expires.
+
+        Args:
+            parent: Optional parent owner.
+        """
+        super().__init__(parent)
+        self.enabled: bool = False
+        """Whether connections should route subscription packets through the synchronizer."""
+        self._pending: 'OrderedDict[Any, _PendingPackets]' = OrderedDict()
+        self._expected: 'weakref.WeakSet[QObject]' = weakref.WeakSet()
+        self._last_delivered: Any = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(CCycleSynchronizer.DEFAULT_TIMEOUT)
+        self._timer.timeout.connect(self.flush)
+        # Subscription callbacks may arrive from the control system threads, while the delivery must happen
+        # in the GUI thread
+        self._packet_submitted.connect(self._on_packet_submitted, Qt.QueuedConnection)
+
+    def _get_timeout(self) -> int:
+        return self._timer.interval()
+
+    def _set_timeout(self, new_val: int):
+        self._timer.setInterval(new_val)
+
+    timeout = property(fget=_get_timeout, fset=_set_timeout)
+    """Time (in milliseconds) to wait for the remaining packets of the cycle, before delivering incomplete cycle."""
+
+    def submit(self, cycle_stamp: Any, connection: QObject, deliver: Callable[[], None]):
+        """
+        Schedule delivery of a packet. This method is thread-safe.
+
+        Args:
+            cycle_stamp: Cycle stamp of the packet, used to group packets together.
+            connection: Connection that produced the packet.
+            deliver: Callable that actually propagates the packet to the listeners.
+        """
+        self._packet_submitted.emit(cycle_stamp, connection, deliver)
+
+    def flush(self):
+        """Deliver all pending packets immediately, regardless of whether their cycles are complete."""
+        self._timer.stop()
+        if not self._pending:
+            return
+        cycles = list(self._pending.keys())
+        self._deliver(cycles)
+
+    def _on_packet_submitted(self, cycle_stamp: Any, connection: QObject, deliver: Callable[[], None]):
+        if self._last_delivered is not None and cycle_stamp <= self._last_delivered:
+            # Late packet of the cycle that has already been delivered. There's no sense in delaying it any further.
+            logger.debug('%s: Packet arrived late for the cycle %s', connection, cycle_stamp)
+            self._deliver_batch([(weakref.ref(connection), deliver)])
+            return
+
+        # Newer cycle implies that previous ones are complete
+        older_cycles = [stamp for stamp in self._pending.keys() if stamp < cycle_stamp]
+        if older_cycles:
+            self._deliver(older_cycles)
+
+        try:
+            packets = self._pending[cycle_stamp]
+        except KeyError:
+            packets = self._pending[cycle_stamp] = []
+        packets.append((weakref.ref(connection), deliver))
+
+        contributors = {ref() for ref, _ in packets}
+        if len(self._expected) > 0 and all(conn in contributors for conn in self._expected):
+            self._deliver([cycle_stamp])
+        elif not self._timer.isActive():
+            self._timer.start()
+
+    def _deliver(self, cycles: List[Any]):
+        batch: _PendingPackets = []
+        for stamp in cycles:
+            batch.extend(self._pending.pop(stamp))
+        if not self._pending:
+            self._timer.stop()
+        self._last_delivered = cycles[-1]
+        self._expected = weakref.WeakSet(filter(None, (ref() for ref, _ in batch)))
+        logger.debug('%s: Delivering %s packets of cycle(s) %s', self, len(batch), cycles)
+        self._deliver_batch(batch)
+
+    def _deliver_batch(self, batch: _PendingPackets):
+        # No paint events are processed until control returns to the event loop, hence all widgets
+        # touched by the batch are repainted together, and only the affected regions are repainted
+        for ref, deliver in batch:
+            if ref() is None:
+                # Connection has been destroyed while the packet was pending
+                continue
+            try:
+                deliver()
+            except RuntimeError:
+                # Underlying C++ object may have been deleted
+                pass
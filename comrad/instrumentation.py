@@ -0,0 +1,352 @@
+"""
+Registry of runtime performance counters, that data plugins, widgets and the rules engine report into, when it is
+enabled (e.g. by the performance status bar plugin, or by the headless benchmark).
+
+Reporting sites check :attr:`InstrumentationRegistry.enabled` before measuring anything, so that there is no
+noticeable overhead, when nobody is interested in the counters.
+"""
+import time
+import copy
+import threading
+from weakref import WeakKeyDictionary
+from dataclasses import dataclass, field, replace
+from typing import Optional, Dict, List, Any
+from qtpy.QtCore import QObject, QTimer, Qt
+
+
+@dataclass
+class TimedCounter:
+    count: int = 0
+    """Amount of recorded events."""
+    seconds: float = 0.0
+    """Total duration of the recorded events."""
+
+    def add(self, seconds: float):
+        """
+        Record a single event.
+
+        Args:
+            seconds: Duration of the event.
+        """
+        self.count += 1
+        self.seconds += seconds
+
+
+@dataclass
+class ChannelStats:
+    address: str
+    """Address of the connection."""
+    packets: TimedCounter = field(default_factory=TimedCounter)
+    """Values emitted to the listeners, and time spent in the listeners."""
+    dropped: int = 0
+    """Values that have not been emitted, because they were filtered out by the deadband, or could not be processed."""
+
+    def copy(self) -> 'ChannelStats':
+        """Copy that is not affected by further recording."""
+        return replace(self, packets=copy.copy(self.packets))
+
+
+@dataclass
+class WidgetStats:
+    name: str
+    """Object name of the widget."""
+    class_name: str
+    """Class name of the widget."""
+    updates: TimedCounter = field(default_factory=TimedCounter)
+    """Values displayed by the widget, and time spent displaying them."""
+    transformations: TimedCounter = field(default_factory=TimedCounter)
+    """Evaluations of the ``valueTransformation`` snippet."""
+    rules: TimedCounter = field(default_factory=TimedCounter)
+    """Evaluations of the widget rules."""
+    coalesced: int = 0
+    """Updates that have been skipped, because a newer value has superseded them."""
+
+    @property
+    def seconds(self) -> float:
+        """Total time spent on behalf of the widget."""
+        return self.updates.seconds + self.transformations.seconds + self.rules.seconds
+
+    def copy(self) -> 'WidgetStats':
+        """Copy that is not affected by further recording."""
+        return replace(self,
+                       updates=copy.copy(self.updates),
+                       transformations=copy.copy(self.transformations),
+                       rules=copy.copy(self.rules))
+
+
+@dataclass
+class InstrumentationSnapshot:
+    duration: float
+    """Time since the counters have been reset (in seconds)."""
+    packets: int
+    """Values emitted by all connections."""
+    dropped: int
+    """Values dropped by all connections."""
+    coalesced: int
+    """Updates skipped in favor of newer ones across all widgets."""
+    rules: TimedCounter
+    """Evaluations of widget rules."""
+    transformations: TimedCounter
+    """Evaluations of ``valueTransformation`` snippets."""
+    channels: List[ChannelStats]
+    """Counters of individual connections."""
+    widgets: List[WidgetStats]
+    """Counters of individual widgets that are still alive."""
+
+
+class InstrumentationRegistry:
+
+    _instance: Optional['InstrumentationRegistry'] = None
+
+    def __init__(self):
+        """
+        Performance counters of the running application. Recording methods may be called from any thread
+        (rules and background value transformations are evaluated outside of the GUI thread).
+        """
+        self.enabled: bool = False
+        """
+        Reporting sites should record events. Check this flag before measuring anything. It is changed
+        by :meth:`enable` and :meth:`disable`.
+        """
+        self._lock = threading.Lock()
+        self._enablers = 0
+        self._started = time.perf_counter()
+        self._channels: Dict[str, ChannelStats] = {}
+        self._widgets: 'WeakKeyDictionary[Any, WidgetStats]' = WeakKeyDictionary()
+        self._rules = TimedCounter()
+        self._transformations = TimedCounter()
+        self._coalesced = 0
+        self._event_loop_lag: List[float] = []
+
+    @classmethod
+    def instance(cls) -> 'InstrumentationRegistry':
+        """Singleton instance shared by the whole application."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def enable(self):
+        """
+        Start recording. Calls are reference-counted, so that the registry stays enabled, until each caller
+        (e.g. the status bar plugin and the headless benchmark) has called :meth:`disable`.
+        """
+        with self._lock:
+            self._enablers += 1
+            self.enabled = True
+
+    def disable(self):
+        """Revert a single call of :meth:`enable`. Recording stops, when nobody needs the counters anymore."""
+        with self._lock:
+            self._enablers = max(0, self._enablers - 1)
+            self.enabled = self._enablers > 0
+
+    def reset(self):
+        """Discard all recorded counters."""
+        with self._lock:
+            self._started = time.perf_counter()
+            self._channels.clear()
+            self._widgets.clear()
+            self._rules = TimedCounter()
+            self._transformations = TimedCounter()
+            self._coalesced = 0
+            self._event_loop_lag.clear()
+
+    def record_packet(self, address: str, seconds: float):
+        """
+        Count a value, emitted by the connection to its listeners.
+
+        Args:
+            address: Address of the connection.
+            seconds: Time spent emitting the value (in directly connected listeners).
+        """
+        with self._lock:
+            self._channel(address).packets.add(seconds)
+
+    def record_dropped(self, address: str):
+        """
+        Count a value that the connection has received, but has not emitted.
+
+        Args:
+            address: Address of the connection.
+        """
+        with self._lock:
+            self._channel(address).dropped += 1
+
+    def record_coalesced(self, widget: Any, count: int = 1):
+        """
+        Count updates of the widget, that have been skipped in favor of newer ones.
+
+        Args:
+            widget: Affected widget.
+            count: Amount of skipped updates.
+        """
+        with self._lock:
+            self._coalesced += count
+            stats = self._widget(widget)
+            if stats is not None:
+                stats.coalesced += count
+
+    def record_widget_update(self, widget: Any, seconds: float):
+        """
+        Count a value displayed by the widget.
+
+        Args:
+            widget: Updated widget.
+            seconds: Time spent updating the widget.
+        """
+        with self._lock:
+            stats = self._widget(widget)
+            if stats is not None:
+                stats.updates.add(seconds)
+
+    def record_transformation(self, widget: Any, seconds: float):
+        """
+        Count an evaluation of a ``valueTransformation`` snippet.
+
+        Args:
+            widget: Widget, owning the snippet.
+            seconds: Duration of the evaluation.
+        """
+        with self._lock:
+            self._transformations.add(seconds)
+            stats = self._widget(widget)
+            if stats is not None:
+                stats.transformations.add(seconds)
+
+    def record_rule(self, widget: Any, seconds: float):
+        """
+        Count an evaluation of a widget rule.
+
+        Args:
+            widget: Widget, owning the rule. May be ``None``, if it has already been destroyed.
+            seconds: Duration of the evaluation.
+        """
+        with self._lock:
+            self._rules.add(seconds)
+            stats = self._widget(widget)
+            if stats is not None:
+                stats.rules.add(seconds)
+
+    def record_event_loop_lag(self, lag_ms: float):
+        """
+        Record how much later than scheduled the event loop has run a periodic probe.
+
+        Args:
+            lag_ms: Delay in milliseconds.
+        """
+        with self._lock:
+            self._event_loop_lag.append(lag_ms)
+
+    def take_event_loop_lag(self) -> List[float]:
+        """
+        Collect delays recorded by :meth:`record_event_loop_lag` since the last call.
+
+        Returns:
+            Delays in milliseconds, in the order of recording.
+        """
+        with self._lock:
+            samples = self._event_loop_lag
+            self._event_loop_lag = []
+        return samples
+
+    def snapshot(self) -> InstrumentationSnapshot:
+        """
+        Copy the current state of the counters.
+
+        Returns:
+            Counters that are not affected by further recording.
+        """
+        with self._lock:
+            channels = [stats.copy() for stats in self._channels.values()]
+            return InstrumentationSnapshot(duration=time.perf_counter() - self._started,
+                                           packets=sum(stats.packets.count for stats in channels),
+                                           dropped=sum(stats.dropped for stats in channels),
+                                           coalesced=self._coalesced,
+                                           rules=copy.copy(self._rules),
+                                           transformations=copy.copy(self._transformations),
+                                           channels=channels,
+                                           widgets=[stats.copy() for stats in self._widgets.values()])
+
+    def _channel(self, address: str) -> ChannelStats:
+        try:
+            return self._channels[address]
+        except KeyError:
+            stats = self._channels[address] = ChannelStats(address=address)
+            return stats
+
+    def _widget(self, widget: Any) -> Optional[WidgetStats]:
+        if widget is None:
+            return None
+        try:
+            return self._widgets[widget]
+        except KeyError:
+            pass
+        except TypeError:
+            # Not weak-referenceable
+            return None
+        try:
+            name = widget.objectName()
+        except (AttributeError, RuntimeError):
+            # RuntimeError when the underlying C++ object has been deleted
+            name = ''
+        stats = self._widgets[widget] = WidgetStats(name=name, class_name=type(widget).__name__)
+        return stats
+
+
+class CEventLoopProbe(QObject):
+
+    DEFAULT_INTERVAL = 10
+    """Default interval of the probe (in milliseconds)."""
+
+    def __init__(self, interval: int = DEFAULT_INTERVAL, parent: Optional[QObject] = None):
+        """
+        Periodic timer that measures how much later than scheduled the event loop gets to run it, and reports
+        the delay into :class:`~comrad.instrumentation.InstrumentationRegistry`.
+
+        Args:
+            interval: Interval of the probe (in milliseconds).
+            parent: Owning object.
+        """
+        super().__init__(parent)
+        self._interval = interval
+        self._last_probe = 0.0
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._on_probe)
+
+    def start(self):
+        """Start measuring."""
+        self._last_probe = time.perf_counter()
+        self._timer.start()
+
+    def stop(self):
+        """Stop measuring."""
+        self._timer.stop()
+
+    def _on_probe(self):
+        now = time.perf_counter()
+        InstrumentationRegistry.instance().record_event_loop_lag(max(0.0, (now - self._last_probe) * 1000.0 - self._interval))
+        self._last_probe = now
+
+
+def connection_counts() -> Dict[str, Any]:
+    """
+    Count connections that are currently open by the data plugins.
+
+    Returns:
+        Dictionary with amount of connections by protocol (``"connections"``) and total amount of channels
+        listening to them (``"listeners"``).
+    """
+    from pydm.data_plugins import plugin_modules
+    connections: Dict[str, int] = {}
+    listeners = 0
+    for protocol, plugin in plugin_modules.items():
+        plugin_connections = getattr(plugin, 'connections', {})
+        if plugin_connections:
+            connections[protocol] = len(plugin_connections)
+            listeners += sum(conn.listener_count for conn in plugin_connections.values())
+    return {
+        'connections': connections,
+        'listeners': listeners,
+    }
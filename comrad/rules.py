@@ -3,6 +3,7 @@ Widget rules can be used to control certain properties based on the incoming val
 """
 
 
+import time
 import functools
 import weakref
 import logging
@@ -21,6 +22,7 @@ from pydm.data_plugins import plugin_for_address
 from pydm.data_plugins.plugin import PyDMPlugin, PyDMConnection
 from pydm.utilities import is_qt_designer
 from pydm import config
+from comrad.instrumentation import InstrumentationRegistry
 from comrad.json import CJSONSerializable, CJSONDeserializeError
 from comrad.data.channel import CChannelData, CContext, CChannel
 from comrad.data.japc_enum import CEnumValue
@@ -194,7 +196,7 @@ class CEnumRule(CBaseRule):
 
         @classmethod
         def from_json(cls, contents):
-            logger.debug(f'Unpacking JSON enum setting: {contents}')
+            logger.debug('Unpacking JSON enum setting: %s', contents)
             field: Union[int, CEnumRule.EnumField] = contents.get('field', None)
             field_val: Union[int, str, CEnumValue.Meaning] = contents.get('fv', None)
             value: AppliedValue = contents.get('value', None)
@@ -274,7 +276,7 @@ class CEnumRule(CBaseRule):
 
     @classmethod
     def from_json(cls, contents):
-        logger.debug(f'Unpacking JSON rule: {contents}')
+        logger.debug('Unpacking JSON rule: %s', contents)
         name: str = contents.get('name', None)
         prop: str = contents.get('prop', None)
         selector: Optional[str] = contents.get('sel', None)
@@ -407,7 +409,7 @@ class CNumRangeRule(CBaseRule):
 
         @classmethod
         def from_json(cls, contents):
-            logger.debug(f'Unpacking JSON range: {contents}')
+            logger.debug('Unpacking JSON range: %s', contents)
             min_val: float = contents.get('min', None)
             max_val: float = contents.get('max', None)
             value: AppliedValue = contents.get('value', None)
@@ -470,7 +472,7 @@ class CNumRangeRule(CBaseRule):
 
     @classmethod
     def from_json(cls, contents):
-        logger.debug(f'Unpacking JSON rule: {contents}')
+        logger.debug('Unpacking JSON rule: %s', contents)
         name: str = contents.get('name', None)
         prop: str = contents.get('prop', None)
         selector: Optional[str] = contents.get('sel', None)
@@ -572,7 +574,7 @@ def unpack_rules(contents: str) -> List[CBaseRule]:
     Returns:
         Lis tof rule objects.
     """
-    logger.debug(f'Unpacking JSON rules into the object: {contents}')
+    logger.debug('Unpacking JSON rules into the object: %s', contents)
     parsed_contents: List[Dict[str, Any]] = json.loads(contents)
     res: List[CBaseRule] = []
 
@@ -618,7 +620,7 @@ class CRulesEngine(PyDMRulesEngine, MonkeyPatchedClass):
             return
 
         widget_name = widget.objectName()
-        logger.debug(f'Registering rules for "{widget_name}":\n{list(rules)}')
+        logger.debug('Registering rules for "%s":\n%s', widget_name, list(rules))
         widget_ref = weakref.ref(widget, self.widget_destroyed)
         if widget_ref in self.widget_map:
             self.unregister(widget_ref)
@@ -632,7 +634,7 @@ class CRulesEngine(PyDMRulesEngine, MonkeyPatchedClass):
                     rule.validate()
                 except TypeError as e:
                     messages = str(e).split(';')
-                    logger.warning('Skipping rule because of the errors:\n' + '\n'.join(messages))
+                    logger.warning('Skipping rule because of the errors:\n%s', '\n'.join(messages))
                     continue
 
                 # TODO: Will this work with wildcard channel? Certainly not dynamically changing one because it's evaluated once
@@ -656,7 +658,7 @@ class CRulesEngine(PyDMRulesEngine, MonkeyPatchedClass):
                         'trigger': True,
                     }]
 
-                logger.debug(f'Channel list for rule "{widget_name}.{rule.name}" will be {channels_list}')
+                logger.debug('Channel list for rule "%s.%s" will be %s', widget_name, rule.name, channels_list)
 
                 job_unit: Dict[str, Any] = {}
                 job_unit['rule'] = rule
@@ -691,6 +693,18 @@ class CRulesEngine(PyDMRulesEngine, MonkeyPatchedClass):
                 self.widget_map[widget_ref].append(job_unit)
 
     def calculate_expression(self, widget_ref: ReferenceType, _: int, rule: Dict[str, Any]):
+        registry = InstrumentationRegistry.instance()
+        if not registry.enabled:
+            self._evaluate_rule(widget_ref, rule)
+            return
+
+        start = time.perf_counter()
+        try:
+            self._evaluate_rule(widget_ref, rule)
+        finally:
+            registry.record_rule(widget_ref(), time.perf_counter() - start)
+
+    def _evaluate_rule(self, widget_ref: ReferenceType, rule: Dict[str, Any]):
         job_unit = rule
         job_unit['calculate'] = False
 
@@ -752,7 +766,7 @@ class CRulesEngine(PyDMRulesEngine, MonkeyPatchedClass):
                         notify_value(None)
                 return
 
-        logger.exception(f'Unsupported rule type: {type(rule_obj).__name__}')
+        logger.exception('Unsupported rule type: %s', type(rule_obj).__name__)
 
     def warn_unconnected_channels(self, widget_ref: ReferenceType, index: int):
         """
@@ -761,7 +775,7 @@ class CRulesEngine(PyDMRulesEngine, MonkeyPatchedClass):
         """
         job_unit = self.widget_map[widget_ref][index]
         rule_obj: CBaseRule = job_unit['rule']
-        logger.warning(f'Rule "{rule_obj.name}": Not all channels are connected, skipping execution.')
+        logger.warning('Rule "%s": Not all channels are connected, skipping execution.', rule_obj.name)
 
 
 def is_valid_color(entry: Any) -> bool:
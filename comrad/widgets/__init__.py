@@ -12,4 +12,12 @@ you can do
 
 """
 # flake8: noqa: E401,E403
-from . import widget
+from comrad._lazy import lazy_attributes
+
+
+# Submodules are imported on first access, as widgets with heavy dependencies (e.g. graphs) should not be
+# imported when they are not used
+__getattr__, __dir__ = lazy_attributes(__name__, globals(), {
+    f'.{name}': (name,) for name in ('widget', 'mixins', 'modifiers', 'buttons', 'graphs', 'containers', 'indicators',
+                                     'tables', 'inputs', 'value_transform')
+})
@@ -0,0 +1,194 @@
+import numpy as np
+from typing import Tuple, List, Optional
+
+
+_BASE_BUCKET_SIZE = 16
+"""Amount of raw points summarized by a single bucket of the finest pyramid level."""
+
+_LEVEL_FACTOR = 4
+"""Amount of buckets of the finer level that are merged into a single bucket of the next coarser level."""
+
+
+class DecimationPyramid:
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        """
+        Multi-resolution summary of a waveform that allows reducing the amount of rendered points for an arbitrary
+        visible range, without revisiting the whole array.
+
+        Every level of the pyramid splits the waveform into equally sized buckets and remembers indexes of the minimum
+        and maximum value in every bucket. Levels are computed once per waveform with vectorized operations, so that
+        subsequent requests (e.g. on zoom) only need to slice the fitting level, which takes time proportional to
+        the amount of produced points, and not to the size of the waveform.
+
+        Args:
+            x: Horizontal coordinates of the waveform.
+            y: Vertical coordinates of the waveform.
+        """
+        if len(x) != len(y):
+            raise ValueError(f'Coordinate arrays must have the same length, {len(x)} and {len(y)} given')
+        self.x = x
+        self.y = y
+        self.x_sorted = len(x) < 2 or bool(np.all(x[1:] >= x[:-1]))
+        """Horizontal coordinates are monotonic, therefore visible range can be located by binary search."""
+        self._levels: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def index_range(self, x_min: float, x_max: float) -> Tuple[int, int]:
+        """
+        Find the range of indexes that need to be rendered to cover the given horizontal range.
+        One extra point is included on each side, so that lines reach the edges of the range.
+
+        Args:
+            x_min: Lower bound of the visible range.
+            x_max: Upper bound of the visible range.
+
+        Returns:
+            Tuple of the first index and the index after the last one.
+        """
+        if not self.x_sorted:
+            return 0, len(self)
+        start = max(int(np.searchsorted(self.x, x_min, side='left')) - 1, 0)
+        stop = min(int(np.searchsorted(self.x, x_max, side='right')) + 1, len(self))
+        return start, stop
+
+    def min_max(self, start: int, stop: int, buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Min/max envelope of the given index range, that preserves the peaks of the waveform.
+
+        Args:
+            start: First index of the range.
+            stop: Index after the last one of the range.
+            buckets: Amount of buckets (typically, the amount of horizontal pixels) to split the range into.
+                     Each bucket is represented by up to 2 points.
+
+        Returns:
+            Tuple of decimated horizontal and vertical coordinates.
+        """
+        indexes = self._envelope_indexes(start=start, stop=stop, buckets=buckets)
+        if indexes is None:
+            return self.x[start:stop], self.y[start:stop]
+        return self.x[indexes], self.y[indexes]
+
+    def lttb(self, start: int, stop: int, points: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Downsample the given index range using "Largest Triangle Three Buckets" algorithm, that preserves the
+        visual shape of the waveform with the fixed amount of points.
+
+        To keep the processing time bounded, the algorithm runs on the min/max envelope of the fitting pyramid level,
+        rather than on the raw points.
+
+        Args:
+            start: First index of the range.
+            stop: Index after the last one of the range.
+            points: Amount of points to produce.
+
+        Returns:
+            Tuple of decimated horizontal and vertical coordinates.
+        """
+        candidates = self._envelope_indexes(start=start, stop=stop, buckets=points)
+        if candidates is None:
+            candidates = np.arange(start, stop)
+        selected = candidates[lttb_indexes(self.x[candidates], self.y[candidates], points)]
+        return self.x[selected], self.y[selected]
+
+    def _envelope_indexes(self, start: int, stop: int, buckets: int) -> Optional[np.ndarray]:
+        count = stop - start
+        buckets = max(buckets, 1)
+        if count <= 2 * buckets:
+            # Not worth decimating
+            return None
+        # Coarsest level that still has at least the requested amount of buckets in the range
+        bucket_size, lo_idx, hi_idx = 1, None, None
+        for level_bucket_size, level_lo, level_hi in self._levels:
+            if count // level_bucket_size < buckets:
+                break
+            bucket_size, lo_idx, hi_idx = level_bucket_size, level_lo, level_hi
+        if lo_idx is None or hi_idx is None:
+            return None
+        first_bucket = start // bucket_size
+        last_bucket = -(-stop // bucket_size)
+        lo_idx = lo_idx[first_bucket:last_bucket]
+        hi_idx = hi_idx[first_bucket:last_bucket]
+        # Preserve the order of points inside each bucket, and keep the boundaries of the range
+        envelope = np.column_stack((np.minimum(lo_idx, hi_idx), np.maximum(lo_idx, hi_idx))).ravel()
+        return np.concatenate(([start], envelope[(envelope > start) & (envelope < stop - 1)], [stop - 1]))
+
+    def _build(self):
+        if len(self) == 0:
+            return
+        lo_idx, hi_idx = _reduce_extrema(self.y, None, None, _BASE_BUCKET_SIZE)
+        bucket_size = _BASE_BUCKET_SIZE
+        while True:
+            self._levels.append((bucket_size, lo_idx, hi_idx))
+            if len(lo_idx) <= _LEVEL_FACTOR:
+                break
+            lo_idx, hi_idx = _reduce_extrema(self.y, lo_idx, hi_idx, _LEVEL_FACTOR)
+            bucket_size *= _LEVEL_FACTOR
+
+
+def lttb_indexes(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Select points of the "Largest Triangle Three Buckets" downsampling.
+
+    Args:
+        x: Horizontal coordinates.
+        y: Vertical coordinates.
+        points: Amount of points to select.
+
+    Returns:
+        Sorted indexes of the selected points.
+    """
+    count = len(y)
+    if points >= count:
+        return np.arange(count)
+    if points < 3:
+        return np.array([0, count - 1][:max(points, 0)], dtype=int)
+    x = x.astype(float, copy=False)
+    y = y.astype(float, copy=False)
+    # First and last points are always kept, the rest is split into equal buckets
+    edges = np.linspace(1, count - 1, points - 1).astype(int)
+    sums_x = np.add.reduceat(x[:-1], edges[:-1])
+    sums_y = np.add.reduceat(y[:-1], edges[:-1])
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])
+    avg_y = np.append(sums_y / sizes, y[-1])
+    res = np.empty(points, dtype=int)
+    res[0] = 0
+    res[-1] = count - 1
+    prev = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[prev], y[prev]
+        cx, cy = avg_x[bucket + 1], avg_y[bucket + 1]
+        areas = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        prev = lo + int(np.argmax(areas))
+        res[bucket + 1] = prev
+    return res
+
+
+def _reduce_extrema(y: np.ndarray,
+                    lo_idx: Optional[np.ndarray],
+                    hi_idx: Optional[np.ndarray],
+                    factor: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge every ``factor`` buckets into one, keeping indexes of the minimum and the maximum values.
+    When ``lo_idx`` and ``hi_idx`` are ``None``, every raw point is treated as a bucket.
+    """
+    return _reduce_indexes(y, lo_idx, factor, np.argmin), _reduce_indexes(y, hi_idx, factor, np.argmax)
+
+
+def _reduce_indexes(y: np.ndarray, idx: Optional[np.ndarray], factor: int, arg_func) -> np.ndarray:
+    count = len(y) if idx is None else len(idx)
+    full = count // factor * factor
+    vals = (y[:full] if idx is None else y[idx[:full]]).reshape(-1, factor)
+    selected = arg_func(vals, axis=1)
+    offsets = np.arange(0, full, factor)
+    res = offsets + selected if idx is None else idx[offsets + selected]
+    if full < count:
+        tail = np.arange(full, count) if idx is None else idx[full:]
+        res = np.append(res, tail[arg_func(y[tail])])
+    return res
@@ -0,0 +1,112 @@
+import math
+import numpy as np
+from typing import Optional, Tuple, Any
+
+
+def frame_to_image(frame: Any, width: int, row_major: bool) -> Optional[np.ndarray]:
+    """
+    Interpret the incoming frame as an image, without copying the data.
+
+    2D (or 3D, for colored images) arrays are used as they are. Flat arrays are reshaped into a view, using the
+    given width, while the height is derived from the size of the array.
+
+    Args:
+        frame: Incoming array.
+        width: Width of the image, used for flat arrays.
+        row_major: Flat array stores pixels row by row (C-like order), otherwise column by column (Fortran-like order).
+
+    Returns:
+        Array of shape ``(-1, width)`` in C-like order, or ``(width, -1)`` in Fortran-like order, or ``None`` if
+        the flat array cannot be split by the given width.
+    """
+    image = np.asarray(frame)
+    if image.ndim != 1:
+        return image
+    if width < 1 or image.size % width:
+        return None
+    if row_major:
+        return image.reshape((-1, width), order='C')
+    return image.reshape((width, -1), order='F')
+
+
+def viewport_slices(shape: Tuple[int, int],
+                    x_range: Optional[Tuple[float, float]],
+                    y_range: Optional[Tuple[float, float]],
+                    pixel_size: Tuple[float, float]) -> Tuple[slice, slice]:
+    """
+    Calculate slices that select the visible part of the row-major image, skipping pixels that would not be
+    distinguishable on the screen. Slicing produces a view, therefore this downsampling does not copy the image,
+    unlike averaging.
+
+    Start of each slice is aligned to its step, so that panning the image does not make the selected pixels
+    jump between neighbours.
+
+    Args:
+        shape: Shape of the image (rows and columns).
+        x_range: Visible horizontal range (columns), or ``None`` to take all columns.
+        y_range: Visible vertical range (rows), or ``None`` to take all rows.
+        pixel_size: Amount of image pixels per screen pixel, horizontally and vertically.
+
+    Returns:
+        Tuple of slices for rows and columns.
+    """
+    return (_axis_slice(shape[0], y_range, pixel_size[1]),
+            _axis_slice(shape[1], x_range, pixel_size[0]))
+
+
+def _axis_slice(length: int, visible_range: Optional[Tuple[float, float]], pixel_size: float) -> slice:
+    step = max(int(pixel_size), 1) if math.isfinite(pixel_size) else 1
+    if visible_range is None:
+        start, stop = 0, length
+    else:
+        start = min(max(int(math.floor(visible_range[0])), 0), length)
+        stop = min(max(int(math.ceil(visible_range[1])), 0), length)
+    start = start // step * step
+    return slice(start, stop, step)
+
+
+class LevelsCache:
+
+    def __init__(self, tolerance: float = 0.02):
+        """
+        Levels of the normalized image, that are only updated when they change significantly.
+
+        Every change of levels invalidates the lookup table that combines levels and the color map, which then has
+        to be recalculated for the next frame. Ignoring small fluctuations of the minimum and maximum keeps the
+        lookup table cached between frames and avoids flickering of the colors.
+
+        Args:
+            tolerance: Fraction of the current levels range, within which changes are ignored.
+        """
+        self.tolerance = tolerance
+        self._levels: Optional[Tuple[float, float]] = None
+
+    @property
+    def levels(self) -> Optional[Tuple[float, float]]:
+        """Currently cached levels."""
+        return self._levels
+
+    def update(self, image: np.ndarray) -> Tuple[float, float]:
+        """
+        Calculate levels for the new image.
+
+        Args:
+            image: Image (or its visible part), whose minimum and maximum define the levels.
+
+        Returns:
+            Tuple of the lower and the upper level.
+        """
+        if image.size == 0:
+            return self._levels or (0.0, 1.0)
+        lower, upper = float(np.nanmin(image)), float(np.nanmax(image))
+        if self._levels is not None:
+            cur_lower, cur_upper = self._levels
+            margin = (cur_upper - cur_lower) * self.tolerance
+            if abs(lower - cur_lower) <= margin and abs(upper - cur_upper) <= margin:
+                return self._levels
+        self._levels = lower, upper
+        return self._levels
+
+    def reset(self):
+        """Forget cached levels."""
+        self._levels = None
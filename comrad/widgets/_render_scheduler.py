@@ -0,0 +1,201 @@
+import time
+import bisect
+import itertools
+from collections import OrderedDict
+from typing import Optional, Callable, List, Tuple, Sequence
+from qtpy.QtCore import QObject, QTimer
+from qtpy.QtWidgets import QWidget
+from comrad.instrumentation import InstrumentationRegistry
+
+
+class RenderTimeHistogram:
+
+    DEFAULT_BOUNDARIES: Tuple[float, ...] = (1.0, 2.0, 4.0, 8.0, 16.0, 33.0, 66.0, 133.0, 266.0)
+    """Upper boundaries (in milliseconds) of the histogram bins. The last bin collects everything above."""
+
+    def __init__(self, boundaries: Sequence[float] = DEFAULT_BOUNDARIES):
+        """
+        Histogram of the time spent rendering, with fixed bins, so that recording is cheap enough
+        to stay enabled permanently.
+
+        Args:
+            boundaries: Sorted upper boundaries of the bins (in milliseconds).
+        """
+        self.boundaries: Tuple[float, ...] = tuple(boundaries)
+        self._counts = [0] * (len(self.boundaries) + 1)
+        self._total_time = 0.0
+        self._max_time = 0.0
+
+    @property
+    def counts(self) -> List[int]:
+        """Amount of samples in each bin. There is one more bin than :attr:`boundaries`."""
+        return list(self._counts)
+
+    @property
+    def total(self) -> int:
+        """Amount of recorded samples."""
+        return sum(self._counts)
+
+    @property
+    def mean_duration(self) -> float:
+        """Average render time in milliseconds."""
+        total = self.total
+        return self._total_time / total if total else 0.0
+
+    @property
+    def max_duration(self) -> float:
+        """Longest render time in milliseconds."""
+        return self._max_time
+
+    def record(self, duration: float):
+        """
+        Add a sample.
+
+        Args:
+            duration: Render time in milliseconds.
+        """
+        self._counts[bisect.bisect_left(self.boundaries, duration)] += 1
+        self._total_time += duration
+        self._max_time = max(self._max_time, duration)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimate the render time, below which the given fraction of samples falls.
+
+        Args:
+            fraction: Value between 0 and 1, e.g. ``0.95``.
+
+        Returns:
+            Upper boundary of the bin containing the percentile (or the longest recorded time for the last bin).
+        """
+        total = self.total
+        if not total:
+            return 0.0
+        cumulative = list(itertools.accumulate(self._counts))
+        idx = bisect.bisect_left(cumulative, fraction * total)
+        return self.boundaries[idx] if idx < len(self.boundaries) else self._max_time
+
+    def reset(self):
+        """Forget all samples."""
+        self._counts = [0] * (len(self.boundaries) + 1)
+        self._total_time = 0.0
+        self._max_time = 0.0
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} total={self.total}; mean={self.mean_duration:.2f}ms; max={self.max_duration:.2f}ms>'
+
+
+class RenderScheduler(QObject):
+
+    DEFERRED_CHECK_INTERVAL = 250
+    """How often (in milliseconds) to check whether hidden sources have become visible."""
+
+    def __init__(self, widget: QWidget, is_source_visible: Callable[[QObject], bool]):
+        """
+        Scheduler that collects updates of all plotting items of a single plot and applies them together,
+        at most once per frame, suspending widget updates in the meantime, so that all of them result in a
+        single repaint.
+
+        Updates that replace the contents of an item are coalesced, so that only the newest one is applied. If the item
+        is hidden, they are deferred until it becomes visible again. Updates that append to the contents of an item
+        are always applied in order.
+
+        Args:
+            widget: Plot widget that is repainted.
+            is_source_visible: Callable that checks whether the item fed by the given source is visible.
+        """
+        super().__init__(widget)
+        self._widget = widget
+        self._is_source_visible = is_source_visible
+        self._max_fps = 0
+        self._pending: 'OrderedDict[int, Tuple[QObject, bool, List[Callable[[], None]]]]' = OrderedDict()
+        self._last_frame: Optional[float] = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def max_fps(self) -> int:
+        """Maximum amount of frames per second. ``0`` disables scheduling, so updates are applied immediately."""
+        return self._max_fps
+
+    @max_fps.setter
+    def max_fps(self, new_val: int):
+        self._max_fps = max(int(new_val), 0)
+        if not self.enabled:
+            self.flush(force=True)
+
+    @property
+    def enabled(self) -> bool:
+        """Updates are being collected rather than applied immediately."""
+        return self._max_fps > 0
+
+    def schedule(self, source: QObject, deliver: Callable[[], None], replaceable: bool):
+        """
+        Schedule an update for the next frame.
+
+        Args:
+            source: Source of the update, typically a data source of a plotting item.
+            deliver: Callable that actually applies the update.
+            replaceable: Update replaces the contents of the item, therefore previous pending updates
+                         from the same source can be discarded.
+        """
+        if not self.enabled:
+            deliver()
+            return
+        key = id(source)
+        try:
+            _, _, updates = self._pending[key]
+        except KeyError:
+            updates = []
+            self._pending[key] = source, replaceable, updates
+        if replaceable and updates:
+            registry = InstrumentationRegistry.instance()
+            if registry.enabled:
+                registry.record_coalesced(self._widget, len(updates))
+            updates.clear()
+        updates.append(deliver)
+        delay = self._time_until_next_frame()
+        # Timer may be running with the longer interval, waiting for the hidden items
+        if not self._timer.isActive() or self._timer.remainingTime() > delay:
+            self._timer.start(delay)
+
+    def flush(self, force: bool = False):
+        """
+        Apply pending updates.
+
+        Args:
+            force: Apply also the updates deferred because of hidden items.
+        """
+        self._timer.stop()
+        if not self._pending:
+            return
+        self._last_frame = time.perf_counter()
+        batch = self._pending
+        self._pending = OrderedDict()
+        updates_enabled = self._widget.updatesEnabled()
+        if updates_enabled:
+            self._widget.setUpdatesEnabled(False)
+        try:
+            for key, (source, replaceable, updates) in batch.items():
+                if replaceable and not force and not self._is_source_visible(source):
+                    self._pending[key] = source, replaceable, updates
+                    continue
+                for deliver in updates:
+                    try:
+                        deliver()
+                    except RuntimeError:
+                        # Underlying C++ object may have been deleted
+                        pass
+        finally:
+            if updates_enabled:
+                self._widget.setUpdatesEnabled(True)
+        if self._pending:
+            self._timer.start(self.DEFERRED_CHECK_INTERVAL)
+
+    def _time_until_next_frame(self) -> int:
+        if self._last_frame is None:
+            return 0
+        frame_interval = 1.0 / self._max_fps
+        remaining = frame_interval - (time.perf_counter() - self._last_frame)
+        return max(int(remaining * 1000), 0)
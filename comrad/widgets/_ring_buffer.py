@@ -0,0 +1,278 @@
+import tempfile
+import numpy as np
+from typing import Tuple, Any, Union, Sequence, List
+
+
+class RingBuffer:
+
+    def __init__(self,
+                 capacity: int,
+                 item_shape: Tuple[int, ...] = (),
+                 dtype: Union[np.dtype, type, str] = float,
+                 memory_map: bool = False):
+        """
+        Fixed-capacity buffer that preallocates all its memory upfront and overwrites the oldest items when full.
+
+        Every item is stored twice, in the two halves of the underlying array. This doubles the memory footprint,
+        but allows :meth:`view` to always return a contiguous chronologically ordered slice, without copying data,
+        while appends remain O(1).
+
+        Args:
+            capacity: Maximum number of items kept in the buffer.
+            item_shape: Shape of a single item (empty tuple for scalars).
+            dtype: Data type of the items.
+            memory_map: Keep the storage in a memory-mapped temporary file, rather than in RAM, so that
+                        very large buffers can be paged out by the operating system.
+        """
+        if capacity <= 0:
+            raise ValueError(f'Capacity must be positive, {capacity} given')
+        self._capacity = capacity
+        shape = (2 * capacity, *item_shape)
+        if memory_map:
+            # Temporary file has no name in the file system and is removed as soon as it is closed
+            self._file = tempfile.TemporaryFile(prefix='comrad-ring-buffer-')
+            self._data = np.memmap(self._file, dtype=dtype, mode='w+', shape=shape)
+        else:
+            self._file = None
+            self._data = np.zeros(shape, dtype=dtype)
+        self._write_pos = 0
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of items kept in the buffer."""
+        return self._capacity
+
+    @property
+    def item_shape(self) -> Tuple[int, ...]:
+        """Shape of a single item."""
+        return self._data.shape[1:]
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Data type of the items."""
+        return self._data.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Amount of memory occupied by the preallocated storage."""
+        return self._data.nbytes
+
+    @property
+    def memory_mapped(self) -> bool:
+        """Storage is kept in a memory-mapped temporary file."""
+        return self._file is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, item: Any):
+        """
+        Add a single item, overwriting the oldest one, if the buffer is full.
+
+        Args:
+            item: New item, compatible with :attr:`item_shape` and :attr:`dtype`.
+        """
+        pos = self._write_pos
+        self._data[pos] = item
+        self._data[pos + self._capacity] = item
+        self._write_pos = (pos + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def extend(self, items: np.ndarray):
+        """
+        Add several items at once, using vectorized copies.
+
+        Args:
+            items: Array of new items, where the first dimension enumerates the items.
+        """
+        count = len(items)
+        if count == 0:
+            return
+        if count >= self._capacity:
+            # Only the newest items can possibly fit
+            items = items[-self._capacity:]
+            self._data[:self._capacity] = items
+            self._data[self._capacity:] = items
+            self._write_pos = 0
+            self._size = self._capacity
+            return
+        pos = self._write_pos
+        first_chunk = min(count, self._capacity - pos)
+        for offset in (0, self._capacity):
+            self._data[pos + offset:pos + offset + first_chunk] = items[:first_chunk]
+            self._data[offset:offset + count - first_chunk] = items[first_chunk:]
+        self._write_pos = (pos + count) % self._capacity
+        self._size = min(self._size + count, self._capacity)
+
+    def clear(self):
+        """Forget all items without releasing the memory."""
+        self._write_pos = 0
+        self._size = 0
+
+    def view(self) -> np.ndarray:
+        """
+        Get items in chronological order (oldest first).
+
+        Returns:
+            Read-only contiguous view of the stored items. It is valid only until the next modification of the buffer.
+        """
+        start = self._write_pos + self._capacity - self._size
+        res = self._data[start:start + self._size]
+        res.flags.writeable = False
+        return res
+
+    def last(self) -> Any:
+        """
+        Get the newest item.
+
+        Raises:
+            IndexError: Buffer is empty.
+        """
+        if self._size == 0:
+            raise IndexError('Buffer is empty')
+        return self._data[self._write_pos + self._capacity - 1]
+
+
+class ScrollingDataStore:
+
+    def __init__(self, fields: Sequence[Tuple[str, Union[np.dtype, type, str]]], capacity: int):
+        """
+        Column-oriented storage for plotting items of the scrolling plot, backed by a :class:`RingBuffer` per field.
+
+        The first field is treated as the horizontal (time) coordinate. Data is expected to arrive in chronological
+        order, which allows extracting visible ranges as contiguous views located by binary search. Data arriving
+        out of order is still accepted, but then extraction sorts (and copies) the columns.
+
+        Args:
+            fields: Names and data types of the stored columns.
+            capacity: Maximum amount of entries, after which the oldest ones get overwritten.
+        """
+        self._fields = list(fields)
+        self._buffers = [RingBuffer(capacity=capacity, dtype=dtype) for _, dtype in self._fields]
+        self._sorted = True
+
+    @property
+    def capacity(self) -> int:
+        """Maximum amount of entries."""
+        return self._buffers[0].capacity
+
+    @property
+    def fields(self) -> List[str]:
+        """Names of the stored columns."""
+        return [name for name, _ in self._fields]
+
+    @property
+    def nbytes(self) -> int:
+        """Amount of memory occupied by the preallocated storage."""
+        return sum(buffer.nbytes for buffer in self._buffers)
+
+    def __len__(self) -> int:
+        return len(self._buffers[0])
+
+    def append(self, *values: Any):
+        """
+        Add a single entry.
+
+        Args:
+            values: Values for each of the fields, in the order of :attr:`fields`.
+        """
+        x_buffer = self._buffers[0]
+        if self._sorted and len(x_buffer) > 0 and values[0] < x_buffer.last():
+            self._sorted = False
+        for buffer, value in zip(self._buffers, values):
+            buffer.append(value)
+
+    def extend(self, *columns: np.ndarray):
+        """
+        Add several entries at once, using vectorized copies.
+
+        Args:
+            columns: Arrays of values for each of the fields, in the order of :attr:`fields`.
+        """
+        x_values = np.asarray(columns[0])
+        if len(x_values) == 0:
+            return
+        x_buffer = self._buffers[0]
+        if self._sorted and ((len(x_buffer) > 0 and x_values[0] < x_buffer.last()) or np.any(np.diff(x_values) < 0)):
+            self._sorted = False
+        for buffer, col in zip(self._buffers, columns):
+            buffer.extend(np.asarray(col))
+
+    def resize(self, capacity: int):
+        """
+        Change the capacity, keeping the newest entries that fit.
+
+        Args:
+            capacity: New maximum amount of entries.
+        """
+        if capacity == self.capacity:
+            return
+        new_buffers = []
+        for buffer, (_, dtype) in zip(self._buffers, self._fields):
+            new_buffer = RingBuffer(capacity=capacity, dtype=dtype)
+            new_buffer.extend(buffer.view())
+            new_buffers.append(new_buffer)
+        self._buffers = new_buffers
+
+    def clear(self):
+        """Forget all entries without releasing the memory."""
+        for buffer in self._buffers:
+            buffer.clear()
+        self._sorted = True
+
+    def columns(self) -> Tuple[np.ndarray, ...]:
+        """
+        Get all entries sorted by the horizontal coordinate.
+
+        Returns:
+            Tuple with an array per field. Arrays are read-only views, valid until the next modification,
+            unless the data arrived out of order.
+        """
+        cols = tuple(buffer.view() for buffer in self._buffers)
+        if self._sorted:
+            return cols
+        order = np.argsort(cols[0], kind='stable')
+        return tuple(col[order] for col in cols)
+
+    def subset_for_xrange(self, start: float, end: float, interpolated: bool = False) -> Tuple[np.ndarray, ...]:
+        """
+        Get entries with the horizontal coordinate inside the given range (inclusive).
+
+        Args:
+            start: Lower bound of the range.
+            end: Upper bound of the range.
+            interpolated: Add entries exactly on the boundaries of the range, interpolated between the neighbouring
+                          entries inside and outside of the range, if there are no entries on the boundaries already.
+                          Numeric fields are interpolated linearly, other fields take the value of the outside entry.
+
+        Returns:
+            Tuple with an array per field.
+        """
+        cols = self.columns()
+        x = cols[0]
+        first = int(np.searchsorted(x, start, side='left'))
+        last = int(np.searchsorted(x, end, side='right'))
+        res = tuple(col[first:last] for col in cols)
+        if not interpolated:
+            return res
+        head = _interpolate_entry(cols, idx=first, x=start, outside=first - 1) if 0 < first < len(x) and x[first] != start else None
+        tail = _interpolate_entry(cols, idx=last - 1, x=end, outside=last) if 0 < last < len(x) and x[last - 1] != end else None
+        if head is None and tail is None:
+            return res
+        return tuple(np.concatenate([[] if head is None else [head[i]], col, [] if tail is None else [tail[i]]]).astype(col.dtype)
+                     for i, col in enumerate(res))
+
+
+def _interpolate_entry(cols: Tuple[np.ndarray, ...], idx: int, x: float, outside: int) -> List[Any]:
+    x_outside = cols[0][outside]
+    x_inside = cols[0][idx]
+    ratio = 0.0 if x_inside == x_outside else (x - x_outside) / (x_inside - x_outside)
+    entry: List[Any] = []
+    for col in cols:
+        if col.dtype.kind in 'fiu':
+            entry.append(col[outside] + (col[idx] - col[outside]) * ratio)
+        else:
+            entry.append(col[outside])
+    return entry
@@ -0,0 +1,51 @@
+from typing import Optional, Sequence, Dict, List
+
+
+def visible_rows(offset: int, viewport_extent: int, row_extent: int, count: int, overscan: int = 0) -> range:
+    """
+    Calculate rows that intersect the viewport of the list with rows of equal size.
+
+    Args:
+        offset: Scrolled distance (in pixels) from the beginning of the list.
+        viewport_extent: Size of the viewport (in pixels) along the scrolling direction.
+        row_extent: Size of a single row (in pixels), including spacing.
+        count: Amount of rows in the list.
+        overscan: Amount of extra rows taken before and after the visible ones, so that they are ready when
+                  scrolling by a small amount.
+
+    Returns:
+        Range of row indexes.
+    """
+    if count <= 0 or row_extent <= 0:
+        return range(0)
+    first = max(offset // row_extent - overscan, 0)
+    last = min((offset + max(viewport_extent, 0)) // row_extent + 1 + overscan, count)
+    return range(first, max(first, last))
+
+
+def recycle_slots(current: Sequence[Optional[int]], rows: range) -> Dict[int, int]:
+    """
+    Assign rows to the pool of reusable instances. Instances that already display one of the required rows
+    keep it, while the rest are re-pointed to the missing rows.
+
+    Args:
+        current: Row currently displayed by each instance, or ``None`` for unassigned instances.
+        rows: Rows that have to be displayed.
+
+    Returns:
+        Mapping of the instance index to the row. Instances that are not needed are not included, as well as
+        the rows that did not get an instance, when there are not enough of them.
+    """
+    assignment: Dict[int, int] = {}
+    assigned = set()
+    free: List[int] = []
+    for slot, row in enumerate(current):
+        if row is not None and row in rows and row not in assigned:
+            assignment[slot] = row
+            assigned.add(row)
+        else:
+            free.append(slot)
+    missing = (row for row in rows if row not in assigned)
+    for slot, row in zip(free, missing):
+        assignment[slot] = row
+    return assignment
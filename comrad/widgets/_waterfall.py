@@ -0,0 +1,227 @@
+import numpy as np
+from typing import Optional, Tuple, Any
+from comrad.widgets._ring_buffer import RingBuffer
+
+
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+"""Size (in bytes) of the history, above which it is kept in a memory-mapped file rather than in RAM."""
+
+_LEVELS_PADDING = 0.05
+"""Fraction of the levels range added when automatic levels have to grow, to avoid re-coloring on every small drift."""
+
+
+def argb_lookup_table(colors: np.ndarray) -> np.ndarray:
+    """
+    Pack colors into 32-bit ARGB values, that can be used directly as pixels of :class:`~PyQt5.QtGui.QImage`.
+
+    Args:
+        colors: Array of shape ``(N, 3)`` with red, green and blue components in the range 0-255.
+
+    Returns:
+        Opaque colors of shape ``(N,)``.
+    """
+    rgb = np.clip(np.asarray(colors), 0, 255).astype(np.uint32)
+    return np.uint32(0xFF000000) | (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+
+def rows_to_argb(rows: np.ndarray, levels: Tuple[float, float], lut: np.ndarray) -> np.ndarray:
+    """
+    Color values using the lookup table, mapping the lower level to the first color and the upper level
+    to the last one. Values outside of levels are clipped, invalid values get the first color.
+
+    Args:
+        rows: Values to color, of any shape.
+        levels: Lower and upper level.
+        lut: Colors produced by :func:`argb_lookup_table`.
+
+    Returns:
+        ARGB pixels of the same shape as ``rows``.
+    """
+    lower, upper = levels
+    scale = (len(lut) - 1) / (upper - lower) if upper > lower else 0.0
+    idx = (rows - lower) * scale
+    np.nan_to_num(idx, copy=False, nan=0.0, posinf=len(lut) - 1, neginf=0.0)
+    np.clip(idx, 0, len(lut) - 1, out=idx)
+    return lut[idx.astype(np.intp)]
+
+
+class WaterfallHistory:
+
+    def __init__(self, capacity: int, memory_limit: int = DEFAULT_MEMORY_LIMIT):
+        """
+        History of the last waveforms, stored as rows of an image, together with their colored representation.
+
+        Every arriving waveform is colored once, which takes time proportional to its length, and the colored rows
+        are kept in a :class:`~comrad.widgets._ring_buffer.RingBuffer`, so that the whole image can be handed to
+        the renderer as a contiguous view, without copying or re-coloring older rows. All rows are re-colored
+        only when colors or levels change.
+
+        When the history does not fit into the ``memory_limit``, it is stored in memory-mapped temporary files.
+
+        Args:
+            capacity: Amount of waveforms to keep.
+            memory_limit: Size (in bytes) of the history, above which it is memory-mapped.
+        """
+        if capacity <= 0:
+            raise ValueError(f'Capacity must be positive, {capacity} given')
+        self._capacity = capacity
+        self.memory_limit = memory_limit
+        self._values: Optional[RingBuffer] = None
+        self._pixels: Optional[RingBuffer] = None
+        self._lut = argb_lookup_table(np.repeat(np.arange(256)[:, np.newaxis], 3, axis=1))
+        self._fixed_levels: Optional[Tuple[float, float]] = None
+        self._levels: Optional[Tuple[float, float]] = None
+
+    @property
+    def capacity(self) -> int:
+        """Amount of waveforms kept in the history."""
+        return self._capacity
+
+    @property
+    def width(self) -> int:
+        """Length of the stored waveforms, or ``0`` if nothing has been stored yet."""
+        return 0 if self._values is None else self._values.item_shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the preallocated storage."""
+        return sum(buffer.nbytes for buffer in (self._values, self._pixels) if buffer is not None)
+
+    @property
+    def memory_mapped(self) -> bool:
+        """History is kept in memory-mapped temporary files."""
+        return self._values is not None and self._values.memory_mapped
+
+    @property
+    def levels(self) -> Optional[Tuple[float, float]]:
+        """Values corresponding to the first and the last color, or ``None`` if they are not known yet."""
+        return self._levels
+
+    def __len__(self) -> int:
+        return 0 if self._values is None else len(self._values)
+
+    def set_colors(self, lut: np.ndarray, levels: Optional[Tuple[float, float]] = None):
+        """
+        Change colors of the history, re-coloring all stored rows.
+
+        Args:
+            lut: Colors produced by :func:`argb_lookup_table`.
+            levels: Fixed lower and upper level, or ``None`` to derive them from the stored values.
+        """
+        self._lut = lut
+        self._fixed_levels = levels
+        self._levels = levels
+        if levels is None and len(self) > 0:
+            values = self.values()
+            self._levels = _levels_for(values[np.isfinite(values)])
+        self._recolor()
+
+    def resize(self, capacity: int):
+        """
+        Change the amount of kept waveforms, keeping the newest ones that fit.
+
+        Args:
+            capacity: New amount of waveforms.
+        """
+        if capacity <= 0:
+            raise ValueError(f'Capacity must be positive, {capacity} given')
+        if capacity == self._capacity:
+            return
+        self._capacity = capacity
+        if self._values is None:
+            return
+        values, pixels, levels = self.values(), self.image(), self._levels
+        self._allocate(self.width)
+        self._values.extend(values)
+        self._pixels.extend(pixels)
+        self._levels = levels
+
+    def append(self, row: Any):
+        """
+        Add a new waveform as the newest row. When the length of the waveform differs from the previous ones,
+        history is started over.
+
+        Args:
+            row: New waveform.
+        """
+        row = np.asarray(row, dtype=np.float32).ravel()
+        if row.size == 0:
+            return
+        if self._values is None or row.size != self.width:
+            self._allocate(row.size)
+        self._values.append(row)
+        if self._fixed_levels is None:
+            levels = _expand_levels(self._levels, row)
+            if levels != self._levels:
+                self._levels = levels
+                self._recolor()
+                return
+        self._pixels.append(rows_to_argb(row, self._levels or (0.0, 1.0), self._lut))
+
+    def clear(self):
+        """Forget all waveforms."""
+        self._values = self._pixels = None
+        self._levels = self._fixed_levels
+
+    def values(self) -> np.ndarray:
+        """
+        Stored waveforms.
+
+        Returns:
+            Read-only view of shape ``(rows, width)``, oldest first, valid until the next modification.
+        """
+        if self._values is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._values.view()
+
+    def image(self) -> np.ndarray:
+        """
+        Colored waveforms.
+
+        Returns:
+            Read-only view of ARGB pixels of shape ``(rows, width)``, oldest first, valid until the next modification.
+        """
+        if self._pixels is None:
+            return np.empty((0, 0), dtype=np.uint32)
+        return self._pixels.view()
+
+    def _allocate(self, width: int):
+        # Values and pixels are 4 bytes each, stored twice by the ring buffer
+        memory_map = self._capacity * width * 16 > self.memory_limit
+        self._values = RingBuffer(capacity=self._capacity, item_shape=(width,), dtype=np.float32, memory_map=memory_map)
+        self._pixels = RingBuffer(capacity=self._capacity, item_shape=(width,), dtype=np.uint32, memory_map=memory_map)
+        self._levels = self._fixed_levels
+
+    def _recolor(self):
+        if self._values is None or self._pixels is None:
+            return
+        values = self._values.view()
+        self._pixels.clear()
+        if len(values) > 0:
+            self._pixels.extend(rows_to_argb(values, self._levels or (0.0, 1.0), self._lut))
+
+
+def _levels_for(values: np.ndarray) -> Optional[Tuple[float, float]]:
+    if values.size == 0:
+        return None
+    return float(values.min()), float(values.max())
+
+
+def _expand_levels(levels: Optional[Tuple[float, float]], row: np.ndarray) -> Optional[Tuple[float, float]]:
+    """Grow levels, when the row does not fit into them, with extra padding."""
+    row_levels = _levels_for(row[np.isfinite(row)])
+    if row_levels is None:
+        return levels
+    if levels is None:
+        return row_levels
+    lower, upper = levels
+    row_lower, row_upper = row_levels
+    if row_lower >= lower and row_upper <= upper:
+        return levels
+    lower, upper = min(lower, row_lower), max(upper, row_upper)
+    padding = (upper - lower) * _LEVELS_PADDING
+    if row_lower < levels[0]:
+        lower -= padding
+    if row_upper > levels[1]:
+        upper += padding
+    return lower, upper
@@ -2,18 +2,25 @@
 # convention as native ComRAD widgets. This is both useful for consistency in Qt Designer widget list
 # and when instantiating them from code.
 
+import os
 import logging
-from typing import Optional, Dict, Any
-from qtpy.QtWidgets import QWidget, QFrame
-from qtpy.QtCore import Signal, Slot, Property
+from string import Template
+from typing import Optional, Dict, Any, Tuple, List
+from qtpy.QtWidgets import (QWidget, QFrame, QLabel, QAbstractButton, QScrollBar, QHBoxLayout, QVBoxLayout,
+                            QApplication)
+from qtpy.QtCore import Signal, Slot, Property, Q_ENUM, Qt, QObject, QEvent
+from qtpy.QtGui import QWheelEvent
 from pydm.widgets.template_repeater import PyDMTemplateRepeater
 from pydm.widgets.embedded_display import PyDMEmbeddedDisplay
-from pydm.utilities import is_qt_designer
+from pydm.utilities import is_qt_designer, find_file
+from pydm.display import load_file
 from pydm import Display as PyDMDisplay, config
 # from pydm import data_plugins
 # from pydm.widgets.tab_bar import PyDMTabWidget
 from comrad.data.context import CContext, CContextProvider, find_context_provider, CContextTrackingDelegate
+from comrad.data.activation import CHiddenChannels
 from comrad.widgets.widget import common_widget_repr
+from comrad.widgets._virtualization import visible_rows, recycle_slots
 from comrad._designer_utils import is_inside_designer_canvas
 
 
@@ -44,6 +51,9 @@ class CEmbeddedDisplay(PyDMEmbeddedDisplay):
 
 class CTemplateRepeater(PyDMTemplateRepeater):
 
+    _OVERSCAN_ROWS = 2
+    """Amount of extra instances created before and after the visible ones in the virtualized mode."""
+
     def __init__(self, parent: Optional[QWidget] = None, **kwargs):
         """
         Takes a template display with macro variables, and a JSON
@@ -58,12 +68,209 @@ class CTemplateRepeater(PyDMTemplateRepeater):
         amount of work: just build a template for a single magnet, and a JSON list
         with the data that describes all of the magnets.
 
+        For long lists, consider enabling :attr:`virtualized` mode.
+
         Args:
             parent: The parent of this widget.
             **kwargs: Any future extras that need to be passed down to PyDM.
         """
+        # Must exist before super init, as it calls rebuild()
+        self._virtualized = False
+        self._viewport: Optional[QWidget] = None
+        self._scrollbar: Optional[QScrollBar] = None
+        self._pool: List[_RecycledTemplateInstance] = []
+        self._row_extent = 0
         super().__init__(parent=parent, **kwargs)
 
+    def _get_virtualized(self) -> bool:
+        return self._virtualized
+
+    def _set_virtualized(self, new_val: bool):
+        if new_val != self._virtualized:
+            self._virtualized = new_val
+            self.rebuild()
+
+    virtualized: bool = Property(bool, _get_virtualized, _set_virtualized)
+    """
+    Create template instances only for the entries that are visible in the scrollable viewport (plus a few around it),
+    and reuse them while scrolling, instead of building all instances upfront. This way, startup time and the amount
+    of connections depend on the size of the viewport, rather than on the size of the data.
+
+    Macro variables defined by the data entries are not substituted when the template is loaded. Instead, they are
+    supplied as context wildcards (see :meth:`CContextFrame.updateWildcards`), re-pointing channels of the reused
+    instance to the new entry. Texts of labels and buttons are updated as well, but other
+    properties (e.g. macros of nested embedded displays) are not.
+
+    All instances must have the same size. ``Flow`` layout type is not supported in this mode. In ComRAD Designer,
+    regular mode is always used.
+    """
+
+    def rebuild(self):
+        """
+        Clear out all existing widgets, and populate the list using the template file and data source.
+        """
+        if not self._virtualization_active:
+            super().rebuild()
+            return
+        self.clear()
+        if not self.templateFilename or not self.data:
+            return
+        vertical = self.layoutType == self.LayoutType.Vertical
+        layout_class = QHBoxLayout if vertical else QVBoxLayout
+        if type(self.layout()) is not layout_class:
+            if self.layout() is not None:
+                # Trick to remove the existing layout by re-parenting it in an empty widget (same as PyDM does)
+                QWidget().setLayout(self.layout())
+            self.setLayout(layout_class(self))
+        self._viewport = QWidget(self)
+        self._viewport.installEventFilter(self)
+        self._scrollbar = QScrollBar(Qt.Vertical if vertical else Qt.Horizontal, self)
+        self._scrollbar.valueChanged.connect(lambda _: self._update_viewport())
+        self.layout().addWidget(self._viewport, 1)
+        self.layout().addWidget(self._scrollbar)
+        self._update_viewport()
+
+    def clear(self):
+        """
+        Clear out any existing instances of the template inside the widget.
+        """
+        super().clear()
+        self._pool = []
+        self._viewport = None
+        self._scrollbar = None
+        self._row_extent = 0
+
+    def count(self) -> int:
+        """
+        Amount of created template instances. In the :attr:`virtualized` mode, it can be smaller than
+        the amount of entries in the data.
+        """
+        if self._viewport is not None:
+            return len(self._pool)
+        return super().count()
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if obj is self._viewport and event.type() == QEvent.Resize:
+            self._update_viewport()
+        return super().eventFilter(obj, event)
+
+    def wheelEvent(self, event: QWheelEvent):
+        if self._scrollbar is not None:
+            QApplication.sendEvent(self._scrollbar, event)
+        else:
+            super().wheelEvent(event)
+
+    @property
+    def _virtualization_active(self) -> bool:
+        return self._virtualized and not is_qt_designer() and self.layoutType != self.LayoutType.Flow
+
+    def _update_viewport(self):
+        if self._viewport is None or self._scrollbar is None:
+            return
+        vertical = self.layoutType == self.LayoutType.Vertical
+        if not self._pool:
+            # First instance defines the size for all of them
+            self._pool.append(self._create_instance(row=0))
+        viewport_extent = self._viewport.height() if vertical else self._viewport.width()
+        spacing = self._temp_layout_spacing
+        total_extent = len(self.data) * self._row_extent - spacing
+        # Avoid recursion from the clamped value
+        self._scrollbar.blockSignals(True)
+        self._scrollbar.setRange(0, max(total_extent - viewport_extent, 0))
+        self._scrollbar.setPageStep(max(viewport_extent, 1))
+        self._scrollbar.setSingleStep(self._row_extent)
+        self._scrollbar.blockSignals(False)
+        offset = self._scrollbar.value()
+
+        rows = visible_rows(offset=offset,
+                            viewport_extent=viewport_extent,
+                            row_extent=self._row_extent,
+                            count=len(self.data),
+                            overscan=self._OVERSCAN_ROWS)
+        assignment = recycle_slots([instance.row for instance in self._pool], rows)
+        for row in rows:
+            if row not in assignment.values():
+                # Scrolled into the area that has not been covered yet, or viewport has grown
+                assignment[len(self._pool)] = row
+                self._pool.append(self._create_instance(row=row))
+        for slot, instance in enumerate(self._pool):
+            row = assignment.get(slot)
+            if row is None:
+                instance.frame.hide()
+                continue
+            instance.show_row(row, self.data[row])
+            start = row * self._row_extent - offset
+            if vertical:
+                instance.frame.setGeometry(0, start, self._viewport.width(), self._row_extent - spacing)
+            else:
+                instance.frame.setGeometry(start, 0, self._row_extent - spacing, self._viewport.height())
+            instance.frame.show()
+
+    def _create_instance(self, row: int) -> '_RecycledTemplateInstance':
+        # Wildcards must be in place before the channels get connected
+        frame = CContextFrame(self._viewport, context=CContext(wildcards=dict(self.data[row])))
+        layout = QVBoxLayout(frame)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._open_recyclable_template())
+        instance = _RecycledTemplateInstance(frame)
+        instance.show_row(row, self.data[row])
+        if not self._row_extent:
+            hint = frame.sizeHint()
+            size = hint.height() if self.layoutType == self.LayoutType.Vertical else hint.width()
+            self._row_extent = max(size, 1) + self._temp_layout_spacing
+            if self.layoutType == self.LayoutType.Vertical:
+                self._viewport.setMinimumHeight(size)
+            else:
+                self._viewport.setMinimumWidth(size)
+        return instance
+
+    def _open_recyclable_template(self) -> QWidget:
+        # Same as open_template_file, but keeps macro variables of the data entries, to be substituted
+        # via context wildcards
+        parent_display = self.find_parent_display()
+        base_path = os.path.dirname(parent_display.loaded_file()) if parent_display else None
+        fname = find_file(self.templateFilename, base_path=base_path)
+        if self._parent_macros is None:
+            self._parent_macros = parent_display.macros() if parent_display else {}
+        entry_keys = {key for variables in self.data for key in variables}
+        macros = {key: val for key, val in self._parent_macros.items() if key not in entry_keys}
+        try:
+            return load_file(fname, macros=macros, target=None)
+        except Exception as ex:  # noqa: B902
+            return QLabel(f'Error: could not load template: {ex}')
+
+
+class _RecycledTemplateInstance:
+
+    def __init__(self, frame: 'CContextFrame'):
+        """
+        Template instance of the virtualized :class:`CTemplateRepeater`, that can be re-pointed to another data entry.
+
+        Args:
+            frame: Container of the template, supplying data entry as context wildcards.
+        """
+        self.frame = frame
+        self.row: Optional[int] = None
+        self._texts = [(widget, widget.text())
+                       for widget_type in (QLabel, QAbstractButton)
+                       for widget in frame.findChildren(widget_type)
+                       if '$' in widget.text()]
+
+    def show_row(self, row: int, variables: Dict[str, Any]):
+        """
+        Re-point the instance to the given data entry.
+
+        Args:
+            row: Index of the data entry.
+            variables: Data entry.
+        """
+        if row == self.row:
+            return
+        self.row = row
+        self.frame.updateWildcards(dict(variables))
+        for widget, text in self._texts:
+            widget.setText(Template(text).safe_substitute(variables))
+
 
 # We can't subclass PyDMDisplay at this point, because load_py_file will try to look for any PyDMDisplay subclasses and
 # load them which will break the logic when constructing displays in code, because more than one subclass will be found
@@ -76,7 +283,15 @@ be integrated inside another display using :class:`CEmbeddedDisplay`.
 """
 
 
-class CContextFrame(QFrame, CContextProvider):
+class _QtDesignerHiddenChannels:
+    Inherit = 0
+    KeepActive = 1
+    Pause = 2
+
+
+class CContextFrame(QFrame, CContextProvider, _QtDesignerHiddenChannels):
+
+    Q_ENUM(_QtDesignerHiddenChannels)
 
     contextUpdated = Signal()
     """Signal to communicate to children that context needs to be updated and possibly connections need to be re-established."""
@@ -102,6 +317,8 @@ class CContextFrame(QFrame, CContextProvider):
         self._local_context.selectorChanged.connect(self.contextUpdated.emit)
         self._local_context.dataFiltersChanged.connect(self.contextUpdated.emit)
         self._local_context.inheritanceChanged.connect(self.contextUpdated.emit)
+        self._hidden_channels = CHiddenChannels.INHERIT
+        self._hidden_channels_grace_period = -1
         self._context_tracker = CContextTrackingDelegate(self)
         if not is_qt_designer() or config.DESIGNER_ONLINE:
             logger.debug(f'{self}: Installing new context tracking event handler: {self._context_tracker}')
@@ -146,6 +363,41 @@ class CContextFrame(QFrame, CContextProvider):
     """
     # TODO: Open up data filters and wildcards (similar to selector) later when proven useful.
 
+    def _get_hidden_channels(self) -> CHiddenChannels:
+        return self._hidden_channels
+
+    def _set_hidden_channels(self, new_val: CHiddenChannels):
+        self._hidden_channels = CHiddenChannels(new_val)
+
+    hiddenChannels: CHiddenChannels = Property(_QtDesignerHiddenChannels, _get_hidden_channels, _set_hidden_channels)
+    """
+    Defines whether channels of the child widgets get paused, when they stay hidden (e.g. inside inactive tabs)
+    for longer than the grace period. By default, the setting of the parent container, or the global setting of
+    :class:`~comrad.data.activation.CChannelActivationPolicy` is used.
+    """
+
+    def _get_hidden_channels_grace_period(self) -> int:
+        return self._hidden_channels_grace_period
+
+    def _set_hidden_channels_grace_period(self, new_val: int):
+        self._hidden_channels_grace_period = new_val
+
+    hiddenChannelsGracePeriod: int = Property(int, _get_hidden_channels_grace_period, _set_hidden_channels_grace_period)
+    """
+    Time (in milliseconds) that child widgets have to stay hidden before their channels get paused, when
+    :attr:`hiddenChannels` is set to ``Pause``. Negative value means the global grace period.
+    """
+
+    def hidden_channels_policy(self) -> Tuple[CHiddenChannels, int]:
+        """
+        Setting of pausing channels for the child widgets, resolved by
+        :meth:`~comrad.data.activation.CChannelActivationPolicy.settings_for`.
+
+        Returns:
+            Tuple of :attr:`hiddenChannels` and :attr:`hiddenChannelsGracePeriod`.
+        """
+        return self._hidden_channels, self._hidden_channels_grace_period
+
     @Slot(dict)
     def updateWildcards(self, wildcards: Dict[str, Any]):
         """
@@ -5,10 +5,13 @@ import copy
 import functools
 import json
 import logging
+import math
+import time
+import zlib
 from collections import OrderedDict
 from collections.abc import Sized
 from enum import Enum
-from typing import cast, Type, Optional, Union, List, Dict, Iterable, Any, Tuple
+from typing import cast, Type, Optional, Union, List, Dict, Iterable, Any, Tuple, Callable
 
 import numpy as np
 import pyqtgraph as pg
@@ -24,21 +27,42 @@ from accwidgets.graph import (PlottingItemDataFactory, UpdateSource, PointData,
                               ScrollingPlotWidget, CyclicPlotWidget, ScrollingTimestampMarker, BarCollectionData,
                               LiveTimestampMarkerDataModel, StaticBarGraphItem, StaticTimestampMarker, CurveData,
                               StaticInjectionBarGraphItem, TimestampMarkerCollectionData, InjectionBarCollectionData,
-                              PlottingItemData)
-# from pydm.widgets.image import PyDMImageView
+                              PlottingItemData, LiveBarGraphDataModel, ExPlotWidgetConfig)
+from pydm.widgets.image import PyDMImageView, ReadingOrder
+from pydm.widgets.colormaps import cmaps, PyDMColorMap
 from pydm.widgets.baseplot import BasePlotCurveItem, PyDMPrimitiveWidget
 from pydm.widgets.channel import PyDMChannel
-from qtpy.QtCore import Property, QObject, Signal, Qt
-from qtpy.QtGui import QColor, QPen, QBrush
+from qtpy.QtCore import Property, QObject, Signal, Slot, Qt, QRectF, Q_ENUM
+from qtpy.QtGui import QColor, QPen, QBrush, QPaintEvent, QPainter
 from qtpy.QtWidgets import QWidget
 
+from comrad.instrumentation import InstrumentationRegistry
 from comrad.data.channel import CChannelData, CContext, CChannel
 from comrad.generics import GenericQObjectMeta
 from comrad.widgets.widget import common_widget_repr, CContextEnabledObject, _factory_channel_setter, _channel_getter
+from comrad.widgets.mixins import CWidgetRulesMixin, CCustomizedTooltipMixin, CHideUnusedFeaturesMixin
+from comrad.widgets._decimation import DecimationPyramid
+from comrad.widgets._ring_buffer import ScrollingDataStore
+from comrad.widgets._render_scheduler import RenderScheduler, RenderTimeHistogram
+from comrad.widgets._image import LevelsCache, frame_to_image, viewport_slices
+from comrad.widgets._waterfall import WaterfallHistory, argb_lookup_table
 
 logger = logging.getLogger(__name__)
 
 
+_DEFAULT_DECIMATION_WIDTH = 2000
+"""Amount of horizontal pixels assumed for decimation, when the curve is not displayed yet."""
+
+_SCROLLING_CAPACITY_MARGIN = 1.2
+"""Extra room in scrolling buffers, to tolerate update rates slightly higher than expected."""
+
+_REPLACEABLE_DATA_TYPES = (CurveData, BarCollectionData, InjectionBarCollectionData, TimestampMarkerCollectionData)
+"""Data types that replace the whole contents of the item, rather than appending to it."""
+
+_DEFAULT_WATERFALL_HISTORY = 100
+"""Amount of waveforms displayed by the waterfall plot by default."""
+
+
 class ColumnNames(Enum):
     """Column names as strings for the plotting item editor dialog's table."""
 
@@ -51,6 +75,7 @@ class ColumnNames(Enum):
     SYMBOL_SIZE = 'Symbol Size'
     LAYER = 'Layer'
     STYLE = 'Style'
+    DECIMATION = 'Decimation'
 
 
 class PlottingItemTypes(Enum):
@@ -60,6 +85,15 @@ class PlottingItemTypes(Enum):
     BAR_GRAPH = 'Bar Graph'
     INJECTION_BAR_GRAPH = 'Injection Bar Graph'
     TIMESTAMP_MARKERS = 'Timestamp Marker'
+    WATERFALL = 'Waterfall'
+
+
+class DecimationMode(Enum):
+    """String values representing methods for reducing the amount of rendered points of large waveforms."""
+
+    NONE = 'None'
+    MIN_MAX = 'Min/Max'
+    LTTB = 'LTTB'
 
 
 class PyDMChannelDataSource(UpdateSource, CContextEnabledObject):
@@ -83,9 +117,15 @@ class PyDMChannelDataSource(UpdateSource, CContextEnabledObject):
             parent.sig_context_changed.connect(self.context_changed)
         CContextEnabledObject.__init__(self)
         self._data_type_to_emit = data_type_to_emit
+        self.replaceable: bool = data_type_to_emit in _REPLACEABLE_DATA_TYPES
+        """
+        Every emitted value replaces the whole contents of the item, therefore values can be skipped when they
+        arrive faster than the plot is repainted.
+        """
 
         # Save last state to check if new value contains any changes
-        self._last_value: Union[List[int], List[float], None] = None
+        self._last_value: Union[List[int], List[float], np.ndarray, None] = None
+        self._last_key: Optional[Tuple[Any, ...]] = None
         self._transform = PlottingItemDataFactory.get_transformation(self._data_type_to_emit)
         self.address = channel_address
 
@@ -143,41 +183,98 @@ class PyDMChannelDataSource(UpdateSource, CContextEnabledObject):
         """
         if not isinstance(packet, CChannelData):
             return
-        value = self._to_list_and_check_value_change(packet.value)
+        registry = InstrumentationRegistry.instance()
+        start = time.perf_counter() if registry.enabled else None
+        value = self._to_list_and_check_value_change(packet.value, header=packet.meta_info)
+        plot = self.parent()
         if value is not None:
             if PlottingItemDataFactory.should_unwrap(value, self._data_type_to_emit):
                 envelope = self._transform(*value)
             else:
                 envelope = self._transform(value)
-            self.sig_new_data[self._data_type_to_emit].emit(envelope)
+            if isinstance(plot, CPlotWidgetBase) and plot.render_scheduler.enabled:
+                plot.render_scheduler.schedule(source=self,
+                                               deliver=functools.partial(self._emit_envelope, envelope),
+                                               replaceable=self.replaceable)
+            else:
+                self._emit_envelope(envelope)
+        if start is not None:
+            registry.record_widget_update(plot, time.perf_counter() - start)
+
+    def _emit_envelope(self, envelope: PlottingItemData):
+        self.sig_new_data[self._data_type_to_emit].emit(envelope)
 
-    def _to_list_and_check_value_change(self, value: Union[float, int, Iterable[float], Iterable[int], None]) -> Union[List[int], List[float], None]:
+    def _to_list_and_check_value_change(self,
+                                        value: Union[float, int, Iterable[float], Iterable[int], None],
+                                        header: Optional[Dict[str, Any]] = None) -> Union[List[int], List[float], np.ndarray, None]:
         """
         Transform the passed values to a list and check if the values are have been
         received before.
 
+        To avoid comparing and copying large arrays, change is detected using the timestamps from the header,
+        or a checksum of the array contents when timestamps are not available. Arrays are never copied or converted
+        to lists, but passed further as read-only views instead. Such view only prevents the plotting items from
+        modifying the array: whoever owns the original array can still change it in place, which also changes
+        the stored last value.
+
+        Args:
+            value: Incoming value.
+            header: Meta-information that arrived with the value.
+
         Returns:
-             Values as a list or None, if the values have been received before.
+             Values as a list (or array) or None, if the values have been received before.
         """
         if value is None or (isinstance(value, Sized) and len(value) == 0):
             # logger.info(f'Data {value} could not be properly interpreted and will be dropped.')
             return None
+        key = _value_change_key(value, header)
         if self._last_value is not None:
-            if isinstance(value, np.ndarray) and isinstance(self._last_value, np.ndarray):
+            if key is not None and self._last_key is not None:
+                if key == self._last_key:
+                    return None
+            elif isinstance(value, np.ndarray) and isinstance(self._last_value, np.ndarray):
                 if np.array_equal(value, self._last_value):
                     return None
             elif value == self._last_value:
                 return None
-        if isinstance(value, (int, float)):
+        if isinstance(value, (int, float, np.number)):
             value = [value]
         elif isinstance(value, tuple):
             value = list(value)
+        elif isinstance(value, np.ndarray) and value.flags.writeable:
+            # Read-only view instead of a copy keeps consumers from modifying the array. The original array
+            # remains writeable by its owner, hence the change detection prefers the key computed above.
+            value = value.view()
+            value.flags.writeable = False
         # Cast for typing hints
         value = cast(List[float], value)
-        self._last_value = copy.copy(value)
+        self._last_value = value if isinstance(value, np.ndarray) else copy.copy(value)
+        self._last_key = key
         return value
 
 
+def _value_change_key(value: Any, header: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, ...]]:
+    """
+    Cheap identity of the value that allows detecting repeated values without comparing them element by element.
+
+    Args:
+        value: Incoming value.
+        header: Meta-information that arrived with the value.
+
+    Returns:
+        Tuple identifying the value, or ``None`` if it is cheaper to compare values directly.
+    """
+    if not isinstance(value, np.ndarray):
+        return None
+    if header:
+        stamps = (header.get('acqStamp'), header.get('cycleStamp'))
+        if any(stamp is not None for stamp in stamps):
+            return ('stamps', *stamps)
+    if value.dtype.hasobject or not value.flags.c_contiguous:
+        return None
+    return 'checksum', value.shape, value.dtype.str, zlib.crc32(value.data.cast('B'))
+
+
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~ Base Classes ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 
@@ -185,6 +282,9 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
 
     ITEM_TYPES: Dict[str, Type[DataModelBasedItem]] = {}
 
+    _DEFAULT_ITEM_STYLE: str = PlottingItemTypes.LINE_GRAPH.value
+    """Style of the items that are restored from the :attr:`curves` property without an explicit style."""
+
     # Which data structure is emitted on which plotting item style
     _SOURCE_EMIT_TYPE: Dict[str, Type[PlottingItemData]] = {
         PlottingItemTypes.LINE_GRAPH.value: PointData,
@@ -223,11 +323,55 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
                            f'Use {CPlotWidgetBase.__name__} only as base class of classes '
                            f'derived from {ExPlotWidget.__name__}.')
         self._items: List[CItemPropertiesBase] = []
+        self._render_time_histogram = RenderTimeHistogram()
 
     def context_changed(self):
         # Pass the notification further to the interested data sources
         self.sig_context_changed.emit()
 
+    @property
+    def render_scheduler(self) -> RenderScheduler:
+        """Scheduler batching updates of all plotting items into a single repaint per frame."""
+        try:
+            return self._render_scheduler
+        except AttributeError:
+            # Created lazily, as the underlying Qt object may not be ready during the construction
+            self._render_scheduler = RenderScheduler(widget=cast(QWidget, self),
+                                                     is_source_visible=self._is_data_source_visible)
+            return self._render_scheduler
+
+    @property
+    def render_time_histogram(self) -> RenderTimeHistogram:
+        """Histogram of the time spent repainting the plot."""
+        return self._render_time_histogram
+
+    def _get_max_fps(self) -> int:
+        return self.render_scheduler.max_fps
+
+    def _set_max_fps(self, new_val: int):
+        self.render_scheduler.max_fps = new_val
+
+    maxFps = Property(int, fget=_get_max_fps, fset=_set_max_fps)
+    """
+    Maximum amount of repaints per second. When set to a positive value, updates arriving from all
+    channels are collected and applied together, once per frame, resulting in a single repaint. Updates of
+    hidden items that replace their whole contents (e.g. waveforms) are postponed until the items are shown.
+    ``0`` applies every update immediately.
+    """
+
+    def paintEvent(self, event: QPaintEvent):
+        start = time.perf_counter()
+        super().paintEvent(event)  # type: ignore
+        self._render_time_histogram.record((time.perf_counter() - start) * 1000)
+
+    def _is_data_source_visible(self, data_source: QObject) -> bool:
+        if not cast(QWidget, self).isVisible():
+            return False
+        for item in self._items:
+            if item.data_source is data_source:
+                return cast(DataModelBasedItem, item).isVisible()
+        return True
+
     @property
     def _items_checked(self):
         """
@@ -254,6 +398,7 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
                                                line_width=item.line_width,
                                                symbol=item.symbol,
                                                symbol_size=item.symbol_size,
+                                               decimation=item.decimation,
                                                layer=None)
         # Force to re-add all elements
         return self._items
@@ -458,7 +603,8 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
                                   line_style: Optional[Qt.PenStyle] = None,
                                   line_width: Union[float, int, None] = None,
                                   symbol: Optional[str] = None,
-                                  symbol_size: Optional[int] = None) -> 'CItemPropertiesBase':
+                                  symbol_size: Optional[int] = None,
+                                  decimation: Optional[str] = None) -> 'CItemPropertiesBase':
         """
         Add a new item attached to a channel to the plot.
 
@@ -474,6 +620,8 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
             symbol : symbol to use as markers representing data (if it is supported
                      by the item)
             symbol_size : How big the symbols should be
+            decimation: method to reduce the amount of rendered points of large waveforms (if it is supported
+                        by the item), see :class:`DecimationMode` for values
             layer: identifier for the layer the item should be added to
             index: index for the plot widgets list of added items (position is
                    important for the positioning in the table)
@@ -504,7 +652,8 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
                                           line_style=line_style,
                                           line_width=line_width,
                                           symbol=symbol,
-                                          symbol_size=symbol_size)
+                                          symbol_size=symbol_size,
+                                          decimation=decimation)
         self._add_created_item(new_item=new_item,
                                layer=layer,
                                index=index)
@@ -540,7 +689,8 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
                                      symbol: Optional[str] = None,
                                      symbol_size: Optional[int] = None,
                                      line_style: Optional[Qt.PenStyle] = None,
-                                     line_width: Union[float, int, None] = None):
+                                     line_width: Union[float, int, None] = None,
+                                     decimation: Optional[str] = None):
         """Set the items styling properties according to the passed values."""
         if color is not None:
             item.color = color
@@ -554,6 +704,8 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
             item.line_style = line_style
         if line_width is not None:
             item.line_width = line_width
+        if decimation is not None:
+            item.decimation = decimation
 
     def _create_fitting_item(self,
                              data_source: 'PyDMChannelDataSource',
@@ -644,7 +796,7 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
             # Fish out invalid layers before adding
             if layer is not None and layer not in cast(ExPlotWidgetProperties, self).layerIDs:
                 layer = None
-            self.add_channel_attached_item(style=item.get('style', PlottingItemTypes.LINE_GRAPH.value),
+            self.add_channel_attached_item(style=item.get('style', self._DEFAULT_ITEM_STYLE),
                                            channel_address=item.get('channel', ''),
                                            name=item.get('name'),
                                            color=item.get('color'),
@@ -652,6 +804,7 @@ class CPlotWidgetBase(PyDMPrimitiveWidget, metaclass=GenericQObjectMeta):
                                            line_width=item.get('line_width'),
                                            symbol=item.get('symbol'),
                                            symbol_size=item.get('symbol_size'),
+                                           decimation=item.get('decimation'),
                                            layer=layer)
 
     curves = Property(type='QStringList', fget=_get_items, fset=_set_items, designable=False)
@@ -692,6 +845,10 @@ class CItemPropertiesBase(abc.ABC):
         PlottingItemTypes.INJECTION_BAR_GRAPH.value,
         PlottingItemTypes.TIMESTAMP_MARKERS.value,
     ]
+    decimations: List[str] = [e.value for e in DecimationMode]
+
+    supports_decimation: bool = False
+    """Item is able to reduce the amount of rendered points, according to :attr:`decimation`."""
 
     def __init__(self, related_base_class: Type, related_concrete_class: Type):
         """
@@ -758,6 +915,9 @@ class CItemPropertiesBase(abc.ABC):
             ('symbol', self.symbol),
             ('symbol_size', self.symbol_size),
         ]
+        if self.decimation != DecimationMode.NONE.value:
+            # Omitted by default to keep the representation of existing items unchanged
+            kv_pairs.append(('decimation', self.decimation))
         return OrderedDict(kv_pairs)
 
     # Properties with implementation shareable through all subclasses
@@ -899,6 +1059,23 @@ class CItemPropertiesBase(abc.ABC):
         if new_size >= 0:
             self._symbol_size = new_size
 
+    @property
+    def decimation(self) -> str:
+        """
+        Method to reduce the amount of rendered points of large waveforms (if supported).
+        Must be a value from the :class:`DecimationMode` enum.
+        """
+        return getattr(self, '_decimation', DecimationMode.NONE.value)
+
+    @decimation.setter
+    def decimation(self, new_decimation: str):
+        """
+        Method to reduce the amount of rendered points of large waveforms (if supported).
+        Must be a value from the :class:`DecimationMode` enum.
+        """
+        if new_decimation in self.decimations:
+            self._decimation = new_decimation
+
 
 class CCurvePropertiesBase(CItemPropertiesBase):
 
@@ -1351,6 +1528,106 @@ class CScrollingTimestampMarker(ScrollingTimestampMarker, CTimestampMarkerProper
                                                                    line_width=line_width)
 
 
+class _ScrollingStoreMixin:
+
+    _STORE_FIELDS: List[Tuple[str, Any]] = []
+
+    def _init_store(self, capacity: Callable[[], int]):
+        """
+        Shared logic of the data models that keep scrolling data in preallocated ring buffers
+        (see :class:`~comrad.widgets._ring_buffer.ScrollingDataStore`), rather than accwidgets data buffers.
+
+        Buffers are allocated when the first value arrives, so that the capacity reflects the final configuration
+        of the plot (e.g. when the time span is set after the item has been created).
+
+        Args:
+            capacity: Callable returning the amount of entries to preallocate.
+        """
+        self._capacity_getter = capacity
+        self._store: Optional[ScrollingDataStore] = None
+
+    @property
+    def store(self) -> Optional[ScrollingDataStore]:
+        """Storage of the received data, or ``None`` if no data has been received yet."""
+        return self._store
+
+    def update_capacity(self):
+        """Resize the preallocated buffers, when the expected amount of data changes."""
+        if self._store is not None:
+            self._store.resize(self._capacity_getter())
+
+    def _handle_data_update(self, data: PlottingItemData):
+        if self._store is None:
+            self._store = ScrollingDataStore(fields=self._STORE_FIELDS, capacity=self._capacity_getter())
+        self._store.append(*(getattr(data, name) for name, _ in self._STORE_FIELDS))
+        cast(LiveCurveDataModel, self).sig_data_model_changed.emit()
+
+    def subset_for_xrange(self, start: float, end: float, interpolated: bool = False, *_, **__) -> Tuple[np.ndarray, ...]:
+        if self._store is None:
+            return self._empty_columns()
+        return self._store.subset_for_xrange(start=start, end=end, interpolated=interpolated)
+
+    @property
+    def full_data_buffer(self) -> Tuple[np.ndarray, ...]:
+        if self._store is None:
+            return self._empty_columns()
+        return self._store.columns()
+
+    def _empty_columns(self) -> Tuple[np.ndarray, ...]:
+        return tuple(np.array([], dtype=dtype) for _, dtype in self._STORE_FIELDS)
+
+
+class CScrollingCurveDataModel(_ScrollingStoreMixin, LiveCurveDataModel):
+
+    _STORE_FIELDS = [('x', float), ('y', float)]
+
+    def __init__(self, data_source: UpdateSource, capacity: Callable[[], int]):
+        """
+        Data model of :class:`CScrollingCurve` that keeps points in preallocated ring buffers.
+
+        Args:
+            data_source: Source emitting :class:`~accwidgets.graph.PointData`.
+            capacity: Callable returning the amount of points to preallocate.
+        """
+        self._init_store(capacity)
+        # Original buffer is bypassed, hence it is kept minimal
+        LiveCurveDataModel.__init__(self, data_source=data_source, buffer_size=1)
+
+
+class CScrollingBarGraphDataModel(_ScrollingStoreMixin, LiveBarGraphDataModel):
+
+    _STORE_FIELDS = [('x', float), ('y', float), ('height', float)]
+
+    def __init__(self, data_source: UpdateSource, capacity: Callable[[], int]):
+        """
+        Data model of :class:`CScrollingBarGraph` that keeps bars in preallocated ring buffers.
+
+        Args:
+            data_source: Source emitting :class:`~accwidgets.graph.BarData`.
+            capacity: Callable returning the amount of bars to preallocate.
+        """
+        self._init_store(capacity)
+        # Original buffer is bypassed, hence it is kept minimal
+        LiveBarGraphDataModel.__init__(self, data_source=data_source, buffer_size=1)
+
+
+class CScrollingInjectionBarDataModel(_ScrollingStoreMixin, LiveInjectionBarDataModel):
+
+    _STORE_FIELDS = [('x', float), ('y', float), ('height', float), ('width', float), ('label', object)]
+
+    def __init__(self, data_source: UpdateSource, capacity: Callable[[], int]):
+        """
+        Data model of :class:`CScrollingInjectionBarGraph` that keeps injection bars in preallocated ring buffers.
+
+        Args:
+            data_source: Source emitting :class:`~accwidgets.graph.InjectionBarData`.
+            capacity: Callable returning the amount of injection bars to preallocate.
+        """
+        self._init_store(capacity)
+        # Original buffer is bypassed, hence it is kept minimal
+        LiveInjectionBarDataModel.__init__(self, data_source=data_source, buffer_size=1)
+
+
 class CScrollingPlot(CPlotWidgetBase, ScrollingPlotWidget):
 
     ITEM_TYPES = {
@@ -1360,6 +1637,12 @@ class CScrollingPlot(CPlotWidgetBase, ScrollingPlotWidget):
         PlottingItemTypes.TIMESTAMP_MARKERS.value: CScrollingTimestampMarker,
     }
 
+    _SCROLLING_DATA_MODELS: Dict[str, Type[_ScrollingStoreMixin]] = {
+        PlottingItemTypes.LINE_GRAPH.value: CScrollingCurveDataModel,
+        PlottingItemTypes.BAR_GRAPH.value: CScrollingBarGraphDataModel,
+        PlottingItemTypes.INJECTION_BAR_GRAPH.value: CScrollingInjectionBarDataModel,
+    }
+
     def __init__(self,
                  parent: QWidget = None,
                  background: str = 'default',
@@ -1372,6 +1655,9 @@ class CScrollingPlot(CPlotWidgetBase, ScrollingPlotWidget):
         Plot widget for displaying scrolling curves, bar graphs and other
         plotting items.
 
+        When :attr:`expectedRate` is set, items keep their data in ring buffers preallocated for the whole
+        time span, instead of the default accwidgets buffers.
+
         Args:
             parent: Parent item for the Plot
             background: Background color for the Plot
@@ -1385,6 +1671,73 @@ class CScrollingPlot(CPlotWidgetBase, ScrollingPlotWidget):
                                      timing_source=timing_source,
                                      **plotitem_kwargs)
         CPlotWidgetBase.__init__(self)
+        self._expected_rate: float = 0.0
+
+    def _get_expected_rate(self) -> float:
+        return self._expected_rate
+
+    def _set_expected_rate(self, new_val: float):
+        new_val = max(float(new_val), 0.0)
+        if new_val == self._expected_rate:
+            return
+        store_toggled = (new_val > 0) != (self._expected_rate > 0)
+        self._expected_rate = new_val
+        if store_toggled:
+            # Items need to be recreated with different data models
+            if self._items:
+                self._set_items(self._get_items())
+            return
+        self._update_capacities()
+
+    expectedRate = Property(float, fget=_get_expected_rate, fset=_set_expected_rate)
+    """
+    Expected update rate (in Hz) of the connected channels. When set to a positive value, plotting items
+    keep their data in ring buffers preallocated for the whole time span (with a small margin), which avoids
+    memory reallocations when displaying long time spans at high rates. ``0`` keeps the default buffers.
+    """
+
+    def buffer_capacity(self) -> int:
+        """
+        Amount of entries preallocated for every plotting item, derived from the time span and :attr:`expectedRate`.
+        When the time span is not finite, the default buffer size is used.
+        """
+        span = getattr(self.plotItem, 'time_span', None)
+        size = getattr(span, 'size', None)
+        if self._expected_rate <= 0 or size is None or not math.isfinite(size) or size <= 0:
+            return DEFAULT_BUFFER_SIZE
+        return int(math.ceil(size * self._expected_rate * _SCROLLING_CAPACITY_MARGIN)) + 1
+
+    def _get_time_span(self) -> float:
+        return ScrollingPlotWidget.timeSpan.fget(self)
+
+    def _set_time_span(self, new_val: float):
+        ScrollingPlotWidget.timeSpan.fset(self, new_val)
+        self._update_capacities()
+
+    timeSpan = Property(float, fget=_get_time_span, fset=_set_time_span)
+    """Overridden property to resize preallocated buffers of the plotting items, when the time span changes."""
+
+    def update_config(self, config: ExPlotWidgetConfig):
+        """Overridden method to resize preallocated buffers of the plotting items, when the time span changes."""
+        ScrollingPlotWidget.update_config(self, config)
+        self._update_capacities()
+
+    def _update_capacities(self):
+        for item in self._items:
+            model = cast(DataModelBasedItem, item).model()
+            if isinstance(model, _ScrollingStoreMixin):
+                model.update_capacity()
+
+    def _create_fitting_item(self,
+                             data_source: PyDMChannelDataSource,
+                             style: str = PlottingItemTypes.LINE_GRAPH.value) -> CItemPropertiesBase:
+        style = style or PlottingItemTypes.LINE_GRAPH.value
+        model_type = self._SCROLLING_DATA_MODELS.get(style)
+        if self._expected_rate <= 0 or model_type is None:
+            return super()._create_fitting_item(data_source=data_source, style=style)
+        item_type = self.ITEM_TYPES[style]
+        data_model = cast(Callable, model_type)(data_source=data_source, capacity=self.buffer_capacity)
+        return item_type(plot_item=self.plotItem, data_model=data_model)
 
 
 # ~~~~~~~~~~~~~~~~~~~~~~ Cyclic Plotting Items ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -1461,6 +1814,8 @@ class CCyclicPlot(CPlotWidgetBase, CyclicPlotWidget):
 
 class CStaticCurve(StaticPlotCurve, CCurvePropertiesBase):
 
+    supports_decimation = True
+
     def __init__(self,
                  plot_item: ExPlotItem,
                  data_model: Union[LiveCurveDataModel, UpdateSource],
@@ -1472,6 +1827,11 @@ class CStaticCurve(StaticPlotCurve, CCurvePropertiesBase):
         Static Curve for a static plot widget that
         receives its data through a :class:`~pydm.widgets.channel.PyDMChannel`.
 
+        Large waveforms can be decimated before rendering (see :attr:`decimation`), so that only a few points
+        per horizontal pixel are handed to the plot. Decimation is recomputed when the visible range changes,
+        from a multi-resolution summary of the last waveform, which keeps rendering time bounded
+        regardless of the waveform size.
+
         Args:
             plot_item: plot item that the item will be added to
             data_model: Either an Update Source or a already initialized data
@@ -1481,6 +1841,9 @@ class CStaticCurve(StaticPlotCurve, CCurvePropertiesBase):
             line_style: style of the lines of them item
             kwargs: further keyword arguments for the base class
         """
+        self._raw_data: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._decimation_source: Optional[DecimationPyramid] = None
+        self._rendering_decimated = False
         StaticPlotCurve.__init__(self,
                                  plot_item=plot_item,
                                  data_model=data_model,
@@ -1494,6 +1857,77 @@ class CStaticCurve(StaticPlotCurve, CCurvePropertiesBase):
                                                          line_style=line_style,
                                                          line_width=line_width)
 
+    @property
+    def decimation(self) -> str:
+        """
+        Method to reduce the amount of rendered points of large waveforms.
+        Must be a value from the :class:`DecimationMode` enum.
+        """
+        return CCurvePropertiesBase.decimation.fget(self)  # type: ignore
+
+    @decimation.setter
+    def decimation(self, new_decimation: str):
+        """
+        Method to reduce the amount of rendered points of large waveforms.
+        Must be a value from the :class:`DecimationMode` enum.
+        """
+        prev_decimation = self.decimation
+        CCurvePropertiesBase.decimation.fset(self, new_decimation)  # type: ignore
+        if self.decimation != prev_decimation and self._raw_data is not None:
+            self._render_data()
+
+    def setData(self, *args, **kwargs):
+        """
+        Intercept the full waveform, so that only its decimated version reaches the plot.
+        Calls with arguments other than horizontal and vertical coordinates are passed through unchanged.
+        """
+        x, y = None, None
+        if len(args) == 2 and not kwargs:
+            x, y = args
+        elif not args and kwargs.keys() == {'x', 'y'}:
+            x, y = kwargs['x'], kwargs['y']
+        self._decimation_source = None
+        if x is None or y is None:
+            self._raw_data = None
+            StaticPlotCurve.setData(self, *args, **kwargs)
+            return
+        self._raw_data = np.asarray(x), np.asarray(y)
+        self._render_data()
+
+    def viewRangeChanged(self):
+        """Recalculate decimation for the new visible range."""
+        super().viewRangeChanged()
+        if self._raw_data is not None and self.decimation != DecimationMode.NONE.value and not self._rendering_decimated:
+            self._render_data()
+
+    def _render_data(self):
+        x, y = cast(Tuple[np.ndarray, np.ndarray], self._raw_data)
+        mode = self.decimation
+        if mode == DecimationMode.NONE.value or len(y) == 0 or x.shape != y.shape or x.ndim != 1:
+            StaticPlotCurve.setData(self, x, y)
+            return
+        if self._decimation_source is None:
+            self._decimation_source = DecimationPyramid(x, y)
+        source = self._decimation_source
+        start, stop, width = 0, len(source), _DEFAULT_DECIMATION_WIDTH
+        view_box = self.getViewBox()
+        if view_box is not None:
+            width = int(view_box.width()) or width
+            log_x = self.opts.get('logMode', [False, False])[0]
+            # With auto-range, clipping to the current range would prevent the view from ever expanding
+            if not view_box.autoRangeEnabled()[0] and not log_x:
+                x_min, x_max = view_box.viewRange()[0]
+                start, stop = source.index_range(x_min, x_max)
+        if mode == DecimationMode.LTTB.value:
+            x, y = source.lttb(start=start, stop=stop, points=width)
+        else:
+            x, y = source.min_max(start=start, stop=stop, buckets=width)
+        self._rendering_decimated = True
+        try:
+            StaticPlotCurve.setData(self, x, y)
+        finally:
+            self._rendering_decimated = False
+
 
 class CStaticBarGraph(StaticBarGraphItem, CBarGraphPropertiesBase):
 
@@ -1637,37 +2071,526 @@ class CStaticPlot(CPlotWidgetBase, StaticPlotWidget):
                                   **plotitem_kwargs)
         CPlotWidgetBase.__init__(self)
 
-# TODO: Make available when proven useful
-# class CImageView(CWidgetRulesMixin, CCustomizedTooltipMixin, CHideUnusedFeaturesMixin, PyDMImageView):
-#
-#     def __init__(self,
-#                  parent: Optional[QWidget] = None,
-#                  image_channel: Optional[str] = None,
-#                  width_channel: Optional[str] = None,
-#                  **kwargs):
-#         """
-#         A :class:`pyqtgraph.ImageView` subclass with support for CS Channels.
-#
-#         If there is no :attr:`widthChannel` it is possible to define the width of
-#         the image with the :attr:`width` property.
-#
-#         The :attr:`normalizeData` property defines if the colors of the images are
-#         relative to the :attr:`colorMapMin` and :attr:`colorMapMax` property or to
-#         the minimum and maximum values of the image.
-#
-#         Use the :attr:`newImageSignal` to hook up to a signal that is emitted when a new
-#         image is rendered in the widget.
-#
-#         Args:
-#             parent: The parent widget for the image view.
-#             image_channel: The channel to be used by the widget for the image data.
-#             width_channel: The channel to be used by the widget to receive the image width information.
-#             **kwargs: Any future extras that need to be passed down to PyDM.
-#         """
-#         CWidgetRulesMixin.__init__(self)
-#         CCustomizedTooltipMixin.__init__(self)
-#         CHideUnusedFeaturesMixin.__init__(self)
-#         PyDMImageView.__init__(self, parent=parent, image_channel=image_channel, width_channel=width_channel, **kwargs)
-#
-#     def default_rule_channel(self) -> str:
-#         return self.imageChannel
+
+# ~~~~~~~~~~~~~~~~~~~~~ Waterfall Plot ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+
+class CWaterfallDataModel(QObject):
+
+    sig_data_model_changed = Signal()
+    """Emitted when a new waveform has been added to the history or when the history has been re-colored."""
+
+    def __init__(self, data_source: UpdateSource, history_length: int = _DEFAULT_WATERFALL_HISTORY):
+        """
+        Data model of :class:`CWaterfallItem` that keeps the last waveforms emitted by the data source
+        as rows of an image (see :class:`~comrad.widgets._waterfall.WaterfallHistory`).
+
+        Args:
+            data_source: Source emitting :class:`~accwidgets.graph.CurveData`.
+            history_length: Amount of waveforms to keep.
+        """
+        super().__init__()
+        self.data_source = data_source
+        self.history = WaterfallHistory(capacity=history_length)
+        self._x_range: Optional[Tuple[float, float]] = None
+        data_source.sig_new_data[CurveData].connect(self._handle_data_update)
+
+    @property
+    def x_range(self) -> Optional[Tuple[float, float]]:
+        """Horizontal coordinates of the first and the last point of the newest waveform."""
+        return self._x_range
+
+    def set_history_length(self, history_length: int):
+        """
+        Change the amount of kept waveforms, keeping the newest ones that fit.
+
+        Args:
+            history_length: New amount of waveforms.
+        """
+        self.history.resize(history_length)
+        self.sig_data_model_changed.emit()
+
+    def set_colors(self, lut: np.ndarray, levels: Optional[Tuple[float, float]]):
+        """
+        Re-color the history.
+
+        Args:
+            lut: Colors produced by :func:`~comrad.widgets._waterfall.argb_lookup_table`.
+            levels: Fixed lower and upper level, or ``None`` to derive them from the data.
+        """
+        self.history.set_colors(lut=lut, levels=levels)
+        self.sig_data_model_changed.emit()
+
+    def _handle_data_update(self, data: CurveData):
+        x = np.asarray(data.x)
+        self.history.append(data.y)
+        self._x_range = (float(x[0]), float(x[-1])) if len(x) > 0 else None
+        self.sig_data_model_changed.emit()
+
+
+class CWaterfallPropertiesBase(CItemPropertiesBase):
+
+    def __init__(self):
+        """
+        Base class for waterfall properties. Waterfall is colored using the color map of the plot, hence color
+        and line related properties are only saved, to not loose them when switching between item styles.
+        """
+        super().__init__(related_base_class=pg.GraphicsObject, related_concrete_class=CWaterfallItem)
+
+    @property
+    def style_string(self) -> str:
+        return PlottingItemTypes.WATERFALL.value
+
+
+class CWaterfallItem(pg.GraphicsObject, CWaterfallPropertiesBase, metaclass=GenericQObjectMeta):
+
+    def __init__(self,
+                 plot_item: ExPlotItem,
+                 data_model: Union[CWaterfallDataModel, UpdateSource],
+                 history_length: int = _DEFAULT_WATERFALL_HISTORY,
+                 **_):
+        """
+        Waterfall item for a waterfall plot widget that receives its data through
+        a :class:`~pydm.widgets.channel.PyDMChannel`.
+
+        Every waveform is displayed as a row of colored pixels. The newest waveform is on the top (at vertical
+        coordinate ``0``), while older waveforms scroll down (their vertical coordinate tells how many updates ago
+        they have arrived). Only the arriving waveform is colored, and the whole history is painted directly from
+        its storage, without copying.
+
+        Args:
+            plot_item: plot item that the item will be added to
+            data_model: Either an Update Source or a already initialized data
+                        model
+            history_length: Amount of waveforms to display, used only if the data_model is only an Update Source.
+        """
+        pg.GraphicsObject.__init__(self)
+        CWaterfallPropertiesBase.__init__(self)
+        if not isinstance(data_model, CWaterfallDataModel):
+            data_model = CWaterfallDataModel(data_source=data_model, history_length=history_length)
+        if isinstance(data_model.data_source, PyDMChannelDataSource):
+            # Every waveform becomes a row, hence none of them can be skipped when updates are batched
+            data_model.data_source.replaceable = False
+        self._data_model = data_model
+        self._parent_plot_item = plot_item
+        self._rect = QRectF()
+        self.opts: Dict[str, Any] = {}
+        self.layer_id: Optional[str] = None
+        """Identifier of the layer the item has been added to."""
+        data_model.sig_data_model_changed.connect(self._data_model_change_handler)
+        CWaterfallPropertiesBase.initialize_style_properties(self, color=None)
+
+    def model(self) -> CWaterfallDataModel:
+        """Data model of the item."""
+        return self._data_model
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(self._rect)
+
+    def paint(self, painter: QPainter, *args):
+        image = self._data_model.history.image()
+        if image.size == 0 or self._rect.isEmpty():
+            return
+        # Rows and columns smaller than a screen pixel are skipped (keeping the newest row),
+        # so that long histories are not scaled down on every repaint
+        target = painter.transform().mapRect(self._rect)
+        rows, cols = image.shape
+        row_step = max(int(rows / max(abs(target.height()), 1.0)), 1)
+        col_step = max(int(cols / max(abs(target.width()), 1.0)), 1)
+        if row_step > 1 or col_step > 1:
+            image = np.ascontiguousarray(image[(rows - 1) % row_step::row_step, ::col_step])
+        qimage = pg.functions.makeQImage(image.view(np.ubyte).reshape(*image.shape, 4),
+                                         alpha=False,
+                                         copy=False,
+                                         transpose=False)
+        painter.drawImage(self._rect, qimage)
+
+    def _data_model_change_handler(self):
+        rect = self._image_rect()
+        if rect != self._rect:
+            self.prepareGeometryChange()
+            self._rect = rect
+            self.informViewBoundsChanged()
+        self.update()
+
+    def _image_rect(self) -> QRectF:
+        history = self._data_model.history
+        rows, width = len(history), history.width
+        if rows == 0:
+            return QRectF()
+        first, last = self._data_model.x_range or (0.0, width - 1.0)
+        step = (last - first) / (width - 1) if width > 1 else 1.0
+        if not math.isfinite(step) or step == 0:
+            first, step = 0.0, 1.0
+        # Pixels are centered around the horizontal coordinates of the points, newest row ends at 0
+        return QRectF(first - step / 2, -rows, step * width, rows)
+
+
+def _color_map_lut(color_map: int) -> np.ndarray:
+    colors = cmaps[color_map]
+    lut = pg.ColorMap(np.linspace(0.0, 1.0, len(colors)), colors).getLookupTable(0.0, 1.0, alpha=False)
+    return argb_lookup_table(lut)
+
+
+class CWaterfallPlot(CPlotWidgetBase, StaticPlotWidget, PyDMColorMap):
+
+    Q_ENUM(PyDMColorMap)
+
+    ITEM_TYPES = {
+        PlottingItemTypes.WATERFALL.value: CWaterfallItem,
+    }
+
+    _SOURCE_EMIT_TYPE = {
+        PlottingItemTypes.WATERFALL.value: CurveData,
+    }
+
+    _DEFAULT_ITEM_STYLE = PlottingItemTypes.WATERFALL.value
+
+    def __init__(self,
+                 parent: QWidget = None,
+                 background: str = 'default',
+                 axis_items: Optional[Dict[str, pg.AxisItem]] = None,
+                 **plotitem_kwargs):
+        """
+        Plot widget for displaying the history of waveforms as a waterfall, where every waveform is
+        a row of pixels colored by the value, with the newest one on the top.
+
+        Args:
+            parent: parent widget for this plot
+            background: background color for the plot widget
+            axis_items: mapping of positions in the plot ('left', 'right', ...)
+                        to axis items which should be used
+            plotitem_kwargs: Further Keyword arguments for the plot item base
+                             class
+        """
+        StaticPlotWidget.__init__(self,
+                                  parent=parent,
+                                  background=background,
+                                  axis_items=axis_items,
+                                  **plotitem_kwargs)
+        CPlotWidgetBase.__init__(self)
+        self._history_length = _DEFAULT_WATERFALL_HISTORY
+        self._color_map = PyDMColorMap.Inferno
+        self._lut = _color_map_lut(self._color_map)
+        self._color_map_min = 0.0
+        self._color_map_max = 255.0
+        self._normalize_data = True
+
+    def addWaterfall(self,
+                     data_source: str,
+                     layer: Optional[str] = None,
+                     name: Optional[str] = None) -> CWaterfallItem:
+        """
+        Add a waterfall displaying the history of the waveforms coming from the channel.
+
+        Args:
+            data_source: address of the channel delivering waveforms
+            layer: Layer in which the waterfall should be added to
+            name: name of the waterfall
+
+        Returns:
+            Waterfall object which was added to the plot.
+        """
+        return cast(CWaterfallItem, self.add_channel_attached_item(style=PlottingItemTypes.WATERFALL.value,
+                                                                   channel_address=data_source,
+                                                                   layer=layer,
+                                                                   name=name))
+
+    def _get_history_length(self) -> int:
+        return self._history_length
+
+    def _set_history_length(self, new_val: int):
+        new_val = max(int(new_val), 1)
+        if new_val != self._history_length:
+            self._history_length = new_val
+            for item in self._waterfall_items():
+                item.model().set_history_length(new_val)
+
+    historyLength: int = Property(int, fget=_get_history_length, fset=_set_history_length)
+    """
+    Amount of the last waveforms displayed by the waterfall. Histories larger than 256 MB are kept
+    in memory-mapped temporary files rather than in RAM.
+    """
+
+    def _get_color_map(self) -> int:
+        return self._color_map
+
+    def _set_color_map(self, new_val: int):
+        if new_val != self._color_map and new_val in cmaps:
+            self._color_map = new_val
+            self._lut = _color_map_lut(new_val)
+            self._update_colors()
+
+    colorMap: int = Property(PyDMColorMap, fget=_get_color_map, fset=_set_color_map)
+    """Color map used to color the values of the waveforms."""
+
+    def _get_color_map_min(self) -> float:
+        return self._color_map_min
+
+    def _set_color_map_min(self, new_val: float):
+        if new_val != self._color_map_min:
+            self._color_map_min = new_val
+            if not self._normalize_data:
+                self._update_colors()
+
+    colorMapMin: float = Property(float, fget=_get_color_map_min, fset=_set_color_map_min)
+    """Value corresponding to the first color of the color map, when :attr:`normalizeData` is disabled."""
+
+    def _get_color_map_max(self) -> float:
+        return self._color_map_max
+
+    def _set_color_map_max(self, new_val: float):
+        if new_val != self._color_map_max:
+            self._color_map_max = new_val
+            if not self._normalize_data:
+                self._update_colors()
+
+    colorMapMax: float = Property(float, fget=_get_color_map_max, fset=_set_color_map_max)
+    """Value corresponding to the last color of the color map, when :attr:`normalizeData` is disabled."""
+
+    def _get_normalize_data(self) -> bool:
+        return self._normalize_data
+
+    def _set_normalize_data(self, new_val: bool):
+        if new_val != self._normalize_data:
+            self._normalize_data = new_val
+            self._update_colors()
+
+    normalizeData: bool = Property(bool, fget=_get_normalize_data, fset=_set_normalize_data)
+    """
+    Colors are relative to the minimum and maximum values of the displayed history, rather than to
+    :attr:`colorMapMin` and :attr:`colorMapMax`. To avoid re-coloring the whole history on every update,
+    the range only grows (with a small margin), when new values do not fit into it.
+    """
+
+    def _create_fitting_item(self,
+                             data_source: PyDMChannelDataSource,
+                             style: str = PlottingItemTypes.WATERFALL.value) -> CItemPropertiesBase:
+        style = style or PlottingItemTypes.WATERFALL.value
+        try:
+            item_type = self.ITEM_TYPES[style]
+        except KeyError:
+            raise ValueError(f"{type(self).__name__} does not support style '{style}'")
+        item = item_type(plot_item=self.plotItem, data_model=data_source, history_length=self._history_length)
+        item.model().set_colors(lut=self._lut, levels=self._levels())
+        return item
+
+    def _add_created_item(self,
+                          new_item: CItemPropertiesBase,
+                          layer: Optional[LayerIdentification] = None,
+                          index: Optional[int] = None) -> None:
+        super()._add_created_item(new_item=new_item, layer=layer, index=index)
+        # Unlike accwidgets items, waterfall needs to remember the layer it has been added to
+        layer = (layer if isinstance(layer, str) or layer is None else layer.id)
+        cast(CWaterfallItem, new_item).layer_id = layer if layer in self.layerIDs else None
+
+    def _waterfall_items(self) -> List[CWaterfallItem]:
+        return [item for item in self._items if isinstance(item, CWaterfallItem)]
+
+    def _levels(self) -> Optional[Tuple[float, float]]:
+        return None if self._normalize_data else (self._color_map_min, self._color_map_max)
+
+    def _update_colors(self):
+        levels = self._levels()
+        for item in self._waterfall_items():
+            item.model().set_colors(lut=self._lut, levels=levels)
+
+
+class CImageView(CWidgetRulesMixin, CCustomizedTooltipMixin, CHideUnusedFeaturesMixin, PyDMImageView):
+
+    def __init__(self,
+                 parent: Optional[QWidget] = None,
+                 image_channel: Optional[str] = None,
+                 width_channel: Optional[str] = None,
+                 **kwargs):
+        """
+        A :class:`pyqtgraph.ImageView` subclass with support for CS Channels.
+
+        The image channel may deliver 2D arrays, or flat arrays, that are split into rows using the width from
+        :attr:`widthChannel` or, if there is no :attr:`widthChannel`, from the :attr:`imageWidth` property. In both
+        cases, the image is displayed without copying the incoming data.
+
+        The :attr:`normalizeData` property defines if the colors of the images are
+        relative to the :attr:`colorMapMin` and :attr:`colorMapMax` property or to
+        the minimum and maximum values of the image.
+
+        Frames are rendered at most :attr:`maxRedrawRate` times per second. When they arrive faster, only the newest
+        one is rendered, while the rest is dropped. When :attr:`autoDownsample` is enabled, only the visible part of
+        the image is rendered, skipping pixels that are smaller than the screen pixels.
+
+        Use the :attr:`newImageSignal` to hook up to a signal that is emitted when a new
+        image is rendered in the widget.
+
+        Args:
+            parent: The parent widget for the image view.
+            image_channel: The channel to be used by the widget for the image data.
+            width_channel: The channel to be used by the widget to receive the image width information.
+            **kwargs: Any future extras that need to be passed down to PyDM.
+        """
+        CWidgetRulesMixin.__init__(self)
+        CCustomizedTooltipMixin.__init__(self)
+        CHideUnusedFeaturesMixin.__init__(self)
+        self._image_channel_id: Optional[str] = None
+        self._width_channel_id: Optional[str] = None
+        self.header: Optional[Dict[str, Any]] = None
+        self._displayed_image: Optional[np.ndarray] = None
+        self._rendered_slices: Optional[Tuple[Tuple[int, ...], Tuple[slice, slice]]] = None
+        self._levels_cache = LevelsCache()
+        self._frames_received = 0
+        self._frames_rendered = 0
+        PyDMImageView.__init__(self, parent=parent, **kwargs)
+        # PyDM keeps fixed slots for image and width channels, while here they are managed via contexts
+        self._channels = []
+        self.getView().getViewBox().sigRangeChanged.connect(self._on_view_range_changed)
+        self.imageChannel = image_channel
+        self.widthChannel = width_channel
+
+    def default_rule_channel(self) -> str:
+        return self.imageChannel
+
+    def channels(self) -> List[PyDMChannel]:
+        """Channels of the image and of its width, if connected."""
+        return self._channels
+
+    def channels_for_tools(self) -> List[PyDMChannel]:
+        """Channels of the image, if connected."""
+        return [ch for ch in self._channels if ch.value_slot == self.image_value_changed]
+
+    def create_channel(self, channel_address: str, context: Optional[CContext]) -> CChannel:
+        if channel_address == self._image_channel_id:
+            connection_slot, value_slot = self.image_connection_state_changed, self.image_value_changed
+        else:
+            connection_slot, value_slot = self.connectionStateChanged, self.image_width_changed
+        ch = cast(CChannel, PyDMChannel(address=channel_address,
+                                        connection_slot=connection_slot,
+                                        value_slot=value_slot,
+                                        severity_slot=self.alarmSeverityChanged))
+        ch.context = context
+        return ch
+
+    def _get_image_channel(self) -> str:
+        return self._image_channel_id or ''
+
+    def _set_image_channel(self, new_val: Optional[str]):
+        if (new_val or None) != self._image_channel_id:
+            self._image_channel_id = new_val or None
+            self._reconnect_image_channels()
+
+    imageChannel = Property(str, fget=_get_image_channel, fset=_set_image_channel)
+    """Address of the channel delivering the image data."""
+
+    def _get_width_channel(self) -> str:
+        return self._width_channel_id or ''
+
+    def _set_width_channel(self, new_val: Optional[str]):
+        if (new_val or None) != self._width_channel_id:
+            self._width_channel_id = new_val or None
+            self._reconnect_image_channels()
+
+    widthChannel = Property(str, fget=_get_width_channel, fset=_set_width_channel)
+    """Address of the channel delivering the width of the image, when image data arrives as a flat array."""
+
+    @property
+    def frames_received(self) -> int:
+        """Amount of frames received from the image channel."""
+        return self._frames_received
+
+    @property
+    def frames_dropped(self) -> int:
+        """Amount of received frames that have never been rendered, because newer ones arrived before the redraw."""
+        return self._frames_received - self._frames_rendered
+
+    @Slot(CChannelData)
+    def image_value_changed(self, packet: CChannelData[Any]):
+        """
+        Remember the newest frame to be rendered on the next redraw.
+
+        Args:
+            packet: New frame from the image channel.
+        """
+        if not isinstance(packet, CChannelData) or packet.value is None:
+            return
+        self.header = packet.meta_info
+        self._frames_received += 1
+        # Only a reference is kept, older frames are simply replaced, if they arrive faster than the redraw rate
+        self.image_waveform = packet.value
+        self.needs_redraw = True
+
+    @Slot(CChannelData)
+    def image_width_changed(self, packet: CChannelData[Any]):
+        """
+        Update the width used to split flat arrays into rows.
+
+        Args:
+            packet: New width from the width channel.
+        """
+        if not isinstance(packet, CChannelData):
+            return
+        PyDMImageView.image_width_changed(self, packet.value)
+
+    def redrawImage(self):
+        """
+        Render the newest received frame, if it has not been rendered yet. This method is invoked by the timer,
+        at most :attr:`maxRedrawRate` times per second. Frames are not rendered while the widget is hidden.
+        """
+        if not self.needs_redraw or not self.isVisible():
+            return
+        self.needs_redraw = False
+        image = frame_to_image(self.image_waveform,
+                               width=self.imageWidth,
+                               row_major=self.readingOrder == ReadingOrder.Clike)
+        if image is None:
+            logger.warning(f'{self}: Cannot split image of size {np.size(self.image_waveform)} into rows of width {self.imageWidth}')
+            return
+        self._displayed_image = image
+        self._rendered_slices = None
+        self._render_displayed_image()
+        self._frames_rendered += 1
+
+    def _reconnect_image_channels(self):
+        self.reconnect([ch for ch in (self._image_channel_id, self._width_channel_id) if ch], self._local_context)
+
+    def _visible_slices(self, image: np.ndarray) -> Tuple[slice, slice]:
+        # Image item is configured by PyDM with row-major axis order
+        shape = image.shape[:2]
+        if not self.autoDownsample:
+            return slice(0, shape[0]), slice(0, shape[1])
+        view_box = self.getView().getViewBox()
+        x_auto, y_auto = view_box.autoRangeEnabled()
+        if x_auto or y_auto:
+            # Cropping would make auto-range shrink to the cropped area, so whole image is taken,
+            # scaled to the size of the widget (keeping in mind that aspect ratio may be locked)
+            scale = min(shape[1] / max(view_box.width(), 1.0), shape[0] / max(view_box.height(), 1.0))
+            return viewport_slices(shape=shape, x_range=None, y_range=None, pixel_size=(scale, scale))
+        x_range, y_range = view_box.viewRange()
+        return viewport_slices(shape=shape, x_range=x_range, y_range=y_range, pixel_size=view_box.viewPixelSize())
+
+    def _render_displayed_image(self):
+        image = self._displayed_image
+        if image is None or image.size == 0:
+            return
+        slices = self._visible_slices(image)
+        visible = image[slices]
+        if visible.size == 0:
+            # Image has been panned out of the view
+            return
+        if self.normalizeData:
+            levels = self._levels_cache.update(visible)
+        else:
+            levels = self.colorMapMin, self.colorMapMax
+        image_item = self.getImageItem()
+        # Unchanged levels keep the lookup table, combining levels and colors, cached
+        image_item.setLevels(levels, update=False)
+        image_item.setImage(visible, autoLevels=False, autoDownsample=False)
+        row_slice, col_slice = slices
+        image_item.setRect(QRectF(col_slice.start,
+                                  row_slice.start,
+                                  visible.shape[1] * col_slice.step,
+                                  visible.shape[0] * row_slice.step))
+        self._rendered_slices = image.shape, slices
+
+    def _on_view_range_changed(self, *_):
+        image = self._displayed_image
+        if image is None or self._rendered_slices == (image.shape, self._visible_slices(image)):
+            return
+        self._render_displayed_image()
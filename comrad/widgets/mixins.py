@@ -1,12 +1,15 @@
 import json
+import time
 import logging
 import copy
+import functools
 from typing import Any, List, cast, Union, Dict, Tuple, Callable, Optional
 from qtpy.QtCore import Property, Signal, Slot
 from qtpy.QtWidgets import QWidget
 from pydm.utilities import is_qt_designer
 from pydm.widgets.base import PyDMWidget
 from pydm.widgets.rules import RulesDispatcher
+from comrad.instrumentation import InstrumentationRegistry
 from comrad.rules import CBaseRule, CChannelError, unpack_rules
 from comrad.json import CJSONEncoder, CJSONDeserializeError
 from comrad.deprecations import deprecated_parent_prop
@@ -185,7 +188,14 @@ class CChannelDataProcessingMixin:
             # Save header here, so that it is available in all value_changed implementations
             self.header = packet.meta_info
 
+        registry = InstrumentationRegistry.instance()
+        if not registry.enabled:
+            super().channelValueChanged(packet)  # type: ignore
+            return
+
+        start = time.perf_counter()
         super().channelValueChanged(packet)  # type: ignore
+        registry.record_widget_update(self, time.perf_counter() - start)
 
 
 class CValueTransformerMixin(CChannelDataProcessingMixin, CValueTransformationBase):
@@ -228,14 +238,20 @@ class CValueTransformerMixin(CChannelDataProcessingMixin, CValueTransformationBa
 
         transform = self.cached_value_transformation()
         if transform:
-            new_val = transform(new_val=packet.value, header=packet.meta_info, widget=self)
-            # Need a copy here, otherwise running transform on the same packet twice can happen
-            new_packet = copy.copy(packet)
-            new_packet.value = new_val
-            super().channelValueChanged(new_packet)
+            self.evaluate_transformation(transform,
+                                         on_result=functools.partial(self._on_transformed_value, packet),
+                                         new_val=packet.value,
+                                         header=packet.meta_info,
+                                         widget=self)
         else:
             super().channelValueChanged(packet)
 
+    def _on_transformed_value(self, packet: CChannelData[Any], new_val: Any):
+        # Need a copy here, otherwise running transform on the same packet twice can happen
+        new_packet = copy.copy(packet)
+        new_packet.value = new_val
+        super().channelValueChanged(new_packet)
+
 
 CWidgetRuleMap = Dict[str, Tuple[str, str, Callable[[Any], Any]]]
 
@@ -1,6 +1,10 @@
 import logging
+import copy
+import time
+import numpy as np
+from datetime import datetime
 from enum import IntEnum
-from typing import List, Dict, Optional, Set, Any
+from typing import List, Dict, Optional, Set, Any, Tuple
 from pydm.widgets.base import PyDMWidget
 from pydm.widgets.channel import PyDMChannel
 from pydm.data_plugins.plugin import PyDMConnection
@@ -8,8 +12,10 @@ from pydm.utilities import is_qt_designer
 from qtpy.QtWidgets import QWidget, QFrame, QVBoxLayout, QLabel, QSizePolicy
 from qtpy.QtCore import Property, Signal, Slot, Q_ENUM, Qt, QSize
 from comrad.data.channel import CChannelData, CContext
+from comrad.data.deadband import CDeadband
 from .mixins import CChannelDataProcessingMixin, CHideUnusedFeaturesMixin, CInitializedMixin, deprecated_parent_prop
 from .value_transform import CValueTransformationBase
+from ._ring_buffer import RingBuffer
 
 
 logger = logging.getLogger(__name__)
@@ -21,9 +27,15 @@ class _QtDesignerGeneratorTrigger:
     AggregatedFirst = 2
 
 
-class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin, CHideUnusedFeaturesMixin, PyDMWidget, CValueTransformationBase, _QtDesignerGeneratorTrigger):
+class _QtDesignerJoinStamp:
+    CycleStamp = 0
+    AcqStamp = 1
+
+
+class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin, CHideUnusedFeaturesMixin, PyDMWidget, CValueTransformationBase, _QtDesignerGeneratorTrigger, _QtDesignerJoinStamp):
 
     Q_ENUM(_QtDesignerGeneratorTrigger)
+    Q_ENUM(_QtDesignerJoinStamp)
 
     class GeneratorTrigger(IntEnum):
         """Enum defining when generator sequence must be triggered."""
@@ -37,6 +49,15 @@ class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin,
         AGGREGATED_FIRST = _QtDesignerGeneratorTrigger.AggregatedFirst
         """First new value arriving since the last trigger."""
 
+    class JoinStamp(IntEnum):
+        """Enum defining which header timestamp is used to align values of different channels in history mode."""
+
+        CYCLE_STAMP = _QtDesignerJoinStamp.CycleStamp
+        """Values are aligned by the ``cycleStamp``, i.e. they belong to the same accelerator cycle."""
+
+        ACQ_STAMP = _QtDesignerJoinStamp.AcqStamp
+        """Values are aligned by the ``acqStamp``, i.e. they have been acquired at the same time."""
+
     updateTriggered = Signal([int], [float], [str], [bool], ['PyQt_PyObject'])
     """Emitted when the user changes the value."""
 
@@ -69,6 +90,14 @@ class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin,
         # This contains channels ids that have not yet updated their values and have not cached them
         # in _values
         self._obsolete_values: Optional[Set[str]] = None
+        # Keys are connection addresses and values are channel ids used in _values, so that the address
+        # does not have to be parsed on every incoming packet
+        self._conn_channel_ids: Dict[str, str] = {}
+        # History mode: ring buffers of values and their timestamps (in seconds) for every channel id
+        self._history_size: int = 0
+        self._history: Dict[str, Tuple[RingBuffer, RingBuffer]] = {}
+        self._join_stamp = CValueAggregator.JoinStamp.CYCLE_STAMP
+        self._join_tolerance: float = 1.0
 
         if is_qt_designer():
             self._setup_ui_for_designer()
@@ -105,6 +134,8 @@ class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin,
             self._values = dict.fromkeys(self._channel_ids, None)
             self._headers = dict.fromkeys(self._channel_ids, None)
             self._obsolete_values = set(self._channel_ids)
+        self._conn_channel_ids.clear()
+        self._history.clear()
 
         # Handle the channel reconnection by the base class
         PyDMWidget.reconnect(self, channels, new_context)
@@ -122,23 +153,16 @@ class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin,
         conn: Optional[PyDMConnection] = self.sender()
         if conn is None or not isinstance(packet, CChannelData):
             return
-        channel_id: str = conn.address
-        if channel_id.startswith('/'):
-            # Because PyDM does not natively support /// notation of JAPC, leading slash is left
-            # in the address. We need to remove it to not confuse the user.
-            channel_id = channel_id[1:]
-
-        # Strip away context information from the address, to always have a consistent keys in the dictionary
-        # If we happen to sit inside CContextFrame or have a global selector defined, channel_id can be different here
-        # from what was recorder in self._obsolete_values. Also, the valueTransformation becomes sensitive to the
-        # environment if keys are used to access data.
-        for delim in ['?', '@', '&']:
-            idx = channel_id.find(delim)
-            if idx != -1:
-                channel_id = channel_id[:idx]
+        try:
+            channel_id = self._conn_channel_ids[conn.address]
+        except KeyError:
+            channel_id = self._conn_channel_ids[conn.address] = _channel_id_from_address(conn.address)
 
         super().value_changed(packet)
 
+        if self._history_size > 0:
+            self._record_history(channel_id, packet)
+
         if self._trigger_type == CValueAggregator.GeneratorTrigger.ANY:
             self._values[channel_id] = packet.value
             self._headers[channel_id] = packet.meta_info
@@ -205,6 +229,49 @@ class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin,
       update and only then fire a new one.
     """
 
+    def _get_history_size(self) -> int:
+        return self._history_size
+
+    def _set_history_size(self, new_val: int):
+        new_val = max(0, new_val)
+        if new_val != self._history_size:
+            self._history_size = new_val
+            self._history.clear()
+
+    historySize: int = Property(int, _get_history_size, _set_history_size)
+    """
+    Number of the latest values kept for each of the input channels. When set to ``0`` (default), only the latest
+    value is kept and the transformation receives ``values`` and ``headers`` dictionaries keyed by channel
+    addresses. When positive, values are kept in ring buffers, aligned between the channels using
+    :attr:`joinStamp` and :attr:`joinTolerance`, and the transformation receives ``values`` dictionary,
+    where every entry is a NumPy array, stacking values of the aligned rows along the first axis, as well as
+    ``stamps`` array with timestamps (in seconds) of these rows. This allows vectorized computations over the last
+    N cycles without Python loops.
+    """
+
+    def _get_join_stamp(self) -> 'CValueAggregator.JoinStamp':
+        return self._join_stamp
+
+    def _set_join_stamp(self, new_val: 'CValueAggregator.JoinStamp'):
+        if new_val != self._join_stamp:
+            self._join_stamp = new_val
+            self._history.clear()
+
+    joinStamp: 'CValueAggregator.JoinStamp' = Property(_QtDesignerJoinStamp, _get_join_stamp, _set_join_stamp)
+    """Header timestamp used to align values of different channels, when :attr:`historySize` is positive."""
+
+    def _get_join_tolerance(self) -> float:
+        return self._join_tolerance
+
+    def _set_join_tolerance(self, new_val: float):
+        self._join_tolerance = max(0.0, new_val)
+
+    joinTolerance: float = Property(float, _get_join_tolerance, _set_join_tolerance)
+    """
+    Maximum difference (in milliseconds) between the timestamps of the values of different channels
+    to consider them belonging to the same row, when :attr:`historySize` is positive.
+    """
+
     @deprecated_parent_prop(logger=logger, property_name='channel')
     def __set_channel(self, _):
         pass
@@ -263,7 +330,16 @@ class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin,
         if not transform:
             return
 
-        result = transform(values=self._values, headers=self._headers)
+        if self._history_size > 0:
+            values, stamps = self._joined_history()
+            self.evaluate_transformation(transform, on_result=self._emit_result, values=values,
+                                         headers=copy.copy(self._headers), stamps=stamps)
+        else:
+            # Copies protect the inputs from being modified by subsequent packets, when evaluated in the background
+            self.evaluate_transformation(transform, on_result=self._emit_result, values=copy.copy(self._values),
+                                         headers=copy.copy(self._headers))
+
+    def _emit_result(self, result: Any):
         if result is None:
             # With None, it will be impossible to determine the signal override, therefore we simply don't send it
             return
@@ -272,6 +348,57 @@ class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin,
         except KeyError:
             pass
 
+    def _record_history(self, channel_id: str, packet: CChannelData[Any]):
+        header = packet.meta_info or {}
+        stamp_name = 'acqStamp' if self._join_stamp == CValueAggregator.JoinStamp.ACQ_STAMP else 'cycleStamp'
+        stamp = header.get(stamp_name)
+        if isinstance(stamp, datetime):
+            stamp_sec = stamp.timestamp()
+        elif isinstance(stamp, (int, float)):
+            stamp_sec = float(stamp)
+        else:
+            # Data without the stamp (e.g. non-multiplexed devices) is aligned by its arrival time
+            stamp_sec = time.time()
+
+        value = np.asarray(packet.value)
+        if value.dtype.kind not in 'biuf':
+            value = np.asarray(packet.value, dtype=object)
+        try:
+            values, stamps = self._history[channel_id]
+        except KeyError:
+            values = stamps = None
+        if values is None or values.item_shape != value.shape or values.dtype != value.dtype:
+            # First value, or the array length has changed. Older values are incompatible and cannot be stacked.
+            values = RingBuffer(capacity=self._history_size, item_shape=value.shape, dtype=value.dtype)
+            stamps = RingBuffer(capacity=self._history_size)
+            self._history[channel_id] = values, stamps
+        values.append(value)
+        stamps.append(stamp_sec)
+
+    def _joined_history(self) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        # Rows are defined by the first channel (in order of inputChannels) that has data
+        keys = [key for key in map(_channel_id_from_address, self._channel_ids) if key in self._history]
+        keys.extend((key for key in self._history.keys() if key not in keys))
+        if not keys:
+            return {}, np.empty(0)
+        ref_stamps = self._history[keys[0]][1].view()
+        mask = np.ones(len(ref_stamps), dtype=bool)
+        indices: Dict[str, np.ndarray] = {}
+        tolerance = self._join_tolerance / 1000.0
+        for key in keys:
+            stamps = self._history[key][1].view()
+            order = np.argsort(stamps, kind='stable')
+            sorted_stamps = stamps[order]
+            right = np.clip(np.searchsorted(sorted_stamps, ref_stamps), 0, len(sorted_stamps) - 1)
+            left = np.clip(right - 1, 0, len(sorted_stamps) - 1)
+            left_dist = np.abs(sorted_stamps[left] - ref_stamps)
+            right_dist = np.abs(sorted_stamps[right] - ref_stamps)
+            nearest = np.where(left_dist <= right_dist, left, right)
+            mask &= np.minimum(left_dist, right_dist) <= tolerance
+            indices[key] = order[nearest]
+        values = {key: self._history[key][0].view()[idx[mask]] for key, idx in indices.items()}
+        return values, ref_stamps[mask]
+
     def _setup_ui_for_designer(self):
         """Improves visibility of the widget in Designer"""
         width = 40
@@ -295,3 +422,20 @@ class CValueAggregator(QWidget, CChannelDataProcessingMixin, CInitializedMixin,
         label.resize(width, height)
         label.setAlignment(Qt.AlignCenter | Qt.AlignVCenter)
         layout.addChildWidget(label)
+
+
+def _channel_id_from_address(address: str) -> str:
+    if address.startswith('/'):
+        # Because PyDM does not natively support /// notation of JAPC, leading slash is left
+        # in the address. We need to remove it to not confuse the user.
+        address = address[1:]
+
+    # Strip away context information from the address, to always have a consistent keys in the dictionary
+    # If we happen to sit inside CContextFrame or have a global selector defined, channel_id can be different here
+    # from what was recorder in self._obsolete_values. Also, the valueTransformation becomes sensitive to the
+    # environment if keys are used to access data.
+    for delim in ['?', '@', '&', CDeadband.SUFFIX_DELIMITER]:
+        idx = address.find(delim)
+        if idx != -1:
+            address = address[:idx]
+    return address
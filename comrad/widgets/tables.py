@@ -1,37 +1,263 @@
 import logging
 import json
-from typing import Optional, List, Dict, cast, TypeVar
-from qtpy.QtCore import Property
-from qtpy.QtWidgets import QWidget
+import numpy as np
+from typing import Optional, List, Dict, cast, TypeVar, Any, Tuple
+from qtpy.QtCore import Property, Qt, QObject, QAbstractTableModel, QModelIndex
+from qtpy.QtWidgets import QWidget, QTableView, QAbstractItemView, QHeaderView
 from qtpy.QtGui import QShowEvent
 from pydm.utilities import is_qt_designer
-# from pydm.widgets.waveformtable import PyDMWaveformTable
+from comrad.data.channel import CChannelData
+from .widget import PyDMWidget
+from .mixins import (CWidgetRulesMixin, CValueTransformerMixin, CCustomizedTooltipMixin, CInitializedMixin,
+                     CHideUnusedFeaturesMixin)
 from accwidgets.log_console import (LogConsole, AbstractLogConsoleFormatter, AbstractLogConsoleModel, LogConsoleModel,
                                     LogLevel)
 
 
 logger = logging.getLogger(__name__)
 
-# TODO: Uncomment when proven useful
-# class CWaveFormTable(CWidgetRulesMixin, CCustomizedTooltipMixin, CHideUnusedFeaturesMixin, PyDMWaveformTable):
-#
-#     def __init__(self, parent: Optional[QWidget] = None, init_channel: Optional[str] = None, **kwargs):
-#         """
-#         A :class:`PyQt5.QTableWidget` with support for CS Channels.
-#
-#         Values of the array are displayed in the selected number of columns.
-#         The number of rows is determined by the size of the waveform.
-#         It is possible to define the labels of each row and column.
-#
-#         Args:
-#             parent: The parent widget for the table.
-#             init_channel: The channel to be used by the widget.
-#             **kwargs: Any future extras that need to be passed down to PyDM.
-#         """
-#         CWidgetRulesMixin.__init__(self)
-#         CCustomizedTooltipMixin.__init__(self)
-#         CHideUnusedFeaturesMixin.__init__(self)
-#         PyDMWaveformTable.__init__(self, parent=parent, init_channel=init_channel, **kwargs)
+
+class CWaveformTableModel(QAbstractTableModel):
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """
+        Read-only table model that displays elements of a 1D array, split into rows of :attr:`columns` elements.
+
+        Cells are not stored anywhere: they are read from the latest array only when the view requests them,
+        therefore memory footprint and update time do not depend on the amount of cells. When a new array
+        arrives, it is compared with the previous one using vectorized operations, and only the range of rows
+        containing changes is reported to the view.
+
+        Args:
+            parent: Owner of the model.
+        """
+        super().__init__(parent)
+        self._array: np.ndarray = np.empty(0)
+        self._columns = 1
+        self._row_stride = 1
+        self._column_labels: List[str] = []
+
+    @property
+    def array(self) -> np.ndarray:
+        """Latest displayed array."""
+        return self._array
+
+    @property
+    def columns(self) -> int:
+        """Amount of elements displayed in a single row."""
+        return self._columns
+
+    @columns.setter
+    def columns(self, new_val: int):
+        new_val = max(int(new_val), 1)
+        if new_val != self._columns:
+            self.beginResetModel()
+            self._columns = new_val
+            self.endResetModel()
+
+    @property
+    def row_stride(self) -> int:
+        """Display only every n-th row, to get an overview of very large arrays."""
+        return self._row_stride
+
+    @row_stride.setter
+    def row_stride(self, new_val: int):
+        new_val = max(int(new_val), 1)
+        if new_val != self._row_stride:
+            self.beginResetModel()
+            self._row_stride = new_val
+            self.endResetModel()
+
+    @property
+    def column_labels(self) -> List[str]:
+        """Labels of the columns. Columns without label display their number."""
+        return self._column_labels
+
+    @column_labels.setter
+    def column_labels(self, new_val: List[str]):
+        self._column_labels = list(new_val)
+        self.headerDataChanged.emit(Qt.Horizontal, 0, max(self._columns - 1, 0))
+
+    def set_array(self, new_val: Any):
+        """
+        Replace the displayed array.
+
+        Args:
+            new_val: New array (or any value convertible to it). Multi-dimensional arrays are flattened.
+        """
+        new_array = np.ravel(np.asarray(new_val))
+        old_array = self._array
+        old_rows = self.rowCount()
+        new_rows = self._rows_for_size(new_array.size)
+        if new_rows > old_rows:
+            self.beginInsertRows(QModelIndex(), old_rows, new_rows - 1)
+            self._array = new_array
+            self.endInsertRows()
+        elif new_rows < old_rows:
+            self.beginRemoveRows(QModelIndex(), new_rows, old_rows - 1)
+            self._array = new_array
+            self.endRemoveRows()
+        else:
+            self._array = new_array
+        common_size = min(old_array.size, new_array.size)
+        if new_array is old_array:
+            # Modified in place, there is no way to tell what has changed
+            changed = (0, common_size - 1) if common_size else None
+        else:
+            changed = _changed_range(old_array[:common_size], new_array[:common_size])
+        if changed is not None and new_rows > 0:
+            first_row = min(changed[0] // self._columns // self._row_stride, new_rows - 1)
+            last_row = min(changed[1] // self._columns // self._row_stride, new_rows - 1)
+            self.dataChanged.emit(self.index(first_row, 0), self.index(last_row, self._columns - 1), [Qt.DisplayRole])
+
+    def element_index(self, row: int, column: int) -> int:
+        """
+        Index of the array element displayed in the given cell.
+
+        Args:
+            row: Displayed row.
+            column: Displayed column.
+
+        Returns:
+            Index of the element, which may be out of bounds for the last row of the array.
+        """
+        return (row * self._row_stride) * self._columns + column
+
+    def rowCount(self, parent: Optional[QModelIndex] = None) -> int:
+        if parent is not None and parent.isValid():
+            return 0
+        return self._rows_for_size(self._array.size)
+
+    def columnCount(self, parent: Optional[QModelIndex] = None) -> int:
+        if parent is not None and parent.isValid():
+            return 0
+        return self._columns
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        idx = self.element_index(row=index.row(), column=index.column())
+        if idx >= self._array.size:
+            return None
+        return str(self._array[idx])
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Vertical:
+            return str(self.element_index(row=section, column=0))
+        try:
+            return self._column_labels[section]
+        except IndexError:
+            return str(section)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def _rows_for_size(self, size: int) -> int:
+        full_rows = -(-size // self._columns)
+        return -(-full_rows // self._row_stride)
+
+
+def _changed_range(old: np.ndarray, new: np.ndarray) -> Optional[Tuple[int, int]]:
+    """
+    Find the first and the last index, where two arrays of the same size differ.
+
+    Returns:
+        Tuple of indexes (inclusive), or ``None``, when arrays are equal.
+    """
+    if new.size == 0:
+        return None
+    try:
+        with np.errstate(invalid='ignore'):
+            diff = old != new
+            if old.dtype.kind in 'fc' and new.dtype.kind in 'fc':
+                diff &= ~(np.isnan(old) & np.isnan(new))
+    except (TypeError, ValueError):
+        diff = None
+    if not isinstance(diff, np.ndarray) or diff.shape != new.shape:
+        # Incomparable types, e.g. when switching from numbers to strings
+        return 0, new.size - 1
+    first = int(np.argmax(diff))
+    if not diff[first]:
+        return None
+    last = new.size - 1 - int(np.argmax(diff[::-1]))
+    return first, last
+
+
+class CWaveFormTable(CWidgetRulesMixin, CValueTransformerMixin, CCustomizedTooltipMixin, CInitializedMixin, CHideUnusedFeaturesMixin, PyDMWidget, QTableView):
+
+    def __init__(self, parent: Optional[QWidget] = None, init_channel: Optional[str] = None):
+        """
+        A :class:`PyQt5.QTableView` with support for CS Channels.
+
+        Values of the array are displayed in the selected number of columns.
+        The number of rows is determined by the size of the waveform.
+        It is possible to define the labels of each column, while rows are labeled by
+        the index of their first element.
+
+        Cells are read lazily from the latest array by :class:`CWaveformTableModel`, so that arrays
+        with millions of elements can be scrolled and updated smoothly.
+
+        Args:
+            parent: The parent widget for the table.
+            init_channel: The channel to be used by the widget.
+        """
+        CWidgetRulesMixin.__init__(self)
+        CInitializedMixin.__init__(self)
+        CHideUnusedFeaturesMixin.__init__(self)
+        CValueTransformerMixin.__init__(self)
+        QTableView.__init__(self, parent)
+        PyDMWidget.__init__(self, init_channel=init_channel)
+        self._table_model = CWaveformTableModel(self)
+        self.setModel(self._table_model)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Avoid measuring every row, which does not scale to large arrays
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+
+    def value_changed(self, packet: CChannelData[Any]):
+        """
+        Callback invoked when the channel value is changed.
+
+        Args:
+            packet: The new value from the channel.
+        """
+        if not isinstance(packet, CChannelData):
+            return
+        super().value_changed(packet)
+        self._table_model.set_array(packet.value if packet.value is not None else [])
+
+    @property
+    def table_model(self) -> CWaveformTableModel:
+        """Model providing the cells of the table."""
+        return self._table_model
+
+    def _get_column_count(self) -> int:
+        return self._table_model.columns
+
+    def _set_column_count(self, new_val: int):
+        self._table_model.columns = new_val
+
+    columnCount: int = Property(int, fget=_get_column_count, fset=_set_column_count)
+    """Amount of array elements displayed in a single row."""
+
+    def _get_row_stride(self) -> int:
+        return self._table_model.row_stride
+
+    def _set_row_stride(self, new_val: int):
+        self._table_model.row_stride = new_val
+
+    rowStride: int = Property(int, fget=_get_row_stride, fset=_set_row_stride)
+    """Display only every n-th row, to get an overview of very large arrays. Value of 1 displays all rows."""
+
+    def _get_column_header_labels(self) -> List[str]:
+        return self._table_model.column_labels
+
+    def _set_column_header_labels(self, new_val: List[str]):
+        self._table_model.column_labels = new_val
+
+    columnHeaderLabels: List[str] = Property('QStringList', fget=_get_column_header_labels, fset=_set_column_header_labels)
+    """Labels of the columns. Columns without label display their number."""
 
 
 _M = TypeVar('_M', bound=AbstractLogConsoleModel)
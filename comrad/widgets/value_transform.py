@@ -1,12 +1,18 @@
 import logging
 import re
 import copy
+import os
+import time
+import builtins
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from string import Template
-from typing import Callable, Optional, Any, cast
-from qtpy.QtCore import Property
+from typing import Callable, Optional, Any, Dict, Tuple, cast
+from qtpy.QtCore import Property, QObject, Signal, Qt
 from pydm.utilities import macro, find_file
 from pydm.widgets.base import PyDMPrimitiveWidget
+from comrad.instrumentation import InstrumentationRegistry
 
 
 logger = logging.getLogger(__name__)
@@ -72,6 +78,9 @@ class CValueTransformationBase(CFileTracking):
         self._value_transform_fn: Callable = None
         self._value_transform_macros = None
         self._value_transform_filename = None
+        self._background_evaluation = False
+        self._background_evaluator: Optional[_BackgroundEvaluator] = None
+        self._compute_latency: float = 0.0
 
     def getValueTransformation(self):
         """
@@ -128,6 +137,54 @@ class CValueTransformationBase(CFileTracking):
         m.update(macro.parse_macro_string(self.macros))
         return m
 
+    def _get_background_evaluation(self) -> bool:
+        return self._background_evaluation
+
+    def _set_background_evaluation(self, new_val: bool):
+        self._background_evaluation = new_val
+
+    backgroundEvaluation = Property(bool, _get_background_evaluation, _set_background_evaluation)
+    """
+    Run the transformation code in a worker thread, instead of the GUI thread. This keeps the window responsive
+    when the code performs heavy computations (e.g. fits or FFTs). Evaluations of the same widget never run
+    concurrently: when new values arrive while the code is still running, only the newest values will be evaluated
+    next, while the result of the running evaluation is still displayed. Code running in the background must not
+    access widgets (including the ``widget`` variable) or other GUI objects.
+    """
+
+    def _get_compute_latency(self) -> float:
+        if self._background_evaluator is not None:
+            return self._background_evaluator.latency
+        return self._compute_latency
+
+    computeLatency = Property(float, _get_compute_latency, designable=False)
+    """Time (in milliseconds) that the last evaluation of the transformation code took."""
+
+    def evaluate_transformation(self, transform: Callable, on_result: Callable[[Any], None], **inputs):
+        """
+        Run the transformation code either synchronously, or in the worker thread, depending on the
+        :attr:`backgroundEvaluation` setting.
+
+        Args:
+            transform: Function produced by :meth:`cached_value_transformation`.
+            on_result: Callback to receive the result. It is always called in the GUI thread.
+            **inputs: Variables that should be visible in the transformation code.
+        """
+        if self._background_evaluation:
+            if self._background_evaluator is None:
+                self._background_evaluator = _BackgroundEvaluator(parent=self if isinstance(self, QObject) else None)
+            self._background_evaluator.submit(transform, on_result, inputs)
+            return
+
+        start = time.perf_counter()
+        result = transform(**inputs)
+        duration = time.perf_counter() - start
+        self._compute_latency = duration * 1000.0
+        registry = InstrumentationRegistry.instance()
+        if registry.enabled:
+            registry.record_transformation(self, duration)
+        on_result(result)
+
     def cached_value_transformation(self) -> Optional[Callable]:
         """
         When called for the first time, it will attempt to access inline code snippet
@@ -165,6 +222,85 @@ class CValueTransformationBase(CFileTracking):
         return self._value_transform_fn
 
 
+class _BackgroundEvaluator(QObject):
+
+    _job_finished = Signal(int, object, float)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """
+        Runs transformation code of a single widget in the shared thread pool, one evaluation at a time.
+
+        Args:
+            parent: Owning object.
+        """
+        super().__init__(parent)
+        self.latency: float = 0.0
+        self._generation = 0
+        self._delivered_generation = 0
+        self._running = False
+        self._pending: Optional[Tuple[int, Callable, Callable[[Any], None], Dict[str, Any]]] = None
+        self._callbacks: Dict[int, Callable[[Any], None]] = {}
+        self._job_finished.connect(self._on_job_finished, Qt.QueuedConnection)
+
+    def submit(self, transform: Callable, on_result: Callable[[Any], None], inputs: Dict[str, Any]):
+        self._generation += 1
+        if self._running:
+            # Replaces any older pending evaluation, which would produce a stale result anyway
+            if self._pending is not None:
+                registry = InstrumentationRegistry.instance()
+                if registry.enabled:
+                    registry.record_coalesced(self.parent())
+            self._pending = (self._generation, transform, on_result, inputs)
+            return
+        self._start(self._generation, transform, on_result, inputs)
+
+    def _start(self, generation: int, transform: Callable, on_result: Callable[[Any], None], inputs: Dict[str, Any]):
+        self._running = True
+        self._callbacks[generation] = on_result
+
+        def job():
+            start = time.perf_counter()
+            result = None
+            try:
+                result = transform(**inputs)
+            finally:
+                self._job_finished.emit(generation, result, (time.perf_counter() - start) * 1000.0)
+
+        _get_executor().submit(job)
+
+    def _on_job_finished(self, generation: int, result: Any, latency: float):
+        self._running = False
+        self.latency = latency
+        registry = InstrumentationRegistry.instance()
+        if registry.enabled:
+            registry.record_transformation(self.parent(), latency / 1000.0)
+        on_result = self._callbacks.pop(generation)
+        if self._pending is not None:
+            pending = self._pending
+            self._pending = None
+            self._start(*pending)
+        if generation > self._delivered_generation:
+            # Results of evaluations superseded by newer values are still delivered, otherwise the widget would
+            # never update, while values keep arriving faster than the code completes
+            self._delivered_generation = generation
+            on_result(result)
+        else:
+            logger.debug('%s: Discarding stale transformation result', self.parent())
+            if registry.enabled:
+                registry.record_coalesced(self.parent())
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4),
+                                       thread_name_prefix='comrad-transformation')
+    return _executor
+
+
 def _create_transformation_function(transformation: str, file: Optional[Path] = None) -> Callable:
     """
     Creates a function used to transform incoming value(s) into a single output value.
@@ -186,18 +322,8 @@ def _create_transformation_function(transformation: str, file: Optional[Path] =
                   string=transformation)
 
     return_var = '__comrad_return_var__'
+    output_func_name = 'output'
 
-    # We wrap the code inside a dummy function so that user can use "return" statement in the code.
-    wrapped_code = """
-{return_var} = None
-
-def {output_func_name}(val):
-    global {return_var}
-    {return_var} = val
-
-__builtins__['output'] = {output_func_name}
-{code}
-""".format(output_func_name='__comrad_output_func__', return_var=return_var, code=code)
     global_base = globals().copy()
     if file:
         global_base['__file__'] = str(file)
@@ -207,6 +333,9 @@ __builtins__['output'] = {output_func_name}
     del global_base[CFileTracking.__name__]
     del global_base[_create_transformation_function.__name__]
     del global_base[PyDMPrimitiveWidget.__name__]
+    del global_base[_BackgroundEvaluator.__name__]
+    del global_base[_get_executor.__name__]
+    del global_base['_executor']
 
     if file:
         # Make sure "import local_file" is possible from the included script
@@ -219,10 +348,21 @@ __builtins__['output'] = {output_func_name}
         import traceback
         global_vars = global_base.copy()  # Make sure to copy to not modify globals visible in the rest of the app
         global_vars.update(inputs)
+
+        def __comrad_output_func__(val):
+            global_vars[return_var] = val
+
+        # Resolved from the globals of this call (also inside functions, defined by the snippet), so that
+        # concurrently running snippets do not interfere
+        global_vars[output_func_name] = __comrad_output_func__
+        if threading.current_thread() is threading.main_thread():
+            # Modules imported by the snippet may rely on output() being a builtin, as it has always been.
+            # This is safe only for synchronous evaluations, because they never overlap in the GUI thread.
+            setattr(builtins, output_func_name, __comrad_output_func__)
         try:
-            exec(wrapped_code, global_vars, {})
+            exec(code, global_vars, {})
             try:
-                return global_vars[return_var]  # This variable should have been set within wrapped_code
+                return global_vars[return_var]  # This variable should have been set by the output function
             except KeyError:
                 return None
         except BaseException as e:  # noqa: B902
@@ -143,8 +143,12 @@ class CContextEnabledObject(metaclass=GenericQObjectMeta):
                                     or (not self._local_context and new_val and new_val.selector)
                                     or (new_val and self._local_context
                                         and (new_val.selector != self._local_context.selector)))
-            if filters_changed or selector_changed:
-                logger.debug(f'New context has selector or data filters changed. This will trigger re-connecting channel on {self}')
+            # Wildcards only matter for addresses that contain macro variables (see format_address)
+            wildcards_changed = bool(any('$' in ch for ch in self._channel_ids)
+                                     and ((new_val and new_val.wildcards or None)
+                                          != (self._local_context and self._local_context.wildcards or None)))
+            if filters_changed or selector_changed or wildcards_changed:
+                logger.debug(f'New context has selector, data filters or wildcards changed. This will trigger re-connecting channel on {self}')
                 self.reconnect(self._channel_ids, new_val)
             elif not self._channels:
                 logger.debug(f'Attempting to make new connections on {self}')
@@ -21,6 +21,7 @@ def patch_app_singleton(monkeypatch):
             from comrad.rbac import CRbaState, CRbaStartupLoginPolicy
             self.rbac = CRbaState(startup_policy=CRbaStartupLoginPolicy.NO_LOGIN)
             self.use_inca = False
+            self.single_process = False
             self.jvm_flags = {}
 
         processEvents = mock.Mock()  # Required for pytest-qt to operate properly
@@ -0,0 +1,138 @@
+import pytest
+from unittest import mock
+from pytestqt.qtbot import QtBot
+from qtpy.QtWidgets import QWidget
+from comrad import CContextFrame
+from comrad.data.activation import CChannelActivationPolicy, CHiddenChannels
+from comrad.data.context import CContextTrackingDelegate
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    monkeypatch.setattr(CChannelActivationPolicy, '_instance', None)
+    return CChannelActivationPolicy.instance()
+
+
+@pytest.fixture
+def last_packets():
+    packets = {}
+
+    def plugin_for_address(address):
+        plugin = mock.MagicMock()
+        plugin.connections = {address: mock.MagicMock(last_packet=packets.get(address))}
+        plugin.get_address.return_value = address
+        return plugin
+
+    with mock.patch('comrad.data.activation.data_plugins.plugin_for_address', side_effect=plugin_for_address):
+        yield packets
+
+
+@pytest.fixture
+def shown_widget(qtbot: QtBot):
+    container = QWidget()
+    qtbot.add_widget(container)
+    widget = QWidget(container)
+    widget.context_changed = mock.MagicMock()
+    widget._channel_ids = ['japc:///dev/prop#field']
+    widget._channels = [make_channel('japc:///dev/prop#field')]
+    tracker = CContextTrackingDelegate(widget)
+    widget.installEventFilter(tracker)
+    with qtbot.wait_exposed(container):
+        container.show()
+    return container, widget, tracker
+
+
+def make_channel(address: str):
+    channel = mock.MagicMock()
+    channel.address = address
+    channel.value_slot = mock.Mock(spec=[])  # Plain callable, not a signal
+    return channel
+
+
+@pytest.mark.parametrize('enabled,frame_mode,frame_grace_period,expected', [
+    (False, CHiddenChannels.INHERIT, -1, (False, 3000)),
+    (True, CHiddenChannels.INHERIT, 500, (True, 3000)),
+    (True, CHiddenChannels.KEEP_ACTIVE, -1, (False, 3000)),
+    (False, CHiddenChannels.PAUSE, -1, (True, 3000)),
+    (False, CHiddenChannels.PAUSE, 500, (True, 500)),
+])
+def test_settings_for_container_override(qtbot: QtBot, policy, enabled, frame_mode, frame_grace_period, expected):
+    policy.enabled = enabled
+    frame = CContextFrame()
+    qtbot.add_widget(frame)
+    frame.hiddenChannels = frame_mode
+    frame.hiddenChannelsGracePeriod = frame_grace_period
+    inner = QWidget(frame)
+    widget = QWidget(inner)
+    assert policy.settings_for(widget) == expected
+
+
+def test_settings_for_closest_container_wins(qtbot: QtBot, policy):
+    outer = CContextFrame()
+    qtbot.add_widget(outer)
+    outer.hiddenChannels = CHiddenChannels.PAUSE
+    inner = CContextFrame(outer)
+    inner.hiddenChannels = CHiddenChannels.KEEP_ACTIVE
+    assert policy.settings_for(QWidget(inner)) == (False, policy.grace_period)
+    inner.hiddenChannels = CHiddenChannels.INHERIT
+    assert policy.settings_for(QWidget(inner)) == (True, policy.grace_period)
+
+
+def test_pause_and_resume_deliver_last_value(policy, last_packets):
+    last_packets['japc:///dev/prop#field'] = 'cached'
+    channels = [make_channel('japc:///dev/prop#field'), make_channel('japc:///dev/prop#other')]
+    paused = policy.pause(channels)
+    assert policy.paused_count == 2
+    for channel in channels:
+        channel.disconnect.assert_called_once()
+        channel.connect.assert_not_called()
+    policy.resume(paused, channels=channels)
+    assert policy.paused_count == 0
+    for channel in channels:
+        channel.connect.assert_called_once()
+    channels[0].value_slot.assert_called_once_with('cached')
+    channels[1].value_slot.assert_not_called()
+
+
+def test_resume_skips_removed_channels(policy, last_packets):
+    kept, removed = make_channel('japc:///dev/prop#a'), make_channel('japc:///dev/prop#b')
+    paused = policy.pause([kept, removed])
+    policy.resume(paused, channels=[kept])
+    kept.connect.assert_called_once()
+    removed.connect.assert_not_called()
+    assert policy.paused_count == 0
+
+
+def test_hidden_widget_channels_paused_after_grace_period(qtbot: QtBot, policy, last_packets, shown_widget):
+    policy.enabled = True
+    policy.grace_period = 50
+    container, widget, tracker = shown_widget
+    container.hide()
+    assert not tracker.paused
+    qtbot.wait_until(lambda: tracker.paused)
+    assert policy.paused_count == 1
+    widget._channels[0].disconnect.assert_called_once()
+    container.show()
+    assert not tracker.paused
+    assert policy.paused_count == 0
+    widget._channels[0].connect.assert_called_once()
+
+
+def test_hidden_widget_shown_within_grace_period_stays_active(qtbot: QtBot, policy, last_packets, shown_widget):
+    policy.enabled = True
+    policy.grace_period = 100
+    container, widget, tracker = shown_widget
+    container.hide()
+    container.show()
+    qtbot.wait(200)
+    assert not tracker.paused
+    widget._channels[0].disconnect.assert_not_called()
+
+
+def test_explicitly_hidden_widget_stays_active(qtbot: QtBot, policy, last_packets, shown_widget):
+    policy.enabled = True
+    policy.grace_period = 50
+    container, widget, tracker = shown_widget
+    widget.hide()
+    qtbot.wait(150)
+    assert not tracker.paused
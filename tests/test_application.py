@@ -77,3 +77,13 @@ def test_serialized_token_is_passed_to_subprocess(Popen, serialized_token, qtbot
             assert args[idx + 1] == serialized_token
         else:
             assert '--rbac-token' not in args
+
+
+@mock.patch('comrad.app.application.subprocess.Popen')
+def test_single_process_opens_new_window(Popen, qtbot):
+    _ = qtbot
+    app = cast(CApplication, QApplication.instance())
+    with mock.patch.object(app, 'single_process', True):
+        CApplication.new_pydm_process(app, ui_file='test_file.ui', macros={'dev': 'A'}, command_line_args=['arg'])
+    Popen.assert_not_called()
+    app.new_window.assert_called_once_with('test_file.ui', macros={'dev': 'A'}, command_line_args=['arg'])
@@ -0,0 +1,315 @@
+import os
+import socket
+import tempfile
+import threading
+import pytest
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from _comrad.broker import protocol
+from _comrad.broker.backends import BrokerBackend, SubscriptionKey
+from _comrad.broker.server import BrokerServer, probe_broker
+
+
+class RecordingBackend(BrokerBackend):
+
+    def __init__(self):
+        self.calls: List[Tuple[str, SubscriptionKey]] = []
+        self.callbacks: Dict[SubscriptionKey, Any] = {}
+        self.error_callbacks: Dict[SubscriptionKey, Any] = {}
+        self.subscribed = threading.Event()
+        self.fail_subscribe = False
+
+    def subscribe(self, key, on_value, on_error):
+        self.calls.append(('subscribe', key))
+        if self.fail_subscribe:
+            raise ValueError('No such device')
+        self.callbacks[key] = on_value
+        self.error_callbacks[key] = on_error
+        self.subscribed.set()
+
+    def unsubscribe(self, key):
+        self.calls.append(('unsubscribe', key))
+        self.callbacks.pop(key, None)
+
+    def get(self, key, on_value, on_error):
+        on_value(42, {'selector': key.selector})
+
+    def set(self, key, value, rbac_token):
+        if value == 'bad':
+            raise ValueError('Bad value')
+
+    def config(self):
+        return {'backend': 'test'}
+
+
+class Client:
+
+    def __init__(self, path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(5.0)
+        self.sock.connect(path)
+        self.decoder = protocol.FrameDecoder()
+        self.received: List[Tuple] = []
+
+    def send(self, *message):
+        self.sock.sendall(protocol.encode_frame(message))
+
+    def expect(self, kind: str) -> Tuple:
+        while True:
+            for idx, message in enumerate(self.received):
+                if message[0] == kind:
+                    return self.received.pop(idx)
+            self.received.extend(self.decoder.feed(self.sock.recv(65536)))
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def backend():
+    return RecordingBackend()
+
+
+@pytest.fixture
+def server(tmp_path: Path, backend):
+    server = BrokerServer(socket_path=str(tmp_path / 'b.sock'), backend=backend, shared_array_threshold=1024)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    assert server.wait_until_running(timeout=5.0)
+    yield server
+    server.shutdown()
+    thread.join(timeout=5.0)
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        event.wait(0.01)
+    raise AssertionError('Condition was not met in time')
+
+
+def test_frame_roundtrip():
+    decoder = protocol.FrameDecoder()
+    frame = protocol.encode_frame((protocol.SUBSCRIBE, 1, 'dev/prop', None, {'a': 1}))
+    # Split in the middle of the length prefix and of the payload
+    assert list(decoder.feed(frame[:2])) == []
+    assert list(decoder.feed(frame[2:10])) == []
+    assert list(decoder.feed(frame[10:] + frame)) == [(protocol.SUBSCRIBE, 1, 'dev/prop', None, {'a': 1})] * 2
+
+
+def test_shared_array_roundtrip_and_stale_detection(tmp_path: Path):
+    writer = protocol.SharedArrayWriter(directory=str(tmp_path))
+    reader = protocol.SharedArrayReader()
+    try:
+        refs = [writer.write(np.arange(10, dtype=float) + i) for i in range(protocol.SharedArrayWriter.SLOT_COUNT)]
+        assert len({ref.path for ref in refs}) == 1
+        assert len({ref.offset for ref in refs}) == protocol.SharedArrayWriter.SLOT_COUNT
+        # Receiver that is behind still gets all values, until their slots are reused
+        for i, ref in enumerate(refs):
+            np.testing.assert_array_equal(reader.read(ref), np.arange(10, dtype=float) + i)
+        newest = writer.write(np.arange(5, dtype=np.int32))
+        assert newest.path == refs[0].path
+        assert newest.offset == refs[0].offset
+        with pytest.raises(protocol.StaleValueError):
+            reader.read(refs[0])
+        np.testing.assert_array_equal(reader.read(refs[1]), np.arange(10, dtype=float) + 1)
+        np.testing.assert_array_equal(reader.read(newest), np.arange(5, dtype=np.int32))
+        # Bigger array moves into a new file, that replaces the removed one
+        bigger = writer.write(np.zeros(10000))
+        assert bigger.path != newest.path
+        with pytest.raises(protocol.StaleValueError):
+            protocol.SharedArrayReader().read(newest)
+        np.testing.assert_array_equal(reader.read(bigger), np.zeros(10000))
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_shared_array_files_are_private(tmp_path: Path):
+    writer = protocol.SharedArrayWriter(directory=str(tmp_path))
+    try:
+        ref = writer.write(np.arange(10, dtype=float))
+        assert os.stat(ref.path).st_mode & 0o777 == 0o600
+    finally:
+        writer.close()
+
+
+def test_default_socket_path_is_private(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv('COMRAD_BROKER_SOCKET', raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    path = Path(protocol.default_socket_path('TEST'))
+    assert path.name == 'comrad-broker-TEST.sock'
+    assert path.parent.parent == tmp_path
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+
+def test_default_socket_path_rejects_shared_directory(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv('COMRAD_BROKER_SOCKET', raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    shared_dir = tmp_path / f'comrad-{os.getuid()}'
+    shared_dir.mkdir()
+    shared_dir.chmod(0o777)
+    with pytest.raises(protocol.BrokerError):
+        protocol.default_socket_path('TEST')
+
+
+def test_share_arrays_of_property_fields():
+    writers: Dict[str, protocol.SharedArrayWriter] = {}
+    reader = protocol.SharedArrayReader()
+    try:
+        value = {'small': np.arange(3), 'big': np.ones(1000), 'scalar': 1}
+        shared = protocol.share_arrays(value, writers=writers, threshold=1024)
+        assert isinstance(shared['big'], protocol.SharedArrayRef)
+        assert isinstance(shared['small'], np.ndarray)
+        assert protocol.shared_paths(shared) == [shared['big'].path]
+        res = protocol.unshare_arrays(shared, reader)
+        np.testing.assert_array_equal(res['big'], np.ones(1000))
+        assert res['scalar'] == 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+        reader.close()
+
+
+def test_probe_reports_backend_config(server):
+    assert probe_broker(server.socket_path) == {'backend': 'test'}
+
+
+def test_probe_without_broker(tmp_path: Path):
+    assert probe_broker(str(tmp_path / 'missing.sock')) is None
+
+
+def test_probe_refuses_socket_of_another_user(server, monkeypatch):
+    uid = os.getuid()
+    monkeypatch.setattr(os, 'getuid', lambda: uid + 1)
+    with pytest.raises(protocol.BrokerError):
+        probe_broker(server.socket_path)
+
+
+def test_subscription_is_shared_and_cached(server, backend):
+    key = SubscriptionKey.create('dev/prop#field', 'SPS.USER.ALL', None)
+    first = Client(server.socket_path)
+    second = Client(server.socket_path)
+    try:
+        first.send(protocol.SUBSCRIBE, 1, 'dev/prop#field', 'SPS.USER.ALL', None)
+        assert backend.subscribed.wait(timeout=5.0)
+        backend.callbacks[key](10, {'isFirstUpdate': True})
+        _, sub_ids, name, payload = first.expect(protocol.VALUE)
+        assert sub_ids == (1,)
+        assert name == 'dev/prop#field'
+        assert protocol.decode_payload(payload) == (10, {'isFirstUpdate': True})
+
+        # Late subscriber receives the last value immediately, without another control system subscription
+        second.send(protocol.SUBSCRIBE, 7, 'dev/prop#field', 'SPS.USER.ALL', None)
+        _, sub_ids, _, payload = second.expect(protocol.VALUE)
+        assert sub_ids == (7,)
+        assert protocol.decode_payload(payload)[0] == 10
+        assert backend.calls == [('subscribe', key)]
+        assert server.subscription_count == 1
+
+        first.send(protocol.UNSUBSCRIBE, 1)
+        second.close()
+        wait_for(lambda: ('unsubscribe', key) in backend.calls)
+        assert backend.calls == [('subscribe', key), ('unsubscribe', key)]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_failed_subscription_is_retried_by_next_client(server, backend):
+    key = SubscriptionKey.create('dev/prop', None, None)
+    first = Client(server.socket_path)
+    second = Client(server.socket_path)
+    try:
+        backend.fail_subscribe = True
+        first.send(protocol.SUBSCRIBE, 1, 'dev/prop', None, None)
+        assert first.expect(protocol.SUBSCRIPTION_ERROR) == (protocol.SUBSCRIPTION_ERROR, 1, 'No such device')
+        assert server.subscription_count == 0
+        backend.fail_subscribe = False
+        second.send(protocol.SUBSCRIBE, 2, 'dev/prop', None, None)
+        assert backend.subscribed.wait(timeout=5.0)
+        assert backend.calls == [('subscribe', key), ('subscribe', key)]
+        assert server.subscription_count == 1
+    finally:
+        first.close()
+        second.close()
+
+
+def test_subscription_error_is_replayed_to_late_subscribers(server, backend):
+    key = SubscriptionKey.create('dev/prop', None, None)
+    first = Client(server.socket_path)
+    second = Client(server.socket_path)
+    try:
+        first.send(protocol.SUBSCRIBE, 1, 'dev/prop', None, None)
+        assert backend.subscribed.wait(timeout=5.0)
+        backend.error_callbacks[key]('Device is down')
+        assert first.expect(protocol.SUBSCRIPTION_ERROR) == (protocol.SUBSCRIPTION_ERROR, 1, 'Device is down')
+        second.send(protocol.SUBSCRIBE, 2, 'dev/prop', None, None)
+        assert second.expect(protocol.SUBSCRIPTION_ERROR) == (protocol.SUBSCRIPTION_ERROR, 2, 'Device is down')
+        assert backend.calls == [('subscribe', key)]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_japc_backend_unsubscribes_only_own_data_filters():
+    from unittest import mock
+    from _comrad.broker.backends import JapcBackend
+    backend = JapcBackend.__new__(JapcBackend)
+    backend._japc = mock.MagicMock()
+    backend._token_lock = threading.Lock()
+    backend._handles = {}
+    first = SubscriptionKey.create('dev/prop', 'SPS.USER.ALL', {'a': 1})
+    second = SubscriptionKey.create('dev/prop', 'SPS.USER.ALL', {'a': 2})
+    handles = [mock.MagicMock(), mock.MagicMock()]
+    backend._japc.subscribeParam.side_effect = handles
+    backend.subscribe(first, on_value=mock.Mock(), on_error=mock.Mock())
+    backend.subscribe(second, on_value=mock.Mock(), on_error=mock.Mock())
+    handles[0].startMonitoring.assert_called_once_with()
+    handles[1].startMonitoring.assert_called_once_with()
+    backend.unsubscribe(first)
+    handles[0].stopMonitoring.assert_called_once_with()
+    handles[1].stopMonitoring.assert_not_called()
+    backend._japc.clearSubscriptions.assert_not_called()
+    backend.unsubscribe(second)
+    backend._japc.clearSubscriptions.assert_called_once_with(parameterName='dev/prop', selector='SPS.USER.ALL')
+
+
+def test_big_arrays_are_delivered_via_shared_memory(server, backend):
+    key = SubscriptionKey.create('dev/prop', None, {'size': 1000})
+    client = Client(server.socket_path)
+    reader = protocol.SharedArrayReader()
+    try:
+        client.send(protocol.SUBSCRIBE, 1, 'dev/prop', None, {'size': 1000})
+        assert backend.subscribed.wait(timeout=5.0)
+        backend.callbacks[key]({'array': np.arange(1000, dtype=float)}, {})
+        _, _, _, payload = client.expect(protocol.VALUE)
+        value, _ = protocol.decode_payload(payload)
+        assert isinstance(value['array'], protocol.SharedArrayRef)
+        np.testing.assert_array_equal(protocol.unshare_arrays(value, reader)['array'], np.arange(1000, dtype=float))
+    finally:
+        reader.close()
+        client.close()
+
+
+def test_get_and_set_requests(server):
+    client = Client(server.socket_path)
+    try:
+        client.send(protocol.GET, 3, 'dev/prop', 'SPS.USER.ALL', None)
+        assert client.expect(protocol.REPLY) == (protocol.REPLY, 3, 'dev/prop', 42, {'selector': 'SPS.USER.ALL'})
+        client.send(protocol.SET, 4, 'dev/prop', None, None, 'good', b'token')
+        assert client.expect(protocol.REPLY)[:2] == (protocol.REPLY, 4)
+        client.send(protocol.SET, 5, 'dev/prop', None, None, 'bad', None)
+        assert client.expect(protocol.ERROR) == (protocol.ERROR, 5, 'Bad value')
+    finally:
+        client.close()
+
+
+def test_second_broker_refuses_to_start(server, backend):
+    with pytest.raises(OSError):
+        BrokerServer(socket_path=server.socket_path, backend=backend).bind()
@@ -87,6 +87,11 @@ def test_channel_data(val1, val2, meta1, meta2, should_equal):
     ('device/prop#field', None, {}, 'device/prop#field'),
     ('device/prop#field', 'TEST.USER.ALL', {}, 'device/prop#field@TEST.USER.ALL'),
     ('device/prop#field', '', {}, 'device/prop#field'),
+    ('device/prop#field|abs=0.5', None, None, 'device/prop#field|abs=0.5'),
+    ('device/prop#field|abs=0.5', 'TEST.USER.ALL', None, 'device/prop#field@TEST.USER.ALL|abs=0.5'),
+    ('device/prop#field|rel=0.1,abs=0.5', None, {'val1': 'key1'}, 'device/prop#field?val1=key1|abs=0.5,rel=0.1'),
+    ('device/prop#field|', 'TEST.USER.ALL', None, 'device/prop#field@TEST.USER.ALL'),
+    ('device/prop#field|unknown=1', 'TEST.USER.ALL', None, 'device/prop#field@TEST.USER.ALL'),
 ])
 def test_format_address(wildcards, addr, selector, data_filter, expected_addr):
     actual_addr = format_address(channel_address=addr,
@@ -94,6 +99,28 @@ def test_format_address(wildcards, addr, selector, data_filter, expected_addr):
     assert actual_addr == expected_addr
 
 
+@pytest.mark.parametrize('addr,wildcards,expected_addr', [
+    ('${DEV}/prop#field', {'DEV': 'device'}, 'device/prop#field'),
+    ('${DEV}/${PROP}#field', {'DEV': 'device', 'PROP': 'prop'}, 'device/prop#field'),
+    ('${DEV}/prop#field', {'OTHER': 'device'}, '${DEV}/prop#field'),
+    ('${DEV}/prop#field', None, '${DEV}/prop#field'),
+    ('${DEV}/prop#field|abs=0.5', {'DEV': 'device'}, 'device/prop#field|abs=0.5'),
+])
+def test_format_address_substitutes_wildcards(addr, wildcards, expected_addr):
+    assert format_address(channel_address=addr, context=CContext(wildcards=wildcards)) == expected_addr
+
+
+@pytest.mark.parametrize('addr,expected_addr', [
+    ('device/prop#field', 'device/prop#field'),
+    ('device/prop#field|abs=0.5', 'device/prop#field'),
+    ('device/prop#field|unknown=1', 'device/prop#field'),
+])
+def test_address_no_ctx_strips_deadband(addr, expected_addr):
+    ch = PyDMChannel(address=addr)
+    cast(CChannel, ch).context = CContext(selector='TEST.USER.ALL')
+    assert cast(CChannel, ch).address_no_ctx == expected_addr
+
+
 def test_address_setter():
     ch = PyDMChannel(address='addr1')
     context = CContext(selector='TEST.USER.ALL')
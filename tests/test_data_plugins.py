@@ -7,7 +7,7 @@ from pytestqt.qtbot import QtBot
 from unittest import mock
 from qtpy.QtCore import QVariant, QObject, Signal
 from comrad.data import channel
-from comrad.data_plugins import CCommonDataConnection, CChannelData, CDataConnection, CDataPlugin
+from comrad.data_plugins import CCommonDataConnection, CChannelData, CDataConnection, CDataPlugin, CCycleSynchronizer
 
 
 @pytest.fixture
@@ -49,6 +49,14 @@ def make_common_conn():
     return TestCommonConnection
 
 
+@pytest.fixture
+def synchronizer(monkeypatch):
+    monkeypatch.setattr(CCycleSynchronizer, '_instance', None)
+    sync = CCycleSynchronizer.instance()
+    sync.enabled = True
+    return sync
+
+
 def make_plugin():
 
     class TestPlugin(CDataPlugin):
@@ -619,6 +627,152 @@ def test_common_failure_to_process_incoming_value(qtbot: QtBot, make_common_conn
         value_slot.assert_not_called()
 
 
+@pytest.mark.parametrize('request_slot_exists', [True, False])
+def test_common_data_path_does_not_format_disabled_debug_messages(qtbot: QtBot, make_common_conn, request_slot_exists):
+    ch = cast(channel.CChannel, channel.PyDMChannel(address='device/property'))
+    ch.value_slot = mock.Mock()
+    if request_slot_exists:
+        ch.request_slot = mock.Mock()
+    repr_calls = []
+
+    def counting_repr(self):
+        repr_calls.append(self)
+        return 'conn'
+
+    messages = []
+    handler = logging.Handler()
+    handler.emit = lambda record: messages.append(record.getMessage())
+    logger = logging.getLogger('comrad.data_plugins')
+    orig_level = logger.level
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    try:
+        with mock.patch.object(make_common_conn, '__repr__', counting_repr):
+            conn = make_common_conn(ch, ch.address)
+            conn.add_listener(ch)
+            conn.add_listener(ch)  # Additional listener issues a GET
+            conn._on_async_get(1)
+            conn._on_requested_get(1, initiator_uid='test-uuid')
+            conn.remove_listener(ch)
+            conn.remove_listener(ch)
+            assert repr_calls == []
+            logger.setLevel(logging.DEBUG)
+            conn._on_async_get(1)
+            assert messages == ['conn: Received async GET callback']
+            assert repr_calls == [conn]
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(orig_level)
+
+
+@pytest.mark.parametrize('address,incoming_values,expected_values', [
+    ('device/property', [1, 1.1, 1.4, 3], [1, 1.1, 1.4, 3]),
+    ('device/property|abs=0.5', [1, 1.1, 1.4, 3], [1, 3]),
+    ('device/property|abs=0.5', [1, 1.4, 1.8, 1.2], [1, 1.8, 1.2]),
+    ('device/property|rel=0.1', [10, 10.5, 11.5, 11.6], [10, 11.5]),
+    ('device/property|hyst=1', [1, 1.5, 1.2, 0.4], [1, 1.5, 0.4]),
+    ('device/property|abs=0.5', ['a', 'a', 'b'], ['a', 'a', 'b']),
+    ('device/property|invalid', [1, 1.1], [1, 1.1]),
+])
+def test_common_subscription_applies_deadband(address, incoming_values, expected_values, make_common_conn):
+    ch = cast(channel.CChannel, channel.PyDMChannel(address=address))
+    value_slot = mock.Mock()
+    ch.value_slot = value_slot
+    conn = make_common_conn(ch, ch.address)
+    with mock.patch.object(conn, 'subscribe'):
+        conn.add_listener(ch)
+    for val in incoming_values:
+        conn._subscribe_callback(val)
+    assert value_slot.call_args_list == [mock.call(CChannelData(value=val, meta_info={})) for val in expected_values]
+
+
+def test_common_get_ignores_deadband(make_common_conn):
+    ch = cast(channel.CChannel, channel.PyDMChannel(address='device/property|abs=10'))
+    value_slot = mock.Mock()
+    ch.value_slot = value_slot
+    conn = make_common_conn(ch, ch.address)
+    with mock.patch.object(conn, 'subscribe'):
+        conn.add_listener(ch)
+    conn._subscribe_callback(1)
+    conn._subscribe_callback(2)
+    value_slot.assert_called_once_with(CChannelData(value=1, meta_info={}))
+    value_slot.reset_mock()
+    conn._on_async_get(2)
+    value_slot.assert_called_once_with(CChannelData(value=2, meta_info={}))
+
+
+def test_cycle_sync_delivers_complete_cycles_together(synchronizer):
+    conn1 = QObject()
+    conn2 = QObject()
+    deliveries = []
+
+    def submit(stamp, conn, name):
+        synchronizer.submit(cycle_stamp=stamp, connection=conn, deliver=functools.partial(deliveries.append, name))
+
+    submit(1, conn1, 'c1-conn1')
+    submit(1, conn2, 'c1-conn2')
+    assert deliveries == []  # Unknown set of contributors, has to wait
+    submit(2, conn1, 'c2-conn1')
+    assert deliveries == ['c1-conn1', 'c1-conn2']  # Newer cycle started
+    submit(2, conn2, 'c2-conn2')
+    assert deliveries == ['c1-conn1', 'c1-conn2', 'c2-conn1', 'c2-conn2']  # All known contributors have arrived
+
+
+def test_cycle_sync_delivers_late_packets_immediately(synchronizer):
+    conn1 = QObject()
+    conn2 = QObject()
+    deliveries = []
+    synchronizer.submit(cycle_stamp=2, connection=conn1, deliver=functools.partial(deliveries.append, 'c2-conn1'))
+    synchronizer.flush()
+    assert deliveries == ['c2-conn1']
+    synchronizer.submit(cycle_stamp=1, connection=conn2, deliver=functools.partial(deliveries.append, 'c1-conn2'))
+    assert deliveries == ['c2-conn1', 'c1-conn2']
+
+
+def test_cycle_sync_delivers_incomplete_cycle_on_timeout(qtbot: QtBot, synchronizer):
+    conn = QObject()
+    deliver = mock.Mock()
+    synchronizer.timeout = 10
+    synchronizer.submit(cycle_stamp=1, connection=conn, deliver=deliver)
+    deliver.assert_not_called()
+    qtbot.wait_until(lambda: deliver.call_count == 1, timeout=1000)
+
+
+def test_cycle_sync_active_does_not_create_instance(monkeypatch):
+    monkeypatch.setattr(CCycleSynchronizer, '_instance', None)
+    assert CCycleSynchronizer.active() is None
+    assert CCycleSynchronizer._instance is None
+    sync = CCycleSynchronizer.instance()
+    assert CCycleSynchronizer.active() is None
+    sync.enabled = True
+    assert CCycleSynchronizer.active() is sync
+
+
+@pytest.mark.parametrize('sync_enabled,meta_info,delivered_immediately', [
+    (True, {'cycleStamp': 1}, False),
+    (True, {}, True),
+    (False, {'cycleStamp': 1}, True),
+    (False, {}, True),
+])
+def test_common_subscription_uses_cycle_sync(sync_enabled, meta_info, delivered_immediately, make_common_conn, synchronizer):
+    synchronizer.enabled = sync_enabled
+    ch = cast(channel.CChannel, channel.PyDMChannel(address='device/property'))
+    value_slot = mock.Mock()
+    ch.value_slot = value_slot
+    conn = make_common_conn(ch, ch.address)
+    with mock.patch.object(conn, 'subscribe'):
+        conn.add_listener(ch)
+    expected_payload = CChannelData(value=1, meta_info=meta_info)
+    with mock.patch.object(conn, 'process_incoming_value', return_value=expected_payload):
+        conn._subscribe_callback(1)
+    if delivered_immediately:
+        value_slot.assert_called_once_with(expected_payload)
+    else:
+        value_slot.assert_not_called()
+        synchronizer.flush()
+        value_slot.assert_called_once_with(expected_payload)
+
+
 @pytest.mark.parametrize('protocol,connection_class', [
     ('test1proto', CDataConnection),
     ('test2proto', 'custom'),
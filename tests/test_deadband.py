@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+from comrad.data.deadband import CDeadband, CDeadbandFilter
+
+
+@pytest.mark.parametrize('addr,expected_addr,expected_deadband', [
+    ('dev/prop#field', 'dev/prop#field', None),
+    ('dev/prop#field|abs=0.5', 'dev/prop#field', CDeadband(absolute=0.5)),
+    ('dev/prop#field|rel=0.01', 'dev/prop#field', CDeadband(relative=0.01)),
+    ('dev/prop#field|hyst=2', 'dev/prop#field', CDeadband(hysteresis=2.0)),
+    ('dev/prop#field|abs=0.5,rel=0.01,hyst=2', 'dev/prop#field', CDeadband(absolute=0.5, relative=0.01, hysteresis=2.0)),
+    ('dev/prop#field@LHC.USER.ALL|abs=1', 'dev/prop#field@LHC.USER.ALL', CDeadband(absolute=1.0)),
+    ('dev/prop#field|', 'dev/prop#field', CDeadband()),
+])
+def test_split_address(addr, expected_addr, expected_deadband):
+    actual_addr, actual_deadband = CDeadband.split_address(addr)
+    assert actual_addr == expected_addr
+    assert actual_deadband == expected_deadband
+
+
+@pytest.mark.parametrize('addr', [
+    'dev/prop#field|abs',
+    'dev/prop#field|abs=',
+    'dev/prop#field|abs=a',
+    'dev/prop#field|unknown=1',
+    'dev/prop#field|abs=-1',
+])
+def test_split_address_fails(addr):
+    with pytest.raises(ValueError):
+        CDeadband.split_address(addr)
+
+
+@pytest.mark.parametrize('deadband,expected_suffix', [
+    (CDeadband(), ''),
+    (CDeadband(absolute=0.5), '|abs=0.5'),
+    (CDeadband(relative=0.5), '|rel=0.5'),
+    (CDeadband(absolute=0.5, hysteresis=1.5), '|abs=0.5,hyst=1.5'),
+])
+def test_to_string_suffix(deadband, expected_suffix):
+    assert deadband.to_string_suffix() == expected_suffix
+
+
+@pytest.mark.parametrize('deadband,values,expected_results', [
+    (CDeadband(absolute=1.0), [0, 0.5, 1.2, 1.5, 2.3], [True, False, True, False, True]),
+    (CDeadband(absolute=1.0), [0, 0.6, 1.2], [True, False, True]),
+    (CDeadband(relative=0.1), [100, 105, 111, 120], [True, False, True, False]),
+    (CDeadband(absolute=5.0, relative=0.1), [10, 13, 16], [True, False, True]),
+    (CDeadband(hysteresis=1.0), [0, 0.5, 0.6, 0.2, -0.5, 0.7], [True, True, True, False, True, True]),
+    (CDeadband(absolute=1.0), ['a', 'a', True, True, None], [True, True, True, True, True]),
+    (CDeadband(absolute=1.0), [np.array([1, 2]), np.array([1.5, 2.5]), np.array([1.5, 3.5])], [True, False, True]),
+    (CDeadband(absolute=1.0), [np.array([1, 2]), np.array([1, 2, 3])], [True, True]),
+    (CDeadband(relative=0.1), [np.array([1, 100]), np.array([1.05, 105]), np.array([1.2, 100])], [True, False, True]),
+    (CDeadband(absolute=1.0), [np.array(['a', 'b']), np.array(['a', 'b'])], [True, True]),
+])
+def test_filter_accept(deadband, values, expected_results):
+    db_filter = CDeadbandFilter(deadband)
+    assert [db_filter.accept(val) for val in values] == expected_results
+
+
+def test_filter_reset():
+    db_filter = CDeadbandFilter(CDeadband(absolute=1.0))
+    assert db_filter.accept(1) is True
+    assert db_filter.accept(1.5) is False
+    db_filter.reset()
+    assert db_filter.accept(1.5) is True
@@ -0,0 +1,130 @@
+import io
+import os
+import pytest
+from unittest import mock
+from pytestqt.qtbot import QtBot
+from qtpy.QtWidgets import QWidget, QLabel
+from comrad.app import display_cache
+from comrad.app.display_cache import CDisplayCache, load_ui_into_display
+
+
+_UI = """<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>Form</class>
+ <widget class="QWidget" name="Form">
+  <layout class="QVBoxLayout" name="layout">
+   <item>
+    <widget class="QLabel" name="label">
+     <property name="text">
+      <string>{text}</string>
+     </property>
+    </widget>
+   </item>
+  </layout>
+ </widget>
+</ui>
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CDisplayCache(directory=tmp_path / 'cache')
+
+
+def test_default_directory_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv('COMRAD_DISPLAY_CACHE_DIR', str(tmp_path))
+    assert CDisplayCache.default_directory() == tmp_path
+
+
+def test_key_depends_on_contents_and_version(cache):
+    key = cache.key(_UI.format(text='a'))
+    assert key == cache.key(_UI.format(text='a'))
+    assert key != cache.key(_UI.format(text='b'))
+    with mock.patch('comrad.app.display_cache.COMRAD_VERSION', '0.0.0'):
+        assert key != cache.key(_UI.format(text='a'))
+
+
+@pytest.mark.parametrize('use_path', [True, False])
+def test_load_ui_type_compiles_once(cache, tmp_path, use_path):
+    ui_file = tmp_path / 'display.ui'
+    ui_file.write_text(_UI.format(text='a'))
+
+    def make_source():
+        return str(ui_file) if use_path else io.StringIO(_UI.format(text='a'))
+
+    with mock.patch('comrad.app.display_cache.compile_ui', wraps=display_cache.compile_ui) as compile_ui:
+        form_class = cache.load_ui_type(make_source())
+        assert cache.load_ui_type(make_source()) is form_class
+        compile_ui.assert_called_once()
+        assert len(list(cache.directory.glob('*.py'))) == 1
+
+        # New process reuses files from disk
+        other_cache = CDisplayCache(directory=cache.directory)
+        assert other_cache.load_ui_type(make_source()) is not form_class
+        compile_ui.assert_called_once()
+
+
+def test_load_ui_type_keeps_recently_used_classes(cache, monkeypatch):
+    monkeypatch.setattr(CDisplayCache, 'MAX_LOADED_CLASSES', 2)
+    first = cache.load_ui_type(io.StringIO(_UI.format(text='a')))
+    cache.load_ui_type(io.StringIO(_UI.format(text='b')))
+    assert cache.load_ui_type(io.StringIO(_UI.format(text='a'))) is first  # Becomes most recently used
+    cache.load_ui_type(io.StringIO(_UI.format(text='c')))
+    assert len(cache._classes) == 2
+    assert cache.load_ui_type(io.StringIO(_UI.format(text='a'))) is first
+    assert cache.load_ui_type(io.StringIO(_UI.format(text='b'))) is not None
+    assert cache.key(_UI.format(text='c')) not in cache._classes
+
+
+def test_cache_directory_is_limited(cache, monkeypatch):
+    monkeypatch.setattr(CDisplayCache, 'MAX_ENTRIES', 2)
+    for idx, text in enumerate(['a', 'b']):
+        cache.load_ui_type(io.StringIO(_UI.format(text=text)))
+        os.utime(cache._entry_path(cache.key(_UI.format(text=text))), (1000 + idx, 1000 + idx))
+    cache.load_ui_type(io.StringIO(_UI.format(text='c')))
+    entries = {path.name for path in cache.directory.glob('*.py')}
+    assert entries == {cache._entry_path(cache.key(_UI.format(text=text))).name for text in ['b', 'c']}
+
+
+def test_cache_directory_drops_entries_of_other_versions(cache):
+    with mock.patch('comrad.app.display_cache.COMRAD_VERSION', '0.0.0'):
+        old_cache = CDisplayCache(directory=cache.directory)
+        old_cache.load_ui_type(io.StringIO(_UI.format(text='a')))
+    assert len(list(cache.directory.glob('*.py'))) == 1
+    cache.load_ui_type(io.StringIO(_UI.format(text='a')))
+    assert [path.name for path in cache.directory.glob('*.py')] == [cache._entry_path(cache.key(_UI.format(text='a'))).name]
+
+
+def test_load_ui_type_without_directory():
+    cache = CDisplayCache(directory=None)
+    form_class = cache.load_ui_type(io.StringIO(_UI.format(text='a')))
+    assert cache.load_ui_type(io.StringIO(_UI.format(text='a'))) is form_class
+
+
+def test_load_ui_type_survives_unwritable_directory(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    cache = CDisplayCache(directory=blocker / 'cache')
+    assert cache.load_ui_type(io.StringIO(_UI.format(text='a'))) is not None
+
+
+def test_load_ui_into_display(qtbot: QtBot, cache, monkeypatch):
+    monkeypatch.setattr(CDisplayCache, '_instance', cache)
+    display = QWidget()
+    qtbot.add_widget(display)
+    load_ui_into_display(io.StringIO(_UI.format(text='Hello')), display)
+    assert display.ui is display
+    assert display.findChild(QLabel, 'label').text() == 'Hello'
+    display.retranslateUi()
+
+
+def test_warm(cache, tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.ui').write_text(_UI.format(text='a'))
+    (tmp_path / 'sub' / 'b.ui').write_text(_UI.format(text='b'))
+    (tmp_path / 'sub' / 'broken.ui').write_text('<ui>')
+    (tmp_path / 'app.py').write_text('')
+    results = cache.warm([tmp_path])
+    assert [path.name for path, _, _ in results] == ['a.ui', 'b.ui']
+    assert all(cold >= 0 and warm >= 0 for _, cold, warm in results)
+    assert len(list(cache.directory.glob('*.py'))) == 2
@@ -0,0 +1,180 @@
+import pytest
+from unittest import mock
+from pytestqt.qtbot import QtBot
+from qtpy.QtCore import QObject
+from qtpy.QtWidgets import QWidget
+from pydm import Display
+from comrad.app.display_instances import CDisplayInstanceCache
+from comrad.data.activation import CChannelActivationPolicy
+from comrad.data.context import CContextTrackingDelegate
+
+
+@pytest.fixture(autouse=True)
+def policy(monkeypatch):
+    monkeypatch.setattr(CChannelActivationPolicy, '_instance', None)
+    with mock.patch('comrad.data.activation.data_plugins.plugin_for_address', return_value=None):
+        yield CChannelActivationPolicy.instance()
+
+
+@pytest.fixture
+def make_display(qtbot: QtBot):
+
+    def _make_display(filename: str = '/app/display.ui', macros=None):
+        # Not registered with qtbot, because evicted displays get destroyed
+        display = Display(macros=macros)
+        display._loaded_file = filename
+        tracked = QWidget(display)
+        tracked._channel_ids = ['japc:///dev/prop#tracked']
+        tracked._channels = [make_channel('japc:///dev/prop#tracked')]
+        tracked._context_tracker = CContextTrackingDelegate(tracked)
+        untracked = _UntrackedWidget(display)
+        return display, tracked, untracked
+
+    return _make_display
+
+
+class _UntrackedWidget(QWidget):
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+        self.channel = make_channel('japc:///dev/prop#untracked')
+
+    def channels(self):
+        return [self.channel]
+
+
+def make_channel(address: str):
+    channel = mock.MagicMock()
+    channel.address = address
+    channel.value_slot = None
+    return channel
+
+
+def test_disabled_by_default():
+    assert not CDisplayInstanceCache().enabled
+
+
+def test_park_and_restore(make_display, policy):
+    cache = CDisplayInstanceCache(capacity=2)
+    display, tracked, untracked = make_display()
+    cache.park(display)
+    assert cache.is_parked(display)
+    assert tracked._context_tracker.paused
+    tracked._channels[0].disconnect.assert_called_once()
+    untracked.channel.disconnect.assert_called_once()
+    assert policy.paused_count == 2
+    assert cache.restore(display)
+    assert not cache.is_parked(display)
+    assert not tracked._context_tracker.paused
+    tracked._channels[0].connect.assert_called_once()
+    untracked.channel.connect.assert_called_once()
+    assert policy.paused_count == 0
+    assert not cache.restore(display)
+
+
+def test_park_keeps_widgets_paused_while_hidden(make_display):
+    cache = CDisplayInstanceCache(capacity=2)
+    display, tracked, _ = make_display()
+    assert tracked._context_tracker.pause()
+    cache.park(display)
+    cache.restore(display)
+    # Paused by the visibility tracking before, will be resumed when the widget is shown
+    assert tracked._context_tracker.paused
+    tracked._channels[0].connect.assert_not_called()
+
+
+def test_eviction_by_capacity(make_display, policy):
+    cache = CDisplayInstanceCache(capacity=2)
+    displays = [make_display(f'/app/{i}.ui')[0] for i in range(3)]
+    for display in displays:
+        cache.park(display)
+    assert cache.parked_count == 2
+    assert cache.is_evicted(displays[0])
+    assert not cache.is_parked(displays[0])
+    assert all(cache.is_parked(d) for d in displays[1:])
+
+
+def test_park_refreshes_recent_use(make_display):
+    cache = CDisplayInstanceCache(capacity=2)
+    first, second, third = (make_display(f'/app/{i}.ui')[0] for i in range(3))
+    cache.park(first)
+    cache.park(second)
+    cache.park(first)
+    cache.park(third)
+    assert cache.is_evicted(second)
+    assert cache.is_parked(first)
+
+
+def test_eviction_by_memory_budget(make_display):
+    cache = CDisplayInstanceCache(capacity=10, memory_budget=100)
+    first, second = make_display('/app/a.ui')[0], make_display('/app/b.ui')[0]
+    cache.record_size(first, 60)
+    cache.record_size(second, 60)
+    cache.park(first)
+    assert cache.memory_usage == 60
+    cache.park(second)
+    assert cache.is_evicted(first)
+    assert cache.memory_usage == 60
+
+
+def test_evicted_display_releases_paused_counter(qtbot: QtBot, make_display, policy):
+    cache = CDisplayInstanceCache(capacity=1)
+    first, second = make_display('/app/a.ui')[0], make_display('/app/b.ui')[0]
+    cache.park(first)
+    cache.park(second)
+    assert cache.is_evicted(first)
+    qtbot.wait_until(lambda: policy.paused_count == 2)
+
+
+@pytest.mark.parametrize('filename,macros,exclude,found', [
+    ('/app/a.ui', {'dev': 'A'}, False, True),
+    ('/app/../app/a.ui', {'dev': 'A'}, False, True),
+    ('/app/a.ui', {'dev': 'B'}, False, False),
+    ('/app/b.ui', {'dev': 'A'}, False, False),
+    ('/app/a.ui', {'dev': 'A'}, True, False),
+])
+def test_find(make_display, filename, macros, exclude, found):
+    cache = CDisplayInstanceCache(capacity=2)
+    display = make_display('/app/a.ui', macros={'dev': 'A'})[0]
+    cache.park(display)
+    res = cache.find(filename, macros=macros, args=None, exclude=lambda _: exclude)
+    assert (res is display) == found
+
+
+def test_find_only_in_owner_window(make_display):
+    cache = CDisplayInstanceCache(capacity=2)
+    window_a, window_b = QObject(), QObject()
+    display = make_display('/app/a.ui')[0]
+    cache.park(display, owner=window_a)
+    assert cache.find('/app/a.ui', macros=None, args=None, owner=window_b) is None
+    assert cache.find('/app/a.ui', macros=None, args=None, owner=window_a) is display
+
+
+def test_open_in_second_window_does_not_steal_display(make_display, monkeypatch):
+    from comrad.app.main_window import CMainWindow
+    cache = CDisplayInstanceCache(capacity=2)
+    monkeypatch.setattr(CDisplayInstanceCache, '_instance', cache)
+
+    def make_window(current_display):
+        window = mock.MagicMock()
+        window._bypass_instance_cache = False
+        window.display_widget.return_value = current_display
+        window._overridden_members = {'open': mock.Mock(return_value=None)}
+        return window
+
+    # Display "a" is in the back history of the first window, that currently shows "b"
+    display_a, display_b = make_display('/app/a.ui')[0], make_display('/app/b.ui')[0]
+    display_b.previous_display = display_a
+    window_a = make_window(display_b)
+    cache.park(display_a, owner=window_a)
+    window_b = make_window(make_display('/app/c.ui')[0])
+    with mock.patch('comrad.app.main_window.current_memory_usage', return_value=None):
+        CMainWindow.open(window_b, '/app/a.ui')
+    window_b._overridden_members['open'].assert_called_once()
+    window_b.set_display_widget.assert_not_called()
+    assert cache.is_parked(display_a)
+
+    # Opening the same display from yet another display of the first window reuses it
+    window_a.display_widget.return_value = make_display('/app/d.ui')[0]
+    assert CMainWindow.open(window_a, '/app/a.ui') is display_a
+    window_a.set_display_widget.assert_called_once_with(display_a)
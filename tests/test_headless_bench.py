@@ -0,0 +1,126 @@
+import json
+import pytest
+from comrad.app.headless_bench import BenchmarkMetrics, write_report
+from comrad.instrumentation import InstrumentationRegistry
+
+
+class Widget:
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def objectName(self) -> str:
+        return self._name
+
+
+class CLabel(Widget):
+    pass
+
+
+class CScrollingPlot(Widget):
+    pass
+
+
+@pytest.fixture
+def metrics():
+    return BenchmarkMetrics(registry=InstrumentationRegistry())
+
+
+def test_start_enables_registry(metrics):
+    assert not metrics.registry.enabled
+    metrics.start()
+    assert metrics.registry.enabled
+
+
+def test_stop_keeps_registry_enabled_for_others(metrics):
+    metrics.registry.enable()
+    metrics.start()
+    metrics.start()
+    metrics.stop()
+    assert metrics.registry.enabled
+    metrics.registry.disable()
+    assert not metrics.registry.enabled
+
+
+def test_report_is_empty_without_activity(metrics):
+    metrics.start()
+    report = metrics.report(display='app.ui')
+    assert report['display'] == 'app.ui'
+    assert report['event_loop'] == {'samples': 0, 'lag_ms': {'p50': None, 'p90': None, 'p99': None, 'max': None}}
+    assert report['widgets'] == []
+    assert report['channels'] == []
+    assert report['connections'] == {'total': 0, 'by_protocol': {}, 'listeners': None}
+    assert report['rules'] == {'evaluations': 0, 'time_s': 0}
+    assert report['value_transformations'] == {'evaluations': 0, 'time_s': 0, 'widgets': []}
+    assert report['process']['cpu_s'] >= 0
+
+
+def test_updates_are_counted_per_widget_and_channel(metrics):
+    label = CLabel('label')
+    plot = CScrollingPlot('plot')
+    registry = metrics.registry
+    registry.record_packet('japc://dev/prop#field', 0.0)
+    registry.record_widget_update(label, 0.0)
+    metrics.start()
+    registry.record_packet('japc://dev/prop#field', 0.0)
+    registry.record_widget_update(label, 0.0)
+    registry.record_widget_update(plot, 0.0)
+    for _ in range(2):
+        registry.record_packet('japc://dev/prop#other', 0.0)
+        registry.record_widget_update(plot, 0.0)
+    registry.record_dropped('japc://dev/prop#other')
+    registry.record_coalesced(plot)
+    report = metrics.report(connections={'japc': 2}, listeners=3)
+    assert report['widgets'] == [
+        {'name': 'plot', 'class': 'CScrollingPlot', 'updates': 3, 'coalesced': 1},
+        {'name': 'label', 'class': 'CLabel', 'updates': 1, 'coalesced': 0},
+    ]
+    assert report['channels'] == [
+        {'address': 'japc://dev/prop#other', 'updates': 2, 'dropped': 1},
+        {'address': 'japc://dev/prop#field', 'updates': 1, 'dropped': 0},
+    ]
+    assert report['connections'] == {'total': 2, 'by_protocol': {'japc': 2}, 'listeners': 3}
+
+
+@pytest.mark.parametrize('samples,expected', [
+    ([5.0], {'p50': 5.0, 'p90': 5.0, 'p99': 5.0, 'max': 5.0}),
+    ([float(i) for i in range(100, 0, -1)], {'p50': 50.0, 'p90': 90.0, 'p99': 99.0, 'max': 100.0}),
+    ([0.0] * 98 + [20.0, 40.0], {'p50': 0.0, 'p90': 0.0, 'p99': 20.0, 'max': 40.0}),
+])
+def test_event_loop_lag_percentiles(metrics, samples, expected):
+    for lag in samples:
+        metrics.registry.record_event_loop_lag(lag)
+    report = metrics.report()
+    assert report['event_loop']['samples'] == len(samples)
+    assert report['event_loop']['lag_ms'] == expected
+
+
+def test_rules_and_transformations_are_timed(metrics):
+    fast = CLabel('fast')
+    slow = CLabel('slow')
+    registry = metrics.registry
+    registry.record_rule(fast, 0.5)
+    registry.record_rule(None, 0.25)
+    registry.record_transformation(fast, 0.125)
+    registry.record_transformation(slow, 1.0)
+    registry.record_transformation(slow, 1.0)
+    report = metrics.report()
+    assert report['rules'] == {'evaluations': 2, 'time_s': 0.75}
+    assert report['value_transformations'] == {
+        'evaluations': 3,
+        'time_s': 2.125,
+        'widgets': [
+            {'name': 'slow', 'class': 'CLabel', 'evaluations': 2, 'time_s': 2.0},
+            {'name': 'fast', 'class': 'CLabel', 'evaluations': 1, 'time_s': 0.125},
+        ],
+    }
+
+
+def test_write_report(metrics, tmp_path):
+    metrics.registry.record_packet('japc://dev/prop#field', 0.0)
+    path = tmp_path / 'report.json'
+    write_report(metrics.report(display='app.ui', rss=1024), str(path))
+    contents = json.loads(path.read_text())
+    assert contents['display'] == 'app.ui'
+    assert contents['process']['rss_bytes'] == 1024
+    assert contents['channels'] == [{'address': 'japc://dev/prop#field', 'updates': 1, 'dropped': 0}]
@@ -0,0 +1,95 @@
+import sys
+import subprocess
+import pytest
+from typing import Dict
+import comrad
+import comrad.data_plugins
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """Cumulative import time (in microseconds) of each module imported by the statement in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                          capture_output=True,
+                          text=True,
+                          check=True)
+    res = {}
+    for line in proc.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        try:
+            res[name.strip()] = int(cumulative)
+        except ValueError:
+            # Header line
+            continue
+    return res
+
+
+_HEAVY_MODULES = [
+    'comrad.widgets.graphs',
+    'comrad.widgets.inputs',
+    'comrad.widgets.tables',
+    'comrad.app.application',
+    'accwidgets.graph',
+    'accwidgets.property_edit',
+    'accwidgets.log_console',
+]
+
+
+@pytest.mark.parametrize('statement', [
+    'import comrad',
+    'from comrad import CChannelData, CEnumValue',
+    'from comrad.data_plugins import CDataPlugin, CChannelData',
+])
+def test_light_imports_skip_widgets_and_application(statement):
+    modules = import_times(statement)
+    assert 'comrad' in modules
+    assert not set(_HEAVY_MODULES) & modules.keys()
+
+
+def test_widget_import_loads_only_its_module():
+    modules = import_times('from comrad import CLabel')
+    assert 'comrad.widgets.indicators' in modules
+    assert 'comrad.widgets.graphs' not in modules
+    assert 'comrad.app.application' not in modules
+
+
+def test_data_plugins_load_connections_on_access():
+    modules = import_times('from comrad.data_plugins import CDataPlugin')
+    assert 'comrad.data_plugins' in modules
+    assert 'comrad.data_plugins._common_conn' not in modules
+
+
+@pytest.mark.parametrize('name', comrad.__all__)
+def test_public_api_resolves(name):
+    assert getattr(comrad, name) is not None
+    assert name in dir(comrad)
+
+
+@pytest.mark.parametrize('name,module', [
+    ('ExPlotWidget', 'comrad.widgets.graphs'),
+    ('PyDMWidget', 'comrad.widgets.tables'),
+    ('WindowPluginConfigTrie', 'comrad.app.application'),
+])
+def test_names_formerly_exposed_by_star_imports(name, module):
+    assert getattr(comrad, name) is getattr(sys.modules[module], name)
+
+
+@pytest.mark.parametrize('name', ['ExPlotWidget', 'CyclicPlotCurve', 'CyclicPlotWidget', 'LogConsoleModel'])
+def test_star_import_exports_accwidgets_base_classes(name):
+    namespace: Dict[str, object] = {}
+    exec('from comrad import *', namespace)
+    assert name in namespace
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        _ = comrad.CNonExistingWidget
+    with pytest.raises(AttributeError):
+        _ = comrad.data_plugins.CNonExistingConnection
+
+
+@pytest.mark.parametrize('name', ['CDataConnection', 'CCommonDataConnection', 'CCycleSynchronizer', 'CChannel', 'CChannelData'])
+def test_data_plugins_api_resolves(name):
+    assert getattr(comrad.data_plugins, name) is not None
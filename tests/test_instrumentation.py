@@ -0,0 +1,128 @@
+import gc
+import threading
+import pytest
+from comrad.instrumentation import InstrumentationRegistry
+
+
+class Widget:
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def objectName(self) -> str:
+        return self._name
+
+
+@pytest.fixture
+def registry():
+    return InstrumentationRegistry()
+
+
+def test_singleton_is_disabled_by_default():
+    assert InstrumentationRegistry.instance() is InstrumentationRegistry.instance()
+    assert InstrumentationRegistry().enabled is False
+
+
+def test_enable_is_reference_counted(registry):
+    registry.enable()
+    registry.enable()
+    registry.disable()
+    assert registry.enabled is True
+    registry.disable()
+    assert registry.enabled is False
+    registry.disable()
+    registry.enable()
+    assert registry.enabled is True
+
+
+def test_channel_counters(registry):
+    registry.record_packet('japc://dev/prop#field', 0.5)
+    registry.record_packet('japc://dev/prop#field', 0.25)
+    registry.record_dropped('japc://dev/prop#field')
+    registry.record_dropped('japc://dev/prop#other')
+    snapshot = registry.snapshot()
+    assert snapshot.packets == 2
+    assert snapshot.dropped == 2
+    channels = {stats.address: stats for stats in snapshot.channels}
+    assert channels['japc://dev/prop#field'].packets.count == 2
+    assert channels['japc://dev/prop#field'].packets.seconds == 0.75
+    assert channels['japc://dev/prop#other'].packets.count == 0
+    assert channels['japc://dev/prop#other'].dropped == 1
+
+
+def test_widget_counters(registry):
+    widget = Widget('label')
+    registry.record_widget_update(widget, 0.5)
+    registry.record_transformation(widget, 0.25)
+    registry.record_rule(widget, 0.125)
+    registry.record_coalesced(widget, count=3)
+    snapshot = registry.snapshot()
+    assert snapshot.coalesced == 3
+    assert snapshot.rules.count == 1
+    assert snapshot.transformations.count == 1
+    stats, = snapshot.widgets
+    assert (stats.name, stats.class_name) == ('label', 'Widget')
+    assert stats.updates.count == 1
+    assert stats.coalesced == 3
+    assert stats.seconds == 0.875
+
+
+def test_totals_are_kept_without_widget(registry):
+    registry.record_rule(None, 0.5)
+    registry.record_coalesced(None)
+    snapshot = registry.snapshot()
+    assert snapshot.rules.count == 1
+    assert snapshot.coalesced == 1
+    assert snapshot.widgets == []
+
+
+def test_destroyed_widgets_are_forgotten(registry):
+    widget = Widget('label')
+    registry.record_widget_update(widget, 0.5)
+    del widget
+    gc.collect()
+    assert registry.snapshot().widgets == []
+
+
+def test_snapshot_is_not_affected_by_further_recording(registry):
+    widget = Widget('label')
+    registry.record_packet('japc://dev/prop', 0.0)
+    registry.record_widget_update(widget, 0.0)
+    snapshot = registry.snapshot()
+    registry.record_packet('japc://dev/prop', 0.0)
+    registry.record_widget_update(widget, 0.0)
+    assert snapshot.channels[0].packets.count == 1
+    assert snapshot.widgets[0].updates.count == 1
+
+
+def test_event_loop_lag_is_taken_once(registry):
+    registry.record_event_loop_lag(1.0)
+    registry.record_event_loop_lag(2.0)
+    assert registry.take_event_loop_lag() == [1.0, 2.0]
+    assert registry.take_event_loop_lag() == []
+
+
+def test_reset(registry):
+    registry.record_packet('japc://dev/prop', 0.0)
+    registry.record_widget_update(Widget('label'), 0.0)
+    registry.record_event_loop_lag(1.0)
+    registry.reset()
+    snapshot = registry.snapshot()
+    assert snapshot.packets == 0
+    assert snapshot.channels == []
+    assert snapshot.widgets == []
+    assert registry.take_event_loop_lag() == []
+
+
+def test_recording_from_multiple_threads(registry):
+
+    def record():
+        for _ in range(1000):
+            registry.record_packet('japc://dev/prop', 0.0)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry.snapshot().packets == 4000
@@ -0,0 +1,54 @@
+import pytest
+import logging
+from unittest import mock
+from _comrad import jvm_prewarm, startup_profile
+from _comrad.jvm_prewarm import start_jvm_prewarm, wait_for_jvm
+from _comrad.startup_profile import startup_phase, startup_timeline
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    monkeypatch.setattr(jvm_prewarm, '_future', None)
+    monkeypatch.setattr(startup_profile, '_events', [])
+    monkeypatch.setattr(startup_profile, '_recording', True)
+
+
+def make_pyjapc_module(module_name: str, init=None):
+    cls = type('PyJapc', (), {'__module__': module_name, '__init__': init or (lambda *_, **__: None)})
+    return mock.MagicMock(PyJapc=cls)
+
+
+def test_wait_without_prewarm():
+    assert wait_for_jvm() is False
+
+
+def test_prewarm_skipped_for_papc():
+    with mock.patch.dict('sys.modules', {'pyjapc': make_pyjapc_module('papc.interfaces.pyjapc')}):
+        future = start_jvm_prewarm()
+        assert start_jvm_prewarm() is future
+        assert wait_for_jvm(timeout=5) is False
+    assert future.result() is False
+
+
+def test_prewarm_failure_falls_back(caplog):
+
+    def fail(*_, **__):
+        raise RuntimeError('No JVM found')
+
+    with mock.patch.dict('sys.modules', {'pyjapc': make_pyjapc_module('pyjapc._japc', init=fail)}):
+        start_jvm_prewarm()
+        with caplog.at_level(logging.WARNING, logger='_comrad.jvm_prewarm'):
+            assert wait_for_jvm(timeout=5) is False
+    assert 'No JVM found' in caplog.text
+
+
+def test_timeline_shows_threads():
+    with mock.patch.dict('sys.modules', {'pyjapc': make_pyjapc_module('papc.interfaces.pyjapc')}):
+        with startup_phase('Import ComRAD'):
+            start_jvm_prewarm()
+            wait_for_jvm(timeout=5)
+    lines = startup_timeline().splitlines()
+    assert lines[0] == 'Startup timeline (ms since launch):'
+    assert any('MainThread' in line and line.endswith('Import ComRAD') for line in lines)
+    assert any('comrad-jvm-prewarm' in line and line.endswith('Import PyJapc') for line in lines)
+    assert any(line.endswith('Wait for JVM') for line in lines)
@@ -0,0 +1,58 @@
+import ast
+import pytest
+from pathlib import Path
+from typing import List
+
+
+_ROOT = Path(__file__).parent.parent
+
+_DATA_PATH_MODULES = [
+    *sorted(str(path.relative_to(_ROOT)) for path in (_ROOT / 'comrad' / 'data_plugins').glob('*.py')),
+    'comrad/data/japc_plugin.py',
+    'comrad/data/pyjapc_patch.py',
+    'comrad/data/broker_client.py',
+    'comrad/rules.py',
+]
+"""Modules on the path of every value and listener change, where log messages must be formatted lazily."""
+
+_LOG_METHODS = {'debug', 'info', 'warning', 'error', 'exception', 'critical', 'log'}
+
+
+def eager_log_calls(source: str) -> List[int]:
+    """Lines of logger calls, whose message is formatted before the logger decides whether it is needed."""
+    res = []
+    for node in ast.walk(ast.parse(source)):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in _LOG_METHODS):
+            continue
+        if not (isinstance(node.func.value, ast.Name) and node.func.value.id in {'logger', 'logging'}):
+            continue
+        msg_args = node.args[1:2] if node.func.attr == 'log' else node.args[:1]
+        for msg in msg_args:
+            if (isinstance(msg, ast.JoinedStr)
+                    or (isinstance(msg, ast.BinOp) and isinstance(msg.op, (ast.Mod, ast.Add)))
+                    or (isinstance(msg, ast.Call) and isinstance(msg.func, ast.Attribute) and msg.func.attr == 'format')):
+                res.append(node.lineno)
+    return res
+
+
+@pytest.mark.parametrize('source,expected_lines', [
+    ("logger.debug('%s: Subscribing', self)", []),
+    ("logger.debug('Static message')", []),
+    ("logger.debug(f'{self}: Subscribing')", [1]),
+    ("logger.warning('{}: Subscribing'.format(self))", [1]),
+    ("logger.warning('%s: Subscribing' % self)", [1]),
+    ("logger.error('Errors:\\n' + text)", [1]),
+    ("logging.log(logging.DEBUG, f'{self}')", [1]),
+    ("print(f'{self}')", []),
+    ("raise ValueError(f'{self}')", []),
+])
+def test_eager_log_calls(source, expected_lines):
+    assert eager_log_calls(source) == expected_lines
+
+
+@pytest.mark.parametrize('module', _DATA_PATH_MODULES)
+def test_data_path_logging_is_lazy(module):
+    path = _ROOT / module
+    lines = eager_log_calls(path.read_text())
+    assert not lines, (f'{module} formats log messages eagerly on lines {lines}. Pass arguments to the logger '
+                       "instead, e.g. logger.debug('%s: message', self)")
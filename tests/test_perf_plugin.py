@@ -0,0 +1,136 @@
+import pytest
+from unittest import mock
+from pytestqt.qtbot import QtBot
+from qtpy.QtCore import Qt, QObject
+from comrad.instrumentation import InstrumentationRegistry, InstrumentationSnapshot, TimedCounter
+from comrad.app.plugins.statusbar.perf_plugin import (PerformanceStatusBarPlugin, PerformanceMonitorButton,
+                                                      PerformanceDetailsDialog, _StatsTable)
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(InstrumentationRegistry, '_instance', None)
+    with mock.patch('comrad.app.plugins.statusbar.perf_plugin.connection_counts',
+                    return_value={'connections': {'japc': 3, 'rda3': 1}, 'listeners': 7}):
+        yield InstrumentationRegistry.instance()
+
+
+def make_snapshot(duration: float, packets: int) -> InstrumentationSnapshot:
+    return InstrumentationSnapshot(duration=duration,
+                                   packets=packets,
+                                   dropped=2,
+                                   coalesced=4,
+                                   rules=TimedCounter(),
+                                   transformations=TimedCounter(),
+                                   channels=[],
+                                   widgets=[])
+
+
+@pytest.mark.parametrize('config,expected_top,expected_interval', [
+    (None, 5, 1000),
+    ({}, 5, 1000),
+    ({'top': '2', 'interval': '500'}, 2, 500),
+    ({'top': 'many', 'interval': '500'}, 5, 500),
+])
+def test_plugin_creates_button(qtbot: QtBot, config, expected_top, expected_interval):
+    button = PerformanceStatusBarPlugin().create_widget(config)
+    qtbot.add_widget(button)
+    assert isinstance(button, PerformanceMonitorButton)
+    assert button._top == expected_top
+    assert button._timer.interval() == expected_interval
+
+
+def test_plugin_is_disabled_by_default():
+    assert PerformanceStatusBarPlugin.enabled is False
+    assert PerformanceStatusBarPlugin.plugin_id == 'comrad.perf'
+
+
+def test_button_shows_rate_and_lag(qtbot: QtBot, registry):
+    button = PerformanceMonitorButton(interval=100000)
+    qtbot.add_widget(button)
+    with mock.patch.object(registry, 'snapshot', side_effect=[make_snapshot(duration=2.0, packets=100),
+                                                              make_snapshot(duration=4.0, packets=160)]):
+        button._last_snapshot = None
+        registry.take_event_loop_lag()
+        button._refresh()
+        assert button.text() == 'Lag 0 ms | 50 values/s | 2 dropped | 4 coalesced | 4 connections'
+        registry.record_event_loop_lag(12.0)
+        registry.record_event_loop_lag(40.4)
+        button._refresh()
+        # Rate is calculated since the last refresh
+        assert button.text() == 'Lag 40 ms | 30 values/s | 2 dropped | 4 coalesced | 4 connections'
+
+
+def test_button_rate_after_reset(qtbot: QtBot, registry):
+    button = PerformanceMonitorButton(interval=100000)
+    qtbot.add_widget(button)
+    with mock.patch.object(registry, 'snapshot', side_effect=[make_snapshot(duration=10.0, packets=100),
+                                                              make_snapshot(duration=1.0, packets=20)]):
+        button._refresh()
+        button._refresh()
+    assert '| 20 values/s |' in button.text()
+
+
+def test_button_tooltip_ranks_most_expensive(qtbot: QtBot, registry):
+    button = PerformanceMonitorButton(top=2, interval=100000)
+    qtbot.add_widget(button)
+    widgets = []
+    for name, seconds in [('cheap', 0.001), ('expensive', 0.1), ('medium', 0.01)]:
+        widget = QObject()
+        widget.setObjectName(name)
+        widgets.append(widget)
+        registry.record_widget_update(widget, seconds)
+    registry.record_packet('dev/cheap#field', 0.002)
+    registry.record_packet('dev/expensive#field', 0.2)
+    registry.record_packet('dev/medium#field', 0.02)
+    button._refresh()
+    assert button.toolTip() == '<br>'.join([
+        '<b>Most expensive widgets</b>',
+        'expensive: 100.0 ms',
+        'medium: 10.0 ms',
+        '<b>Most expensive channels</b>',
+        'dev/expensive#field: 200.0 ms',
+        'dev/medium#field: 20.0 ms',
+        '<i>Click for details</i>',
+    ])
+
+
+def test_button_enables_registry_until_destroyed(qtbot: QtBot, registry):
+    assert not registry.enabled
+    first = PerformanceMonitorButton(interval=100000)
+    # Not registered with qtbot, because they are destroyed by the test
+    second = PerformanceMonitorButton(interval=100000)
+    assert registry.enabled
+    first.deleteLater()
+    qtbot.wait_until(lambda: registry._enablers == 1)
+    assert registry.enabled
+    second.deleteLater()
+    qtbot.wait_until(lambda: not registry.enabled)
+
+
+def test_details_dialog_shows_counters(qtbot: QtBot, registry):
+    registry.record_packet('dev/prop#field', 0.01)
+    registry.record_dropped('dev/prop#field')
+    dialog = PerformanceDetailsDialog(registry=registry)
+    qtbot.add_widget(dialog)
+    dialog.update_snapshot(registry.snapshot())
+    assert dialog._channels.rowCount() == 1
+    assert dialog._channels.item(0, 0).text() == 'dev/prop#field'
+    assert dialog._channels.item(0, 4).data(Qt.DisplayRole) == 1
+    dialog._reset()
+    assert dialog._channels.rowCount() == 0
+
+
+def test_stats_table_sorts_numerically(qtbot: QtBot):
+    table = _StatsTable(['Name', 'Values'])
+    qtbot.add_widget(table)
+    table.set_rows([['b', 10], ['a', 9], ['c', 100]])
+    table.sortItems(1, Qt.AscendingOrder)
+    assert [table.item(row, 1).data(Qt.DisplayRole) for row in range(table.rowCount())] == [9, 10, 100]
+    assert [table.item(row, 0).text() for row in range(table.rowCount())] == ['a', 'b', 'c']
+    table.sortItems(1, Qt.DescendingOrder)
+    assert [table.item(row, 0).text() for row in range(table.rowCount())] == ['c', 'b', 'a']
+    # Refilling the table while sorted does not scramble the rows
+    table.set_rows([['d', 2], ['e', 30]])
+    assert table.rowCount() == 2
+    assert [table.item(row, 0).text() for row in range(table.rowCount())] == ['e', 'd']
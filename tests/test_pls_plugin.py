@@ -6,6 +6,7 @@ from unittest import mock
 from qtpy.QtWidgets import QToolBar, QApplication
 from accwidgets.timing_bar._model import TimingUpdate
 from comrad import CApplication
+from comrad.data.context import CContext
 from comrad.app.plugins.toolbar.pls_plugin import (PLSToolbarConfig, PLSToolbarWidget, TimingBar, TelegramInfo,
                                                    TimingBarDomain, DEFAULT_DOMAIN, get_telegram_info)
 
@@ -482,6 +483,19 @@ def test_toolbar_widget_update_view_on_selector_change_to_none_selector(qtbot: Q
     assert bar.highlightedUser is None
 
 
+def test_toolbar_widget_follows_selector_of_own_window(qtbot: QtBot):
+    QApplication.instance().main_window.ui.navbar = QToolBar()
+    own_context = cast(CApplication, CApplication.instance()).main_window.window_context
+    widget = PLSToolbarWidget()
+    qtbot.add_widget(widget)
+    assert widget.window_context is own_context
+    with mock.patch.object(cast(CApplication, CApplication.instance()).main_window, 'window_context', CContext()) as other_context:
+        other_context.selector = 'LHC.USER.ALL'
+        assert widget._btn.text() == 'PLS: None'
+        own_context.selector = 'PSB.USER.MD1'
+        assert widget._btn.text() == 'PLS: PSB.USER.MD1'
+
+
 def test_toolbar_widget_adapts_bar_size_to_size_hint_on_new_data(qtbot: QtBot):
     QApplication.instance().main_window.ui.navbar = QToolBar()
     widget = PLSToolbarWidget()
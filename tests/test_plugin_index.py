@@ -0,0 +1,137 @@
+import os
+import pytest
+import json
+from unittest import mock
+from pathlib import Path
+from comrad.app.plugins.common import (load_plugins_from_path, CToolbarPlugin, CToolbarWidgetPlugin, CMenuBarPlugin,
+                                       CStatusBarPlugin)
+from comrad.app.plugins._index import PluginIndex
+
+
+TOOLBAR_PLUGIN = """
+from qtpy.QtWidgets import QWidget
+from comrad.app.plugins.common import CToolbarWidgetPlugin
+
+
+class HelperWidget(QWidget):
+    pass
+
+
+class TestToolbarPlugin(CToolbarWidgetPlugin):
+    plugin_id = 'org.example.toolbar'
+    enabled = {enabled}
+
+    def create_widget(self, _):
+        return None
+"""
+
+
+MENU_PLUGIN = """
+from comrad.app.plugins.common import CMenuBarPlugin
+
+
+class _Base(CMenuBarPlugin):
+    plugin_id = {plugin_id}
+
+    def menu_bar_item(self):
+        return None
+
+
+class TestMenuPlugin(_Base):
+    pass
+"""
+
+
+@pytest.fixture
+def plugin_dir(tmp_path: Path):
+    plugin_dir = tmp_path / 'plugins'
+    plugin_dir.mkdir()
+    return plugin_dir
+
+
+@pytest.fixture
+def index(tmp_path: Path):
+    return PluginIndex(path=tmp_path / 'cache' / 'plugin-index.json')
+
+
+def write_plugins(plugin_dir: Path, toolbar_enabled: bool = True, menu_plugin_id: str = "'org.example.menu'"):
+    (plugin_dir / 'toolbar_plugin.py').write_text(TOOLBAR_PLUGIN.format(enabled=toolbar_enabled))
+    (plugin_dir / 'menu_plugin.py').write_text(MENU_PLUGIN.format(plugin_id=menu_plugin_id))
+    (plugin_dir / 'other.py').write_text('raise ImportError')
+
+
+def loaded_types(plugins):
+    return sorted(cls.__name__ for cls in plugins.values())
+
+
+@pytest.mark.parametrize('toolbar_enabled,whitelist,blacklist,expect_import', [
+    (True, None, None, True),
+    (True, None, ['org.example.toolbar'], False),
+    (False, None, None, False),
+    (False, ['org.example.toolbar'], None, True),
+])
+def test_index_skips_disabled_plugins(plugin_dir, index, toolbar_enabled, whitelist, blacklist, expect_import):
+    write_plugins(plugin_dir, toolbar_enabled=toolbar_enabled)
+    with mock.patch('comrad.app.plugins.common._import_plugin_file', wraps=lambda f: None) as import_file:
+        load_plugins_from_path(locations=[plugin_dir],
+                               token='_plugin.py',
+                               base_type=CToolbarPlugin,
+                               index=index,
+                               whitelist=whitelist,
+                               blacklist=blacklist)
+    if expect_import:
+        import_file.assert_called_once_with(plugin_dir / 'toolbar_plugin.py')
+    else:
+        import_file.assert_not_called()
+
+
+def test_index_shares_walk_and_modules(plugin_dir, index):
+    write_plugins(plugin_dir)
+    with mock.patch('os.walk', wraps=os.walk) as walk:
+        toolbar = load_plugins_from_path(locations=[plugin_dir], token='_plugin.py', base_type=CToolbarPlugin, index=index)
+        menu = load_plugins_from_path(locations=[plugin_dir], token='_plugin.py', base_type=CMenuBarPlugin, index=index)
+        status = load_plugins_from_path(locations=[plugin_dir], token='_plugin.py', base_type=CStatusBarPlugin, index=index)
+    walk.assert_called_once()
+    assert loaded_types(toolbar) == ['TestToolbarPlugin']
+    assert issubclass(next(iter(toolbar.values())), CToolbarWidgetPlugin)
+    assert loaded_types(menu) == ['TestMenuPlugin', '_Base']
+    assert status == {}
+    with mock.patch('comrad.app.plugins.common._import_plugin_file') as import_file:
+        load_plugins_from_path(locations=[plugin_dir], token='_plugin.py', base_type=CToolbarPlugin, index=index)
+    import_file.assert_not_called()
+
+
+def test_index_is_stored_and_refreshed(plugin_dir, index):
+    write_plugins(plugin_dir)
+    load_plugins_from_path(locations=[plugin_dir], token='_plugin.py', base_type=CToolbarPlugin, index=index)
+    contents = json.loads(index.path.read_text())
+    assert set(contents['files'].keys()) == {str(plugin_dir / 'toolbar_plugin.py'), str(plugin_dir / 'menu_plugin.py')}
+
+    new_index = PluginIndex(path=index.path)
+    with mock.patch('comrad.app.plugins._index._analyze') as analyze:
+        new_index.classes(plugin_dir / 'toolbar_plugin.py')
+    analyze.assert_not_called()
+
+    (plugin_dir / 'toolbar_plugin.py').write_text(TOOLBAR_PLUGIN.format(enabled=False) + '\n')
+    classes = new_index.classes(plugin_dir / 'toolbar_plugin.py')
+    assert [c for c in classes if c['name'] == 'TestToolbarPlugin'][0]['enabled'] is False
+
+
+@pytest.mark.parametrize('menu_plugin_id', [
+    "'org.' + 'example'",
+    "''",
+])
+def test_index_imports_undecidable_plugins(plugin_dir, index, menu_plugin_id):
+    write_plugins(plugin_dir, menu_plugin_id=menu_plugin_id)
+    with mock.patch('comrad.app.plugins.common._import_plugin_file', wraps=lambda f: None) as import_file:
+        load_plugins_from_path(locations=[plugin_dir], token='_plugin.py', base_type=CMenuBarPlugin, index=index)
+    import_file.assert_called_once_with(plugin_dir / 'menu_plugin.py')
+
+
+def test_index_survives_unwritable_location(plugin_dir, tmp_path):
+    write_plugins(plugin_dir)
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('')
+    index = PluginIndex(path=blocker / 'plugin-index.json')
+    toolbar = load_plugins_from_path(locations=[plugin_dir], token='_plugin.py', base_type=CToolbarPlugin, index=index)
+    assert loaded_types(toolbar) == ['TestToolbarPlugin']
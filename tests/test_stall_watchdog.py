@@ -0,0 +1,73 @@
+import time
+import threading
+import pytest
+from comrad.app.stall_watchdog import StallWatchdog, StallReport
+
+
+def slow_widget_update(duration: float):
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+def classify(frame):
+    return 'CLabel "label"' if frame.f_code.co_name == 'slow_widget_update' else None
+
+
+@pytest.fixture
+def reports():
+    return []
+
+
+@pytest.fixture
+def watchdog(reports):
+    reported = threading.Event()
+
+    def on_stall(report):
+        reports.append(report)
+        reported.set()
+
+    watchdog = StallWatchdog(threshold=0.05, on_stall=on_stall, classify=classify, sample_interval=0.002)
+    watchdog.reported = reported
+    watchdog.start()
+    yield watchdog
+    watchdog.stop()
+
+
+def test_stall_is_attributed(watchdog, reports):
+    watchdog.heartbeat()
+    slow_widget_update(0.3)
+    watchdog.heartbeat()
+    assert watchdog.reported.wait(timeout=5.0)
+    report, = reports
+    assert 0.2 <= report.duration <= 1.0
+    assert report.samples > 0
+    assert report.culprits[0][0] == 'CLabel "label"'
+    assert report.hotspots[0][0].startswith('test_stall_watchdog.py:')
+    assert any('in slow_widget_update' in frame for frame in report.stack)
+
+
+def test_regular_heartbeats_are_not_reported(watchdog, reports):
+    for _ in range(20):
+        watchdog.heartbeat()
+        time.sleep(0.01)
+    assert reports == []
+
+
+def test_nothing_is_reported_before_first_heartbeat(watchdog, reports):
+    slow_widget_update(0.2)
+    assert reports == []
+
+
+def test_report_format():
+    report = StallReport(duration=2.5,
+                         samples=4,
+                         culprits=[('CLabel "label"', 3), ('connection dev/prop', 1)],
+                         hotspots=[('snippet.py:3 in <module>', 4)],
+                         stack=['launcher.py:10 in run', 'widgets.py:20 in value_changed', 'snippet.py:3 in <module>'])
+    assert report.format(max_depth=2) == ('Event loop stalled for 2.50 s (4 samples)\n'
+                                          'Spent in: CLabel "label" (75%), connection dev/prop (25%)\n'
+                                          'Hottest frames: snippet.py:3 in <module> (100%)\n'
+                                          'Most frequent stack (innermost last):\n'
+                                          '  widgets.py:20 in value_changed\n'
+                                          '  snippet.py:3 in <module>')
@@ -0,0 +1,107 @@
+import json
+import time
+import pytest
+from _comrad import startup_profile
+from _comrad.startup_profile import (start_recording, stop_recording, is_recording, is_profiling, startup_phase,
+                                     record_event, startup_events, startup_summary, write_chrome_trace)
+
+
+_UI = """<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>Form</class>
+ <widget class="QWidget" name="Form">
+  <layout class="QVBoxLayout" name="layout">
+   <item>
+    <widget class="QLabel" name="label">
+     <property name="text">
+      <string>Hello</string>
+     </property>
+    </widget>
+   </item>
+  </layout>
+ </widget>
+</ui>
+"""
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    monkeypatch.setattr(startup_profile, '_events', [])
+    monkeypatch.setattr(startup_profile, '_recording', False)
+    monkeypatch.setattr(startup_profile, '_profiling', False)
+
+
+def test_nothing_recorded_by_default():
+    assert not is_recording()
+    with startup_phase('Import ComRAD'):
+        pass
+    record_event('CLabel', category='widget', start=time.perf_counter())
+    assert startup_events() == []
+
+
+def test_recording_lifecycle():
+    start_recording(profile=True)
+    assert is_recording()
+    assert is_profiling()
+    with startup_phase('Import ComRAD'):
+        pass
+    stop_recording()
+    assert not is_recording()
+    assert not is_profiling()
+    with startup_phase('Load main display'):
+        pass
+    events = startup_events()
+    assert [e.name for e in events] == ['Import ComRAD']
+    assert events[0].end >= events[0].start
+
+
+def test_summary():
+    start_recording(profile=True)
+    now = time.perf_counter()
+    with startup_phase('Load main display'):
+        record_event('CLabel', category='widget', start=now, end=now + 0.002)
+        record_event('CLabel', category='widget', start=now, end=now + 0.004)
+        record_event('CScrollingPlot', category='widget', start=now, end=now + 0.1)
+        record_event('japc:///dev/prop#field', category='channel', start=now, end=now + 0.5)
+    lines = startup_summary(top=1).splitlines()
+    assert lines[0] == 'Startup timeline (ms since launch):'
+    assert lines[1].endswith('Load main display')
+    widgets_header = lines.index('Widget construction, including children (ms):')
+    assert lines[widgets_header + 2].split()[:2] == ['CScrollingPlot', '1']
+    assert lines[widgets_header + 3].strip() == '... 1 more'
+    assert 'Time from connection to the first value: 1 channels, median 500.0 ms, max 500.0 ms' in lines
+
+
+def test_chrome_trace(tmp_path):
+    start_recording(profile=True)
+    now = time.perf_counter()
+    with startup_phase('Load main display'):
+        record_event('CLabel', category='widget', start=now, end=now + 0.002)
+    record_event('Event loop started', category='phase', start=now)
+    path = tmp_path / 'trace.json'
+    write_chrome_trace(str(path))
+    trace = json.loads(path.read_text())
+    events = {e['name']: e for e in trace['traceEvents']}
+    assert events['Load main display']['ph'] == 'X'
+    assert events['CLabel']['cat'] == 'widget'
+    assert events['CLabel']['dur'] == pytest.approx(2000, abs=1)
+    assert events['Event loop started']['ph'] == 'i'
+    assert events['thread_name']['args'] == {'name': 'MainThread'}
+
+
+def test_widget_construction_recorded(qtbot, tmp_path):
+    from qtpy.QtWidgets import QWidget, QLabel
+    from comrad.app.display_cache import CDisplayCache
+    from comrad.app.startup_profile import _instrument_form_class
+
+    start_recording(profile=True)
+    ui_file = tmp_path / 'display.ui'
+    ui_file.write_text(_UI)
+    form_class = CDisplayCache(directory=None).load_ui_type(str(ui_file))
+    _instrument_form_class(form_class)
+    _instrument_form_class(form_class)
+    widget = QWidget()
+    qtbot.add_widget(widget)
+    form_class().setupUi(widget)
+    assert widget.findChild(QLabel, 'label').text() == 'Hello'
+    assert [e.name for e in startup_events(category='widget')] == ['QLabel']
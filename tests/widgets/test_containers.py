@@ -1,8 +1,28 @@
 import pytest
 from unittest import mock
-from qtpy.QtWidgets import QWidget, QVBoxLayout, QApplication, QMainWindow
+from qtpy.QtWidgets import QWidget, QVBoxLayout, QApplication, QMainWindow, QLabel
 from qtpy.QtCore import Signal
-from comrad import CContextFrame, CContext, PyDMWidget
+from comrad import CContextFrame, CContext, PyDMWidget, CTemplateRepeater
+
+
+_TEMPLATE_UI = """<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>Form</class>
+ <widget class="QWidget" name="Form">
+  <layout class="QVBoxLayout" name="verticalLayout">
+   <item>
+    <widget class="QLabel" name="label">
+     <property name="text">
+      <string>${NAME}</string>
+     </property>
+    </widget>
+   </item>
+  </layout>
+ </widget>
+ <resources/>
+ <connections/>
+</ui>
+"""
 
 
 @pytest.fixture
@@ -183,3 +203,45 @@ def test_context_view_without_hierarchy(qtbot, real_window):
     real_window.setCentralWidget(widget_in_hierarchy)
     assert widget_in_hierarchy.get_context_view() == CContext(selector='WINDOW')
     assert dangling_widget.get_context_view() == CContext(selector=None)
+
+
+@pytest.mark.parametrize('virtualized', [True, False])
+def test_template_repeater_virtualized_creates_visible_instances_only(qtbot, tmp_path, virtualized):
+    template = tmp_path / 'template.ui'
+    template.write_text(_TEMPLATE_UI)
+    repeater = CTemplateRepeater()
+    qtbot.add_widget(repeater)
+    repeater.virtualized = virtualized
+    repeater.templateFilename = str(template)
+    repeater.data = [{'NAME': f'dev{i}'} for i in range(200)]
+    repeater.resize(200, 200)
+    with qtbot.wait_exposed(repeater):
+        repeater.show()
+    if virtualized:
+        assert 0 < repeater.count() < 30
+    else:
+        assert repeater.count() == 200
+
+
+def test_template_repeater_virtualized_recycles_instances_on_scroll(qtbot, tmp_path):
+    template = tmp_path / 'template.ui'
+    template.write_text(_TEMPLATE_UI)
+    repeater = CTemplateRepeater()
+    qtbot.add_widget(repeater)
+    repeater.virtualized = True
+    repeater.templateFilename = str(template)
+    repeater.data = [{'NAME': f'dev{i}'} for i in range(200)]
+    repeater.resize(200, 200)
+    with qtbot.wait_exposed(repeater):
+        repeater.show()
+
+    def visible_texts():
+        return {label.text() for label in repeater.findChildren(QLabel) if label.isVisible()}
+
+    assert 'dev0' in visible_texts()
+    assert 'dev199' not in visible_texts()
+    count = repeater.count()
+    repeater._scrollbar.setValue(repeater._scrollbar.maximum())
+    assert 'dev199' in visible_texts()
+    assert 'dev0' not in visible_texts()
+    assert repeater.count() == count
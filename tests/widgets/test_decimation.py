@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+from comrad.widgets._decimation import DecimationPyramid, lttb_indexes
+
+
+@pytest.mark.parametrize('size', [1, 5, 17, 100, 1000, 12345])
+@pytest.mark.parametrize('buckets', [1, 10, 100])
+def test_min_max_preserves_extrema(size, buckets):
+    rng = np.random.default_rng(seed=size)
+    x = np.arange(size, dtype=float)
+    y = rng.normal(size=size)
+    pyramid = DecimationPyramid(x, y)
+    dec_x, dec_y = pyramid.min_max(start=0, stop=size, buckets=buckets)
+    assert dec_y.max() == y.max()
+    assert dec_y.min() == y.min()
+    assert dec_x[0] == x[0]
+    assert dec_x[-1] == x[-1]
+    assert np.all(np.diff(dec_x) >= 0)
+    assert len(dec_x) <= max(size, 2 * 4 * buckets + 2)
+
+
+@pytest.mark.parametrize('x_min,x_max,expected_range', [
+    (-10, 200, (0, 100)),
+    (10, 20, (9, 22)),
+    (10.5, 19.5, (10, 21)),
+    (150, 200, (99, 100)),
+])
+def test_index_range(x_min, x_max, expected_range):
+    pyramid = DecimationPyramid(np.arange(100, dtype=float), np.zeros(100))
+    assert pyramid.index_range(x_min, x_max) == expected_range
+
+
+def test_index_range_unsorted_uses_full_range():
+    pyramid = DecimationPyramid(np.array([3.0, 1.0, 2.0]), np.zeros(3))
+    assert not pyramid.x_sorted
+    assert pyramid.index_range(1.5, 2.5) == (0, 3)
+
+
+def test_min_max_of_subrange():
+    y = np.zeros(100000)
+    y[50500] = 10
+    y[70000] = -10
+    pyramid = DecimationPyramid(np.arange(len(y), dtype=float), y)
+    start, stop = pyramid.index_range(50000, 60000)
+    dec_x, dec_y = pyramid.min_max(start=start, stop=stop, buckets=100)
+    assert dec_x[0] <= 50000
+    assert dec_x[-1] >= 60000
+    assert dec_y.max() == 10
+    assert dec_y.min() == 0
+    assert len(dec_x) < 1000
+
+
+@pytest.mark.parametrize('size,points,expected_len', [
+    (10, 20, 10),
+    (10, 10, 10),
+    (100, 10, 10),
+    (100, 2, 2),
+    (100000, 500, 500),
+])
+def test_lttb_keeps_amount_and_boundaries(size, points, expected_len):
+    x = np.arange(size, dtype=float)
+    y = np.sin(x / 10)
+    pyramid = DecimationPyramid(x, y)
+    dec_x, _ = pyramid.lttb(start=0, stop=size, points=points)
+    assert len(dec_x) == expected_len
+    assert dec_x[0] == 0
+    assert dec_x[-1] == size - 1
+    assert np.all(np.diff(dec_x) > 0)
+
+
+def test_lttb_picks_spike():
+    y = np.zeros(1000)
+    y[503] = 100
+    indexes = lttb_indexes(np.arange(1000, dtype=float), y, 20)
+    assert 503 in indexes
+
+
+def test_empty_waveform():
+    pyramid = DecimationPyramid(np.array([]), np.array([]))
+    dec_x, dec_y = pyramid.min_max(start=0, stop=0, buckets=10)
+    assert len(dec_x) == 0
+    assert len(dec_y) == 0
+
+
+def test_mismatching_lengths_fail():
+    with pytest.raises(ValueError):
+        DecimationPyramid(np.arange(3), np.arange(4))
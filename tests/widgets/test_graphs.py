@@ -7,16 +7,18 @@ from datetime import datetime
 from dateutil.tz import tzoffset
 from pytestqt.qtbot import QtBot
 from unittest import mock
-from qtpy.QtCore import QObject, Qt
+from qtpy.QtCore import QObject, Qt, QRectF
 from qtpy.QtGui import QColor
 from qtpy.QtWidgets import QWidget, QVBoxLayout
-from comrad import CCyclicPlot, CScrollingPlot, CStaticPlot, PointData, CContextFrame, CChannelData
+from comrad import (CCyclicPlot, CScrollingPlot, CStaticPlot, PointData, CurveData, CContextFrame, CChannelData,
+                    CImageView, CWaterfallPlot)
 from comrad.data.context import find_context_provider
-from comrad.widgets.graphs import (PyDMChannelDataSource, CPlotWidgetBase, CItemPropertiesBase, UpdateSource,
-                                   AbstractBasePlotCurve, PlottingItemTypes, DEFAULT_BUFFER_SIZE,
+from comrad.widgets.graphs import (PyDMChannelDataSource, CPlotWidgetBase, CItemPropertiesBase, UpdateSource, CWaterfallItem,
+                                   AbstractBasePlotCurve, PlottingItemTypes, DecimationMode, DEFAULT_BUFFER_SIZE,
                                    CScrollingCurve, CScrollingBarGraph, CScrollingTimestampMarker,
                                    CScrollingInjectionBarGraph, CCyclicCurve, CStaticTimestampMarker,
-                                   CStaticInjectionBarGraph, CStaticBarGraph, CStaticCurve)
+                                   CStaticInjectionBarGraph, CStaticBarGraph, CStaticCurve, CScrollingCurveDataModel,
+                                   CScrollingBarGraphDataModel, CScrollingInjectionBarDataModel)
 
 
 TZ = tzoffset('UTC+0', 0)
@@ -154,6 +156,36 @@ def test_pydmchanneldatasource_transforms_value_into_correct_format(input, last_
         assert blocker.args is None
 
 
+@pytest.mark.parametrize('first_header,second_header,second_value,should_send', [
+    ({}, {}, np.array([1, 2, 3]), False),
+    ({}, {}, np.array([1, 2, 4]), True),
+    ({}, {}, np.array([[1, 2, 3]]), True),
+    ({}, {}, np.array([1, 2, 3], dtype=np.int8), True),
+    ({'acqStamp': 1}, {'acqStamp': 1}, np.array([1, 2, 3]), False),
+    ({'acqStamp': 1}, {'acqStamp': 1}, np.array([1, 2, 4]), False),
+    ({'acqStamp': 1}, {'acqStamp': 2}, np.array([1, 2, 3]), True),
+    ({'cycleStamp': 1}, {'cycleStamp': 1}, np.array([1, 2, 3]), False),
+    ({'cycleStamp': 1}, {'cycleStamp': 2}, np.array([1, 2, 3]), True),
+    ({'acqStamp': 1}, {}, np.array([1, 2, 3]), True),
+])
+def test_pydmchanneldatasource_detects_array_change_without_comparison(first_header, second_header, second_value, should_send):
+    data_source = PyDMChannelDataSource(channel_address='dev/prop#field', data_type_to_emit=CurveData)
+    assert data_source._to_list_and_check_value_change(np.array([1, 2, 3]), header=first_header) is not None
+    res = data_source._to_list_and_check_value_change(second_value, header=second_header)
+    assert (res is not None) == should_send
+
+
+def test_pydmchanneldatasource_does_not_copy_arrays():
+    data_source = PyDMChannelDataSource(channel_address='dev/prop#field', data_type_to_emit=CurveData)
+    orig = np.array([1.0, 2.0, 3.0])
+    res = data_source._to_list_and_check_value_change(orig)
+    assert isinstance(res, np.ndarray)
+    assert np.shares_memory(res, orig)
+    assert not res.flags.writeable
+    assert orig.flags.writeable
+    assert data_source._last_value is res
+
+
 def test_cplotwidgetbase_forbids_weird_subclasses(log_capture):
 
     class WeirdSubclass(QObject, CPlotWidgetBase):
@@ -646,6 +678,273 @@ def test_curves_setter(qtbot):
     assert second_item.symbol_size == 1
 
 
+def test_curves_decimation_roundtrip(qtbot):
+    widget = CStaticPlot()
+    qtbot.add_widget(widget)
+    widget.add_channel_attached_item(channel_address='dev1/prop#field', decimation=DecimationMode.LTTB.value)
+    widget.add_channel_attached_item(channel_address='dev2/prop#field')
+    json_repr = [json.loads(c) for c in widget.curves]
+    assert json_repr[0]['decimation'] == DecimationMode.LTTB.value
+    assert 'decimation' not in json_repr[1]
+    widget.curves = [json.dumps(item) for item in json_repr]
+    assert [item.decimation for item in widget._items] == [DecimationMode.LTTB.value, DecimationMode.NONE.value]
+
+
+@pytest.mark.parametrize('decimation,expected_reduced', [
+    (DecimationMode.NONE.value, False),
+    (DecimationMode.MIN_MAX.value, True),
+    (DecimationMode.LTTB.value, True),
+])
+def test_static_curve_decimates_large_waveform(qtbot, decimation, expected_reduced):
+    widget = CStaticPlot()
+    qtbot.add_widget(widget)
+    item = widget.add_channel_attached_item(channel_address='dev/prop#field', decimation=decimation)
+    assert isinstance(item, CStaticCurve)
+    x = np.arange(100000, dtype=float)
+    y = np.sin(x / 100)
+    item.setData(x, y)
+    assert (len(item.yData) < len(y)) == expected_reduced
+    item.decimation = DecimationMode.NONE.value
+    assert len(item.yData) == len(y)
+
+
+@pytest.mark.parametrize('style,expected_model_type', [
+    (PlottingItemTypes.LINE_GRAPH.value, CScrollingCurveDataModel),
+    (PlottingItemTypes.BAR_GRAPH.value, CScrollingBarGraphDataModel),
+    (PlottingItemTypes.INJECTION_BAR_GRAPH.value, CScrollingInjectionBarDataModel),
+])
+def test_scrolling_plot_expected_rate_uses_ring_buffers(qtbot, style, expected_model_type):
+    widget = CScrollingPlot()
+    qtbot.add_widget(widget)
+    item = widget.add_channel_attached_item(channel_address='dev/prop#field', style=style)
+    assert not isinstance(item.model(), expected_model_type)
+    widget.expectedRate = 10
+    item = widget._items[0]
+    assert isinstance(item.model(), expected_model_type)
+    assert item.address == 'dev/prop#field'
+    widget.expectedRate = 0
+    assert not isinstance(widget._items[0].model(), expected_model_type)
+
+
+def test_scrolling_plot_buffer_capacity(qtbot):
+    widget = CScrollingPlot(time_span=100.0)
+    qtbot.add_widget(widget)
+    assert widget.buffer_capacity() == DEFAULT_BUFFER_SIZE
+    widget.expectedRate = 10
+    assert widget.buffer_capacity() == 1201
+
+
+def test_scrolling_curve_data_model_stores_points(qtbot):
+    widget = CScrollingPlot(time_span=100.0)
+    qtbot.add_widget(widget)
+    widget.expectedRate = 0.1
+    item = widget.add_channel_attached_item(channel_address='dev/prop#field')
+    model = item.model()
+    assert model.store is None
+    with qtbot.wait_signal(model.sig_data_model_changed):
+        item.data_source.sig_new_data[PointData].emit(PointData(x=1.0, y=2.0))
+    assert model.store.capacity == 13
+    for x in range(2, 20):
+        model._handle_data_update(PointData(x=float(x), y=2.0 * x))
+    assert len(model.store) == 13
+    x, y = model.subset_for_xrange(start=10.0, end=12.0)
+    np.testing.assert_array_equal(x, [10.0, 11.0, 12.0])
+    np.testing.assert_array_equal(y, [20.0, 22.0, 24.0])
+    assert len(model.full_data_buffer[0]) == 13
+    x, y = model.subset_for_xrange(start=10.5, end=12.0, interpolated=True)
+    np.testing.assert_array_equal(x, [10.5, 11.0, 12.0])
+    np.testing.assert_array_equal(y, [21.0, 22.0, 24.0])
+
+
+def test_scrolling_plot_time_span_resizes_buffers(qtbot):
+    widget = CScrollingPlot(time_span=100.0)
+    qtbot.add_widget(widget)
+    widget.expectedRate = 0.1
+    item = widget.add_channel_attached_item(channel_address='dev/prop#field')
+    model = item.model()
+    model._handle_data_update(PointData(x=1.0, y=2.0))
+    assert model.store.capacity == 13
+    widget.timeSpan = 200.0
+    assert widget.timeSpan == 200.0
+    assert model.store.capacity == 25
+
+
+def test_plot_max_fps_batches_updates(qtbot):
+    widget = CStaticPlot()
+    qtbot.add_widget(widget)
+    widget.maxFps = 10
+    assert widget.maxFps == 10
+    item = widget.add_channel_attached_item(channel_address='dev/prop#field')
+    with qtbot.wait_signal(item.data_source.sig_new_data, raising=False, timeout=100) as blocker:
+        item.data_source.value_updated(CChannelData(value=np.array([1.0, 2.0]), meta_info={}))
+        item.data_source.value_updated(CChannelData(value=np.array([3.0, 4.0]), meta_info={}))
+    assert blocker.args is None
+    with qtbot.wait_signal(item.data_source.sig_new_data) as blocker:
+        widget.render_scheduler.flush(force=True)
+    np.testing.assert_array_equal(blocker.args[0].y, [3.0, 4.0])
+
+
+def test_plot_records_render_time(qtbot):
+    widget = CStaticPlot()
+    qtbot.add_widget(widget)
+    widget.show()
+    qtbot.wait_exposed(widget)
+    widget.render_time_histogram.reset()
+    widget.viewport().repaint()
+    assert widget.render_time_histogram.total > 0
+
+
+def test_waterfall_appends_rows(qtbot):
+    widget = CWaterfallPlot()
+    qtbot.add_widget(widget)
+    widget.historyLength = 3
+    item = widget.addWaterfall(data_source='dev/prop#field')
+    assert isinstance(item, CWaterfallItem)
+    assert not item.data_source.replaceable
+    for i in range(5):
+        item.data_source.sig_new_data[CurveData].emit(CurveData(x=np.arange(4.0), y=np.full(4, float(i))))
+    history = item.model().history
+    np.testing.assert_array_equal(history.values()[:, 0], [2.0, 3.0, 4.0])
+    assert item.boundingRect() == QRectF(-0.5, -3.0, 4.0, 3.0)
+    widget.historyLength = 2
+    np.testing.assert_array_equal(history.values()[:, 0], [3.0, 4.0])
+
+
+def test_waterfall_max_fps_keeps_all_rows(qtbot):
+    widget = CWaterfallPlot()
+    qtbot.add_widget(widget)
+    widget.maxFps = 10
+    item = widget.addWaterfall(data_source='dev/prop#field')
+    item.data_source.value_updated(CChannelData(value=np.array([1.0, 2.0]), meta_info={}))
+    item.data_source.value_updated(CChannelData(value=np.array([3.0, 4.0]), meta_info={}))
+    widget.render_scheduler.flush(force=True)
+    assert len(item.model().history) == 2
+
+
+def test_waterfall_colors(qtbot):
+    widget = CWaterfallPlot()
+    qtbot.add_widget(widget)
+    item = widget.addWaterfall(data_source='dev/prop#field')
+    item.model()._handle_data_update(CurveData(x=np.arange(2.0), y=np.array([0.0, 10.0])))
+    assert item.model().history.levels == (0.0, 10.0)
+    widget.normalizeData = False
+    widget.colorMapMin = -10.0
+    widget.colorMapMax = 30.0
+    assert item.model().history.levels == (-10.0, 30.0)
+    image = item.model().history.image().copy()
+    widget.colorMap = CWaterfallPlot.Viridis
+    assert not np.array_equal(item.model().history.image(), image)
+
+
+def test_waterfall_curves_property(qtbot):
+    widget = CWaterfallPlot()
+    qtbot.add_widget(widget)
+    widget.addWaterfall(data_source='dev/prop#field', name='History')
+    items = widget.curves
+    assert json.loads(items[0])['style'] == PlottingItemTypes.WATERFALL.value
+    widget.curves = [json.dumps({'channel': 'dev/prop#field2'})]
+    assert len(widget._items) == 1
+    assert isinstance(widget._items[0], CWaterfallItem)
+    assert widget._items[0].address == 'dev/prop#field2'
+    with pytest.raises(ValueError):
+        widget.add_channel_attached_item(channel_address='dev/prop#field', style=PlottingItemTypes.LINE_GRAPH.value)
+
+
+def test_waterfall_paints(qtbot):
+    widget = CWaterfallPlot()
+    qtbot.add_widget(widget)
+    widget.resize(200, 200)
+    widget.show()
+    qtbot.wait_exposed(widget)
+    item = widget.addWaterfall(data_source='dev/prop#field')
+    for i in range(1000):
+        item.model()._handle_data_update(CurveData(x=np.arange(5000.0), y=np.full(5000, float(i))))
+    widget.viewport().repaint()
+    assert widget.render_time_histogram.total > 0
+
+
+def test_image_view_renders_newest_frame_only(qtbot):
+    widget = CImageView()
+    qtbot.add_widget(widget)
+    widget.autoDownsample = False
+    widget.show()
+    qtbot.wait_exposed(widget)
+    frames = [np.full((20, 10), i, dtype=np.uint16) for i in range(5)]
+    for frame in frames:
+        widget.image_value_changed(CChannelData(value=frame, meta_info={}))
+    widget.redrawImage()
+    assert widget.frames_received == 5
+    assert widget.frames_dropped == 4
+    assert np.shares_memory(widget.getImageItem().image, frames[-1])
+    widget.redrawImage()
+    assert widget.frames_dropped == 4
+
+
+@pytest.mark.parametrize('width,expected_shape', [
+    (4, (4, 3)),
+    (3, (3, 4)),
+])
+def test_image_view_reshapes_flat_array_by_width(qtbot, width, expected_shape):
+    widget = CImageView()
+    qtbot.add_widget(widget)
+    widget.autoDownsample = False
+    widget.show()
+    qtbot.wait_exposed(widget)
+    frame = np.arange(12, dtype=float)
+    widget.image_width_changed(CChannelData(value=width, meta_info={}))
+    widget.image_value_changed(CChannelData(value=frame, meta_info={}))
+    widget.redrawImage()
+    assert widget.getImageItem().image.shape == expected_shape
+    assert np.shares_memory(widget.getImageItem().image, frame)
+
+
+def test_image_view_downsamples_to_viewport(qtbot):
+    widget = CImageView()
+    qtbot.add_widget(widget)
+    widget.resize(200, 200)
+    widget.show()
+    qtbot.wait_exposed(widget)
+    frame = np.zeros((2000, 2000), dtype=np.uint16)
+    widget.image_value_changed(CChannelData(value=frame, meta_info={}))
+    widget.redrawImage()
+    rendered = widget.getImageItem().image
+    assert rendered.shape[0] < frame.shape[0]
+    assert rendered.shape[1] < frame.shape[1]
+    assert np.shares_memory(rendered, frame)
+
+
+def test_image_view_does_not_render_hidden(qtbot):
+    widget = CImageView()
+    qtbot.add_widget(widget)
+    widget.image_value_changed(CChannelData(value=np.zeros((10, 10)), meta_info={}))
+    widget.redrawImage()
+    assert widget.needs_redraw
+    assert widget.frames_dropped == 1
+
+
+@mock.patch('comrad.widgets.graphs.PyDMChannel')
+def test_image_view_connects_channels(PyDMChannel, qtbot):
+    widget = CImageView()
+    qtbot.add_widget(widget)
+    widget._context_tracker.context_ready = True
+    widget.imageChannel = 'dev/prop#image'
+    widget.widthChannel = 'dev/prop#width'
+    assert widget.imageChannel == 'dev/prop#image'
+    assert widget.widthChannel == 'dev/prop#width'
+    value_slots = {call.kwargs['address']: call.kwargs['value_slot'] for call in PyDMChannel.call_args_list}
+    assert value_slots == {
+        'dev/prop#image': widget.image_value_changed,
+        'dev/prop#width': widget.image_width_changed,
+    }
+    assert widget.default_rule_channel() == 'dev/prop#image'
+
+
+def test_decimation_supported_only_by_static_curve():
+    assert CStaticCurve.supports_decimation
+    assert not CCyclicCurve.supports_decimation
+    assert not CScrollingCurve.supports_decimation
+
+
 @pytest.mark.parametrize('widget_type', [
     CScrollingPlot,
     CCyclicPlot,
@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+from comrad.widgets._image import LevelsCache, frame_to_image, viewport_slices
+
+
+@pytest.mark.parametrize('row_major,expected_shape', [
+    (True, (3, 4)),
+    (False, (4, 3)),
+])
+def test_frame_to_image_reshapes_flat_array_without_copy(row_major, expected_shape):
+    frame = np.arange(12)
+    image = frame_to_image(frame, width=4, row_major=row_major)
+    assert image.shape == expected_shape
+    assert np.shares_memory(image, frame)
+    if row_major:
+        assert image[1, 0] == 4
+    else:
+        assert image[0, 1] == 4
+
+
+def test_frame_to_image_keeps_2d_array():
+    frame = np.zeros((10, 20))
+    assert frame_to_image(frame, width=0, row_major=True) is frame
+
+
+@pytest.mark.parametrize('width', [0, -1, 5])
+def test_frame_to_image_rejects_wrong_width(width):
+    assert frame_to_image(np.arange(12), width=width, row_major=True) is None
+
+
+@pytest.mark.parametrize('shape,x_range,y_range,pixel_size,expected_slices', [
+    ((50, 100), None, None, (1.0, 1.0), (slice(0, 50, 1), slice(0, 100, 1))),
+    ((50, 100), None, None, (0.3, 0.3), (slice(0, 50, 1), slice(0, 100, 1))),
+    ((50, 100), None, None, (4.5, 2.0), (slice(0, 50, 2), slice(0, 100, 4))),
+    ((50, 100), (10.5, 20.2), (-5, 60), (1.0, 1.0), (slice(0, 50, 1), slice(10, 21, 1))),
+    ((50, 100), (10.5, 20.2), (-5, 60), (4.0, 1.0), (slice(0, 50, 1), slice(8, 21, 4))),
+    ((50, 100), (200, 300), (0, 50), (1.0, 1.0), (slice(0, 50, 1), slice(100, 100, 1))),
+    ((50, 100), None, None, (float('nan'), float('inf')), (slice(0, 50, 1), slice(0, 100, 1))),
+])
+def test_viewport_slices(shape, x_range, y_range, pixel_size, expected_slices):
+    assert viewport_slices(shape=shape, x_range=x_range, y_range=y_range, pixel_size=pixel_size) == expected_slices
+
+
+def test_viewport_slices_produce_view():
+    image = np.zeros((1000, 5000), dtype=np.uint16)
+    visible = image[viewport_slices(shape=image.shape, x_range=None, y_range=None, pixel_size=(5.0, 5.0))]
+    assert visible.shape == (200, 1000)
+    assert np.shares_memory(visible, image)
+
+
+def test_levels_cache_ignores_small_changes():
+    cache = LevelsCache(tolerance=0.02)
+    assert cache.update(np.array([0.0, 100.0])) == (0.0, 100.0)
+    assert cache.update(np.array([1.0, 99.0])) == (0.0, 100.0)
+    assert cache.update(np.array([0.0, 110.0])) == (0.0, 110.0)
+    cache.reset()
+    assert cache.levels is None
+    assert cache.update(np.array([1.0, 99.0])) == (1.0, 99.0)
+
+
+def test_levels_cache_empty_image():
+    cache = LevelsCache()
+    assert cache.update(np.array([])) == (0.0, 1.0)
+    cache.update(np.array([2, 5]))
+    assert cache.update(np.array([])) == (2.0, 5.0)
@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from unittest import mock
+from pytestqt.qtbot import QtBot
+from comrad import CValueAggregator, CChannelData
+from comrad.widgets.modifiers import _channel_id_from_address
+
+
+@pytest.mark.parametrize('address,expected_id', [
+    ('dev/prop#field', 'dev/prop#field'),
+    ('/dev/prop#field', 'dev/prop#field'),
+    ('dev/prop#field@LHC.USER.ALL', 'dev/prop#field'),
+    ('dev/prop#field?key1=val1&key2=val2', 'dev/prop#field'),
+    ('dev/prop#field@LHC.USER.ALL|abs=0.5', 'dev/prop#field'),
+])
+def test_channel_id_from_address(address, expected_id):
+    assert _channel_id_from_address(address) == expected_id
+
+
+def _send(widget: CValueAggregator, address: str, value, **header):
+    with mock.patch.object(widget, 'sender', return_value=mock.MagicMock(address=address)):
+        widget.value_changed(CChannelData(value=value, meta_info=header))
+
+
+def test_aggregator_caches_channel_ids(qtbot: QtBot):
+    widget = CValueAggregator()
+    qtbot.add_widget(widget)
+    with mock.patch('comrad.widgets.modifiers._channel_id_from_address', return_value='dev/prop#field') as parse:
+        _send(widget, '/dev/prop#field@LHC.USER.ALL', 1)
+        _send(widget, '/dev/prop#field@LHC.USER.ALL', 2)
+        parse.assert_called_once_with('/dev/prop#field@LHC.USER.ALL')
+    assert widget._values == {'dev/prop#field': 2}
+
+
+def test_aggregator_without_history_passes_latest_values(qtbot: QtBot):
+    widget = CValueAggregator()
+    qtbot.add_widget(widget)
+    transform = mock.Mock(return_value=None)
+    with mock.patch.object(widget, 'cached_value_transformation', return_value=transform):
+        widget.valueTransformation = 'output(values)'
+        _send(widget, 'dev/prop#a', 1, cycleStamp=datetime(2020, 1, 1))
+        _send(widget, 'dev/prop#a', 2, cycleStamp=datetime(2020, 1, 2))
+    transform.assert_called_with(values={'dev/prop#a': 2}, headers={'dev/prop#a': {'cycleStamp': datetime(2020, 1, 2)}})
+
+
+@pytest.mark.parametrize('join_stamp,tolerance,b_offset_ms,expected_rows', [
+    (CValueAggregator.JoinStamp.CYCLE_STAMP, 1.0, 0, [0, 1, 2]),
+    (CValueAggregator.JoinStamp.CYCLE_STAMP, 1.0, 0.5, [0, 1, 2]),
+    (CValueAggregator.JoinStamp.CYCLE_STAMP, 1.0, 5, []),
+    (CValueAggregator.JoinStamp.CYCLE_STAMP, 10.0, 5, [0, 1, 2]),
+    (CValueAggregator.JoinStamp.ACQ_STAMP, 1.0, 0, [0, 1, 2]),
+])
+def test_aggregator_history_joins_by_stamp(qtbot: QtBot, join_stamp, tolerance, b_offset_ms, expected_rows):
+    widget = CValueAggregator()
+    qtbot.add_widget(widget)
+    widget.historySize = 3
+    widget.joinStamp = join_stamp
+    widget.joinTolerance = tolerance
+    widget._channel_ids = ['dev/prop#a', 'dev/prop#b']
+    stamp_name = 'acqStamp' if join_stamp == CValueAggregator.JoinStamp.ACQ_STAMP else 'cycleStamp'
+    start = datetime(2020, 1, 1)
+    transform = mock.Mock(return_value=None)
+    with mock.patch.object(widget, 'cached_value_transformation', return_value=transform):
+        widget.valueTransformation = 'output(values)'
+        for i in range(4):
+            stamp = start + timedelta(seconds=1.2 * i)
+            _send(widget, 'dev/prop#a', float(i), **{stamp_name: stamp})
+            _send(widget, 'dev/prop#b', np.array([i, i * 10]), **{stamp_name: stamp + timedelta(milliseconds=b_offset_ms)})
+    values = transform.call_args[1]['values']
+    stamps = transform.call_args[1]['stamps']
+    # Only the last 3 cycles fit into the history
+    expected_a = np.array([1.0, 2.0, 3.0])[expected_rows]
+    expected_b = np.array([[1, 10], [2, 20], [3, 30]])[expected_rows]
+    np.testing.assert_array_equal(values['dev/prop#a'], expected_a)
+    np.testing.assert_array_equal(values['dev/prop#b'], expected_b.reshape(-1, 2))
+    assert len(stamps) == len(expected_rows)
+
+
+def test_aggregator_history_resets_on_shape_change(qtbot: QtBot):
+    widget = CValueAggregator()
+    qtbot.add_widget(widget)
+    widget.historySize = 5
+    _send(widget, 'dev/prop#a', np.array([1, 2]), cycleStamp=1.0)
+    _send(widget, 'dev/prop#a', np.array([1, 2, 3]), cycleStamp=2.0)
+    values, stamps = widget._joined_history()
+    np.testing.assert_array_equal(values['dev/prop#a'], np.array([[1, 2, 3]]))
+    np.testing.assert_array_equal(stamps, np.array([2.0]))
@@ -0,0 +1,107 @@
+import pytest
+from unittest import mock
+from qtpy.QtCore import QObject
+from qtpy.QtWidgets import QWidget
+from comrad.widgets._render_scheduler import RenderScheduler, RenderTimeHistogram
+
+
+@pytest.mark.parametrize('samples,expected_counts,expected_p50,expected_p100', [
+    ([], [0, 0, 0], 0.0, 0.0),
+    ([0.5], [1, 0, 0], 1.0, 1.0),
+    ([0.5, 1.5, 1.7], [1, 2, 0], 2.0, 2.0),
+    ([0.5, 0.7, 0.8, 3.0], [3, 0, 1], 1.0, 3.0),
+])
+def test_histogram_record(samples, expected_counts, expected_p50, expected_p100):
+    histogram = RenderTimeHistogram(boundaries=(1.0, 2.0))
+    for sample in samples:
+        histogram.record(sample)
+    assert histogram.counts == expected_counts
+    assert histogram.total == len(samples)
+    assert histogram.percentile(0.5) == expected_p50
+    assert histogram.percentile(1.0) == expected_p100
+    assert histogram.max_duration == max(samples, default=0.0)
+    histogram.reset()
+    assert histogram.counts == [0, 0, 0]
+    assert histogram.mean_duration == 0.0
+
+
+@pytest.fixture
+def make_scheduler(qtbot):
+
+    def _make(is_visible=lambda _: True):
+        widget = QWidget()
+        qtbot.add_widget(widget)
+        return RenderScheduler(widget=widget, is_source_visible=is_visible)
+
+    return _make
+
+
+def test_scheduler_disabled_delivers_immediately(make_scheduler):
+    scheduler = make_scheduler()
+    deliver = mock.Mock()
+    scheduler.schedule(source=QObject(), deliver=deliver, replaceable=False)
+    deliver.assert_called_once()
+
+
+@pytest.mark.parametrize('replaceable,expected_calls', [
+    (True, ['c']),
+    (False, ['a', 'b', 'c']),
+])
+def test_scheduler_batches_updates(make_scheduler, replaceable, expected_calls):
+    scheduler = make_scheduler()
+    scheduler.max_fps = 30
+    source = QObject()
+    calls = []
+    for val in ['a', 'b', 'c']:
+        scheduler.schedule(source=source, deliver=lambda val=val: calls.append(val), replaceable=replaceable)
+    assert calls == []
+    scheduler.flush()
+    assert calls == expected_calls
+
+
+def test_scheduler_suspends_widget_updates(make_scheduler):
+    scheduler = make_scheduler()
+    scheduler.max_fps = 30
+    states = []
+    scheduler.schedule(source=QObject(),
+                       deliver=lambda: states.append(scheduler.parent().updatesEnabled()),
+                       replaceable=False)
+    scheduler.flush()
+    assert states == [False]
+    assert scheduler.parent().updatesEnabled()
+
+
+def test_scheduler_defers_hidden_sources(make_scheduler):
+    visible_source = QObject()
+    hidden_source = QObject()
+    scheduler = make_scheduler(is_visible=lambda src: src is visible_source)
+    scheduler.max_fps = 30
+    visible_deliver = mock.Mock()
+    hidden_deliver = mock.Mock()
+    appended_deliver = mock.Mock()
+    scheduler.schedule(source=visible_source, deliver=visible_deliver, replaceable=True)
+    scheduler.schedule(source=hidden_source, deliver=hidden_deliver, replaceable=True)
+    scheduler.schedule(source=QObject(), deliver=appended_deliver, replaceable=False)
+    scheduler.flush()
+    visible_deliver.assert_called_once()
+    appended_deliver.assert_called_once()
+    hidden_deliver.assert_not_called()
+    scheduler.flush(force=True)
+    hidden_deliver.assert_called_once()
+
+
+def test_scheduler_flushes_on_timer(qtbot, make_scheduler):
+    scheduler = make_scheduler()
+    scheduler.max_fps = 30
+    deliver = mock.Mock()
+    scheduler.schedule(source=QObject(), deliver=deliver, replaceable=False)
+    qtbot.wait_until(lambda: deliver.called, timeout=1000)
+
+
+def test_scheduler_disabling_flushes_pending(make_scheduler):
+    scheduler = make_scheduler(is_visible=lambda _: False)
+    scheduler.max_fps = 30
+    deliver = mock.Mock()
+    scheduler.schedule(source=QObject(), deliver=deliver, replaceable=True)
+    scheduler.max_fps = 0
+    deliver.assert_called_once()
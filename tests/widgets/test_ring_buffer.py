@@ -0,0 +1,147 @@
+import pytest
+import numpy as np
+from comrad.widgets._ring_buffer import RingBuffer, ScrollingDataStore
+
+
+@pytest.mark.parametrize('capacity,items,expected', [
+    (3, [], []),
+    (3, [1], [1]),
+    (3, [1, 2, 3], [1, 2, 3]),
+    (3, [1, 2, 3, 4], [2, 3, 4]),
+    (3, [1, 2, 3, 4, 5, 6, 7], [5, 6, 7]),
+    (1, [1, 2], [2]),
+])
+def test_append(capacity, items, expected):
+    buffer = RingBuffer(capacity)
+    for item in items:
+        buffer.append(item)
+    np.testing.assert_array_equal(buffer.view(), expected)
+    assert len(buffer) == len(expected)
+
+
+@pytest.mark.parametrize('capacity,chunks,expected', [
+    (4, [[1, 2]], [1, 2]),
+    (4, [[1, 2], [3, 4, 5]], [2, 3, 4, 5]),
+    (4, [[1, 2, 3, 4, 5, 6]], [3, 4, 5, 6]),
+    (4, [[1], [2, 3, 4, 5, 6, 7]], [4, 5, 6, 7]),
+    (4, [[1, 2, 3], [], [4, 5, 6]], [3, 4, 5, 6]),
+])
+def test_extend(capacity, chunks, expected):
+    buffer = RingBuffer(capacity)
+    for chunk in chunks:
+        buffer.extend(np.array(chunk, dtype=float))
+    np.testing.assert_array_equal(buffer.view(), expected)
+
+
+def test_view_is_contiguous_and_read_only():
+    buffer = RingBuffer(capacity=4, item_shape=(2,))
+    for i in range(7):
+        buffer.append([i, -i])
+    view = buffer.view()
+    assert view.flags.c_contiguous
+    assert not view.flags.writeable
+    assert np.shares_memory(view, buffer._data)
+    np.testing.assert_array_equal(view, [[3, -3], [4, -4], [5, -5], [6, -6]])
+
+
+def test_last():
+    buffer = RingBuffer(capacity=2)
+    with pytest.raises(IndexError):
+        buffer.last()
+    buffer.append(1)
+    buffer.append(2)
+    buffer.append(3)
+    assert buffer.last() == 3
+
+
+def test_clear_keeps_memory():
+    buffer = RingBuffer(capacity=2)
+    buffer.append(1)
+    nbytes = buffer.nbytes
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.nbytes == nbytes
+
+
+def test_memory_mapped_storage():
+    buffer = RingBuffer(capacity=3, item_shape=(2,), dtype=np.float32, memory_map=True)
+    assert buffer.memory_mapped
+    assert isinstance(buffer._data, np.memmap)
+    buffer.extend(np.arange(8, dtype=np.float32).reshape(4, 2))
+    np.testing.assert_array_equal(buffer.view(), [[2, 3], [4, 5], [6, 7]])
+    assert not RingBuffer(capacity=3).memory_mapped
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(capacity=0)
+
+
+def test_scrolling_store_subset_for_xrange():
+    store = ScrollingDataStore(fields=[('x', float), ('y', float)], capacity=5)
+    for x in range(7):
+        store.append(float(x), x * 10.0)
+    assert len(store) == 5
+    x, y = store.subset_for_xrange(start=3.0, end=5.0)
+    np.testing.assert_array_equal(x, [3.0, 4.0, 5.0])
+    np.testing.assert_array_equal(y, [30.0, 40.0, 50.0])
+
+
+@pytest.mark.parametrize('start,end,expected_x,expected_y', [
+    (1.5, 3.5, [1.5, 2.0, 3.0, 3.5], [15.0, 20.0, 30.0, 35.0]),
+    (1.0, 3.0, [1.0, 2.0, 3.0], [10.0, 20.0, 30.0]),
+    (1.2, 1.7, [1.2, 1.7], [12.0, 17.0]),
+    (-1.0, 9.0, [0.0, 1.0, 2.0, 3.0, 4.0], [0.0, 10.0, 20.0, 30.0, 40.0]),
+])
+def test_scrolling_store_subset_for_xrange_interpolated(start, end, expected_x, expected_y):
+    store = ScrollingDataStore(fields=[('x', float), ('y', float)], capacity=10)
+    for x in range(5):
+        store.append(float(x), x * 10.0)
+    x, y = store.subset_for_xrange(start=start, end=end, interpolated=True)
+    np.testing.assert_array_almost_equal(x, expected_x)
+    np.testing.assert_array_almost_equal(y, expected_y)
+
+
+def test_scrolling_store_sorts_out_of_order_data():
+    store = ScrollingDataStore(fields=[('x', float), ('label', object)], capacity=5)
+    store.append(1.0, 'a')
+    store.append(3.0, 'c')
+    store.append(2.0, 'b')
+    x, labels = store.columns()
+    np.testing.assert_array_equal(x, [1.0, 2.0, 3.0])
+    assert list(labels) == ['a', 'b', 'c']
+    store.clear()
+    store.append(5.0, 'd')
+    assert list(store.columns()[1]) == ['d']
+    store.extend(np.array([7.0, 6.0]), np.array(['f', 'e'], dtype=object))
+    assert list(store.columns()[1]) == ['d', 'e', 'f']
+
+
+@pytest.mark.parametrize('new_capacity,expected', [
+    (2, [3.0, 4.0]),
+    (4, [1.0, 2.0, 3.0, 4.0]),
+    (10, [1.0, 2.0, 3.0, 4.0]),
+])
+def test_scrolling_store_resize_keeps_newest(new_capacity, expected):
+    store = ScrollingDataStore(fields=[('x', float)], capacity=4)
+    for x in [1.0, 2.0, 3.0, 4.0]:
+        store.append(x)
+    store.resize(new_capacity)
+    assert store.capacity == new_capacity
+    np.testing.assert_array_equal(store.columns()[0], expected)
+
+
+def test_scrolling_store_24h_memory_footprint():
+    # 24 hours of a 10 Hz curve, with 20% margin
+    capacity = int(24 * 3600 * 10 * 1.2)
+    store = ScrollingDataStore(fields=[('x', float), ('y', float)], capacity=capacity)
+    # Memory is allocated upfront: 2 fields, 8 bytes each, every entry kept twice
+    expected_bytes = 2 * 2 * 8 * capacity
+    assert store.nbytes == expected_bytes
+    assert expected_bytes < 34 * 1024 * 1024
+    chunk = np.arange(capacity // 4, dtype=float)
+    for i in range(6):
+        store.extend(chunk + i * len(chunk), chunk)
+        # Wrapping around does not allocate any new memory
+        assert store.nbytes == expected_bytes
+    assert len(store) == capacity
@@ -1,10 +1,13 @@
 import pytest
 import logging
+import numpy as np
 from typing import List
 from pytestqt.qtbot import QtBot
 from unittest import mock
 from accwidgets.log_console import LogConsoleRecord
-from comrad import CLogConsole, LogLevel, LogConsoleModel, AbstractLogConsoleModel
+from qtpy.QtCore import Qt
+from comrad import CLogConsole, LogLevel, LogConsoleModel, AbstractLogConsoleModel, CWaveFormTable, CChannelData
+from comrad.widgets.tables import CWaveformTableModel
 
 
 @pytest.fixture(autouse=True, scope='function')
@@ -472,3 +475,75 @@ def custom_model_class():
             self._selected_levels = new_val
 
     return TestModel
+
+
+@pytest.mark.parametrize('size,columns,stride,expected_rows', [
+    (0, 1, 1, 0),
+    (10, 1, 1, 10),
+    (10, 3, 1, 4),
+    (10, 3, 2, 2),
+    (1_000_000, 4, 10, 25_000),
+])
+def test_waveform_table_model_row_count(size, columns, stride, expected_rows):
+    model = CWaveformTableModel()
+    model.columns = columns
+    model.row_stride = stride
+    model.set_array(np.arange(size))
+    assert model.rowCount() == expected_rows
+    assert model.columnCount() == columns
+
+
+def test_waveform_table_model_reads_cells_lazily():
+    model = CWaveformTableModel()
+    model.columns = 3
+    model.row_stride = 2
+    arr = np.arange(20)
+    model.set_array(arr)
+    assert model.array is arr
+    assert model.data(model.index(1, 1)) == '7'
+    assert model.headerData(1, Qt.Vertical) == '6'
+    assert model.data(model.index(3, 2)) is None
+    model.column_labels = ['a']
+    assert model.headerData(0, Qt.Horizontal) == 'a'
+    assert model.headerData(1, Qt.Horizontal) == '1'
+
+
+@pytest.mark.parametrize('new_val,expected_rows', [
+    ([0, 1, 2, 3, 4, 5, 6, 7, 8, 9], None),
+    ([0, 1, 2, 3, 4, 15, 6, 7, 8, 9], (2, 2)),
+    ([10, 1, 2, 3, 4, 5, 6, 7, 8, 19], (0, 4)),
+    ([0, 1, 2, 3, 4, 5, 6, 7, 18, 9, 10, 11], (4, 4)),
+])
+def test_waveform_table_model_emits_changed_rows_only(new_val, expected_rows):
+    model = CWaveformTableModel()
+    model.columns = 2
+    model.set_array(np.arange(10))
+    emitted = []
+    model.dataChanged.connect(lambda top_left, bottom_right, *_: emitted.append((top_left.row(), bottom_right.row())))
+    model.set_array(np.array(new_val))
+    if expected_rows is None:
+        assert emitted == []
+    else:
+        assert emitted == [expected_rows]
+
+
+def test_waveform_table_model_ignores_nan():
+    model = CWaveformTableModel()
+    model.set_array(np.array([np.nan, 1.0]))
+    emitted = []
+    model.dataChanged.connect(lambda *args: emitted.append(args))
+    model.set_array(np.array([np.nan, 1.0]))
+    assert emitted == []
+
+
+def test_waveform_table_displays_channel_value(qtbot: QtBot):
+    widget = CWaveFormTable()
+    qtbot.add_widget(widget)
+    widget.columnCount = 2
+    widget.rowStride = 1
+    widget.columnHeaderLabels = ['x', 'y']
+    widget.channelValueChanged(CChannelData(value=np.arange(1_000_000, dtype=float), meta_info={}))
+    assert widget.model().rowCount() == 500_000
+    assert widget.model().data(widget.model().index(10, 1)) == '21.0'
+    widget.channelValueChanged(CChannelData(value=None, meta_info={}))
+    assert widget.model().rowCount() == 0
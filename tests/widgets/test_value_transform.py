@@ -0,0 +1,142 @@
+import builtins
+import threading
+import time
+from unittest import mock
+from pytestqt.qtbot import QtBot
+from comrad import CLabel, CChannelData, CValueAggregator
+from comrad.widgets.value_transform import _BackgroundEvaluator, _create_transformation_function
+
+
+def test_transformation_output_is_local_to_snippet():
+    fn1 = _create_transformation_function('output(1)')
+    fn2 = _create_transformation_function('output(new_val * 2)')
+    assert fn1() == 1
+    assert fn2(new_val=3) == 6
+
+
+def test_synchronous_evaluation_records_latency(qtbot: QtBot):
+    widget = CLabel()
+    qtbot.add_widget(widget)
+    on_result = mock.Mock()
+    widget.evaluate_transformation(lambda val: val + 1, on_result=on_result, val=1)
+    on_result.assert_called_once_with(2)
+    assert widget.computeLatency >= 0.0
+
+
+def test_background_evaluation_runs_outside_gui_thread(qtbot: QtBot):
+    widget = CLabel()
+    qtbot.add_widget(widget)
+    widget.backgroundEvaluation = True
+    gui_thread = threading.current_thread()
+    threads = []
+
+    def transform(val):
+        threads.append(threading.current_thread())
+        return val + 1
+
+    on_result = mock.Mock()
+    widget.evaluate_transformation(transform, on_result=on_result, val=1)
+    qtbot.wait_until(lambda: on_result.call_count == 1, timeout=1000)
+    on_result.assert_called_once_with(2)
+    assert threads and threads[0] is not gui_thread
+
+
+def test_transformation_output_is_local_to_concurrent_snippets():
+    fn = _create_transformation_function("""
+def emit(val):
+    output(val)
+
+barrier.wait(1)
+emit(new_val)
+""")
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def run(val):
+        results[val] = fn(new_val=val, barrier=barrier)
+
+    threads = [threading.Thread(target=run, args=(val,)) for val in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {1: 1, 2: 2}
+
+
+def test_transformation_output_is_builtin_for_imported_modules(tmp_path, monkeypatch):
+    monkeypatch.setattr(builtins, 'output', None, raising=False)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / 'comrad_test_output_helper.py').write_text('def emit(val):\n    output(val)\n')
+    fn = _create_transformation_function('from comrad_test_output_helper import emit\nemit(new_val * 2)',
+                                         file=tmp_path / 'snippet.py')
+    assert fn(new_val=3) == 6
+    assert fn(new_val=4) == 8
+
+
+def test_transformation_output_is_not_builtin_in_worker_threads(monkeypatch):
+    monkeypatch.setattr(builtins, 'output', None, raising=False)
+    fn = _create_transformation_function('output(new_val)')
+    results = []
+    thread = threading.Thread(target=lambda: results.append(fn(new_val=1)))
+    thread.start()
+    thread.join()
+    assert results == [1]
+    assert builtins.output is None
+
+
+def test_background_evaluator_coalesces_pending_values(qtbot: QtBot):
+    evaluator = _BackgroundEvaluator()
+    release = threading.Event()
+    evaluated = []
+
+    def transform(val):
+        if val == 1:
+            release.wait(1)
+        evaluated.append(val)
+        return val
+
+    on_result = mock.Mock()
+    evaluator.submit(transform, on_result, {'val': 1})
+    evaluator.submit(transform, on_result, {'val': 2})  # Pending, will be replaced
+    evaluator.submit(transform, on_result, {'val': 3})
+    release.set()
+    qtbot.wait_until(lambda: on_result.call_count == 2, timeout=1000)
+    qtbot.wait(50)
+    assert on_result.call_args_list == [mock.call(1), mock.call(3)]
+    assert evaluated == [1, 3]
+
+
+def test_background_evaluator_delivers_results_while_values_keep_arriving(qtbot: QtBot):
+    evaluator = _BackgroundEvaluator()
+
+    def transform(val):
+        time.sleep(0.02)
+        return val
+
+    on_result = mock.Mock()
+    for val in range(50):
+        evaluator.submit(transform, on_result, {'val': val})
+        qtbot.wait(5)
+    assert on_result.call_count >= 2
+    delivered = [call.args[0] for call in on_result.call_args_list]
+    assert delivered == sorted(delivered)
+
+
+def test_clabel_background_transformation(qtbot: QtBot):
+    widget = CLabel()
+    qtbot.add_widget(widget)
+    widget.backgroundEvaluation = True
+    widget.valueTransformation = 'output(new_val * 2)'
+    widget.channelValueChanged(CChannelData(value=2, meta_info={}))
+    qtbot.wait_until(lambda: widget.text() == '4', timeout=1000)
+
+
+def test_aggregator_background_transformation(qtbot: QtBot):
+    widget = CValueAggregator()
+    qtbot.add_widget(widget)
+    widget.backgroundEvaluation = True
+    widget.valueTransformation = 'output(values["dev/prop#a"] * 2)'
+    with qtbot.wait_signal(widget.updateTriggered[int]) as blocker:
+        with mock.patch.object(widget, 'sender', return_value=mock.MagicMock(address='dev/prop#a')):
+            widget.value_changed(CChannelData(value=2, meta_info={}))
+    assert blocker.args == [4]
@@ -0,0 +1,35 @@
+import pytest
+from comrad.widgets._virtualization import visible_rows, recycle_slots
+
+
+@pytest.mark.parametrize('offset,viewport_extent,row_extent,count,overscan,expected', [
+    (0, 100, 30, 500, 0, range(0, 4)),
+    (0, 100, 30, 500, 2, range(0, 6)),
+    (300, 100, 30, 500, 0, range(10, 14)),
+    (300, 100, 30, 500, 2, range(8, 16)),
+    (0, 100, 30, 2, 2, range(0, 2)),
+    (14900, 100, 30, 500, 2, range(494, 500)),
+    (0, 100, 30, 0, 2, range(0)),
+    (0, 100, 0, 10, 2, range(0)),
+    (0, 0, 30, 10, 0, range(0, 1)),
+])
+def test_visible_rows(offset, viewport_extent, row_extent, count, overscan, expected):
+    assert visible_rows(offset=offset,
+                        viewport_extent=viewport_extent,
+                        row_extent=row_extent,
+                        count=count,
+                        overscan=overscan) == expected
+
+
+@pytest.mark.parametrize('current,rows,expected', [
+    ([], range(0, 2), {}),
+    ([None, None], range(0, 2), {0: 0, 1: 1}),
+    ([0, 1, 2], range(0, 3), {0: 0, 1: 1, 2: 2}),
+    ([0, 1, 2], range(1, 4), {0: 3, 1: 1, 2: 2}),
+    ([0, 1, 2], range(5, 8), {0: 5, 1: 6, 2: 7}),
+    ([0, 1, 2, 3], range(2, 4), {2: 2, 3: 3}),
+    ([0, 0], range(0, 2), {0: 0, 1: 1}),
+    ([0, 1], range(0, 3), {0: 0, 1: 1}),
+])
+def test_recycle_slots(current, rows, expected):
+    assert recycle_slots(current, rows) == expected
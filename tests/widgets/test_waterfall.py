@@ -0,0 +1,109 @@
+import pytest
+import numpy as np
+from comrad.widgets._waterfall import WaterfallHistory, argb_lookup_table, rows_to_argb
+
+
+GRAY = argb_lookup_table(np.repeat(np.arange(256)[:, np.newaxis], 3, axis=1))
+
+
+def test_argb_lookup_table():
+    lut = argb_lookup_table(np.array([[255, 0, 0], [0, 128, 255], [300, -1, 1]]))
+    assert lut.dtype == np.uint32
+    np.testing.assert_array_equal(lut, [0xFFFF0000, 0xFF0080FF, 0xFFFF0001])
+
+
+@pytest.mark.parametrize('rows,levels,expected', [
+    ([0.0, 5.0, 10.0], (0.0, 10.0), [0, 127, 255]),
+    ([-5.0, 20.0], (0.0, 10.0), [0, 255]),
+    ([np.nan, np.inf, -np.inf], (0.0, 10.0), [0, 255, 0]),
+    ([1.0, 2.0], (1.0, 1.0), [0, 0]),
+])
+def test_rows_to_argb(rows, levels, expected):
+    pixels = rows_to_argb(np.array(rows), levels, GRAY)
+    np.testing.assert_array_equal(pixels & 0xFF, expected)
+    assert np.all(pixels >> 24 == 0xFF)
+
+
+def test_history_keeps_last_rows():
+    history = WaterfallHistory(capacity=3)
+    for i in range(5):
+        history.append(np.full(4, i))
+    assert len(history) == 3
+    assert history.width == 4
+    np.testing.assert_array_equal(history.values()[:, 0], [2, 3, 4])
+    assert history.image().shape == (3, 4)
+    assert history.image().flags.c_contiguous
+
+
+def test_history_colors_only_new_row():
+    history = WaterfallHistory(capacity=10)
+    history.set_colors(GRAY, levels=(0.0, 255.0))
+    history.append([0, 255])
+    first_row = history.image()[0].copy()
+    history.append([255, 0])
+    np.testing.assert_array_equal(history.image()[0], first_row)
+    np.testing.assert_array_equal(history.image()[1] & 0xFF, [255, 0])
+
+
+def test_history_automatic_levels_grow():
+    history = WaterfallHistory(capacity=10)
+    history.append([0.0, 10.0])
+    assert history.levels == (0.0, 10.0)
+    history.append([2.0, 8.0])
+    assert history.levels == (0.0, 10.0)
+    history.append([0.0, 20.0])
+    assert history.levels == (0.0, 21.0)
+    # Older rows are re-colored according to the new levels
+    assert history.image()[0, 1] & 0xFF == int(10.0 * 255 / 21.0)
+
+
+def test_history_fixed_levels():
+    history = WaterfallHistory(capacity=10)
+    history.append([0.0, 10.0])
+    history.set_colors(GRAY, levels=(0.0, 20.0))
+    assert history.image()[0, 1] & 0xFF == 127
+    history.append([0.0, 40.0])
+    assert history.levels == (0.0, 20.0)
+    history.set_colors(GRAY)
+    assert history.levels == (0.0, 40.0)
+
+
+def test_history_restarts_on_width_change():
+    history = WaterfallHistory(capacity=10)
+    history.append([1, 2, 3])
+    history.append([1, 2, 3])
+    history.append([1, 2])
+    assert len(history) == 1
+    assert history.width == 2
+
+
+def test_history_resize_keeps_newest():
+    history = WaterfallHistory(capacity=5)
+    for i in range(5):
+        history.append([i, i])
+    levels = history.levels
+    history.resize(2)
+    assert history.capacity == 2
+    np.testing.assert_array_equal(history.values()[:, 0], [3, 4])
+    assert history.image().shape == (2, 2)
+    assert history.levels == levels
+
+
+def test_history_spills_to_memory_map():
+    history = WaterfallHistory(capacity=100, memory_limit=1000)
+    history.append(np.arange(10))
+    assert history.memory_mapped
+    small = WaterfallHistory(capacity=100)
+    small.append(np.arange(10))
+    assert not small.memory_mapped
+
+
+def test_history_empty():
+    history = WaterfallHistory(capacity=3)
+    assert len(history) == 0
+    assert history.width == 0
+    assert history.image().shape == (0, 0)
+    history.append([])
+    assert len(history) == 0
+    with pytest.raises(ValueError):
+        WaterfallHistory(capacity=0)